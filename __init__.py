@@ -32,6 +32,9 @@ from .blueprint import blueprint_nest_navigate
 from .blueprint import blueprint_node_cross_ib
 from .blueprint import blueprint_shader_quick_connect
 
+# 导出数据缓存
+from .utils import preprocess_cache
+
 # 第四代导出模块
 try:
     from .common.export import draw_call_model, submesh_model, blueprint_model_v4
@@ -194,9 +197,15 @@ def register():
     blueprint_node_cross_ib.register()
     blueprint_shader_quick_connect.register()
 
+    # 导出数据缓存
+    preprocess_cache.register()
+
 
 
 def unregister():
+    # 导出数据缓存
+    preprocess_cache.unregister()
+
     # 蓝图系统
     blueprint_shader_quick_connect.unregister()
     blueprint_node_cross_ib.unregister()
@@ -39,6 +39,12 @@ class D3D11GameType:
     CategoryExtractSlotDict:Dict[str,str] =  field(init=False,repr=False)
     CategoryExtractTechniqueDict:Dict[str,str] =  field(init=False,repr=False)
     CategoryStrideDict:Dict[str,int] =  field(init=False,repr=False)
+    # 每个Category在完整顶点里的起始字节偏移，顺序和CategoryStrideDict一致
+    CategoryOffsetDict:Dict[str,int] =  field(init=False,repr=False)
+    # 完整顶点的字节数
+    TotalStride:int = field(init=False,repr=False,default=0)
+    # 第一次用到时编译，之后复用
+    _total_structured_dtype:numpy.dtype = field(init=False,repr=False,default=None)
 
     def __post_init__(self):
         self.FileName = os.path.basename(self.FilePath)
@@ -91,6 +97,13 @@ class D3D11GameType:
             self.CategoryExtractTechniqueDict[d3d11_element.Category] = d3d11_element.ExtractTechnique
             self.CategoryStrideDict[d3d11_element.Category] = self.CategoryStrideDict.get(d3d11_element.Category,0) + d3d11_element.ByteWidth
             self.ElementNameD3D11ElementDict[d3d11_element.ElementName] = d3d11_element
+
+        self.CategoryOffsetDict = {}
+        category_offset = 0
+        for category_name, category_stride in self.CategoryStrideDict.items():
+            self.CategoryOffsetDict[category_name] = category_offset
+            category_offset += category_stride
+        self.TotalStride = aligned_byte_offset
     
     def get_real_category_stride_dict(self) -> dict:
         new_dict = {}
@@ -123,9 +136,13 @@ class D3D11GameType:
         return 4
 
     def get_total_structured_dtype(self) -> numpy.dtype:
-        total_structured_dtype:numpy.dtype = numpy.dtype([])
+        '''
+        完整顶点的结构化dtype，只在第一次调用时编译，之后直接返回同一个对象
+        '''
+        if self._total_structured_dtype is not None:
+            return self._total_structured_dtype
 
-        # 预设的权重个数，也就是每个顶点组受多少个权重影响
+        dtype_field_list = []
         for d3d11_element_name in self.OrderedFullElementList:
             d3d11_element = self.ElementNameD3D11ElementDict[d3d11_element_name]
             np_type = FormatUtils.get_nptype_from_format(d3d11_element.Format)
@@ -134,8 +151,37 @@ class D3D11GameType:
                 
             # XXX 长度为1时必须手动指定为(1,)否则会变成1维数组
             if format_len == 1:
-                total_structured_dtype = numpy.dtype(total_structured_dtype.descr + [(d3d11_element_name, (np_type, (1,)))])
+                dtype_field_list.append((d3d11_element_name, (np_type, (1,))))
             else:
-                total_structured_dtype = numpy.dtype(total_structured_dtype.descr + [(d3d11_element_name, (np_type, format_len))])
-
-        return total_structured_dtype
\ No newline at end of file
+                dtype_field_list.append((d3d11_element_name, (np_type, format_len)))
+
+        self._total_structured_dtype = numpy.dtype(dtype_field_list)
+        return self._total_structured_dtype
+
+
+class D3D11GameTypeRegistry:
+    '''
+    进程内共享的数据类型缓存，key 是 json 文件的绝对路径，
+    文件的修改时间或大小变化时重新解析，否则所有导出流程拿到的都是同一个 D3D11GameType 对象
+    拿到的对象只读，不要修改里面的字典和列表
+    '''
+    # key 是绝对路径，value 是 ((mtime_ns, size), D3D11GameType)
+    _path_gametype_dict:Dict[str,tuple] = {}
+
+    @classmethod
+    def get_game_type(cls, file_path:str) -> D3D11GameType:
+        abs_path = os.path.abspath(file_path)
+        file_stat = os.stat(abs_path)
+        file_stamp = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        cached = cls._path_gametype_dict.get(abs_path, None)
+        if cached is not None and cached[0] == file_stamp:
+            return cached[1]
+
+        d3d11_game_type = D3D11GameType(FilePath=file_path)
+        cls._path_gametype_dict[abs_path] = (file_stamp, d3d11_game_type)
+        return d3d11_game_type
+
+    @classmethod
+    def clear(cls):
+        cls._path_gametype_dict = {}
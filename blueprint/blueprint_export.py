@@ -15,6 +15,9 @@ from ..base.m_global_key_counter import M_GlobalKeyCounter
 from ..config.properties_generate_mod import Properties_GenerateMod
 from ..config.properties_import_model import Properties_ImportModel
 
+from ..common.export_manifest import save_export_manifest, reset_export_manifest
+from ..helper.buffer_export_helper import BufferExportHelper
+
 from .blueprint_model import BluePrintModel
 from .blueprint_export_helper import BlueprintExportHelper
 
@@ -390,6 +393,9 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
                     return {'FINISHED'}
                 end_operation(f"GenerateMod_Export_{export_index}")
 
+                # 保存增量导出清单，多文件导出每一轮的 Buffer 文件夹各自一份
+                save_export_manifest()
+
                 print(f"第 {export_index}/{max_export_count} 次导出完成")
                 
                 # 每次导出后清理副本（就像手动导出后清理一样）
@@ -433,6 +439,16 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
             
             CommandUtils.OpenGeneratedModFolder()
         finally:
+            # 关闭本次导出中复用的常驻预处理工作进程
+            from ..utils.parallel_preprocess import shutdown_worker_pool
+            shutdown_worker_pool()
+
+            # 导出中断时丢弃尚未保存的增量导出清单
+            reset_export_manifest()
+
+            # 保存 Buffer 文件哈希索引，打印本次写出/跳过的字节数
+            BufferExportHelper.flush_hash_index()
+
             # Clean up override
             BlueprintExportHelper.forced_target_tree_name = None
             # 恢复原始导出路径
@@ -1046,11 +1062,17 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
             print(f"[ParallelPreprocess] 开始并行预处理 {len(objects_to_process)} 个物体...")
             print(f"[ParallelPreprocess] 工作进程数: {num_workers}")
             
+            object_costs = {
+                obj_name: ParallelPreprocessManager.estimate_object_cost(node_mapping[obj_name][0])
+                for obj_name in objects_to_process
+            }
+            
             object_blend_map = manager.preprocess_parallel(
                 blend_file=blend_file,
                 object_names=objects_to_process,
                 mirror_workflow=mirror_workflow_enabled,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                object_costs=object_costs
             )
             
             if manager.validation_error:
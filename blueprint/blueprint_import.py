@@ -1,6 +1,8 @@
 import os
 import bpy
 
+from concurrent.futures import ThreadPoolExecutor
+
 from ..utils.json_utils import JsonUtils
 from ..utils.config_utils import ConfigUtils
 from ..utils.collection_utils import CollectionColor, CollectionUtils
@@ -15,6 +17,153 @@ from ..importer.migoto_binary_file import ConfigTabsHelper, ConfigAliasHelper
 from ..base.drawib_pair import DrawIBPair
 from .blueprint_drag_drop import set_importing_state, refresh_workspace_cache
 
+# 工作空间导入时并行准备 DrawIB 数据的线程数，主要是磁盘读取和 numpy 计算
+IMPORT_PREPARE_MAX_WORKERS = 8
+
+
+def _map_in_thread_pool(prepare_func, item_list:list):
+    '''
+    在线程池里对每一项执行 prepare_func，按原顺序逐个返回结果
+    主线程拿到一个结果就可以开始创建物体，同时后面的 DrawIB 还在后台继续准备
+    prepare_func 里不能访问 bpy，准备阶段抛出的异常会在主线程取到对应结果时重新抛出
+    '''
+    if len(item_list) == 0:
+        return
+    max_workers = min(IMPORT_PREPARE_MAX_WORKERS, len(item_list))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for result in executor.map(prepare_func, item_list):
+            yield result
+
+
+def _get_import_folder_path_list(drawib_folder_path:str) -> list[str]:
+    '''
+    列出 DrawIB 文件夹下的数据类型文件夹，GPU 类型排在 CPU 类型前面
+    '''
+    gpu_import_folder_path_list = []
+    cpu_import_folder_path_list = []
+
+    dirs = os.listdir(drawib_folder_path)
+    for dirname in dirs:
+        if not dirname.startswith("TYPE_"):
+            continue
+        final_import_folder_path = os.path.join(drawib_folder_path,dirname)
+        if dirname.startswith("TYPE_GPU"):
+            gpu_import_folder_path_list.append(final_import_folder_path)
+        elif dirname.startswith("TYPE_CPU"):
+            cpu_import_folder_path_list.append(final_import_folder_path)
+
+    return gpu_import_folder_path_list + cpu_import_folder_path_list
+
+
+def _prepare_import_ssmt4(import_folder_path:str):
+    '''
+    第四代工作空间导入的准备阶段，在线程池中执行，不访问 bpy
+    找到第一个有 fmt 文件的数据类型，读取并解码 ib/vb 数据
+    文件夹名格式不对或者找不到可导入的数据类型时返回 None
+    '''
+    import_folder_name = os.path.basename(import_folder_path)
+    print("Import FolderName: " + import_folder_name)
+
+    namesplits = import_folder_name.split('-')
+    if len(namesplits) < 3:
+        print(f"Warning: Skipping folder with unexpected name format (expected at least one '-'): {import_folder_name}")
+        return None
+
+    draw_ib = namesplits[0]
+    print("尝试导入DrawIB:", draw_ib)
+
+    for gametype_folder_path in _get_import_folder_path_list(import_folder_path):
+        gametype_name = gametype_folder_path.split("TYPE_")[1]
+        print("尝试导入数据类型: " + gametype_name)
+
+        print("DrawIB " + draw_ib + "尝试导入路径: " + gametype_folder_path)
+
+        fmt_file_path = os.path.join(gametype_folder_path, import_folder_name + ".fmt")
+        if not os.path.exists(fmt_file_path):
+            print(f"找不到 fmt 文件: {fmt_file_path}")
+            continue
+
+        mbf = MigotoBinaryFile(fmt_path=fmt_file_path, mesh_name=import_folder_name + ".自定义名称")
+        MeshImporter.prepare_mbf_data(mbf)
+
+        import_json_path = os.path.join(gametype_folder_path, "import.json")
+        if os.path.exists(import_json_path):
+            import_json = JsonUtils.LoadFromFile(import_json_path)
+            work_game_type = import_json.get("WorkGameType","")
+        else:
+            tmp_json_path = os.path.join(gametype_folder_path, "tmp.json")
+            if os.path.exists(tmp_json_path):
+                tmp_json = JsonUtils.LoadFromFile(tmp_json_path)
+                work_game_type = tmp_json.get("WorkGameType","")
+            else:
+                work_game_type = ""
+
+        return {
+            "import_folder_name": import_folder_name,
+            "draw_ib": draw_ib,
+            "gametype_name": gametype_name,
+            "mbf": mbf,
+            "work_game_type": work_game_type,
+        }
+
+    return None
+
+
+def _prepare_import_ssmt3(draw_ib_pair:DrawIBPair):
+    '''
+    第三代工作空间导入的准备阶段，在线程池中执行，不访问 bpy
+    找到第一个能读取到 prefix 列表的数据类型，读取并解码其中每个部件的 ib/vb 数据
+    需要报告给用户的信息放在 report_list 里，由主线程调用 self.report
+    '''
+    draw_ib = draw_ib_pair.DrawIB
+    alias_name = draw_ib_pair.AliasName
+
+    if alias_name == "":
+        alias_name = "Original"
+
+    prepared = {
+        "draw_ib": draw_ib,
+        "gametype_name": "",
+        "mbf_list": [],
+        "work_game_type": "",
+        "report_list": [],
+    }
+
+    print("尝试导入DrawIB:", draw_ib)
+    import_drawib_folder_path = os.path.join(GlobalConfig.path_workspace_folder(), draw_ib)
+    print("当前导入的DrawIB路径:", import_drawib_folder_path)
+
+    if not os.path.exists(import_drawib_folder_path):
+        prepared["report_list"].append(({'ERROR'},"目标DrawIB "+draw_ib+" 的提取文件夹不存在,请检查你的工作空间中的DrawIB列表是否正确或者是否忘记点击提取模型: " + import_drawib_folder_path))
+        return prepared
+
+    for import_folder_path in _get_import_folder_path_list(import_drawib_folder_path):
+        gametype_name = import_folder_path.split("TYPE_")[1]
+        print("尝试导入数据类型: " + gametype_name)
+
+        print("DrawIB " + draw_ib + "尝试导入路径: " + import_folder_path)
+
+        import_prefix_list = ConfigUtils.get_prefix_list_from_tmp_json(import_folder_path)
+        if len(import_prefix_list) == 0:
+            prepared["report_list"].append(({'ERROR'},"当前数据类型暂不支持一键导入分支模型"))
+            continue
+
+        part_count = 1
+        for prefix in import_prefix_list:
+            fmt_file_path = os.path.join(import_folder_path, prefix + ".fmt")
+            mbf = MigotoBinaryFile(fmt_path=fmt_file_path,mesh_name=draw_ib + "-" + str(part_count) + "-" + alias_name)
+            MeshImporter.prepare_mbf_data(mbf)
+            prepared["mbf_list"].append(mbf)
+
+            part_count = part_count + 1
+
+        tmp_json = ConfigUtils.read_tmp_json(import_folder_path)
+        prepared["work_game_type"] = tmp_json.get("WorkGameType","")
+        prepared["gametype_name"] = gametype_name
+        break
+
+    return prepared
+
 
 def _organize_objects_by_tabs_ssmt4(workspace_collection, imported_objects_info: list):
     tabs_config = ConfigTabsHelper.get_drawib_tabs_config()
@@ -76,78 +225,24 @@ def ImportFromWorkSpaceSSMT4(self, context):
     imported_count = 0
     imported_objects_info = []
 
-    for import_folder_path in workspace_subfolders:
-        import_folder_name = os.path.basename(import_folder_path)
-        print("Import FolderName: " + import_folder_name)
-
-        namesplits = import_folder_name.split('-')
-        if len(namesplits) < 3:
-            print(f"Warning: Skipping folder with unexpected name format (expected at least one '-'): {import_folder_name}")
+    # 文件查找、fmt 解析和 ib/vb 解码在线程池里并行完成，主线程只负责创建物体
+    for prepared in _map_in_thread_pool(_prepare_import_ssmt4, workspace_subfolders):
+        if prepared is None:
             continue
 
-        draw_ib = namesplits[0]
-        index_count = namesplits[1]
-        first_index = namesplits[2]
+        mbf = prepared["mbf"]
+        obj = MeshImporter.create_mesh_obj_from_mbf(mbf=mbf, import_collection=workspace_collection)
 
-        print("尝试导入DrawIB:", draw_ib)
-        
-        gpu_import_folder_path_list = []
-        cpu_import_folder_path_list = []
+        if obj:
+            imported_objects_info.append({
+                "obj": obj,
+                "draw_ib": prepared["draw_ib"],
+                "mesh_name": mbf.mesh_name
+            })
 
-        dirs = os.listdir(import_folder_path)
-        for dirname in dirs:
-            if not dirname.startswith("TYPE_"):
-                continue
-            final_import_folder_path = os.path.join(import_folder_path,dirname)
-            if dirname.startswith("TYPE_GPU"):
-                gpu_import_folder_path_list.append(final_import_folder_path)
-            elif dirname.startswith("TYPE_CPU"):
-                cpu_import_folder_path_list.append(final_import_folder_path)
-
-        final_import_folder_path_list = []
-        for gpu_path in gpu_import_folder_path_list:
-            final_import_folder_path_list.append(gpu_path)
-        for cpu_path in cpu_import_folder_path_list:
-            final_import_folder_path_list.append(cpu_path)
-        
-
-        for import_folder_path in final_import_folder_path_list:
-            gametype_name = import_folder_path.split("TYPE_")[1]
-            print("尝试导入数据类型: " + gametype_name)
-
-            print("DrawIB " + draw_ib + "尝试导入路径: " + import_folder_path)
-
-            fmt_file_path = os.path.join(import_folder_path, import_folder_name + ".fmt")
-            if not os.path.exists(fmt_file_path):
-                print(f"找不到 fmt 文件: {fmt_file_path}")
-                continue
-                
-            mbf = MigotoBinaryFile(fmt_path=fmt_file_path, mesh_name=import_folder_name + ".自定义名称")
-            obj = MeshImporter.create_mesh_obj_from_mbf(mbf=mbf, import_collection=workspace_collection)
-            
-            if obj:
-                imported_objects_info.append({
-                    "obj": obj,
-                    "draw_ib": draw_ib,
-                    "mesh_name": mbf.mesh_name
-                })
-
-            import_json_path = os.path.join(import_folder_path, "import.json")
-            if os.path.exists(import_json_path):
-                import_json = JsonUtils.LoadFromFile(import_json_path)
-                work_game_type = import_json.get("WorkGameType","")
-            else:
-                tmp_json_path = os.path.join(import_folder_path, "tmp.json")
-                if os.path.exists(tmp_json_path):
-                    tmp_json = JsonUtils.LoadFromFile(tmp_json_path)
-                    work_game_type = tmp_json.get("WorkGameType","")
-                else:
-                    work_game_type = ""
-                    
-            foldername_gametypename_dict[import_folder_name] = work_game_type
-            imported_count += 1
-            self.report({'INFO'}, "成功导入" + import_folder_name + " 的数据类型: " + gametype_name)
-            break
+        foldername_gametypename_dict[prepared["import_folder_name"]] = prepared["work_game_type"]
+        imported_count += 1
+        self.report({'INFO'}, "成功导入" + prepared["import_folder_name"] + " 的数据类型: " + prepared["gametype_name"])
 
     _organize_objects_by_tabs_ssmt4(workspace_collection, imported_objects_info)
 
@@ -254,70 +349,27 @@ def ImprotFromWorkSpaceSSMT3(self, context):
 
     draw_ib_pair_list:list[DrawIBPair] = ConfigUtils.get_extract_drawib_list_from_workspace_config_json()
 
+    # 别名配置在主线程里先加载好，后台线程创建 MigotoBinaryFile 时只读取
+    ConfigAliasHelper.load_config_alias(current_workspace_folder)
+
     draw_ib_gametypename_dict = {}
     imported_count = 0
-    
-    for draw_ib_pair in draw_ib_pair_list:
-        draw_ib = draw_ib_pair.DrawIB
-        alias_name = draw_ib_pair.AliasName
-
-        if alias_name == "":
-            alias_name = "Original"
 
-        print("尝试导入DrawIB:", draw_ib)
-        import_drawib_folder_path = os.path.join(current_workspace_folder, draw_ib)
-        print("当前导入的DrawIB路径:", import_drawib_folder_path)
+    # 文件查找、fmt 解析和 ib/vb 解码在线程池里并行完成，主线程只负责创建物体
+    for prepared in _map_in_thread_pool(_prepare_import_ssmt3, draw_ib_pair_list):
+        for report_type, report_message in prepared["report_list"]:
+            self.report(report_type, report_message)
 
-        if not os.path.exists(import_drawib_folder_path):
-            self.report({'ERROR'},"目标DrawIB "+draw_ib+" 的提取文件夹不存在,请检查你的工作空间中的DrawIB列表是否正确或者是否忘记点击提取模型: " + import_drawib_folder_path)
+        if len(prepared["mbf_list"]) == 0:
             continue
-        
-        gpu_import_folder_path_list = []
-        cpu_import_folder_path_list = []
-
-        dirs = os.listdir(import_drawib_folder_path)
-        for dirname in dirs:
-            if not dirname.startswith("TYPE_"):
-                continue
-            final_import_folder_path = os.path.join(import_drawib_folder_path,dirname)
-            if dirname.startswith("TYPE_GPU"):
-                gpu_import_folder_path_list.append(final_import_folder_path)
-            elif dirname.startswith("TYPE_CPU"):
-                cpu_import_folder_path_list.append(final_import_folder_path)
-
-        final_import_folder_path_list = []
-        for gpu_path in gpu_import_folder_path_list:
-            final_import_folder_path_list.append(gpu_path)
-        for cpu_path in cpu_import_folder_path_list:
-            final_import_folder_path_list.append(cpu_path)
-        
 
-        for import_folder_path in final_import_folder_path_list:
-            gametype_name = import_folder_path.split("TYPE_")[1]
-            print("尝试导入数据类型: " + gametype_name)
+        for mbf in prepared["mbf_list"]:
+            MeshImporter.create_mesh_obj_from_mbf(mbf=mbf,import_collection=workspace_collection)
 
-            print("DrawIB " + draw_ib + "尝试导入路径: " + import_folder_path)
-
-            import_prefix_list = ConfigUtils.get_prefix_list_from_tmp_json(import_folder_path)
-            if len(import_prefix_list) == 0:
-                self.report({'ERROR'},"当前数据类型暂不支持一键导入分支模型")
-                continue
-
-            part_count = 1
-            for prefix in import_prefix_list:
-                
-                fmt_file_path = os.path.join(import_folder_path, prefix + ".fmt")
-                mbf = MigotoBinaryFile(fmt_path=fmt_file_path,mesh_name=draw_ib + "-" + str(part_count) + "-" + alias_name)
-                MeshImporter.create_mesh_obj_from_mbf(mbf=mbf,import_collection=workspace_collection)
-
-                part_count = part_count + 1
-
-            tmp_json = ConfigUtils.read_tmp_json(import_folder_path)
-            work_game_type = tmp_json.get("WorkGameType","")
-            draw_ib_gametypename_dict[draw_ib] = work_game_type
-            imported_count += 1
-            self.report({'INFO'}, "成功导入DrawIB " + draw_ib + " 的数据类型: " + gametype_name)
-            break
+        draw_ib = prepared["draw_ib"]
+        draw_ib_gametypename_dict[draw_ib] = prepared["work_game_type"]
+        imported_count += 1
+        self.report({'INFO'}, "成功导入DrawIB " + draw_ib + " 的数据类型: " + prepared["gametype_name"])
 
     save_import_json_path = os.path.join(GlobalConfig.path_workspace_folder(),"Import.json")
     JsonUtils.SaveToFile(json_dict=draw_ib_gametypename_dict,filepath=save_import_json_path)
@@ -444,6 +444,12 @@ class SSMTNode_Result_Output(SSMTNodeBase):
         layout.prop(context.scene.properties_generate_mod, 
                     "forbid_auto_texture_ini",text="禁止自动贴图流程")
 
+        layout.prop(context.scene.properties_generate_mod, "direct_shapekey_evaluation")
+
+        layout.prop(context.scene.properties_generate_mod, "sparse_shapekey_export")
+
+        layout.prop(context.scene.properties_generate_mod, "use_incremental_export")
+
         if GlobalConfig.logic_name != LogicName.UnityCPU:
             layout.prop(context.scene.properties_generate_mod,
                         "recalculate_tangent",text="向量归一化法线存入TANGENT(全局)")
@@ -8,6 +8,7 @@ from ..utils.config_utils import ConfigUtils
 from ..utils.collection_utils import *
 from ..utils.json_utils import *
 from ..utils.timer_utils import *
+from ..utils.format_utils import FormatUtils
 
 from ..base.obj_data_model import ObjDataModel
 from ..base.component_model import ComponentModel
@@ -16,10 +17,14 @@ from ..base.m_draw_indexed import M_DrawIndexed
 
 from ..config.main_config import *
 from ..config.import_config import ImportConfig
+from ..config.properties_generate_mod import Properties_GenerateMod
 
 from ..blueprint.blueprint_model import BluePrintModel
 
 from ..helper.buffer_export_helper import BufferExportHelper
+from ..blueprint.blueprint_export_helper import BlueprintExportHelper
+
+from .export_manifest import ExportManifest, get_export_manifest
 
 class DrawIBModel:
     '''
@@ -29,6 +34,11 @@ class DrawIBModel:
     (例如WWMI就有自己的一套DrawIBModel)
     '''
 
+    # 稀疏形态键Buffer中，float32 的 POSITION 分量变化量不超过这个值视为没有移动
+    SPARSE_SHAPEKEY_TOLERANCE = 1e-6
+    # 法线、切线等方向分量重新计算时会有浮点误差，变化量不超过这个值视为没有变化（小于 SNORM8 的量化步长）
+    SPARSE_SHAPEKEY_DIRECTION_TOLERANCE = 1e-3
+
 
     # 通过default_factory让每个类的实例的变量分割开来，不再共享类的静态变量
     def __init__(self, draw_ib:str, branch_model:BluePrintModel, skip_buffer_export:bool = False, unique_str:str = ""):
@@ -43,14 +53,70 @@ class DrawIBModel:
         self.import_config:ImportConfig = ImportConfig(draw_ib=self.draw_ib, unique_str=unique_str)
         self.d3d11GameType:D3D11GameType = self.import_config.d3d11GameType
 
-        '''
-        这里是要得到每个Component对应的obj_data_model列表
-        在这一步之前，需要对当前DrawIB的所有的obj_data_model填充ib和category_buf_dict属性
-        '''
-        self.draw_ib_ordered_obj_data_model_list:list[ObjDataModel] = branch_model.get_buffered_obj_data_model_list_by_draw_ib_and_game_type(draw_ib=draw_ib,d3d11_game_type=self.import_config.d3d11GameType)
+        # (3) 增量导出：输入没有变化并且上一次写出的 Buffer 文件都还在时，直接从这些文件恢复
         self._component_model_list:list[ComponentModel] = []
         self.component_name_component_model_dict:dict[str,ComponentModel] = {}
+        self.__init_buffer_data()
+
+        export_manifest = None if skip_buffer_export else get_export_manifest()
+        input_key = ""
+        is_reused = False
+        if export_manifest is not None:
+            input_key = ExportManifest.calculate_input_key(
+                draw_ib=draw_ib,
+                unique_str=unique_str,
+                ordered_obj_data_model_list=branch_model.ordered_draw_obj_data_model_list,
+                d3d11_game_type=self.d3d11GameType,
+                shapekey_names=list(BlueprintExportHelper.get_current_shapekeyname_mkey_dict().keys())
+            )
+            manifest_entry = export_manifest.get_reusable_entry(draw_ib=draw_ib, input_key=input_key)
+            if manifest_entry is not None:
+                self.draw_ib_ordered_obj_data_model_list:list[ObjDataModel] = [copy.deepcopy(obj_data_model) for obj_data_model in branch_model.ordered_draw_obj_data_model_list if obj_data_model.draw_ib == draw_ib]
+                self.__parse_component_model_list()
+                is_reused = self.__restore_from_manifest(export_manifest=export_manifest, manifest_entry=manifest_entry)
+                if is_reused:
+                    print(f"[ExportManifest] {self.draw_ib} 没有变化，复用上一次导出的 Buffer 文件")
+                else:
+                    self._component_model_list = []
+                    self.component_name_component_model_dict = {}
+                    self.__init_buffer_data()
+
+        if not is_reused:
+            '''
+            这里是要得到每个Component对应的obj_data_model列表
+            在这一步之前，需要对当前DrawIB的所有的obj_data_model填充ib和category_buf_dict属性
+            '''
+            self.draw_ib_ordered_obj_data_model_list:list[ObjDataModel] = branch_model.get_buffered_obj_data_model_list_by_draw_ib_and_game_type(draw_ib=draw_ib,d3d11_game_type=self.import_config.d3d11GameType)
+            self.__parse_component_model_list()
+
+            # 读取和解析 buffer 数据（预导出模式也需要这些数据来生成正确的 INI）
+            self.__read_component_ib_buf_dict()
+            self.parse_categoryname_bytelist_dict()
+
+        # (5) 导出Buffer文件，Export Index Buffer files, Category Buffer files. (And Export ShapeKey Buffer Files.(WWMI))
+        # 用于写出IB时使用
+        self.PartName_IBResourceName_Dict = {}
+        self.PartName_IBBufferFileName_Dict = {}
+        self.combine_partname_ib_resource_and_filename_dict()
         
+        # 只在非预导出模式下写出 Buffer 文件
+        if skip_buffer_export:
+            print(f"[PreviewExport] 跳过 Buffer 文件写入: {self.draw_ib}")
+        elif is_reused:
+            self.copy_shapekey_shader()
+            export_manifest.set_entry(draw_ib=draw_ib, entry=manifest_entry, reused=True)
+        else:
+            self.write_buffer_files()
+            if export_manifest is not None:
+                if input_key:
+                    export_manifest.set_entry(draw_ib=draw_ib, entry=self.__build_manifest_entry(export_manifest=export_manifest, input_key=input_key), reused=False)
+                else:
+                    export_manifest.discard_entry(draw_ib=draw_ib)
+
+    def __parse_component_model_list(self):
+        '''
+        按 Component 把当前 DrawIB 的 obj_data_model 分组
+        '''
         if self.unique_str:
             print(f"SSMT4 格式: 根据 first_index 分块")
             first_index_obj_list_dict:dict[int,list[ObjDataModel]] = {}
@@ -84,8 +150,11 @@ class DrawIBModel:
         
         LOG.newline()
 
-        # (4) 根据之前解析集合架构的结果，读取obj对象内容到字典中
-        self.componentname_ibbuf_dict:dict[str,list[int]] = {} # 每个Component都生成一个IndexBuffer文件，或者所有Component共用一个IB文件。
+    def __init_buffer_data(self):
+        '''
+        根据之前解析集合架构的结果，读取obj对象内容到字典中
+        '''
+        self.componentname_ibbuf_dict:dict[str,numpy.ndarray] = {} # 每个Component都生成一个IndexBuffer文件，或者所有Component共用一个IB文件。
         self.__categoryname_bytelist_dict = {} # 每个Category都生成一个CategoryBuffer文件。
         self.draw_number:int = 0 # 每个DrawIB都有总的顶点数，对应CategoryBuffer里的顶点数。
         self.total_index_count:int = 0 # 每个DrawIB都有总的IndexCount数，也就是所有的Component中的所有顶点索引数量
@@ -93,22 +162,102 @@ class DrawIBModel:
 
         # 用于存储合并后的形态键数据
         self.shapekey_name_bytelist_dict:dict[str, numpy.ndarray] = {}
+        # 稀疏形态键Buffer：每个形态键实际移动的顶点编号，和 shapekey_name_bytelist_dict 中的顶点一一对应，为空时表示完整Buffer
+        self.shapekey_name_vertexid_dict:dict[str, numpy.ndarray] = {}
 
-        # 读取和解析 buffer 数据（预导出模式也需要这些数据来生成正确的 INI）
-        self.__read_component_ib_buf_dict()
-        self.parse_categoryname_bytelist_dict()
+    def __restore_from_manifest(self, export_manifest:ExportManifest, manifest_entry:dict) -> bool:
+        '''
+        从清单记录的 DrawIndexed 参数和上一次写出的 Buffer 文件恢复当前 DrawIBModel，
+        任意一个 Buffer 文件内容对不上时返回 False，由调用方走完整的生成流程
+        '''
+        buf_filename_data_dict = {}
+        for buf_filename in manifest_entry.get("buffers", {}).keys():
+            buf_data = export_manifest.load_buffer(entry=manifest_entry, buf_filename=buf_filename)
+            if buf_data is None:
+                return False
+            buf_filename_data_dict[buf_filename] = buf_data
+
+        obj_name_drawindexed_info_dict = manifest_entry.get("drawindexed", {})
+        for component_model in self._component_model_list:
+            new_final_ordered_draw_obj_model_list:list[ObjDataModel] = []
+            for obj_model in component_model.final_ordered_draw_obj_model_list:
+                obj_name = obj_model.obj_name
+                drawindexed_obj = self.__obj_name_drawindexed_dict.get(obj_name, None)
+                if drawindexed_obj is None:
+                    drawindexed_info = obj_name_drawindexed_info_dict.get(obj_name, None)
+                    if drawindexed_info is None:
+                        # 上一次导出时这个物体就因为没有 ib 被跳过了
+                        continue
+                    drawindexed_obj = M_DrawIndexed()
+                    drawindexed_obj.DrawNumber = drawindexed_info["DrawNumber"]
+                    drawindexed_obj.DrawOffsetIndex = drawindexed_info["DrawOffsetIndex"]
+                    drawindexed_obj.DrawStartIndex = drawindexed_info["DrawStartIndex"]
+                    drawindexed_obj.AliasName = drawindexed_info["AliasName"]
+                    drawindexed_obj.UniqueVertexCount = drawindexed_info["UniqueVertexCount"]
+                    self.__obj_name_drawindexed_dict[obj_name] = drawindexed_obj
 
-        # (5) 导出Buffer文件，Export Index Buffer files, Category Buffer files. (And Export ShapeKey Buffer Files.(WWMI))
-        # 用于写出IB时使用
-        self.PartName_IBResourceName_Dict = {}
-        self.PartName_IBBufferFileName_Dict = {}
-        self.combine_partname_ib_resource_and_filename_dict()
-        
-        # 只在非预导出模式下写出 Buffer 文件
-        if not skip_buffer_export:
-            self.write_buffer_files()
-        else:
-            print(f"[PreviewExport] 跳过 Buffer 文件写入: {self.draw_ib}")
+                obj_model.drawindexed_obj = drawindexed_obj
+                new_final_ordered_draw_obj_model_list.append(obj_model)
+
+            component_model.final_ordered_draw_obj_model_list = new_final_ordered_draw_obj_model_list
+            self.component_name_component_model_dict[component_model.component_name] = copy.copy(component_model)
+
+        for component_name, buf_filename in manifest_entry.get("ib_files", {}).items():
+            self.componentname_ibbuf_dict[component_name] = numpy.frombuffer(buf_filename_data_dict[buf_filename], dtype=numpy.uint32)
+
+        for category_name, buf_filename in manifest_entry.get("category_files", {}).items():
+            self.__categoryname_bytelist_dict[category_name] = numpy.frombuffer(buf_filename_data_dict[buf_filename], dtype=numpy.uint8)
+
+        for sk_name, buf_filename in manifest_entry.get("shapekey_files", {}).items():
+            self.shapekey_name_bytelist_dict[sk_name] = numpy.frombuffer(buf_filename_data_dict[buf_filename], dtype=numpy.uint8)
+
+        for sk_name, buf_filename in manifest_entry.get("shapekey_vertexid_files", {}).items():
+            self.shapekey_name_vertexid_dict[sk_name] = numpy.frombuffer(buf_filename_data_dict[buf_filename], dtype=numpy.uint32)
+
+        self.draw_number = manifest_entry.get("draw_number", 0)
+        self.total_index_count = manifest_entry.get("total_index_count", 0)
+        return True
+
+    def __build_manifest_entry(self, export_manifest:ExportManifest, input_key:str) -> dict:
+        '''
+        记录本次写出的 Buffer 文件和生成 ini 需要的参数，供下一次导出复用
+        '''
+        manifest_entry = {
+            "input_key": input_key,
+            "draw_number": self.draw_number,
+            "total_index_count": self.total_index_count,
+            "ib_files": {},
+            "category_files": {},
+            "shapekey_files": {},
+            "shapekey_vertexid_files": {},
+            "drawindexed": {},
+            "buffers": {},
+        }
+        for obj_name, drawindexed_obj in self.__obj_name_drawindexed_dict.items():
+            manifest_entry["drawindexed"][obj_name] = {
+                "DrawNumber": drawindexed_obj.DrawNumber,
+                "DrawOffsetIndex": drawindexed_obj.DrawOffsetIndex,
+                "DrawStartIndex": drawindexed_obj.DrawStartIndex,
+                "AliasName": drawindexed_obj.AliasName,
+                "UniqueVertexCount": drawindexed_obj.UniqueVertexCount,
+            }
+
+        for component_name, ib_buf in self.componentname_ibbuf_dict.items():
+            buf_filename = self.get_ib_buffer_filename(component_name)
+            if ib_buf is not None and len(ib_buf) != 0 and buf_filename:
+                manifest_entry["ib_files"][component_name] = buf_filename
+        for category_name in self.__categoryname_bytelist_dict.keys():
+            manifest_entry["category_files"][category_name] = self.get_category_buffer_filename(category_name)
+        for sk_name in self.shapekey_name_bytelist_dict.keys():
+            manifest_entry["shapekey_files"][sk_name] = self.get_shapekey_buffer_filename(sk_name)
+        for sk_name in self.shapekey_name_vertexid_dict.keys():
+            manifest_entry["shapekey_vertexid_files"][sk_name] = self.get_shapekey_vertexid_buffer_filename(sk_name)
+
+        for file_dict_name in ("ib_files", "category_files", "shapekey_files", "shapekey_vertexid_files"):
+            for buf_filename in manifest_entry[file_dict_name].values():
+                if buf_filename not in manifest_entry["buffers"]:
+                    export_manifest.record_buffer(entry=manifest_entry, buf_filename=buf_filename)
+        return manifest_entry
 
 
     def parse_categoryname_bytelist_dict(self):
@@ -136,15 +285,8 @@ class DrawIBModel:
         shapekey_data_lists = {name: [] for name in unique_shape_key_names}
 
         # Pre-calculate Position stride/offset for slicing ShapeKey data
-        pos_cat_offset = 0
-        pos_cat_stride = 0
-        target_cat = "Position"
-        for cat_name in self.d3d11GameType.OrderedCategoryNameList:
-             stride = self.d3d11GameType.CategoryStrideDict.get(cat_name, 0)
-             if cat_name == target_cat:
-                 pos_cat_stride = stride
-                 break
-             pos_cat_offset += stride
+        pos_cat_offset = self.d3d11GameType.CategoryOffsetDict.get("Position", 0)
+        pos_cat_stride = self.d3d11GameType.CategoryStrideDict.get("Position", 0)
 
         # 3. 遍历对象填充容器
         for obj_model in all_ordered_objects:
@@ -207,12 +349,89 @@ class DrawIBModel:
             position_bytelength = len(self.__categoryname_bytelist_dict["Position"])
             self.draw_number = int(position_bytelength/position_stride)
 
+        if self.shapekey_name_bytelist_dict and Properties_GenerateMod.sparse_shapekey_export():
+            self.__sparsify_shapekey_buffers()
+
+    def __get_position_element_layout(self):
+        '''
+        返回 Position Category 中每个元素的 (SemanticName, 字节偏移, 字节宽度, 是否为 float32)
+        各元素宽度之和和 Position 步长对不上时返回空列表
+        '''
+        element_layout = []
+        byte_offset = 0
+        for element_name in self.d3d11GameType.OrderedFullElementList:
+            d3d11_element = self.d3d11GameType.ElementNameD3D11ElementDict[element_name]
+            if d3d11_element.Category != "Position":
+                continue
+            is_float32 = FormatUtils.get_nptype_from_format(d3d11_element.Format) == numpy.float32 and d3d11_element.ByteWidth % 4 == 0
+            element_layout.append((d3d11_element.SemanticName, byte_offset, d3d11_element.ByteWidth, is_float32))
+            byte_offset += d3d11_element.ByteWidth
+        if byte_offset != self.d3d11GameType.CategoryStrideDict.get("Position", 0):
+            return []
+        return element_layout
+
+    def __calc_shapekey_moved_mask(self, sk_rows:numpy.ndarray, base_rows:numpy.ndarray, element_layout:list) -> numpy.ndarray:
+        '''
+        按元素分别判断每个顶点是否被形态键改变：
+        float32 的 POSITION 按 SPARSE_SHAPEKEY_TOLERANCE 比较，其它 float32 元素（法线、切线等）按 SPARSE_SHAPEKEY_DIRECTION_TOLERANCE 比较，
+        这样重新计算法线切线带来的浮点误差不会让没有变化的顶点被当成移动过，
+        非 float32 元素逐字节比较
+        '''
+        if not element_layout:
+            return (sk_rows != base_rows).any(axis=1)
+
+        moved_mask = numpy.zeros(len(sk_rows), dtype=bool)
+        for semantic_name, byte_offset, byte_width, is_float32 in element_layout:
+            sk_element = sk_rows[:, byte_offset:byte_offset + byte_width]
+            base_element = base_rows[:, byte_offset:byte_offset + byte_width]
+            if is_float32:
+                tolerance = self.SPARSE_SHAPEKEY_TOLERANCE if semantic_name == "POSITION" else self.SPARSE_SHAPEKEY_DIRECTION_TOLERANCE
+                diff = numpy.ascontiguousarray(sk_element).view(numpy.float32) - numpy.ascontiguousarray(base_element).view(numpy.float32)
+                moved_mask |= ~(numpy.abs(diff) <= tolerance).all(axis=1)
+            else:
+                moved_mask |= (sk_element != base_element).any(axis=1)
+        return moved_mask
+
+    def __sparsify_shapekey_buffers(self):
+        '''
+        把完整的形态键 Position Buffer 转换为稀疏形式：只保留和原始 Position 不同的顶点，
+        同时记录这些顶点的编号，由 ShapesSparse.hlsl 只对这些顶点计算
+        是否不同由 __calc_shapekey_moved_mask 按元素分别判断
+        '''
+        base_position = self.__categoryname_bytelist_dict.get("Position", None)
+        position_stride = self.d3d11GameType.CategoryStrideDict.get("Position", 0)
+        if base_position is None or position_stride == 0 or len(base_position) != self.draw_number * position_stride:
+            print(f"[SparseShapeKey] {self.draw_ib} 缺少完整的 Position 数据，形态键使用完整Buffer")
+            return
+
+        element_layout = self.__get_position_element_layout()
+        base_rows = numpy.asarray(base_position, dtype=numpy.uint8).reshape(self.draw_number, position_stride)
+
+        dense_bytes = 0
+        sparse_bytes = 0
+        sparse_shapekey_name_bytelist_dict = {}
+        for sk_name, sk_buf in self.shapekey_name_bytelist_dict.items():
+            sk_rows = numpy.asarray(sk_buf, dtype=numpy.uint8).reshape(self.draw_number, position_stride)
+            moved_mask = self.__calc_shapekey_moved_mask(sk_rows, base_rows, element_layout)
+            moved_vertex_ids = numpy.flatnonzero(moved_mask).astype(numpy.uint32)
+            dense_bytes += sk_rows.nbytes
+            if len(moved_vertex_ids) == 0:
+                # 没有移动任何顶点的形态键不需要计算
+                continue
+            sparse_shapekey_name_bytelist_dict[sk_name] = sk_rows[moved_mask].reshape(-1)
+            self.shapekey_name_vertexid_dict[sk_name] = moved_vertex_ids
+            sparse_bytes += sk_rows.shape[1] * len(moved_vertex_ids) + moved_vertex_ids.nbytes
+
+        self.shapekey_name_bytelist_dict = sparse_shapekey_name_bytelist_dict
+        reduced_percent = (1 - sparse_bytes / dense_bytes) * 100 if dense_bytes else 0
+        print(f"[SparseShapeKey] {self.draw_ib} 形态键Buffer {dense_bytes} -> {sparse_bytes} 字节，减少 {reduced_percent:.1f}%")
+
     def __read_component_ib_buf_dict(self):
         obj_name_drawindexedobj_cache_dict:dict[str,M_DrawIndexed] = {}
         
         is_merged_mode = (GlobalConfig.logic_name == LogicName.CTXMC or GlobalConfig.logic_name == LogicName.NierR)
         
-        merged_ib_buffer = []  # Total IB buffer for merged mode
+        merged_ib_chunk_list:list[numpy.ndarray] = []  # Total IB buffer for merged mode
         draw_offset = 0        # Corresponds to DrawOffsetIndex
         
         # In Separate mode, total offset is also needed to calculate total_index_count
@@ -225,7 +444,7 @@ class DrawIBModel:
         
         for component_model in self._component_model_list:
             # For Separate mode: each component has its own IB buffer and offset starts from 0 (usually)
-            component_ib_buffer = []
+            component_ib_chunk_list:list[numpy.ndarray] = []
             component_draw_offset = 0
             
             new_final_ordered_draw_obj_model_list:list[ObjDataModel] = [] 
@@ -252,11 +471,12 @@ class DrawIBModel:
                         print("Can't find ib object for " + obj_name +",skip this obj process.")
                         continue
                     
-                    unique_vertex_number_set = set(ib)
-                    unique_vertex_number = len(unique_vertex_number_set)
+                    # IB 全程保持 uint32 数组，用 bincount 掩码统计实际用到的顶点数
+                    ib = numpy.asarray(ib, dtype=numpy.uint32).reshape(-1)
+                    unique_vertex_number = int(numpy.count_nonzero(numpy.bincount(ib))) if len(ib) != 0 else 0
 
                     # Calculate offset IB for this object
-                    current_obj_ib_with_offset = [idx + vertex_number_ib_offset for idx in ib]
+                    current_obj_ib_with_offset = ib + numpy.uint32(vertex_number_ib_offset)
                     draw_number = len(current_obj_ib_with_offset)
                     
                     # Accumulate buffers and calculate DrawIndexed params
@@ -266,11 +486,11 @@ class DrawIBModel:
                     drawindexed_obj.AliasName = "[" + obj_name + "]  (" + str(unique_vertex_number) + ")"
                     
                     if is_merged_mode:
-                        merged_ib_buffer.extend(current_obj_ib_with_offset)
+                        merged_ib_chunk_list.append(current_obj_ib_with_offset)
                         drawindexed_obj.DrawOffsetIndex = str(draw_offset)
                         draw_offset += draw_number
                     else:
-                        component_ib_buffer.extend(current_obj_ib_with_offset)
+                        component_ib_chunk_list.append(current_obj_ib_with_offset)
                         # For separate mode, offset usually starts from 0 for each component file?
                         # Actually based on original code 'offset = offset + draw_number' (reset per component in loop)
                         drawindexed_obj.DrawOffsetIndex = str(component_draw_offset)
@@ -291,10 +511,12 @@ class DrawIBModel:
             # Update component model
             component_model.final_ordered_draw_obj_model_list = new_final_ordered_draw_obj_model_list
             new_component_model_list.append(component_model)
-            self.component_name_component_model_dict[component_model.component_name] = copy.deepcopy(component_model)
+            # 浅拷贝即可，物体上的 ib 和 Buffer 数组之后只读不改，不需要整份深拷贝
+            self.component_name_component_model_dict[component_model.component_name] = copy.copy(component_model)
             
             # Store Component Buffer (Separate Mode)
             if not is_merged_mode:
+                component_ib_buffer = numpy.concatenate(component_ib_chunk_list) if component_ib_chunk_list else numpy.empty(0, dtype=numpy.uint32)
                 if len(component_ib_buffer) == 0:
                     LOG.warning(self.draw_ib + " collection: " + component_model.component_name + " is hide, skip export ib buf.")
                 else:
@@ -305,6 +527,7 @@ class DrawIBModel:
         # Finalize (Merged Mode) and Total Count
         if is_merged_mode:
             self.total_index_count = draw_offset
+            merged_ib_buffer = numpy.concatenate(merged_ib_chunk_list) if merged_ib_chunk_list else numpy.empty(0, dtype=numpy.uint32)
             # In Merged mode, we stick the big buffer into every component? 
             # Original code: iterate components allowing export if ib_buf is not empty.
             if len(merged_ib_buffer) != 0:
@@ -341,6 +564,48 @@ class DrawIBModel:
                 self.PartName_IBResourceName_Dict[partname] = ib_resource_name
                 self.PartName_IBBufferFileName_Dict[partname] = ib_buf_filename
 
+    def get_ib_buffer_filename(self, component_name:str) -> str:
+        buf_filename = self.PartName_IBBufferFileName_Dict.get(component_name.replace("Component ", ""), None)
+        if buf_filename is None:
+            buf_filename = self.PartName_IBBufferFileName_Dict.get("1", None)
+        return buf_filename
+
+    def get_category_buffer_filename(self, category_name:str) -> str:
+        if self.unique_str:
+            return self.unique_str + "-" + category_name + ".buf"
+        return self.draw_ib + "-" + category_name + ".buf"
+
+    def get_shapekey_buffer_filename(self, sk_name:str) -> str:
+        # 这里根据需求，也许需要加上 hash 前缀，如 self.draw_ib + "-" + sk_filename
+        # 但根据用户指示："名字就是Position.形态键名称.buf", 这里直接拼接在 hash 后面比较稳妥
+        # 通常格式: [Hash]-Position.[SKName].buf
+        # sk_name 直接来自蓝图节点配置的形态键名称
+        return self.draw_ib + "-" + "Position." + sk_name + ".buf"
+
+    def get_shapekey_vertexid_buffer_filename(self, sk_name:str) -> str:
+        return self.draw_ib + "-" + "Position." + sk_name + ".VertexId.buf"
+
+    def copy_shapekey_shader(self):
+        '''
+        有形态键时需要把Shape.hlsl复制到Mod文件夹下面的res文件夹下面
+        '''
+        if not self.shapekey_name_bytelist_dict:
+            return
+
+        res_path = os.path.join(GlobalConfig.path_generate_mod_folder(),"res\\")
+
+        if not os.path.exists(res_path):
+            os.makedirs(res_path)
+
+        # 获取当前文件(draw_ib_model.py)所在目录下的res文件夹
+        current_res_path = os.path.join(os.path.dirname(__file__), "res")
+        shape_hlsl_name = "ShapesSparse.hlsl" if self.shapekey_name_vertexid_dict else "Shapes.hlsl"
+        shape_hlsl_path = os.path.join(current_res_path, shape_hlsl_name)
+        
+        if os.path.exists(shape_hlsl_path):
+            shutil.copy(shape_hlsl_path, res_path)
+            print(f"Copied {shape_hlsl_name} to {res_path}")
+
     def write_buffer_files(self):
         '''
         导出当前Mod的所有Buffer文件
@@ -352,57 +617,29 @@ class DrawIBModel:
             if ib_buf is None or len(ib_buf) == 0:
                 print("Export Skip, Can't get ib buf for partname: " + partname)
             else:
-                buf_filename = self.PartName_IBBufferFileName_Dict.get(partname.replace("Component ", ""), None)
-                if buf_filename is None:
-                    buf_filename = self.PartName_IBBufferFileName_Dict.get("1", None)
+                buf_filename = self.get_ib_buffer_filename(partname)
                 if buf_filename:
                     BufferExportHelper.write_buf_ib_r32_uint(ib_buf, buf_filename)
                 
         # print("Export Category Buffers::")
         # Export category buffer files.
         for category_name, category_buf in self.__categoryname_bytelist_dict.items():
-            if self.unique_str:
-                buf_path = buf_output_folder + self.unique_str + "-" + category_name + ".buf"
-            else:
-                buf_path = buf_output_folder + self.draw_ib + "-" + category_name + ".buf"
-            # print("write: " + buf_path)
-            # print(type(category_buf[0]))
-             # 将 list 转换为 numpy 数组
-            # category_array = numpy.array(category_buf, dtype=numpy.uint8)
-            with open(buf_path, 'wb') as ibf:
-                category_buf.tofile(ibf)
+            buf_path = buf_output_folder + self.get_category_buffer_filename(category_name)
+            BufferExportHelper.write_buffer_file(buf_path, category_buf)
 
         # Export ShapeKey buffer files.
         if self.shapekey_name_bytelist_dict:
-            # 需要把Shape.hlsl复制到Mod文件夹下面的res文件夹下面
-            res_path = os.path.join(GlobalConfig.path_generate_mod_folder(),"res\\")
-
-            if not os.path.exists(res_path):
-                os.makedirs(res_path)
-
-            # 获取当前文件(draw_ib_model.py)所在目录下的res文件夹
-            current_res_path = os.path.join(os.path.dirname(__file__), "res")
-            shape_hlsl_path = os.path.join(current_res_path, "Shapes.hlsl")
-            
-            if os.path.exists(shape_hlsl_path):
-                if not os.path.exists(res_path):
-                    os.makedirs(res_path)
-                
-                shutil.copy(shape_hlsl_path, res_path)
-                print(f"Copied Shape.hlsl to {res_path}")
+            self.copy_shapekey_shader()
 
             print("Export ShapeKey Buffers::")
             for sk_name, sk_buf in self.shapekey_name_bytelist_dict.items():
-                sk_filename = "Position." + sk_name + ".buf" 
-                # 这里根据需求，也许需要加上 hash 前缀，如 self.draw_ib + "-" + sk_filename
-                # 但根据用户指示："名字就是Position.形态键名称.buf", 这里直接拼接在 hash 后面比较稳妥
-                # 通常格式: [Hash]-Position.[SKName].buf
-                # sk_name 直接来自蓝图节点配置的形态键名称
-                
-                buf_path = buf_output_folder + self.draw_ib + "-" + sk_filename
+                buf_path = buf_output_folder + self.get_shapekey_buffer_filename(sk_name)
                 # print("write sk: " + buf_path)
-                with open(buf_path, 'wb') as skf:
-                    sk_buf.tofile(skf)
+                BufferExportHelper.write_buffer_file(buf_path, sk_buf)
+
+            for sk_name, vertex_ids in self.shapekey_name_vertexid_dict.items():
+                buf_path = buf_output_folder + self.get_shapekey_vertexid_buffer_filename(sk_name)
+                BufferExportHelper.write_buffer_file(buf_path, vertex_ids)
 
 
 
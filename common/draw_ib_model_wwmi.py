@@ -173,8 +173,7 @@ class DrawIBModelWWMI:
         # 直接遍历 OrderedCategoryNameList 进行写出，保持了顺序和筛选逻辑
         for category_name,category_buf in self.obj_buffer_model_wwmi.category_buffer_dict.items():
             buf_path = GlobalConfig.path_generatemod_buffer_folder() + buffer_prefix + "-" + category_name + ".buf"
-            with open(buf_path, 'wb') as ibf:
-                category_buf.tofile(ibf)
+            BufferExportHelper.write_buffer_file(buf_path, category_buf)
 
         # 写出ShapeKey相关Buffer文件
         if self.obj_buffer_model_wwmi.export_shapekey:
@@ -463,43 +462,35 @@ class DrawIBModelWWMI:
         blend_remap_reverse = numpy.empty(0, dtype=numpy.uint16)
         remapped_vgs_counts = []
 
-        # Per-component remap maps: { component_name: { 'forward': [orig_vg_ids], 'reverse': {orig->local} } }
+        # Per-component remap maps: { component_name: { 'forward': sorted orig_vg_ids (uint16 ndarray) } }
         remap_maps: dict[str, dict] = {}
         # Per-component boolean indicating whether remap was used for that component
         remap_used: dict[str, bool] = {}
 
         for comp_obj in components_objs:
-            # Build per-vertex VG id array for this component
-            vert_vg_ids = numpy.zeros((len(comp_obj.data.vertices), num_vgs), dtype=numpy.uint16)
-
-            # For remap calculation collect used VG ids for vertices referenced by this component
-            used_vg_set = set()
-
-            for vi, v in enumerate(comp_obj.data.vertices):
-                # vertex.groups is a sequence of group assignments (group index, weight)
-                groups = [(g.group, g.weight) for g in v.groups]
-
-                # sort by weight descending and keep top `num_vgs`
-                if len(groups) > 0:
-                    groups.sort(key=lambda x: x[1], reverse=True)
-                    for i, (gidx, w) in enumerate(groups[:num_vgs]):
-                        vert_vg_ids[vi, i] = int(gidx)
-                        if w > 0:
-                            used_vg_set.add(int(gidx))
+            # 每个顶点按权重从大到小取前 num_vgs 个顶点组（权重相同时保持 v.groups 的原始顺序），
+            # 其中权重大于0的顶点组就是这个 component 实际用到的顶点组
+            row_offsets, group_ids, weights = VertexGroupUtils.collect_vertex_group_weights(comp_obj.data)
+            topk_weights_dict, topk_indices_dict = VertexGroupUtils.calc_topk_blend_from_csr(
+                row_offsets, group_ids, weights,
+                blend_size=num_vgs,
+                split_by_4=False,
+                max_influences=num_vgs,
+            )
+            obj_vg_ids = numpy.unique(topk_indices_dict[0][topk_weights_dict[0] > 0])
 
             # Determine whether remapping is needed for this component
-            max_used = (max(used_vg_set) if len(used_vg_set) else 0)
-            if len(used_vg_set) == 0 or max_used < 256:
+            if len(obj_vg_ids) == 0 or obj_vg_ids[-1] < 256:
                 # No remapping required for this component
                 remapped_vgs_counts.append(0)
-                remap_maps[comp_obj.name] = { 'forward': [], 'reverse': {} }
+                remap_maps[comp_obj.name] = { 'forward': numpy.empty(0, dtype=numpy.uint16) }
                 remap_used[comp_obj.name] = False
                 continue
             else:
                 self.blend_remap = True
 
             # Create forward and reverse remap arrays (512 entries each, uint16)
-            obj_vg_ids = numpy.array(sorted(used_vg_set), dtype=numpy.uint16)
+            obj_vg_ids = obj_vg_ids.astype(numpy.uint16)
 
             forward = numpy.zeros(512, dtype=numpy.uint16)
             forward[:len(obj_vg_ids)] = obj_vg_ids
@@ -511,10 +502,8 @@ class DrawIBModelWWMI:
             blend_remap_forward = numpy.concatenate((blend_remap_forward, forward), axis=0)
             blend_remap_reverse = numpy.concatenate((blend_remap_reverse, reverse), axis=0)
             remapped_vgs_counts.append(len(obj_vg_ids))
-            # build simple python mapping structures for later remap usage
-            forward_list = [int(x) for x in obj_vg_ids.tolist()]
-            reverse_map = { int(v): int(i) for i, v in enumerate(forward_list) }
-            remap_maps[comp_obj.name] = { 'forward': forward_list, 'reverse': reverse_map }
+            # forward[i] 是局部索引 i 对应的原始顶点组索引，replace_remapped_blendindices 用它构建查找表
+            remap_maps[comp_obj.name] = { 'forward': obj_vg_ids }
             remap_used[comp_obj.name] = True
         
         # Expose the remap maps on the instance for later use (original vg id -> local compact id)
@@ -528,13 +517,11 @@ class DrawIBModelWWMI:
 
         # 写出BlendRemapForward.buf
         if blend_remap_forward.size != 0:
-            with open(os.path.join(output_dir, f"{buffer_prefix}-BlendRemapForward.buf"), 'wb') as f:
-                blend_remap_forward.tofile(f)
+            BufferExportHelper.write_buffer_file(os.path.join(output_dir, f"{buffer_prefix}-BlendRemapForward.buf"), blend_remap_forward)
 
         # 写出BlendRemapReverse.buf
         if blend_remap_reverse.size != 0:
-            with open(os.path.join(output_dir, f"{buffer_prefix}-BlendRemapReverse.buf"), 'wb') as f:
-                blend_remap_reverse.tofile(f)
+            BufferExportHelper.write_buffer_file(os.path.join(output_dir, f"{buffer_prefix}-BlendRemapReverse.buf"), blend_remap_reverse)
 
 
     def replace_remapped_blendindices(self, obj_element_model: ObjElementModel):
@@ -545,7 +532,7 @@ class DrawIBModelWWMI:
         过程：
         - 构建 loop -> polygon 的映射
         - 构建 polygon -> 原始 component object name 的映射（使用 components[*].objects[*].index_offset 和 index_count）
-        - 对每个 loop 的 BLENDINDICES 条目，使用对应 component 的 reverse 映射表进行替换
+        - 每个 component 的 forward 表构建一行查找表，所有 loop 的 BLENDINDICES 一次查表完成替换
         """
 
         if not hasattr(self, 'blend_remap_maps') or not self.blend_remap_maps:
@@ -553,13 +540,16 @@ class DrawIBModelWWMI:
 
         mesh = obj_element_model.mesh
         loops_len = len(mesh.loops)
+        poly_count = len(mesh.polygons)
 
         # Build loop -> polygon mapping
-        loop_to_poly = numpy.empty(loops_len, dtype=numpy.int32)
-        for poly in mesh.polygons:
-            start = poly.loop_start
-            end = start + poly.loop_total
-            loop_to_poly[start:end] = poly.index
+        poly_loop_starts = numpy.empty(poly_count, dtype=numpy.int64)
+        mesh.polygons.foreach_get('loop_start', poly_loop_starts)
+        poly_loop_totals = numpy.empty(poly_count, dtype=numpy.int64)
+        mesh.polygons.foreach_get('loop_total', poly_loop_totals)
+        poly_loop_ends = numpy.cumsum(poly_loop_totals)
+        loop_ids = numpy.arange(int(poly_loop_ends[-1]) if poly_count else 0, dtype=numpy.int64)
+        loop_ids += numpy.repeat(poly_loop_starts - (poly_loop_ends - poly_loop_totals), poly_loop_totals)
 
         arr = None
         # Source array: original parsed dict if present
@@ -575,9 +565,21 @@ class DrawIBModelWWMI:
             # Nothing to remap
             return
 
-        # 2) polygon -> component object name mapping
-        poly_count = len(mesh.polygons)
-        polygon_to_objname = [None] * poly_count
+        # 查找表：第0行是原样保留，每个用到Remap的 component 一行，未用到的顶点组索引保持原值
+        lut_size = max(int(arr.max()) + 1 if arr.size else 0, 512)
+        remap_lut_list = [numpy.arange(lut_size, dtype=numpy.int64)]
+        remap_lut_row_dict = {}
+        for comp_obj_name, remap_entry in self.blend_remap_maps.items():
+            forward = remap_entry.get('forward')
+            if forward is None or len(forward) == 0:
+                continue
+            lut = numpy.arange(lut_size, dtype=numpy.int64)
+            lut[forward] = numpy.arange(len(forward), dtype=numpy.int64)
+            remap_lut_row_dict[comp_obj_name] = len(remap_lut_list)
+            remap_lut_list.append(lut)
+
+        # 2) polygon -> component object name mapping，转换成每个面使用的查找表行号
+        polygon_lut_rows = numpy.zeros(poly_count, dtype=numpy.int64)
 
         for comp in self.merged_object.components:
             for temp_obj in comp.objects:
@@ -585,35 +587,15 @@ class DrawIBModelWWMI:
                     continue
                 poly_start = int(temp_obj.index_offset // 3)
                 poly_end = poly_start + int(temp_obj.index_count // 3)
-                for p in range(poly_start, poly_end):
-                    if 0 <= p < poly_count:
-                        polygon_to_objname[p] = temp_obj.name
-
-        # Determine width (number of indices per entry)
-        if getattr(arr, 'ndim', 1) == 1:
-            width = 1
-        else:
-            width = arr.shape[1]
+                polygon_lut_rows[max(poly_start, 0):max(min(poly_end, poly_count), 0)] = remap_lut_row_dict.get(temp_obj.name, 0)
 
-        for li in range(loops_len):
-            poly_idx = int(loop_to_poly[li])
-            comp_obj_name = polygon_to_objname[poly_idx] if (0 <= poly_idx < len(polygon_to_objname)) else None
-            if not comp_obj_name:
-                continue
-            remap_entry = self.blend_remap_maps.get(comp_obj_name, None)
-            if not remap_entry:
-                continue
-            reverse_map = remap_entry.get('reverse', {})
+        loop_lut_rows = numpy.zeros(loops_len, dtype=numpy.int64)
+        loop_lut_rows[loop_ids] = numpy.repeat(polygon_lut_rows, poly_loop_totals)
 
-            if width == 1:
-                orig = int(arr[li])
-                new = reverse_map.get(orig, orig)
-                arr[li] = new
-            else:
-                for j in range(width):
-                    orig = int(arr[li, j])
-                    new = reverse_map.get(orig, orig)
-                    arr[li, j] = new
+        # 一次查表替换所有 loop 的 BLENDINDICES
+        remap_lut = numpy.stack(remap_lut_list)
+        loop_lut_rows = loop_lut_rows.reshape((-1,) + (1,) * (arr.ndim - 1))
+        arr[...] = remap_lut[loop_lut_rows, arr.astype(numpy.int64)]
 
         obj_element_model.final_elementname_data_dict['BLENDINDICES'] = arr
 
@@ -43,7 +43,7 @@ class SubMeshModel:
         from ...utils.obj_utils import ObjUtils
         from ...utils.collection_utils import CollectionUtils
         from ...utils.json_utils import JsonUtils
-        from ...base.d3d11_gametype import D3D11GameType
+        from ...base.d3d11_gametype import D3D11GameTypeRegistry
         from ...helper.obj_buffer_helper import ObjBufferHelper
         from ...common.obj_element_model import ObjElementModel
         from ...common.obj_buffer_model_unity import ObjBufferModelUnity
@@ -53,7 +53,7 @@ class SubMeshModel:
         folder_name = self.unique_str
 
         import_json_path = os.path.join(GlobalConfig.path_workspace_folder(), "Import.json")
-        import_json = JsonUtils.LoadFromFile(import_json_path)
+        import_json = JsonUtils.LoadFromFileCached(import_json_path)
         gametype_name = import_json.get(folder_name, "")
         
         if gametype_name:
@@ -62,7 +62,7 @@ class SubMeshModel:
             game_import_json_path = os.path.join(import_folder_path, gametype_foldername, "import.json")
 
             if os.path.exists(game_import_json_path):
-                self.d3d11_game_type = D3D11GameType(FilePath=game_import_json_path)
+                self.d3d11_game_type = D3D11GameTypeRegistry.get_game_type(game_import_json_path)
 
                 for draw_call_model in self.drawcall_model_list:
                     source_obj = ObjUtils.get_obj_by_name(draw_call_model.obj_name)
@@ -159,17 +159,10 @@ class SubMeshModel:
                 return
 
         if self.d3d11_game_type:
-            original_obj_name = mesh_objects[0].name
-            obj_element_model = ObjElementModel(d3d11_game_type=self.d3d11_game_type, obj_name=original_obj_name)
+            # 合并后的物体只 evaluate 和解析一次，直接交给 ObjBufferModelUnity 使用
+            obj_element_model = ObjElementModel(d3d11_game_type=self.d3d11_game_type, obj_name=submesh_merged_obj.name)
 
-            obj_element_model.element_vertex_ndarray = ObjBufferHelper.convert_to_element_vertex_ndarray(
-                original_elementname_data_dict=obj_element_model.original_elementname_data_dict,
-                final_elementname_data_dict={},
-                mesh=obj_element_model.mesh,
-                d3d11_game_type=self.d3d11_game_type
-            )
-
-            obj_buffer_model = ObjBufferModelUnity(obj=submesh_merged_obj, d3d11_game_type=self.d3d11_game_type)
+            obj_buffer_model = ObjBufferModelUnity(obj=submesh_merged_obj, d3d11_game_type=self.d3d11_game_type, obj_element_model=obj_element_model)
             self.ib = obj_buffer_model.ib
             self.category_buffer_dict = obj_buffer_model.category_buffer_dict
             self.index_vertex_id_dict = obj_buffer_model.index_loop_id_dict
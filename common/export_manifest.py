@@ -0,0 +1,254 @@
+'''
+增量导出清单
+
+每次生成Mod后在 Buffer 文件夹里记录一份 ExportManifest.json：
+每个 DrawIB 对应一个输入指纹（参与导出的物体指纹 + 数据类型 + 影响 Buffer 的设置）
+以及这次写出的 Buffer 文件名和内容哈希、生成 ini 需要的 DrawIndexed 参数。
+
+下一次导出时如果某个 DrawIB 的输入指纹没有变化，并且磁盘上的 Buffer 文件内容和清单一致，
+DrawIBModel 就直接从这些 Buffer 文件恢复，不再重新解析物体、也不再重新写文件，
+只有真正改动过的 DrawIB 才会重新生成。ini 每次都完整重新生成，本身开销很小。
+'''
+
+import os
+import json
+import hashlib
+
+import bpy
+
+from ..utils.preprocess_cache import FingerprintCalculator
+
+from ..config.main_config import GlobalConfig
+from ..config.plugin_config import PluginConfig
+from ..config.properties_generate_mod import Properties_GenerateMod
+
+from ..base.d3d11_gametype import D3D11GameType
+
+from ..helper.buffer_export_helper import BufferExportHelper
+
+
+class ExportManifest:
+    '''
+    单个 Buffer 文件夹对应的增量导出清单
+    '''
+    MANIFEST_VERSION = 1
+    MANIFEST_FILE_NAME = "ExportManifest.json"
+    # Buffer 编码方式（Element 编码、TBN、去重、BlendRemap 等）有改动时加一，
+    # 和插件版本一起参与输入指纹，旧版本写出的 Buffer 不会被新代码复用
+    BUFFER_ENCODER_VERSION = 1
+
+    # 这些设置只影响界面或者导出流程本身，不影响 Buffer 内容，不参与输入指纹
+    IGNORED_SETTING_NAMES = {
+        "rna_type",
+        "name",
+        "open_mod_folder_after_generate_mod",
+        "enable_performance_stats",
+        "preview_export_only",
+        "use_incremental_export",
+        "use_specific_generate_mod_folder_path",
+        "generate_mod_folder_path",
+        "dedup_options_expanded",
+    }
+
+    def __init__(self, buffer_folder:str):
+        self.buffer_folder = buffer_folder
+        self.manifest_path = os.path.join(buffer_folder, self.MANIFEST_FILE_NAME)
+        self.draw_ib_entry_dict:dict[str,dict] = {}
+        self.reused_draw_ib_list:list[str] = []
+        self.rebuilt_draw_ib_list:list[str] = []
+        self.load()
+
+    def load(self):
+        self.draw_ib_entry_dict = {}
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest_data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[ExportManifest] 读取清单失败，本次全部重新生成: {e}")
+            return
+        if manifest_data.get("version") != self.MANIFEST_VERSION:
+            print("[ExportManifest] 清单版本不一致，本次全部重新生成")
+            return
+        self.draw_ib_entry_dict = manifest_data.get("draw_ibs", {})
+
+    def save(self):
+        manifest_data = {
+            "version": self.MANIFEST_VERSION,
+            "draw_ibs": self.draw_ib_entry_dict,
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest_data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        print(f"[ExportManifest] 复用 DrawIB: {self.reused_draw_ib_list}, 重新生成 DrawIB: {self.rebuilt_draw_ib_list}")
+
+    @staticmethod
+    def hash_bytes(data) -> str:
+        return hashlib.blake2b(memoryview(data), digest_size=16).hexdigest()
+
+    @classmethod
+    def _collect_setting_values(cls, property_group) -> dict:
+        '''
+        收集属性组里所有会影响 Buffer 内容的设置，新加的设置自动参与比较
+        '''
+        setting_values = {}
+        if property_group is None:
+            return setting_values
+        for prop in property_group.bl_rna.properties:
+            if prop.identifier in cls.IGNORED_SETTING_NAMES or prop.type in {'POINTER', 'COLLECTION'}:
+                continue
+            value = getattr(property_group, prop.identifier, None)
+            if hasattr(value, '__len__') and not isinstance(value, str):
+                value = list(value)
+            setting_values[prop.identifier] = value
+        return setting_values
+
+    @classmethod
+    def calculate_input_key(cls, draw_ib:str, unique_str:str, ordered_obj_data_model_list:list, d3d11_game_type:D3D11GameType, shapekey_names:list) -> str:
+        '''
+        计算一个 DrawIB 的输入指纹，无法判断时返回空字符串
+        多文件导出节点每一轮都会替换物体和 DrawIB，存在这种物体时不做增量导出
+
+        这里用的是导出时实际读取的物体（预处理之后的副本），
+        处理链节点对物体的修改已经体现在副本数据里，所以不需要单独比较节点设置
+        修改器、引用物体、骨架变换和驱动器的影响通过求值后网格的哈希覆盖
+        '''
+        scene = bpy.context.scene
+        game_type_file_hash = ""
+        if d3d11_game_type.FilePath and os.path.exists(d3d11_game_type.FilePath):
+            with open(d3d11_game_type.FilePath, 'rb') as f:
+                game_type_file_hash = cls.hash_bytes(f.read())
+
+        if any(getattr(obj_data_model, 'is_multifile_export', False) for obj_data_model in ordered_obj_data_model_list):
+            return ""
+
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        object_info_list = []
+        for obj_data_model in ordered_obj_data_model_list:
+            if obj_data_model.draw_ib != draw_ib:
+                continue
+            obj = bpy.data.objects.get(obj_data_model.obj_name)
+            if obj is None or obj.type != 'MESH':
+                return ""
+            fingerprint = FingerprintCalculator.calculate_fingerprint(obj)
+            object_info_list.append({
+                "obj_name": obj_data_model.obj_name,
+                "component_count": obj_data_model.component_count,
+                "first_index": obj_data_model.first_index,
+                "fingerprint": fingerprint.to_dict(),
+                "attribute_hash": FingerprintCalculator.calculate_attribute_hash(obj),
+                "evaluated_mesh_hash": FingerprintCalculator.calculate_evaluated_mesh_hash(obj, depsgraph),
+                "custom_properties": {key: str(obj[key]) for key in obj.keys() if key.startswith("3DMigoto:")},
+            })
+
+        input_data = {
+            "addon_version": PluginConfig.get_version_string(),
+            "buffer_encoder_version": cls.BUFFER_ENCODER_VERSION,
+            "draw_ib": draw_ib,
+            "unique_str": unique_str,
+            "logic_name": GlobalConfig.logic_name,
+            "game_type": d3d11_game_type.GameTypeName,
+            "game_type_file_hash": game_type_file_hash,
+            "category_stride": d3d11_game_type.CategoryStrideDict,
+            "ordered_category_names": d3d11_game_type.OrderedCategoryNameList,
+            "shapekey_names": sorted(shapekey_names),
+            "generate_mod_settings": cls._collect_setting_values(getattr(scene, "properties_generate_mod", None)),
+            "wwmi_settings": cls._collect_setting_values(getattr(scene, "properties_wwmi", None)),
+            "objects": object_info_list,
+        }
+        return cls.hash_bytes(json.dumps(input_data, sort_keys=True, default=str).encode())
+
+    def get_reusable_entry(self, draw_ib:str, input_key:str):
+        '''
+        输入指纹一致并且清单记录的 Buffer 文件都还在时返回清单条目，否则返回 None
+        文件内容是否被改动过在 load_buffer 读取时校验
+        '''
+        if not input_key:
+            return None
+        entry = self.draw_ib_entry_dict.get(draw_ib, None)
+        if entry is None or entry.get("input_key") != input_key:
+            return None
+        for buf_filename, buf_info in entry.get("buffers", {}).items():
+            buf_path = os.path.join(self.buffer_folder, buf_filename)
+            if not os.path.exists(buf_path) or os.path.getsize(buf_path) != buf_info.get("size", -1):
+                print(f"[ExportManifest] {draw_ib} 的 Buffer 文件缺失或大小不一致: {buf_filename}")
+                return None
+        return entry
+
+    def load_buffer(self, entry:dict, buf_filename:str) -> bytes:
+        '''
+        读取上一次写出的 Buffer 文件，内容哈希和清单不一致时返回 None
+        '''
+        buf_info = entry.get("buffers", {}).get(buf_filename, None)
+        if buf_info is None:
+            return None
+        with open(os.path.join(self.buffer_folder, buf_filename), 'rb') as f:
+            data = f.read()
+        if self.hash_bytes(data) != buf_info.get("hash"):
+            print(f"[ExportManifest] Buffer 文件内容和清单不一致: {buf_filename}")
+            return None
+        return data
+
+    def record_buffer(self, entry:dict, buf_filename:str):
+        '''
+        记录刚写出的 Buffer 文件的大小和内容哈希
+        写出时已经算过哈希的直接用哈希索引里的记录，不用再读一遍文件
+        '''
+        buf_path = os.path.join(self.buffer_folder, buf_filename)
+        file_info = BufferExportHelper.get_recorded_file_info(buf_path)
+        if file_info is not None and file_info.get("size") == os.path.getsize(buf_path):
+            buf_size, buf_hash = file_info["size"], file_info["hash"]
+        else:
+            with open(buf_path, 'rb') as f:
+                data = f.read()
+            buf_size, buf_hash = len(data), self.hash_bytes(data)
+        entry.setdefault("buffers", {})[buf_filename] = {
+            "size": buf_size,
+            "hash": buf_hash,
+        }
+
+    def set_entry(self, draw_ib:str, entry:dict, reused:bool):
+        self.draw_ib_entry_dict[draw_ib] = entry
+        if reused:
+            self.reused_draw_ib_list.append(draw_ib)
+        else:
+            self.rebuilt_draw_ib_list.append(draw_ib)
+
+    def discard_entry(self, draw_ib:str):
+        self.draw_ib_entry_dict.pop(draw_ib, None)
+
+
+_current_export_manifest:ExportManifest = None
+
+
+def get_export_manifest() -> ExportManifest:
+    '''
+    获取当前 Buffer 文件夹对应的导出清单，未开启增量导出时返回 None
+    多文件导出每一轮的 Buffer 文件夹不同，文件夹变化时先保存上一份清单
+    '''
+    global _current_export_manifest
+    if not Properties_GenerateMod.use_incremental_export():
+        return None
+
+    buffer_folder = GlobalConfig.path_generatemod_buffer_folder()
+    if _current_export_manifest is None or _current_export_manifest.buffer_folder != buffer_folder:
+        save_export_manifest()
+        _current_export_manifest = ExportManifest(buffer_folder)
+    return _current_export_manifest
+
+
+def save_export_manifest():
+    global _current_export_manifest
+    if _current_export_manifest is not None:
+        _current_export_manifest.save()
+        _current_export_manifest = None
+
+
+def reset_export_manifest():
+    '''
+    导出异常中断时丢弃内存中的清单，不写盘
+    '''
+    global _current_export_manifest
+    _current_export_manifest = None
@@ -116,12 +116,10 @@ class M_IniHelper:
             
             draw_ib_folder_keys = []
             if unique_str:
-                workspace_folder = GlobalConfig.path_workspace_folder()
                 draw_ib_base = draw_ib.split("-")[0] if "-" in draw_ib else draw_ib
                 
                 try:
-                    all_folders = [f.name for f in os.scandir(workspace_folder) if f.is_dir()]
-                    ssmt4_folders = [f for f in all_folders if f.startswith(draw_ib_base + "-")]
+                    ssmt4_folders = WorkSpaceHelper.get_drawib_folder_name_list(draw_ib_base)
                     draw_ib_folder_keys = ssmt4_folders if ssmt4_folders else [unique_str]
                     print(f"调试: SSMT4 模式，找到的分块文件夹: {draw_ib_folder_keys}")
                 except Exception as e:
@@ -238,8 +236,7 @@ class M_IniHelper:
                     # 查找所有以 draw_ib_base 开头的文件夹
                     workspace_folder = GlobalConfig.path_workspace_folder()
                     try:
-                        all_folders = [f.name for f in os.scandir(workspace_folder) if f.is_dir()]
-                        ssmt4_folders = [f for f in all_folders if f.startswith(draw_ib_base + "-")]
+                        ssmt4_folders = WorkSpaceHelper.get_drawib_folder_name_list(draw_ib_base)
                         
                         # 在每个分块文件夹中查找贴图文件
                         for folder_name in ssmt4_folders:
@@ -247,7 +244,7 @@ class M_IniHelper:
                             if os.path.exists(folder_path):
                                 # 检查 TYPE_ 文件夹
                                 try:
-                                    subdirs = os.listdir(folder_path)
+                                    subdirs = WorkSpaceHelper.get_type_folder_name_list(folder_name)
                                     for subdir in subdirs:
                                         if subdir.startswith("TYPE_"):
                                             type_folder_path = os.path.join(folder_path, subdir)
@@ -331,8 +328,14 @@ class M_IniHelper:
             if not drawib_model.shapekey_name_bytelist_dict:
                 continue
 
+            # 稀疏形态键Buffer只包含移动过的顶点，使用 ShapesSparse.hlsl 按顶点编号计算
+            is_sparse_shapekey = bool(drawib_model.shapekey_name_vertexid_dict)
+
             customshader_section.append("[CustomShaderComputeShapes" + str(ib_number) + "]")
-            customshader_section.append("cs = ./res/Shapes.hlsl")
+            if is_sparse_shapekey:
+                customshader_section.append("cs = ./res/ShapesSparse.hlsl")
+            else:
+                customshader_section.append("cs = ./res/Shapes.hlsl")
             customshader_section.append("cs-u5 = copy " + "Resource" + drawib + "Position.1")
             customshader_section.new_line()
 
@@ -347,8 +350,13 @@ class M_IniHelper:
                 customshader_section.append("x88 = " + m_key.key_name)
                 customshader_section.append("cs-t50 = copy " + "Resource" + drawib + "Position.1")
                 customshader_section.append("cs-t51 = copy " + "Resource" + drawib + "Position." + shapekey_name)
+                if is_sparse_shapekey:
+                    customshader_section.append("cs-t52 = copy " + "Resource" + drawib + "Position." + shapekey_name + ".VertexId")
                 customshader_section.append("Resource" + drawib + "Position = ref cs-u5")
-                customshader_section.append("Dispatch = " + str(drawib_model.draw_number) + " ,1 ,1")
+                if is_sparse_shapekey:
+                    customshader_section.append("Dispatch = " + str(len(drawib_model.shapekey_name_vertexid_dict[shapekey_name])) + " ,1 ,1")
+                else:
+                    customshader_section.append("Dispatch = " + str(drawib_model.draw_number) + " ,1 ,1")
                 customshader_section.new_line()
 
             ib_number += 1
@@ -356,6 +364,8 @@ class M_IniHelper:
             customshader_section.append("cs-u5 = null")
             customshader_section.append("cs-t50 = null")
             customshader_section.append("cs-t51 = null")
+            if is_sparse_shapekey:
+                customshader_section.append("cs-t52 = null")
 
         ini_builder.append_section(customshader_section)
 
@@ -391,6 +401,13 @@ class M_IniHelper:
                 resource_section.append("filename = Buffer/" + drawib + "-" + "Position." + shapekey_name + ".buf")
                 resource_section.new_line()
 
+                if drawib_model.shapekey_name_vertexid_dict.get(shapekey_name,None) is not None:
+                    resource_section.append("[Resource" + drawib + "Position." + shapekey_name + ".VertexId]")
+                    resource_section.append("type = buffer")
+                    resource_section.append("stride = 4")
+                    resource_section.append("filename = Buffer/" + drawib + "-" + "Position." + shapekey_name + ".VertexId.buf")
+                    resource_section.new_line()
+
             ib_number += 1
         
         ini_builder.append_section(resource_section)
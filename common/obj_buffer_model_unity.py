@@ -16,7 +16,8 @@ from .obj_element_model import ObjElementModel
 
 from ..helper.obj_buffer_helper import ObjBufferHelper
 from ..utils.obj_utils import ObjUtils
-from .shapekey_buffer_model import ShapeKeyBufferModel
+from ..utils.mesh_utils import MeshUtils, TriangleTopology
+from .shapekey_buffer_model import ShapeKeyBufferModel, ShapeKeyMeshArrays
 
 from ..blueprint.blueprint_export_helper import BlueprintExportHelper
 
@@ -24,26 +25,24 @@ from ..blueprint.blueprint_export_helper import BlueprintExportHelper
 class ObjBufferModelUnity:
     obj:bpy.types.Object
     d3d11_game_type:D3D11GameType
+    # 可以由调用方传入已经计算好的 ObjElementModel，不传则在这里创建，计算完成后释放引用
+    obj_element_model:ObjElementModel = field(default=None, repr=False)
 
     obj_name:str = field(init=False, repr=False)
     dtype:numpy.dtype = field(init=False, repr=False)
     element_vertex_ndarray:numpy.ndarray = field(init=False,repr=False)
 
     # 这三个是最终要得到的输出内容
-    ib:list = field(init=False,repr=False)
+    ib:numpy.ndarray = field(init=False,repr=False) # uint32 索引数组
     category_buffer_dict:dict = field(init=False,repr=False)
     index_loop_id_dict:dict = field(init=False,repr=False) # 仅用于WWMI的索引 Loop ID字典，key是 Buffer 索引，value是 Loop ID，默认可以为None
     
     def __post_init__(self) -> None:
         ObjBufferHelper.check_and_verify_attributes(obj=self.obj, d3d11_game_type=self.d3d11_game_type)
-        obj_element_model = ObjElementModel(d3d11_game_type=self.d3d11_game_type,obj_name=self.obj.name)
-
-        obj_element_model.element_vertex_ndarray = ObjBufferHelper.convert_to_element_vertex_ndarray(
-            original_elementname_data_dict=obj_element_model.original_elementname_data_dict,
-            final_elementname_data_dict={},
-            mesh=obj_element_model.mesh,
-            d3d11_game_type=self.d3d11_game_type
-        )
+        if self.obj_element_model is None:
+            self.obj_element_model = ObjElementModel(d3d11_game_type=self.d3d11_game_type, obj_name=self.obj.name)
+        obj_element_model = self.obj_element_model
+        obj_element_model.ensure_element_vertex_ndarray()
 
         mesh = obj_element_model.mesh
         # self.obj_name = obj_element_model.obj_name
@@ -108,35 +107,125 @@ class ObjBufferModelUnity:
                 # 这避免了使用 self.element_vertex_ndarray (Loops) 导致的形状不匹配错误
                 base_shape_vertex_ndarray = numpy.zeros(target_count, dtype=self.dtype)
 
-                for sk in shape_keys:
-                    sk_name = sk.name
-                    
-                    # 1. 重置在配置列表中的非当前形态键，未配置的形态键保留原值
-                    ShapeKeyUtils.reset_shapekey_values(self.obj, configured_shapekey_names=shapekey_names, current_shapekey_name=sk_name)
-                    sk.value = 1.0
-                    
-                    # 2. 获取应用了形态键后的 Mesh 数据
-                    # 注意：get_mesh_evaluate_from_obj 生成了一个新的 Mesh 数据块
-                    # 物体在导出前已经被 BEAUTY 三角化，所以这里不需要再次三角化
-                    mesh_eval = ObjUtils.get_mesh_evaluate_from_obj(obj=self.obj)
-
-                    # 计算TANGENT，不然导出丢失部分TANGENT数据导致光影效果错误
-                    mesh_eval.calc_tangents()
-                    
-                    # 3. 构建 ShapeKeyBufferModel (它会自动在 __post_init__ 中计算数据)
-                    sb_model = ShapeKeyBufferModel(
-                        name=sk_name,
-                        base_element_vertex_ndarray=base_shape_vertex_ndarray,
-                        mesh=mesh_eval,
+                # 形态键之后没有修改器时，直接从 key_blocks 读取所有形态键坐标，并批量计算法线切线
+                direct_blocker = None
+                if not Properties_GenerateMod.direct_shapekey_evaluation():
+                    direct_blocker = "未开启形态键快速计算"
+                if direct_blocker is None:
+                    direct_blocker = ShapeKeyUtils.get_direct_evaluation_blocker(obj=self.obj, mesh=mesh)
+                if direct_blocker is None:
+                    direct_blocker = MeshUtils.get_batched_tbn_blocker(mesh=mesh)
+
+                if direct_blocker is None:
+                    print(f"[ShapeKey] {self.obj.name}: 使用形态键快速计算")
+                    self.shape_key_buffer_dict = self._calc_shape_key_buffer_dict_direct(
+                        mesh=mesh,
+                        shapekey_names=[sk.name for sk in shape_keys],
+                        indices_map=indices_map,
+                        base_shape_vertex_ndarray=base_shape_vertex_ndarray
+                    )
+                else:
+                    print(f"[ShapeKey] {self.obj.name}: 逐个形态键计算，原因: {direct_blocker}")
+                    self._calc_shape_key_buffer_dict_evaluated(
+                        shape_keys=shape_keys,
+                        shapekey_names=shapekey_names,
                         indices_map=indices_map,
-                        d3d11_game_type=self.d3d11_game_type
+                        base_shape_vertex_ndarray=base_shape_vertex_ndarray
                     )
-                    self.shape_key_buffer_dict[sk_name] = sb_model
-                    
-  
 
                 # 循环结束后重置状态
                 ShapeKeyUtils.reset_shapekey_values(self.obj)
                 TimerUtils.End(f"Processing {len(shape_keys)} ShapeKeys for {self.obj.name}")
 
-        
\ No newline at end of file
+        # ObjElementModel 持有 evaluated mesh，用完就释放，不随 ObjBufferModelUnity 一起保留
+        self.obj_element_model = None
+
+    def _calc_shape_key_buffer_dict_evaluated(self, shape_keys:list, shapekey_names:list, indices_map:numpy.ndarray, base_shape_vertex_ndarray:numpy.ndarray) -> None:
+        '''
+        逐个形态键设置值并重新 evaluate mesh，适用于任何修改器堆栈
+        '''
+        for sk in shape_keys:
+            sk_name = sk.name
+            
+            # 1. 重置在配置列表中的非当前形态键，未配置的形态键保留原值
+            ShapeKeyUtils.reset_shapekey_values(self.obj, configured_shapekey_names=shapekey_names, current_shapekey_name=sk_name)
+            sk.value = 1.0
+            
+            # 2. 获取应用了形态键后的 Mesh 数据
+            # 注意：get_mesh_evaluate_from_obj 生成了一个新的 Mesh 数据块
+            # 物体在导出前已经被 BEAUTY 三角化，所以这里不需要再次三角化
+            mesh_eval = ObjUtils.get_mesh_evaluate_from_obj(obj=self.obj)
+
+            # 计算TANGENT，不然导出丢失部分TANGENT数据导致光影效果错误
+            mesh_eval.calc_tangents()
+            
+            # 3. 构建 ShapeKeyBufferModel (它会自动在 __post_init__ 中计算数据)
+            sb_model = ShapeKeyBufferModel(
+                name=sk_name,
+                base_element_vertex_ndarray=base_shape_vertex_ndarray,
+                mesh=mesh_eval,
+                indices_map=indices_map,
+                d3d11_game_type=self.d3d11_game_type
+            )
+            self.shape_key_buffer_dict[sk_name] = sb_model
+
+    def _calc_shape_key_buffer_dict_direct(self, mesh:bpy.types.Mesh, shapekey_names:list, indices_map:numpy.ndarray, base_shape_vertex_ndarray:numpy.ndarray) -> dict:
+        '''
+        一次性读取所有形态键的顶点坐标，在共享拓扑上批量计算法线与切线，
+        不修改形态键的值，也不需要为每个形态键做 depsgraph evaluate
+
+        批量计算的切线和 calc_tangents() 的 MikkTSpace 结果不完全一致，
+        所以只有所在三角形被形态键移动过的顶点才使用计算结果，其余 Loop 直接沿用基础 mesh 的法线切线，
+        保证形态键没有移动的区域和基础 Position Buffer 完全相同
+        '''
+        shapekey_vertex_coords_dict = ShapeKeyUtils.get_direct_shapekey_vertex_coords_dict(obj=self.obj, shapekey_names=shapekey_names)
+        topology = TriangleTopology.from_mesh(mesh)
+
+        # 基础 mesh 已经在 ObjElementModel 中 calc_tangents() 过
+        vertex_count = len(mesh.vertices)
+        loop_count = len(mesh.loops)
+        base_vertex_coords = numpy.empty(vertex_count * 3, dtype=numpy.float32)
+        mesh.vertices.foreach_get('co', base_vertex_coords)
+        base_vertex_coords = base_vertex_coords.reshape(-1, 3)
+        base_loop_arrays = {}
+        for attribute_name, component_count in (('normal', 3), ('tangent', 3), ('bitangent', 3), ('bitangent_sign', 1)):
+            attribute_array = numpy.empty(loop_count * component_count, dtype=numpy.float32)
+            mesh.loops.foreach_get(attribute_name, attribute_array)
+            base_loop_arrays[attribute_name] = attribute_array.reshape(loop_count, component_count) if component_count > 1 else attribute_array
+
+        shape_key_buffer_dict = {}
+        for sk_name, vertex_coords in shapekey_vertex_coords_dict.items():
+            # 顶点被移动后，所有包含它的三角形的顶点法线切线都会变化
+            moved_vertices = numpy.any(vertex_coords != base_vertex_coords, axis=1)
+            moved_triangles = numpy.any(moved_vertices[topology.triangle_vertices], axis=1)
+            affected_vertices = numpy.zeros(vertex_count, dtype=bool)
+            affected_vertices[topology.triangle_vertices[moved_triangles].reshape(-1)] = True
+            affected_loops = affected_vertices[topology.loop_vertex_indices]
+
+            loop_normals = base_loop_arrays['normal']
+            loop_tangents = base_loop_arrays['tangent']
+            loop_bitangents = base_loop_arrays['bitangent']
+            loop_bitangent_signs = base_loop_arrays['bitangent_sign']
+            if affected_loops.any():
+                calc_normals, calc_tangents, calc_bitangent_signs = MeshUtils.calc_loop_normals_tangents(vertex_coords=vertex_coords, topology=topology)
+                calc_bitangents = numpy.cross(calc_normals, calc_tangents) * calc_bitangent_signs[:, None]
+                loop_normals = numpy.where(affected_loops[:, None], calc_normals, loop_normals)
+                loop_tangents = numpy.where(affected_loops[:, None], calc_tangents, loop_tangents)
+                loop_bitangents = numpy.where(affected_loops[:, None], calc_bitangents, loop_bitangents).astype(numpy.float32)
+                loop_bitangent_signs = numpy.where(affected_loops, calc_bitangent_signs, loop_bitangent_signs)
+
+            shape_key_buffer_dict[sk_name] = ShapeKeyBufferModel(
+                name=sk_name,
+                base_element_vertex_ndarray=base_shape_vertex_ndarray,
+                mesh=ShapeKeyMeshArrays(
+                    vertex_coords=vertex_coords,
+                    loop_vertex_indices=topology.loop_vertex_indices,
+                    loop_normals=loop_normals,
+                    loop_tangents=loop_tangents,
+                    loop_bitangent_signs=loop_bitangent_signs,
+                    loop_bitangents=loop_bitangents
+                ),
+                indices_map=indices_map,
+                d3d11_game_type=self.d3d11_game_type
+            )
+        return shape_key_buffer_dict
@@ -11,13 +11,13 @@ import numpy
 import bpy
 
 from dataclasses import dataclass, field
-from typing import Dict
 
 from ..utils.format_utils import FormatUtils, Fatal
 from ..utils.timer_utils import TimerUtils
 from ..utils.vertexgroup_utils import VertexGroupUtils
 from ..utils.obj_utils import ObjUtils
 from ..utils.shapekey_utils import ShapeKeyUtils
+from ..utils.performance_stats import increment_counter
 
 from ..config.main_config import GlobalConfig, LogicName
 from ..config.properties_import_model import Properties_ImportModel
@@ -48,6 +48,7 @@ class ObjElementModel:
     element_vertex_ndarray:numpy.ndarray = field(init=False,repr=False)
 
     def __post_init__(self) -> None:
+        increment_counter("ObjElementModel_Evaluate")
         self.obj = ObjUtils.get_obj_by_name(name=self.obj_name)
 
         # 重置形态键，因为用户不一定会重置，咱们帮他重置好了
@@ -71,3 +72,15 @@ class ObjElementModel:
         self.total_structured_dtype:numpy.dtype = self.d3d11_game_type.get_total_structured_dtype()
         self.original_elementname_data_dict = ObjBufferHelper.parse_elementname_data_dict(mesh=mesh, d3d11_game_type=self.d3d11_game_type)
 
+    def ensure_element_vertex_ndarray(self) -> numpy.ndarray:
+        '''
+        把 original/final 数据打包成 element_vertex_ndarray，已打包过则直接返回
+        '''
+        if getattr(self, "element_vertex_ndarray", None) is None:
+            self.element_vertex_ndarray = ObjBufferHelper.convert_to_element_vertex_ndarray(
+                original_elementname_data_dict=self.original_elementname_data_dict,
+                final_elementname_data_dict=self.final_elementname_data_dict,
+                mesh=self.mesh,
+                d3d11_game_type=self.d3d11_game_type
+            )
+        return self.element_vertex_ndarray
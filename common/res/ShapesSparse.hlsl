@@ -0,0 +1,31 @@
+// **** SPARSE SHAPEKEYS SHADER ****
+// Same as Shapes.hlsl, but the shapekey buffer only contains the vertices moved by this shapekey,
+// vertex_ids[i] is the vertex index of shapekey[i] in the original buffer.
+
+struct VertexAttributes {
+    float3 position;
+    float3 normal;
+    float4 tangent;
+};
+
+RWStructuredBuffer<VertexAttributes> rw_buffer : register(u5);
+StructuredBuffer<VertexAttributes> base : register(t50);
+StructuredBuffer<VertexAttributes> shapekey : register(t51);
+StructuredBuffer<uint> vertex_ids : register(t52);
+
+Texture1D<float4> IniParams : register(t120);
+#define key IniParams[88].x
+
+[numthreads(1, 1, 1)]
+void main(uint3 threadID : SV_DispatchThreadID)
+{
+    uint i = threadID.x;
+    uint v = vertex_ids[i];
+    VertexAttributes diff;
+    diff.position = shapekey[i].position - base[v].position;
+    diff.normal = shapekey[i].normal - base[v].normal;
+    diff.tangent = shapekey[i].tangent - base[v].tangent;
+    rw_buffer[v].position += diff.position*key;
+    rw_buffer[v].normal += diff.normal*key;
+    rw_buffer[v].tangent += diff.tangent*key;
+}
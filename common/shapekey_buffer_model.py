@@ -6,7 +6,57 @@ from dataclasses import dataclass, field, InitVar
 from typing import Dict
 
 from ..base.d3d11_gametype import D3D11GameType
-from ..helper.obj_buffer_helper import ObjBufferHelper
+from ..helper.element_codec import ElementSource, ElementCodecRegistry
+from ..config.main_config import GlobalConfig
+
+
+class _ArrayAttributeCollection:
+    '''
+    用 numpy 数组模拟 mesh.vertices / mesh.loops 的 len() 与 foreach_get 接口
+    '''
+    def __init__(self, length:int, attribute_dict:Dict[str, numpy.ndarray]):
+        self.length = length
+        self.attribute_dict = attribute_dict
+
+    def __len__(self) -> int:
+        return self.length
+
+    def foreach_get(self, attribute_name:str, output:numpy.ndarray) -> None:
+        output[...] = self.attribute_dict[attribute_name].reshape(output.shape)
+
+
+@dataclass
+class ShapeKeyMeshArrays:
+    '''
+    直接由形态键坐标批量计算出的 mesh 数据，可以代替 evaluated mesh 传给 ShapeKeyBufferModel，
+    这样就不需要为每个形态键都做一次 depsgraph evaluate 和 calc_tangents()
+    '''
+    vertex_coords: numpy.ndarray = field(repr=False)
+    loop_vertex_indices: numpy.ndarray = field(repr=False)
+    loop_normals: numpy.ndarray = field(repr=False)
+    loop_tangents: numpy.ndarray = field(repr=False)
+    loop_bitangent_signs: numpy.ndarray = field(repr=False)
+    # 不传时由法线、切线和副切线符号计算
+    loop_bitangents: numpy.ndarray = field(default=None, repr=False)
+
+    vertices: _ArrayAttributeCollection = field(init=False, repr=False)
+    loops: _ArrayAttributeCollection = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        loop_bitangents = self.loop_bitangents
+        if loop_bitangents is None:
+            loop_bitangents = numpy.cross(self.loop_normals, self.loop_tangents) * self.loop_bitangent_signs[:, None]
+
+        self.vertices = _ArrayAttributeCollection(len(self.vertex_coords), {
+            "co": self.vertex_coords,
+        })
+        self.loops = _ArrayAttributeCollection(len(self.loop_vertex_indices), {
+            "vertex_index": self.loop_vertex_indices,
+            "normal": self.loop_normals,
+            "tangent": self.loop_tangents,
+            "bitangent_sign": self.loop_bitangent_signs,
+            "bitangent": loop_bitangents.astype(numpy.float32),
+        })
 
 @dataclass
 class ShapeKeyBufferModel:
@@ -42,8 +92,11 @@ class ShapeKeyBufferModel:
         # 我们假设 self.indices_map 传入的是 Buffer 中每个点对应的 Loop Index
         loop_indices = self.indices_map
         
-        # 缓存：Vertex Indices (从 Loop Index 转换而来)
-        loop_vertex_indices = None 
+        # Position 直接按 Buffer 用到的 Loop 取顶点坐标，其余元素对全部 Loop 编码后再按 Loop Index 取出
+        all_loop_vertex_indices = numpy.empty(len(mesh.loops), dtype=int)
+        mesh.loops.foreach_get("vertex_index", all_loop_vertex_indices)
+        position_source = ElementSource(mesh=mesh, loop_vertex_indices=all_loop_vertex_indices[loop_indices])
+        element_source = ElementSource(mesh=mesh, loop_vertex_indices=all_loop_vertex_indices)
 
         target_category = "Position"
         for d3d11_element in self.d3d11_game_type.D3D11ElementList:
@@ -52,44 +105,15 @@ class ShapeKeyBufferModel:
             
             elem_name = d3d11_element.ElementName
             data = None
+            semantic = ElementCodecRegistry.get_semantic(d3d11_element)
+            codec = ElementCodecRegistry.resolve(d3d11_element, GlobalConfig.logic_name)
             
-            if elem_name == 'POSITION':
-                if loop_vertex_indices is None:
-                    # 懒计算 Vertex Index 映射
-                    all_loop_vertex_indices = numpy.empty(len(mesh.loops), dtype=int)
-                    mesh.loops.foreach_get("vertex_index", all_loop_vertex_indices)
-                    loop_vertex_indices = all_loop_vertex_indices[loop_indices]
-                
-                data = ObjBufferHelper._parse_position(
-                    mesh_vertices=mesh.vertices,
-                    mesh_vertices_length=len(mesh.vertices),
-                    loop_vertex_indices=loop_vertex_indices,
-                    d3d11_element=d3d11_element
-                )
-            
-            elif elem_name == 'NORMAL':
-                all_normals = ObjBufferHelper._parse_normal(
-                    mesh_loops=mesh.loops,
-                    mesh_loops_length=len(mesh.loops),
-                    d3d11_element=d3d11_element
-                )
-                data = all_normals[loop_indices]
-            
-            elif elem_name == 'TANGENT':
-                all_tangents = ObjBufferHelper._parse_tangent(
-                    mesh_loops=mesh.loops,
-                    mesh_loops_length=len(mesh.loops),
-                    d3d11_element=d3d11_element
-                )
-                data = all_tangents[loop_indices]
-            
-            elif elem_name.startswith('BINORMAL'):
-                all_binormals = ObjBufferHelper._parse_binormal(
-                    mesh_loops=mesh.loops,
-                    mesh_loops_length=len(mesh.loops),
-                    d3d11_element=d3d11_element
-                )
-                data = all_binormals[loop_indices]
+            if codec is None:
+                pass
+            elif semantic == 'POSITION':
+                data = codec(position_source, d3d11_element)
+            elif semantic in ('NORMAL', 'TANGENT', 'BINORMAL'):
+                data = codec(element_source, d3d11_element)[loop_indices]
 
             if data is not None:
                 self.element_vertex_ndarray[elem_name] = data
@@ -13,7 +13,109 @@ class DedupedTextureInfo:
     componet_count_list_str:str = field(default="",init=False)
 
 
+@dataclass
+class WorkSpaceIndex:
+    '''
+    工作空间目录结构的一次性索引，生成Mod时每个 DrawIB 的查询都从这里读取，不再反复遍历文件夹
+
+    folder_mtime_dict 记录建立索引时涉及到的每个文件夹的修改时间（不存在的记为 None），
+    文件夹里增删文件或子文件夹都会改变它自己的修改时间，所以逐个比较就能判断索引是否过期
+    '''
+    workspace_folder:str = ""
+    folder_mtime_dict:Dict[str,Union[int,None]] = field(default_factory=dict)
+
+    # 工作空间下的所有子文件夹名，保持 os.scandir 的顺序
+    subfolder_name_list:List[str] = field(default_factory=list)
+    # 子文件夹名 -> 其中 TYPE_ 开头的数据类型文件夹名，保持 os.listdir 的顺序，查询时才填充
+    folder_type_name_list_dict:Dict[str,List[str]] = field(default_factory=dict)
+
+    # Config/MarkTexture 下所有文件的 (文件名, 完整路径)，保持 os.walk 的顺序
+    marktexture_folder:str = ""
+    marktexture_folder_exists:bool = False
+    marktexture_file_list:List[tuple] = field(default_factory=list)
+
+    @staticmethod
+    def get_folder_mtime(folder_path:str):
+        try:
+            return os.stat(folder_path).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def build(cls, workspace_folder:str) -> "WorkSpaceIndex":
+        index = WorkSpaceIndex(workspace_folder=workspace_folder)
+        index.folder_mtime_dict[workspace_folder] = cls.get_folder_mtime(workspace_folder)
+
+        try:
+            index.subfolder_name_list = [f.name for f in os.scandir(workspace_folder) if f.is_dir()]
+        except OSError as e:
+            print(f"[WorkSpaceIndex] 无法读取工作空间文件夹: {e}")
+
+        config_folder = os.path.join(workspace_folder, "Config")
+        index.marktexture_folder = os.path.join(config_folder, "MarkTexture")
+        index.folder_mtime_dict[config_folder] = cls.get_folder_mtime(config_folder)
+        index.folder_mtime_dict[index.marktexture_folder] = cls.get_folder_mtime(index.marktexture_folder)
+        index.marktexture_folder_exists = os.path.exists(index.marktexture_folder)
+
+        if index.marktexture_folder_exists:
+            for root, dirs, files in os.walk(index.marktexture_folder):
+                index.folder_mtime_dict[root] = cls.get_folder_mtime(root)
+                for file in files:
+                    index.marktexture_file_list.append((file, os.path.join(root, file)))
+
+        print(f"[WorkSpaceIndex] 建立工作空间索引: {len(index.subfolder_name_list)} 个子文件夹, {len(index.marktexture_file_list)} 个贴图标记文件")
+        return index
+
+    def get_type_folder_name_list(self, folder_name:str) -> List[str]:
+        '''
+        只有贴图查找失败时才会用到，所以第一次查询某个子文件夹时才读取并记录下来
+        '''
+        type_folder_name_list = self.folder_type_name_list_dict.get(folder_name, None)
+        if type_folder_name_list is None:
+            folder_path = os.path.join(self.workspace_folder, folder_name)
+            self.folder_mtime_dict[folder_path] = self.get_folder_mtime(folder_path)
+            try:
+                type_folder_name_list = [dirname for dirname in os.listdir(folder_path) if dirname.startswith("TYPE_")]
+            except OSError:
+                type_folder_name_list = []
+            self.folder_type_name_list_dict[folder_name] = type_folder_name_list
+        return type_folder_name_list
+
+    def is_up_to_date(self, workspace_folder:str) -> bool:
+        if workspace_folder != self.workspace_folder:
+            return False
+        for folder_path, mtime in self.folder_mtime_dict.items():
+            if self.get_folder_mtime(folder_path) != mtime:
+                return False
+        return True
+
+
 class WorkSpaceHelper:
+    _workspace_index:WorkSpaceIndex = None
+
+    @classmethod
+    def get_workspace_index(cls) -> WorkSpaceIndex:
+        '''
+        获取当前工作空间的索引，工作空间切换或者文件夹有变化时重新建立
+        '''
+        workspace_folder = GlobalConfig.path_workspace_folder()
+        if cls._workspace_index is None or not cls._workspace_index.is_up_to_date(workspace_folder):
+            cls._workspace_index = WorkSpaceIndex.build(workspace_folder)
+        return cls._workspace_index
+
+    @classmethod
+    def get_drawib_folder_name_list(cls, draw_ib_base:str) -> List[str]:
+        '''
+        SSMT4 格式下同一个 DrawIB 拆成多个 DrawIB-IndexCount-FirstIndex 文件夹，返回这些文件夹名
+        '''
+        return [folder_name for folder_name in cls.get_workspace_index().subfolder_name_list if folder_name.startswith(draw_ib_base + "-")]
+
+    @classmethod
+    def get_type_folder_name_list(cls, folder_name:str) -> List[str]:
+        '''
+        返回工作空间子文件夹下 TYPE_ 开头的数据类型文件夹名
+        '''
+        return cls.get_workspace_index().get_type_folder_name_list(folder_name)
 
     @staticmethod
     def find_json_file_in_marktexture_folder(filename_pattern: str, draw_ib: str) -> str:
@@ -21,23 +123,20 @@ class WorkSpaceHelper:
         在 Config/MarkTexture 文件夹下递归查找匹配的 JSON 文件
         优先查找文件名包含 draw_ib 的文件，否则返回第一个匹配的文件
         '''
-        workspace_folder = GlobalConfig.path_workspace_folder()
-        marktexture_folder = os.path.join(workspace_folder, "Config", "MarkTexture")
+        workspace_index = WorkSpaceHelper.get_workspace_index()
         
-        if not os.path.exists(marktexture_folder):
-            print(f"MarkTexture 文件夹不存在: {marktexture_folder}")
+        if not workspace_index.marktexture_folder_exists:
+            print(f"MarkTexture 文件夹不存在: {workspace_index.marktexture_folder}")
             return ""
         
         matching_files = []
         draw_ib_matching_files = []
         
-        for root, dirs, files in os.walk(marktexture_folder):
-            for file in files:
-                if filename_pattern in file and file.endswith(".json"):
-                    full_path = os.path.join(root, file)
-                    matching_files.append(full_path)
-                    if draw_ib in file:
-                        draw_ib_matching_files.append(full_path)
+        for file, full_path in workspace_index.marktexture_file_list:
+            if filename_pattern in file and file.endswith(".json"):
+                matching_files.append(full_path)
+                if draw_ib in file:
+                    draw_ib_matching_files.append(full_path)
         
         if draw_ib_matching_files:
             print(f"找到匹配 draw_ib 的文件: {draw_ib_matching_files[0]}")
@@ -53,8 +152,6 @@ class WorkSpaceHelper:
     @staticmethod
     def get_hash_deduped_texture_info_dict(draw_ib:str) -> Dict[str,DedupedTextureInfo]:
 
-        workspace_folder = GlobalConfig.path_workspace_folder()
-        
         component_name__drawcall_indexlist_json_path = WorkSpaceHelper.find_json_file_in_marktexture_folder(
             "ComponentName_DrawCallIndexList", draw_ib
         )
@@ -66,7 +163,7 @@ class WorkSpaceHelper:
             print(f"无法找到必要的贴图标记文件，跳过哈希贴图生成")
             return {}
 
-        component_name__drawcall_indexlist_json_dict = JsonUtils.LoadFromFile(component_name__drawcall_indexlist_json_path)
+        component_name__drawcall_indexlist_json_dict = JsonUtils.LoadFromFileCached(component_name__drawcall_indexlist_json_path)
 
         drawcall_component_count_dict = {}
         for component_name, drawcall_indexlist in component_name__drawcall_indexlist_json_dict.items():
@@ -80,7 +177,7 @@ class WorkSpaceHelper:
                 if component_count:
                     drawcall_component_count_dict[drawcall_index] = component_count
 
-        trianglelist_deduped_filename_json_dict = JsonUtils.LoadFromFile(trianglelist_deduped_filename_json_path)
+        trianglelist_deduped_filename_json_dict = JsonUtils.LoadFromFileCached(trianglelist_deduped_filename_json_path)
 
 
         deduped_filename_drawcall_index_list_dict = {}
@@ -15,7 +15,7 @@ from ..utils.format_utils import Fatal
 
 from .main_config import GlobalConfig
 
-from ..base.d3d11_gametype import D3D11GameType
+from ..base.d3d11_gametype import D3D11GameType, D3D11GameTypeRegistry
 
 
 def check_and_try_generate_import_json() -> dict:
@@ -347,7 +347,7 @@ class ImportConfig:
             except:
                 pass
         else:
-            self.d3d11GameType:D3D11GameType = D3D11GameType(tmp_json_path)
+            self.d3d11GameType:D3D11GameType = D3D11GameTypeRegistry.get_game_type(tmp_json_path)
             tmp_json_dict = JsonUtils.LoadFromFile(tmp_json_path)
         
         '''
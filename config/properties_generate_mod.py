@@ -129,6 +129,48 @@ class Properties_GenerateMod(bpy.types.PropertyGroup):
         '''
         return bpy.context.scene.properties_generate_mod.enable_performance_stats
 
+    direct_shapekey_evaluation: bpy.props.BoolProperty(
+        name="形态键快速计算",
+        description="生成形态键Buffer时，直接读取所有形态键的顶点坐标并批量计算法线和切线，不再为每个形态键重新计算一次完整的Mesh。\n" \
+        "物体存在启用的修改器、自定义法线、锐边等情况时会自动回退到逐个形态键计算的方式。\n" \
+        "被形态键移动的顶点附近的切线是近似计算的，和 Blender 的 MikkTSpace 结果不完全一致，所以默认关闭",
+        default=False
+    ) # type: ignore
+
+    @classmethod
+    def direct_shapekey_evaluation(cls):
+        '''
+        bpy.context.scene.properties_generate_mod.direct_shapekey_evaluation
+        '''
+        return bpy.context.scene.properties_generate_mod.direct_shapekey_evaluation
+
+    sparse_shapekey_export: bpy.props.BoolProperty(
+        name="稀疏形态键Buffer",
+        description="形态键Buffer只写出实际发生变化的顶点，并额外写出这些顶点的编号，配合ShapesSparse.hlsl只对这些顶点计算。\n" \
+        "大部分形态键只移动少量顶点，可以明显减小Buffer体积和每帧的计算量",
+        default=False
+    ) # type: ignore
+
+    @classmethod
+    def sparse_shapekey_export(cls):
+        '''
+        bpy.context.scene.properties_generate_mod.sparse_shapekey_export
+        '''
+        return bpy.context.scene.properties_generate_mod.sparse_shapekey_export
+
+    use_incremental_export: bpy.props.BoolProperty(
+        name="增量导出",
+        description="在Buffer文件夹中记录导出清单，再次生成Mod时，物体和设置都没有变化的DrawIB直接复用上一次生成的Buffer文件，只重新生成改动过的DrawIB和ini（实验性功能，默认关闭）",
+        default=False
+    ) # type: ignore
+
+    @classmethod
+    def use_incremental_export(cls):
+        '''
+        bpy.context.scene.properties_generate_mod.use_incremental_export
+        '''
+        return bpy.context.scene.properties_generate_mod.use_incremental_export
+
     preview_export_only: bpy.props.BoolProperty(
         name="配置表预导出",
         description="只生成 INI 配置文件，不处理文件、物体等。用于快速预览生成的配置内容",
@@ -157,6 +157,33 @@ class Properties_ImportModel(bpy.types.PropertyGroup):
         '''
         return bpy.context.scene.properties_import_model.use_preprocess_cache
 
+    use_array_preprocess_cache: bpy.props.BoolProperty(
+        name="使用数组缓存",
+        description="启用后，预处理缓存保存为 .npz 数组文件，命中时直接用数组重建物体，比读写 .blend 快得多。含有修改器、材质或其它无法保存的数据的物体会自动改用 .blend 缓存",
+        default=True,
+    )  # type: ignore
+
+    @classmethod
+    def use_array_preprocess_cache(cls):
+        '''
+        bpy.context.scene.properties_import_model.use_array_preprocess_cache
+        '''
+        return bpy.context.scene.properties_import_model.use_array_preprocess_cache
+
+    preprocess_cache_max_size_mb: bpy.props.IntProperty(
+        name="缓存容量上限(MB)",
+        description="预处理缓存的最大磁盘占用，超出时自动删除最久未使用的缓存，0 表示不限制",
+        default=2048,
+        min=0,
+    )  # type: ignore
+
+    @classmethod
+    def get_preprocess_cache_max_size_mb(cls):
+        '''
+        bpy.context.scene.properties_import_model.preprocess_cache_max_size_mb
+        '''
+        return bpy.context.scene.properties_import_model.preprocess_cache_max_size_mb
+
 def register():
     bpy.utils.register_class(Properties_ImportModel)
     bpy.types.Scene.properties_import_model = bpy.props.PointerProperty(type=Properties_ImportModel)
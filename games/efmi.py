@@ -9,6 +9,7 @@ from ..common.draw_ib_model import DrawIBModel
 from ..base.m_global_key_counter import M_GlobalKeyCounter
 from ..blueprint.blueprint_model import BluePrintModel
 from ..blueprint.blueprint_export_helper import BlueprintExportHelper
+from ..helper.buffer_export_helper import BufferExportHelper
 
 from ..common.m_ini_builder import M_IniBuilder,M_IniSection,M_SectionType
 from ..config.properties_generate_mod import Properties_GenerateMod
@@ -198,23 +199,18 @@ class ModModelEFMI:
             self._export_buffers()
     
     def _export_buffers(self):
-        import struct
-        
         buf_output_folder = GlobalConfig.path_generatemod_buffer_folder()
 
         for submesh_model in self._submesh_model_list:
             if len(submesh_model.ib) > 0:
                 ib_filename = submesh_model.unique_str + "-Index.buf"
                 ib_filepath = os.path.join(buf_output_folder, ib_filename)
-                packed_data = struct.pack(f'<{len(submesh_model.ib)}I', *submesh_model.ib)
-                with open(ib_filepath, 'wb') as ibf:
-                    ibf.write(packed_data)
+                BufferExportHelper.write_buf_ib_r32_uint(submesh_model.ib, ib_filepath)
 
             for category, category_buf in submesh_model.category_buffer_dict.items():
                 category_buf_filename = submesh_model.unique_str + "-" + category + ".buf"
                 category_buf_filepath = os.path.join(buf_output_folder, category_buf_filename)
-                with open(category_buf_filepath, 'wb') as f:
-                    category_buf.tofile(f)
+                BufferExportHelper.write_buffer_file(category_buf_filepath, category_buf)
 
     def parse_draw_ib_draw_ib_model_dict(self, skip_buffer_export:bool = False):
         for draw_ib in self.branch_model.draw_ib__component_count_list__dict.keys():
@@ -130,15 +130,13 @@ class BufferExportMixin:
         for category, category_buf in drawib_model.category_buffer_dict.items():
             category_buf_filename = prefix + "-" + category + ".buf"
             category_buf_filepath = os.path.join(output_folder, category_buf_filename)
-            with open(category_buf_filepath, 'wb') as file_obj:
-                category_buf.tofile(file_obj)
+            BufferExportHelper.write_buffer_file(category_buf_filepath, category_buf)
         
         # 写入形态键缓冲区
         for shapekey_name, shapekey_buf in drawib_model.shapekey_name_bytelist_dict.items():
             shapekey_buf_filename = prefix + "-Position." + shapekey_name + ".buf"
             shapekey_buf_filepath = os.path.join(output_folder, shapekey_buf_filename)
-            with open(shapekey_buf_filepath, 'wb') as file_obj:
-                shapekey_buf.tofile(file_obj)
+            BufferExportHelper.write_buffer_file(shapekey_buf_filepath, shapekey_buf)
 
 
 class VersionAwareExportFactory:
@@ -1,11 +1,20 @@
 import os
-import struct
+import json
+import hashlib
 import numpy
 
+from ..utils.performance_stats import increment_counter, get_counter
+
 
 class BufferExportHelper:
     _global_config = None
 
+    # 每个输出文件夹旁边放一份哈希索引，记录上一次写出的每个文件的内容哈希、大小和修改时间
+    HASH_INDEX_FILE_NAME = "BufferHashIndex.json"
+
+    # key 是文件夹路径，value 是 {文件名: {"hash": ..., "size": ..., "mtime_ns": ...}}
+    _folder_hash_index_dict: dict = {}
+
     @classmethod
     def _get_global_config(cls):
         if cls._global_config is None:
@@ -13,45 +22,136 @@ class BufferExportHelper:
             cls._global_config = GlobalConfig
         return cls._global_config
 
+    @classmethod
+    def _get_hash_index(cls, folder: str) -> dict:
+        hash_index = cls._folder_hash_index_dict.get(folder, None)
+        if hash_index is None:
+            hash_index = {}
+            index_path = os.path.join(folder, cls.HASH_INDEX_FILE_NAME)
+            if os.path.exists(index_path):
+                try:
+                    with open(index_path, 'r', encoding='utf-8') as f:
+                        hash_index = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"[BufferWrite] 读取哈希索引失败，本次全部重新写出: {e}")
+                    hash_index = {}
+            cls._folder_hash_index_dict[folder] = hash_index
+        return hash_index
+
+    @staticmethod
+    def _as_bytes_view(data) -> memoryview:
+        if isinstance(data, numpy.ndarray):
+            data = numpy.ascontiguousarray(data).reshape(-1).view(numpy.uint8)
+        return memoryview(data).cast('B')
+
+    @classmethod
+    def write_buffer_file(cls, file_path: str, data) -> bool:
+        '''
+        按内容写出 Buffer 文件：内存中的字节和哈希索引记录的一致，
+        并且磁盘上的文件大小、修改时间也没被别的流程动过时直接跳过，
+        否则先写临时文件再原子替换，避免 3Dmigoto 重载时读到写了一半的文件。
+
+        data 可以是 bytes 或者 numpy 数组（按内存布局原样写出，等价于 tofile）
+        返回 True 表示真正写了文件
+        '''
+        byte_view = cls._as_bytes_view(data)
+        byte_count = byte_view.nbytes
+        content_hash = hashlib.blake2b(byte_view, digest_size=16).hexdigest()
+
+        folder, file_name = os.path.split(os.path.abspath(file_path))
+        hash_index = cls._get_hash_index(folder)
+        recorded = hash_index.get(file_name, None)
+        if recorded is not None and recorded.get("hash") == content_hash:
+            try:
+                file_stat = os.stat(file_path)
+                if file_stat.st_size == byte_count and file_stat.st_mtime_ns == recorded.get("mtime_ns"):
+                    increment_counter("BufferWrite_SkippedFiles")
+                    increment_counter("BufferWrite_SkippedBytes", byte_count)
+                    return False
+            except OSError:
+                pass
+
+        os.makedirs(folder, exist_ok=True)
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(byte_view)
+        os.replace(tmp_path, file_path)
+
+        hash_index[file_name] = {
+            "hash": content_hash,
+            "size": byte_count,
+            "mtime_ns": os.stat(file_path).st_mtime_ns,
+        }
+        increment_counter("BufferWrite_WrittenFiles")
+        increment_counter("BufferWrite_WrittenBytes", byte_count)
+        return True
+
+    @classmethod
+    def get_recorded_file_info(cls, file_path: str) -> dict:
+        '''
+        返回哈希索引里记录的文件信息 {"hash", "size", "mtime_ns"}，没有记录时返回 None
+        '''
+        folder, file_name = os.path.split(os.path.abspath(file_path))
+        return cls._get_hash_index(folder).get(file_name, None)
+
+    @classmethod
+    def flush_hash_index(cls):
+        '''
+        把本次导出更新过的哈希索引写回各个文件夹，并打印写出/跳过统计
+        '''
+        for folder, hash_index in cls._folder_hash_index_dict.items():
+            if not os.path.isdir(folder):
+                continue
+            index_path = os.path.join(folder, cls.HASH_INDEX_FILE_NAME)
+            tmp_path = index_path + ".tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(hash_index, f, ensure_ascii=False, indent=1)
+                os.replace(tmp_path, index_path)
+            except OSError as e:
+                print(f"[BufferWrite] 保存哈希索引失败: {index_path} {e}")
+        cls._folder_hash_index_dict = {}
+
+        written_files = get_counter("BufferWrite_WrittenFiles")
+        skipped_files = get_counter("BufferWrite_SkippedFiles")
+        if written_files or skipped_files:
+            written_mb = get_counter("BufferWrite_WrittenBytes") / (1024 * 1024)
+            skipped_mb = get_counter("BufferWrite_SkippedBytes") / (1024 * 1024)
+            print(f"[BufferWrite] 写出 {written_files} 个文件 ({written_mb:.2f} MB)，内容未变跳过 {skipped_files} 个文件 ({skipped_mb:.2f} MB)")
+
     @staticmethod
     def write_category_buffer_files(category_buffer_dict: dict, draw_ib: str):
         GlobalConfig = BufferExportHelper._get_global_config()
         for category_name, category_buf in category_buffer_dict.items():
             buf_path = GlobalConfig.path_generatemod_buffer_folder() + draw_ib + "-" + category_name + ".buf"
-            with open(buf_path, 'wb') as ibf:
-                category_buf.tofile(ibf)
+            BufferExportHelper.write_buffer_file(buf_path, category_buf)
 
     @staticmethod
-    def write_buf_ib_r32_uint(index_list: list[int], buf_file_name: str):
+    def write_buf_ib_r32_uint(index_list, buf_file_name: str):
+        '''
+        index_list 可以是 list 或者 numpy 数组，统一按小端 uint32 直接写出内存
+        '''
         GlobalConfig = BufferExportHelper._get_global_config()
         ib_path = os.path.join(GlobalConfig.path_generatemod_buffer_folder(), buf_file_name)
-        packed_data = struct.pack(f'<{len(index_list)}I', *index_list)
-        with open(ib_path, 'wb') as ibf:
-            ibf.write(packed_data)
+        BufferExportHelper.write_buffer_file(ib_path, numpy.asarray(index_list, dtype='<u4'))
 
     @staticmethod
     def write_buf_shapekey_offsets(shapekey_offsets, filename: str):
         GlobalConfig = BufferExportHelper._get_global_config()
-        with open(GlobalConfig.path_generatemod_buffer_folder() + filename, 'wb') as file:
-            for number in shapekey_offsets:
-                data = struct.pack('i', number)
-                file.write(data)
+        int_array = numpy.asarray(shapekey_offsets, dtype='<i4')
+        BufferExportHelper.write_buffer_file(GlobalConfig.path_generatemod_buffer_folder() + filename, int_array)
 
     @staticmethod
     def write_buf_shapekey_vertex_ids(shapekey_vertex_ids, filename: str):
         GlobalConfig = BufferExportHelper._get_global_config()
-        with open(GlobalConfig.path_generatemod_buffer_folder() + filename, 'wb') as file:
-            for number in shapekey_vertex_ids:
-                data = struct.pack('i', number)
-                file.write(data)
+        int_array = numpy.asarray(shapekey_vertex_ids, dtype='<i4')
+        BufferExportHelper.write_buffer_file(GlobalConfig.path_generatemod_buffer_folder() + filename, int_array)
 
     @staticmethod
     def write_buf_shapekey_vertex_offsets(shapekey_vertex_offsets, filename: str):
         GlobalConfig = BufferExportHelper._get_global_config()
-        float_array = numpy.array(shapekey_vertex_offsets, dtype=numpy.float32)
-        float_array = float_array.astype(numpy.float16)
-        with open(GlobalConfig.path_generatemod_buffer_folder() + filename, 'wb') as file:
-            float_array.tofile(file)
+        float_array = numpy.asarray(shapekey_vertex_offsets, dtype=numpy.float32).astype('<f2')
+        BufferExportHelper.write_buffer_file(GlobalConfig.path_generatemod_buffer_folder() + filename, float_array)
 
     @staticmethod
     def write_buf_blendindices_uint16(blendindices, filename: str):
@@ -65,6 +165,4 @@ class BufferExportHelper:
             arr_to_write = arr
         arr_uint16 = arr_to_write.astype(numpy.uint16)
         out_path = os.path.join(GlobalConfig.path_generatemod_buffer_folder(), filename)
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        with open(out_path, 'wb') as f:
-            arr_uint16.tofile(f)
+        BufferExportHelper.write_buffer_file(out_path, arr_uint16)
@@ -0,0 +1,462 @@
+'''
+顶点元素编码表
+
+以前每个元素的编码都写在 ObjBufferHelper._parse_xxx 里，按 Format 和 GlobalConfig.logic_name 一路 if 判断，
+现在改成表驱动：(语义, DXGI Format, 游戏逻辑) -> 向量化编码函数。
+导出开始时每个元素只解析一次对应的编码函数，之后每个物体都只是按顺序调用一串 numpy 运算。
+
+- ElementSource: 某个 mesh 的原始数据来源，按需 foreach_get 并缓存，
+  同一份法线、切线、副切线符号会被多个元素共用，不会重复读取
+- ElementCodecRegistry: 编码函数注册表，Format 支持 fnmatch 通配符，
+  匹配时游戏逻辑精确匹配优先于通用，Format 精确匹配优先于通配
+'''
+import fnmatch
+import numpy
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from ..base.fatal import Fatal
+from ..base.d3d11_element import D3D11Element
+from ..base.d3d11_gametype import D3D11GameType
+
+from ..utils.format_utils import FormatUtils
+from ..utils.tbn_codec import TBNCodec
+
+from ..config.main_config import LogicName
+
+
+class ElementSource:
+    '''
+    单个 mesh 的原始数据，第一次用到时才 foreach_get，之后直接返回缓存
+    返回的数组是共享的，编码函数里不能原地修改
+    '''
+    def __init__(self, mesh, blendweights_dict:dict = None, blendindices_dict:dict = None, loop_vertex_indices:numpy.ndarray = None):
+        self.mesh = mesh
+        self.loop_count = len(mesh.loops)
+        self.vertex_count = len(mesh.vertices)
+        self.blendweights_dict = blendweights_dict if blendweights_dict is not None else {}
+        self.blendindices_dict = blendindices_dict if blendindices_dict is not None else {}
+        self._loop_vertex_indices = loop_vertex_indices
+        self._array_cache:Dict[str, numpy.ndarray] = {}
+
+    def _get_loop_array(self, attribute_name:str, component_count:int) -> numpy.ndarray:
+        cached = self._array_cache.get(attribute_name, None)
+        if cached is None:
+            cached = numpy.empty(self.loop_count * component_count, dtype=numpy.float32)
+            self.mesh.loops.foreach_get(attribute_name, cached)
+            if component_count > 1:
+                cached = cached.reshape(-1, component_count)
+            self._array_cache[attribute_name] = cached
+        return cached
+
+    @property
+    def loop_vertex_indices(self) -> numpy.ndarray:
+        if self._loop_vertex_indices is None:
+            self._loop_vertex_indices = numpy.empty(self.loop_count, dtype=int)
+            self.mesh.loops.foreach_get("vertex_index", self._loop_vertex_indices)
+        return self._loop_vertex_indices
+
+    def vertex_coords(self) -> numpy.ndarray:
+        cached = self._array_cache.get("co", None)
+        if cached is None:
+            # Follow WWMI-Tools: fetch the undeformed vertex coordinates and do
+            # not apply mirroring or dtype conversion at extraction stage.
+            cached = numpy.empty(self.vertex_count * 3, dtype=numpy.float32)
+            self.mesh.vertices.foreach_get('co', cached)
+            cached = cached.reshape(-1, 3)
+            self._array_cache["co"] = cached
+        return cached
+
+    def normals(self) -> numpy.ndarray:
+        return self._get_loop_array("normal", 3)
+
+    def tangents(self) -> numpy.ndarray:
+        return self._get_loop_array("tangent", 3)
+
+    def bitangents(self) -> numpy.ndarray:
+        return self._get_loop_array("bitangent", 3)
+
+    def bitangent_signs(self) -> numpy.ndarray:
+        return self._get_loop_array("bitangent_sign", 1)
+
+    def color(self, layer_name:str) -> Optional[numpy.ndarray]:
+        if layer_name not in self.mesh.vertex_colors:
+            return None
+        # 因为COLOR属性存储在Blender里固定是float32类型所以这里只能用numpy.float32
+        result = numpy.zeros(self.loop_count, dtype=(numpy.float32, 4))
+        self.mesh.vertex_colors[layer_name].data.foreach_get("color", result.ravel())
+        return result
+
+    def uv(self, layer_name:str) -> Optional[numpy.ndarray]:
+        if layer_name not in self.mesh.uv_layers:
+            return None
+        uvs_array = numpy.empty(self.loop_count, dtype=(numpy.float32, 2))
+        self.mesh.uv_layers[layer_name].data.foreach_get("uv", uvs_array.ravel())
+        uvs_array[:, 1] = 1.0 - uvs_array[:, 1]
+        return uvs_array
+
+    @staticmethod
+    def _get_blend_data(blend_dict:dict, semantic_index:int, semantic_name:str) -> numpy.ndarray:
+        blend_data = blend_dict.get(semantic_index, None)
+        if blend_data is None:
+            # 如果当前索引对应的数据为 None，则使用索引0的数据并全部置0
+            blend_data_0 = blend_dict.get(0, None)
+            if blend_data_0 is None:
+                raise Fatal("Cannot find any valid " + semantic_name + " data in this model, Please check if your model's Vertex Group is correct.")
+            blend_data = numpy.zeros_like(blend_data_0)
+        return blend_data
+
+    def blendindices(self, semantic_index:int) -> numpy.ndarray:
+        return self._get_blend_data(self.blendindices_dict, semantic_index, "BLENDINDICES")
+
+    def blendweights(self, semantic_index:int) -> numpy.ndarray:
+        return self._get_blend_data(self.blendweights_dict, semantic_index, "BLENDWEIGHT")
+
+
+# 编码函数签名: (source, d3d11_element) -> numpy.ndarray 或 None（None 表示这个元素没有数据）
+ElementCodec = Callable[[ElementSource, D3D11Element], Optional[numpy.ndarray]]
+
+
+@dataclass
+class _CodecEntry:
+    semantic: str
+    format_pattern: str
+    logic_names: Optional[frozenset]
+    byte_width: Optional[int]
+    codec: ElementCodec
+
+    def matches(self, semantic:str, fmt:str, logic_name:str, byte_width:int) -> bool:
+        if self.semantic != semantic:
+            return False
+        if self.logic_names is not None and logic_name not in self.logic_names:
+            return False
+        if self.byte_width is not None and self.byte_width != byte_width:
+            return False
+        return fnmatch.fnmatchcase(fmt, self.format_pattern)
+
+    def specificity(self) -> tuple:
+        return (self.logic_names is not None, not any(c in self.format_pattern for c in "*?["))
+
+
+class ElementCodecRegistry:
+    '''
+    (语义, DXGI Format, 游戏逻辑) 到编码函数的映射
+    '''
+    _entry_list:List[_CodecEntry] = []
+    # key 是 (id(d3d11_game_type), logic_name)，value 是 (d3d11_game_type, codec_plan)
+    _codec_plan_cache:Dict[tuple, tuple] = {}
+
+    # 这几个语义只有元素名完全一致时才导出，例如 NORMAL1 不导出，保持和以前的行为一致
+    EXACT_SEMANTIC_NAMES = ("POSITION", "NORMAL", "TANGENT", "ENCODEDDATA")
+    # 这几个语义按前缀匹配，BLENDWEIGHTS 也归到 BLENDWEIGHT
+    PREFIX_SEMANTIC_NAMES = ("BINORMAL", "COLOR", "TEXCOORD", "BLENDINDICES", "BLENDWEIGHT")
+
+    @classmethod
+    def register(cls, semantic:str, format_patterns, codec:ElementCodec, logic_names=None, byte_width:int = None):
+        if isinstance(format_patterns, str):
+            format_patterns = (format_patterns,)
+        logic_name_set = frozenset(logic_names) if logic_names is not None else None
+        for format_pattern in format_patterns:
+            cls._entry_list.append(_CodecEntry(semantic, format_pattern, logic_name_set, byte_width, codec))
+
+    @classmethod
+    def get_semantic(cls, d3d11_element:D3D11Element) -> str:
+        element_name = d3d11_element.ElementName
+        if element_name in cls.EXACT_SEMANTIC_NAMES:
+            return element_name
+        for semantic in cls.PREFIX_SEMANTIC_NAMES:
+            if element_name.startswith(semantic):
+                return semantic
+        return ""
+
+    @classmethod
+    def resolve(cls, d3d11_element:D3D11Element, logic_name:str) -> Optional[ElementCodec]:
+        '''
+        返回这个元素在当前游戏逻辑下的编码函数，没有对应编码时返回 None
+        '''
+        semantic = cls.get_semantic(d3d11_element)
+        if not semantic:
+            return None
+        best_entry = None
+        for entry in cls._entry_list:
+            if not entry.matches(semantic, d3d11_element.Format, logic_name, d3d11_element.ByteWidth):
+                continue
+            if best_entry is None or entry.specificity() > best_entry.specificity():
+                best_entry = entry
+        return best_entry.codec if best_entry is not None else None
+
+    @classmethod
+    def resolve_codec_plan(cls, d3d11_game_type:D3D11GameType, logic_name:str) -> List[tuple]:
+        '''
+        导出开始时为数据类型里的每个元素解析一次编码函数，返回 [(元素名, 元素, 编码函数)]
+        '''
+        cached = cls._codec_plan_cache.get((id(d3d11_game_type), logic_name), None)
+        if cached is not None and cached[0] is d3d11_game_type:
+            return cached[1]
+
+        # EFMI/AEMI 存在 ENCODEDDATA 时法线切线都编码在 ENCODEDDATA 里，单独的 NORMAL/TANGENT/BINORMAL 不导出
+        skip_tbn = ('ENCODEDDATA' in d3d11_game_type.ElementNameD3D11ElementDict
+                    and logic_name in (LogicName.EFMI, LogicName.AEMI))
+
+        codec_plan = []
+        for d3d11_element_name in d3d11_game_type.OrderedFullElementList:
+            d3d11_element = d3d11_game_type.ElementNameD3D11ElementDict[d3d11_element_name]
+            semantic = cls.get_semantic(d3d11_element)
+            if skip_tbn and semantic in ("NORMAL", "TANGENT", "BINORMAL"):
+                continue
+
+            codec = cls.resolve(d3d11_element, logic_name)
+            if codec is None:
+                if semantic == "ENCODEDDATA":
+                    print(f"警告: ENCODEDDATA 元素仅在 EFMI/AEMI 格式中支持，当前游戏类型: {logic_name}")
+                elif semantic in ("BLENDINDICES", "BLENDWEIGHT"):
+                    raise Fatal(f"未知的{semantic}格式: {d3d11_element.Format}")
+                continue
+            codec_plan.append((d3d11_element_name, d3d11_element, codec))
+
+        cls._codec_plan_cache[(id(d3d11_game_type), logic_name)] = (d3d11_game_type, codec_plan)
+        return codec_plan
+
+
+# ----------------------------------------------------------------------
+# Format 编码表：输入是 float32 的 (N, 4) 数组
+# ----------------------------------------------------------------------
+def _keep(data:numpy.ndarray) -> numpy.ndarray:
+    return data
+
+def _to_float16(data:numpy.ndarray) -> numpy.ndarray:
+    return data.astype(numpy.float16)
+
+_FLOAT4_ENCODER_DICT:Dict[str, Callable] = {
+    'R16G16B16A16_FLOAT': _to_float16,
+    'R8G8B8A8_SNORM': FormatUtils.convert_4x_float32_to_r8g8b8a8_snorm,
+    'R8G8B8A8_UNORM': FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm,
+    'R16G16B16A16_SNORM': FormatUtils.convert_4x_float32_to_r16g16b16a16_snorm,
+    'R16G16B16A16_UNORM': FormatUtils.convert_4x_float32_to_r16g16b16a16_unorm,
+}
+
+_UNREAL_LOGIC_NAMES = (LogicName.WWMI, LogicName.WuWa)
+
+
+def _xyz_with_w(xyz:numpy.ndarray, w) -> numpy.ndarray:
+    result = numpy.empty((len(xyz), 4), dtype=numpy.float32)
+    result[:, :3] = xyz
+    result[:, 3] = w
+    return result
+
+
+# ----------------------------------------------------------------------
+# POSITION
+# ----------------------------------------------------------------------
+def _position_xyz(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    return source.vertex_coords()[source.loop_vertex_indices]
+
+def _position_xyz0(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    # If format expects 4 components, add a zero alpha column (float32)
+    return _xyz_with_w(_position_xyz(source, d3d11_element), 0.0)
+
+def _position_xyz1_float16(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    # 4 分量的半精度格式，W 固定为 1.0（齐次坐标）
+    return _xyz_with_w(_position_xyz(source, d3d11_element), 1.0).astype(numpy.float16)
+
+ElementCodecRegistry.register("POSITION", "*", _position_xyz)
+ElementCodecRegistry.register("POSITION", "R32G32B32A32_FLOAT", _position_xyz0)
+ElementCodecRegistry.register("POSITION", "R16G16B16A16_FLOAT", _position_xyz1_float16)
+
+
+# ----------------------------------------------------------------------
+# NORMAL
+# ----------------------------------------------------------------------
+def _normal_xyz(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    return source.normals()
+
+def _normal_xyz1_float32(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    return _xyz_with_w(source.normals(), 1.0)
+
+def _normal_xyz1_float16(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    return _xyz_with_w(source.normals(), 1.0).astype(numpy.float16)
+
+def _normal_xyz1_snorm8(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    return FormatUtils.convert_4x_float32_to_r8g8b8a8_snorm(_xyz_with_w(source.normals(), 1.0))
+
+def _normal_unreal_snorm8(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    # 鸣潮 NORMAL.w 存的是翻转后的副切线符号
+    return FormatUtils.convert_4x_float32_to_r8g8b8a8_snorm(_xyz_with_w(source.normals(), -source.bitangent_signs()))
+
+def _make_normal_unorm8(w:float) -> ElementCodec:
+    def _normal_unorm8(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+        # 法线是 [-1,1]，导出成 UNORM 时 xyz 归一化到 [0,1]（此处感谢 球球 的代码开发）
+        return FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm(_xyz_with_w((source.normals() + 1) * 0.5, w))
+    return _normal_unorm8
+
+def _normal_efmi_tbn_r32_uint(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    print("终末地法线编码 - 使用 TBNCodec (完整TBN编码)")
+    return TBNCodec.encode_efmi_tools_r32_uint_from_tbn(
+        source.normals(),
+        source.tangents(),
+        source.bitangent_signs(),
+        flip_texcoord_v=True,
+        flip_bitangent_sign=True,
+    ).reshape(-1, 1)
+
+def _normal_aemi_octahedral_r32_uint(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    print("终末地法线编码 - 使用 TBNCodec (仅法线编码)")
+    return TBNCodec.convert_normals_to_octahedral_r32_uint(source.normals()).reshape(-1, 1)
+
+ElementCodecRegistry.register("NORMAL", "*", _normal_xyz)
+ElementCodecRegistry.register("NORMAL", "R32G32B32A32_FLOAT", _normal_xyz1_float32)
+ElementCodecRegistry.register("NORMAL", "R16G16B16A16_FLOAT", _normal_xyz1_float16)
+ElementCodecRegistry.register("NORMAL", "R8G8B8A8_SNORM", _normal_xyz1_snorm8)
+ElementCodecRegistry.register("NORMAL", "R8G8B8A8_SNORM", _normal_unreal_snorm8, logic_names=_UNREAL_LOGIC_NAMES)
+ElementCodecRegistry.register("NORMAL", "R8G8B8A8_UNORM", _make_normal_unorm8(1.0))
+# 燕云十六声的最后一位w固定为0
+ElementCodecRegistry.register("NORMAL", "R8G8B8A8_UNORM", _make_normal_unorm8(0.0), logic_names=(LogicName.YYSLS,))
+ElementCodecRegistry.register("NORMAL", "R32_UINT", _normal_efmi_tbn_r32_uint, logic_names=(LogicName.EFMI,))
+ElementCodecRegistry.register("NORMAL", "R32_UINT", _normal_aemi_octahedral_r32_uint, logic_names=(LogicName.AEMI,))
+
+
+# ----------------------------------------------------------------------
+# TANGENT: 先按游戏逻辑决定 W 分量，再按 Format 编码
+# ----------------------------------------------------------------------
+def _tangent_w_flipped_bitangent_sign(source:ElementSource) -> numpy.ndarray:
+    # 大部分Unity游戏都要把 TANGENT 的 W 分量设为翻转（*= -1）后的副切线符号，否则渲染不正确
+    return _xyz_with_w(source.tangents(), -source.bitangent_signs())
+
+def _tangent_w_one(source:ElementSource) -> numpy.ndarray:
+    # 燕云十六声、Unreal引擎（鸣潮）这里要填写固定的1
+    return _xyz_with_w(source.tangents(), 1.0)
+
+def _tangent_xyz(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    # 第五人格格式
+    return source.tangents()
+
+def _make_float4_codec(float4_source:Callable, encoder:Callable) -> ElementCodec:
+    def _codec(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+        return encoder(float4_source(source))
+    return _codec
+
+for _logic_names, _float4_source in ((None, _tangent_w_flipped_bitangent_sign),
+                                     ((LogicName.YYSLS,) + _UNREAL_LOGIC_NAMES, _tangent_w_one)):
+    ElementCodecRegistry.register("TANGENT", "*", _make_float4_codec(_float4_source, _keep), logic_names=_logic_names)
+    for _format, _encoder in _FLOAT4_ENCODER_DICT.items():
+        if _format == 'R16G16B16A16_UNORM':
+            continue
+        ElementCodecRegistry.register("TANGENT", _format, _make_float4_codec(_float4_source, _encoder), logic_names=_logic_names)
+    ElementCodecRegistry.register("TANGENT", "R32G32B32_FLOAT", _tangent_xyz, logic_names=_logic_names)
+
+
+# ----------------------------------------------------------------------
+# BINORMAL
+# ----------------------------------------------------------------------
+def _binormal_xyz1(source:ElementSource) -> numpy.ndarray:
+    return _xyz_with_w(source.bitangents(), 1.0)
+
+def _binormal_unreal_xyz1(source:ElementSource) -> numpy.ndarray:
+    # 鸣潮逆向翻转：Binormal (-x, -y, z)
+    return _xyz_with_w(source.bitangents() * numpy.array([-1.0, -1.0, 1.0], dtype=numpy.float32), 1.0)
+
+for _logic_names, _float4_source in ((None, _binormal_xyz1), (_UNREAL_LOGIC_NAMES, _binormal_unreal_xyz1)):
+    ElementCodecRegistry.register("BINORMAL", "*", _make_float4_codec(_float4_source, _keep), logic_names=_logic_names)
+    #  燕云十六声格式
+    ElementCodecRegistry.register("BINORMAL", "R16G16B16A16_SNORM", _make_float4_codec(_float4_source, FormatUtils.convert_4x_float32_to_r16g16b16a16_snorm), logic_names=_logic_names)
+
+
+# ----------------------------------------------------------------------
+# ENCODEDDATA: EFMI/AEMI 的 10-10-10-2 TBN 编码
+# ----------------------------------------------------------------------
+def _encoded_tbn(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+    encoded_data = TBNCodec.encode_tbn_data(source.normals(), source.tangents(), -source.bitangent_signs())
+    print(f"终末地 TBN 编码完成: {len(encoded_data)} 个顶点")
+    return encoded_data.reshape(-1, 1)
+
+ElementCodecRegistry.register("ENCODEDDATA", "*", _encoded_tbn, logic_names=(LogicName.EFMI, LogicName.AEMI))
+
+
+# ----------------------------------------------------------------------
+# COLOR
+# ----------------------------------------------------------------------
+def _make_color_codec(encoder:Callable) -> ElementCodec:
+    def _color_codec(source:ElementSource, d3d11_element:D3D11Element) -> Optional[numpy.ndarray]:
+        color = source.color(d3d11_element.ElementName)
+        return encoder(color) if color is not None else None
+    return _color_codec
+
+def _color_r16g16_unorm(color:numpy.ndarray) -> numpy.ndarray:
+    # 鸣潮的平滑法线存UV，在WWMI中的处理方式是转为R16G16_UNORM。
+    return FormatUtils.convert_2x_float32_to_r16g16_unorm(color.astype(numpy.float16)[:, :2])
+
+def _color_r16g16_float(color:numpy.ndarray) -> numpy.ndarray:
+    return color[:, :2]
+
+ElementCodecRegistry.register("COLOR", "*", _make_color_codec(_keep))
+ElementCodecRegistry.register("COLOR", "R16G16B16A16_FLOAT", _make_color_codec(_to_float16))
+ElementCodecRegistry.register("COLOR", "R8G8B8A8_UNORM", _make_color_codec(FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm))
+ElementCodecRegistry.register("COLOR", "R16G16_UNORM", _make_color_codec(_color_r16g16_unorm))
+ElementCodecRegistry.register("COLOR", "R16G16_FLOAT", _make_color_codec(_color_r16g16_float))
+# TODO 添加八面体压缩法线到R32_UINT的代码
+
+
+# ----------------------------------------------------------------------
+# TEXCOORD: 只导出 FLOAT 格式，同时存在 .xy 和 .zw 时以 .zw 为准
+# ----------------------------------------------------------------------
+def _make_texcoord_codec(encoder:Callable) -> ElementCodec:
+    def _texcoord_codec(source:ElementSource, d3d11_element:D3D11Element) -> Optional[numpy.ndarray]:
+        uvs_array = source.uv(d3d11_element.ElementName + '.zw')
+        if uvs_array is None:
+            uvs_array = source.uv(d3d11_element.ElementName + '.xy')
+        return encoder(uvs_array) if uvs_array is not None else None
+    return _texcoord_codec
+
+ElementCodecRegistry.register("TEXCOORD", "*FLOAT", _make_texcoord_codec(_keep))
+ElementCodecRegistry.register("TEXCOORD", "R16G16_FLOAT", _make_texcoord_codec(_to_float16))
+
+
+# ----------------------------------------------------------------------
+# BLENDINDICES
+# ----------------------------------------------------------------------
+def _make_blendindices_codec(encoder:Callable) -> ElementCodec:
+    def _blendindices_codec(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+        return encoder(source.blendindices(d3d11_element.SemanticIndex))
+    return _blendindices_codec
+
+def _blendindices_8bit(blendindices:numpy.ndarray) -> numpy.ndarray:
+    # TODO 全局顶点组索引大于255时截断为uint8会丢失数据，这里只提示不截断，后续还要和remap里进行映射
+    max_index = numpy.max(blendindices)
+    if max_index > 255:
+        print("BLENDINDICES大于255了,最大值是：" + str(max_index))
+    return blendindices
+
+def _first_2(data:numpy.ndarray) -> numpy.ndarray:
+    return data[:, :2]
+
+def _first_1(data:numpy.ndarray) -> numpy.ndarray:
+    return data[:, :1]
+
+ElementCodecRegistry.register("BLENDINDICES", ("R32G32B32A32_SINT", "R32G32B32A32_UINT", "R16G16B16A16_UINT"), _make_blendindices_codec(_keep))
+ElementCodecRegistry.register("BLENDINDICES", ("R32G32_UINT", "R32G32_SINT"), _make_blendindices_codec(_first_2))
+ElementCodecRegistry.register("BLENDINDICES", ("R32_UINT", "R32_SINT"), _make_blendindices_codec(_first_1))
+ElementCodecRegistry.register("BLENDINDICES", "R8G8B8A8_SNORM", _make_blendindices_codec(FormatUtils.convert_4x_float32_to_r8g8b8a8_snorm))
+ElementCodecRegistry.register("BLENDINDICES", "R8G8B8A8_UNORM", _make_blendindices_codec(FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm))
+ElementCodecRegistry.register("BLENDINDICES", "R8G8B8A8_UINT", _make_blendindices_codec(_blendindices_8bit))
+# WWMI 的 R8_UINT / R16_UINT 特殊处理：一个元素里装下全部权重
+ElementCodecRegistry.register("BLENDINDICES", "R8_UINT", _make_blendindices_codec(_blendindices_8bit), byte_width=8)
+ElementCodecRegistry.register("BLENDINDICES", "R16_UINT", _make_blendindices_codec(_keep), byte_width=16)
+
+
+# ----------------------------------------------------------------------
+# BLENDWEIGHT
+# ----------------------------------------------------------------------
+def _make_blendweight_codec(encoder:Callable) -> ElementCodec:
+    def _blendweight_codec(source:ElementSource, d3d11_element:D3D11Element) -> numpy.ndarray:
+        return encoder(source.blendweights(d3d11_element.SemanticIndex))
+    return _blendweight_codec
+
+ElementCodecRegistry.register("BLENDWEIGHT", "R32G32B32A32_FLOAT", _make_blendweight_codec(_keep))
+ElementCodecRegistry.register("BLENDWEIGHT", "R32G32_FLOAT", _make_blendweight_codec(_first_2))
+ElementCodecRegistry.register("BLENDWEIGHT", "R16G16B16A16_FLOAT", _make_blendweight_codec(_to_float16))
+ElementCodecRegistry.register("BLENDWEIGHT", "R8G8B8A8_SNORM", _make_blendweight_codec(FormatUtils.convert_4x_float32_to_r8g8b8a8_snorm))
+ElementCodecRegistry.register("BLENDWEIGHT", "R8G8B8A8_UNORM", _make_blendweight_codec(FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm_blendweights))
+ElementCodecRegistry.register("BLENDWEIGHT", "R16G16B16A16_UNORM", _make_blendweight_codec(FormatUtils.convert_4x_float32_to_r16g16b16a16_unorm))
+# WWMI R8_UNORM 特殊处理
+ElementCodecRegistry.register("BLENDWEIGHT", "R8_UNORM", _make_blendweight_codec(FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm_blendweights), byte_width=8)
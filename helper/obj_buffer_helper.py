@@ -1,12 +1,12 @@
-import collections
 from ..base.d3d11_gametype import D3D11GameType
 from ..base.fatal import Fatal
 
 
-from ..utils.format_utils import FormatUtils
 from ..utils.vertexgroup_utils import VertexGroupUtils
 from ..utils.timer_utils import TimerUtils
-from ..utils.tbn_codec import TBNCodec
+from ..utils.row_hash_utils import RowHashUtils
+
+from .element_codec import ElementSource, ElementCodecRegistry
 
 from ..config.main_config import GlobalConfig, LogicName
 from ..config.properties_generate_mod import Properties_GenerateMod
@@ -54,396 +54,6 @@ class ObjBufferHelper:
 
 
 
-    @staticmethod
-    def _parse_position(mesh_vertices, mesh_vertices_length, loop_vertex_indices, d3d11_element):
-        vertex_coords = numpy.empty(mesh_vertices_length * 3, dtype=numpy.float32)
-        # Follow WWMI-Tools: fetch the undeformed vertex coordinates and do
-        # not apply mirroring or dtype conversion at extraction stage.
-        # mesh_vertices.foreach_get('undeformed_co', vertex_coords)
-        mesh_vertices.foreach_get('co', vertex_coords)
-        positions = vertex_coords.reshape(-1, 3)[loop_vertex_indices]
-
-        if d3d11_element.Format == 'R32G32B32A32_FLOAT':
-            # If format expects 4 components, add a zero alpha column (float32)
-            new_array = numpy.zeros((positions.shape[0], 4), dtype=numpy.float32)
-            new_array[:, :3] = positions
-            positions = new_array
-        elif d3d11_element.Format == 'R16G16B16A16_FLOAT':
-            # If format expects 4 components, add a W column (float16).
-            # Expand the 3-component positions into the first 3 slots
-            # and set the 4th (W) component to 1.0 (homogeneous coord).
-            new_array = numpy.zeros((positions.shape[0], 4), dtype=numpy.float16)
-            new_array[:, :3] = positions.astype(numpy.float16)
-            new_array[:, 3] = numpy.ones(positions.shape[0], dtype=numpy.float16)
-            positions = new_array
-        return positions
-
-    @staticmethod
-    def _parse_normal(mesh_loops, mesh_loops_length, d3d11_element, has_encoded_data=False):
-        # 统一获取法线数据
-        normals = numpy.empty(mesh_loops_length * 3, dtype=numpy.float32)
-        mesh_loops.foreach_get('normal', normals)
-
-        if d3d11_element.Format == 'R16G16B16A16_FLOAT':
-            result = numpy.ones(mesh_loops_length * 4, dtype=numpy.float32)
-            result[0::4] = normals[0::3]
-            result[1::4] = normals[1::3]
-            result[2::4] = normals[2::3]
-            result = result.reshape(-1, 4)
-
-            result = result.astype(numpy.float16)
-            return result
-
-        elif d3d11_element.Format == 'R32G32B32A32_FLOAT':
-            
-            result = numpy.ones(mesh_loops_length * 4, dtype=numpy.float32)
-            result[0::4] = normals[0::3]
-            result[1::4] = normals[1::3]
-            result[2::4] = normals[2::3]
-            result = result.reshape(-1, 4)
-
-            result = result.astype(numpy.float32)
-            return result
-
-        elif d3d11_element.Format == 'R8G8B8A8_SNORM':
-            # WWMI 这里已经确定过NORMAL没问题
-
-            result = numpy.ones(mesh_loops_length * 4, dtype=numpy.float32)
-            result[0::4] = normals[0::3]
-            result[1::4] = normals[1::3]
-            result[2::4] = normals[2::3]
-            
-            if GlobalConfig.logic_name == LogicName.WWMI or GlobalConfig.logic_name == LogicName.WuWa:
-                bitangent_signs = numpy.empty(mesh_loops_length, dtype=numpy.float32)
-                mesh_loops.foreach_get("bitangent_sign", bitangent_signs)
-                result[3::4] = bitangent_signs * -1
-                # print("Unreal: Set NORMAL.W to bitangent_sign")
-            
-            result = result.reshape(-1, 4)
-
-            return FormatUtils.convert_4x_float32_to_r8g8b8a8_snorm(result)
-
-
-        elif d3d11_element.Format == 'R8G8B8A8_UNORM':
-            # 因为法线数据是[-1,1]如果非要导出成UNORM，那一定是进行了归一化到[0,1]
-            
-            result = numpy.ones(mesh_loops_length * 4, dtype=numpy.float32)
-            
-
-            # 燕云十六声的最后一位w固定为0
-            if GlobalConfig.logic_name == LogicName.YYSLS:
-                result = numpy.zeros(mesh_loops_length * 4, dtype=numpy.float32)
-                
-            result[0::4] = normals[0::3]
-            result[1::4] = normals[1::3]
-            result[2::4] = normals[2::3]
-            result = result.reshape(-1, 4)
-
-            # 归一化 (此处感谢 球球 的代码开发)
-            def DeConvert(nor):
-                return (nor + 1) * 0.5
-
-            for i in range(len(result)):
-                result[i][0] = DeConvert(result[i][0])
-                result[i][1] = DeConvert(result[i][1])
-                result[i][2] = DeConvert(result[i][2])
-
-            return FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm(result)
-
-        elif d3d11_element.Format == "R32_UINT" and GlobalConfig.logic_name == LogicName.EFMI:
-            print("终末地法线编码 - 使用 TBNCodec (完整TBN编码)")
-            raw_normals = normals.reshape(-1, 3)
-            tangents = numpy.empty(mesh_loops_length * 3, dtype=numpy.float32)
-            mesh_loops.foreach_get("tangent", tangents)
-            tangents = tangents.reshape(-1, 3)
-
-            bitangent_signs = numpy.empty(mesh_loops_length, dtype=numpy.float32)
-            mesh_loops.foreach_get("bitangent_sign", bitangent_signs)
-
-            new_normals = TBNCodec.encode_efmi_tools_r32_uint_from_tbn(
-                raw_normals,
-                tangents,
-                bitangent_signs,
-                flip_texcoord_v=True,
-                flip_bitangent_sign=True,
-            ).reshape(-1, 1)
-            
-            return new_normals
-
-        elif d3d11_element.Format == "R32_UINT" and GlobalConfig.logic_name == LogicName.AEMI:
-            print("终末地法线编码 - 使用 TBNCodec (仅法线编码)")
-            raw_normals = normals.reshape(-1, 3)
-            return TBNCodec.convert_normals_to_octahedral_r32_uint(raw_normals).reshape(-1, 1)
-        
-        else:
-            # 将一维数组 reshape 成 (mesh_loops_length, 3) 形状的二维数组
-            result = normals.reshape(-1, 3)
-
-            return result
-
-    @staticmethod
-    def _parse_tangent(mesh_loops, mesh_loops_length, d3d11_element):
-        result = numpy.empty(mesh_loops_length * 4, dtype=numpy.float32)
-
-        # 使用 foreach_get 批量获取切线和副切线符号数据
-        tangents = numpy.empty(mesh_loops_length * 3, dtype=numpy.float32)
-        mesh_loops.foreach_get("tangent", tangents)
-
-        # 将切线分量放置到输出数组中
-        result[0::4] = tangents[0::3]  # x 分量
-        result[1::4] = tangents[1::3]  # y 分量
-        result[2::4] = tangents[2::3]  # z 分量
-
-        if GlobalConfig.logic_name == LogicName.YYSLS:
-            # 燕云十六声的TANGENT.w固定为1
-            tangent_w = numpy.ones(mesh_loops_length, dtype=numpy.float32)
-            result[3::4] = tangent_w
-        elif GlobalConfig.logic_name == LogicName.WWMI or GlobalConfig.logic_name == LogicName.WuWa:
-            # Unreal引擎中这里要填写固定的1
-            tangent_w = numpy.ones(mesh_loops_length, dtype=numpy.float32)
-            result[3::4] = tangent_w
-        else:
-            # print("其它游戏翻转TANGENT的W分量")
-            # 默认就设置BITANGENT的W翻转，大部分Unity游戏都要用到
-            bitangent_signs = numpy.empty(mesh_loops_length, dtype=numpy.float32)
-            mesh_loops.foreach_get("bitangent_sign", bitangent_signs)
-            # XXX 将副切线符号乘以 -1
-            # 这里翻转（翻转指的就是 *= -1）是因为如果要确保Unity游戏中渲染正确，必须翻转TANGENT的W分量
-            bitangent_signs *= -1
-            result[3::4] = bitangent_signs  # w 分量 (副切线符号)
-        # 重塑 output_tangents 成 (mesh_loops_length, 4) 形状的二维数组
-        result = result.reshape(-1, 4)
-
-        if d3d11_element.Format == 'R16G16B16A16_FLOAT':
-            result = result.astype(numpy.float16)
-
-        elif d3d11_element.Format == 'R8G8B8A8_SNORM':
-            # print("WWMI TANGENT To SNORM")
-            result = FormatUtils.convert_4x_float32_to_r8g8b8a8_snorm(result)
-
-        elif d3d11_element.Format == 'R8G8B8A8_UNORM':
-            result = FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm(result)
-        
-        # 第五人格格式
-        elif d3d11_element.Format == "R32G32B32_FLOAT":
-            result = numpy.empty(mesh_loops_length * 3, dtype=numpy.float32)
-
-            result[0::3] = tangents[0::3]  # x 分量
-            result[1::3] = tangents[1::3]  # y 分量
-            result[2::3] = tangents[2::3]  # z 分量
-
-            result = result.reshape(-1, 3)
-        
-        # 燕云十六声格式
-        elif d3d11_element.Format == 'R16G16B16A16_SNORM':
-            result = FormatUtils.convert_4x_float32_to_r16g16b16a16_snorm(result)
-        
-        return result
-
-    @staticmethod
-    def _parse_binormal(mesh_loops, mesh_loops_length, d3d11_element):
-        result = numpy.empty(mesh_loops_length * 4, dtype=numpy.float32)
-
-        # 使用 foreach_get 批量获取切线和副切线符号数据
-        binormals = numpy.empty(mesh_loops_length * 3, dtype=numpy.float32)
-        mesh_loops.foreach_get("bitangent", binormals)
-        
-        if GlobalConfig.logic_name == LogicName.WWMI or GlobalConfig.logic_name == LogicName.WuWa:
-            # 鸣潮逆向翻转：Binormal (-x, -y, z)
-            binormals[0::3] *= -1
-            binormals[1::3] *= -1
-
-        # 将切线分量放置到输出数组中
-        # BINORMAL全部翻转即可得到和YYSLS游戏中一样的效果。
-        result[0::4] = binormals[0::3]  # x 分量
-        result[1::4] = binormals[1::3]   # y 分量
-        result[2::4] = binormals[2::3]  # z 分量
-        binormal_w = numpy.ones(mesh_loops_length, dtype=numpy.float32)
-        result[3::4] = binormal_w
-        result = result.reshape(-1, 4)
-
-        if d3d11_element.Format == 'R16G16B16A16_SNORM':
-            #  燕云十六声格式
-            result = FormatUtils.convert_4x_float32_to_r16g16b16a16_snorm(result)
-            
-        return result
-
-    @staticmethod
-    def _parse_encoded_tbn(mesh_loops, mesh_loops_length, d3d11_element):
-        """
-        解析并编码 EFMI/AEMI 格式的 ENCODEDDATA (10-10-10-2 TBN 编码)
-        
-        该方法从 mesh.loops 中获取法线、切线和副切线符号，
-        并使用 TBNCodec 编码为 10-10-10-2 格式的 R32_UINT 数据
-        """
-        normals = numpy.empty(mesh_loops_length * 3, dtype=numpy.float32)
-        mesh_loops.foreach_get('normal', normals)
-        normals = normals.reshape(-1, 3)
-
-        tangents = numpy.empty(mesh_loops_length * 3, dtype=numpy.float32)
-        mesh_loops.foreach_get("tangent", tangents)
-        tangents = tangents.reshape(-1, 3)
-
-        bitangent_signs = numpy.empty(mesh_loops_length, dtype=numpy.float32)
-        mesh_loops.foreach_get("bitangent_sign", bitangent_signs)
-        bitangent_signs *= -1
-
-        encoded_data = TBNCodec.encode_tbn_data(normals, tangents, bitangent_signs)
-        
-        print(f"终末地 TBN 编码完成: {len(encoded_data)} 个顶点")
-        
-        return encoded_data.reshape(-1, 1)
-
-    @staticmethod
-    def _parse_color(mesh, mesh_loops_length, d3d11_element_name, d3d11_element):
-        if d3d11_element_name in mesh.vertex_colors:
-            # 因为COLOR属性存储在Blender里固定是float32类型所以这里只能用numpy.float32
-            result = numpy.zeros(mesh_loops_length, dtype=(numpy.float32, 4))
-            # result = numpy.zeros((mesh_loops_length,4), dtype=(numpy.float32))
-
-            mesh.vertex_colors[d3d11_element_name].data.foreach_get("color", result.ravel())
-            
-            if d3d11_element.Format == 'R16G16B16A16_FLOAT':
-                result = result.astype(numpy.float16)
-            elif d3d11_element.Format == "R16G16_UNORM":
-                # 鸣潮的平滑法线存UV，在WWMI中的处理方式是转为R16G16_UNORM。
-                # 但是这里很可能存在转换问题。
-                result = result.astype(numpy.float16)
-                result = result[:, :2]
-                result = FormatUtils.convert_2x_float32_to_r16g16_unorm(result)
-            # TODO 添加八面体压缩法线到R32_UINT的代码
-
-            elif d3d11_element.Format == "R16G16_FLOAT":
-                # 
-                result = result[:, :2]
-            elif d3d11_element.Format == 'R8G8B8A8_UNORM':
-                result = FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm(result)
-
-            print(d3d11_element.Format)
-            print(d3d11_element_name)
-    
-            return result
-        return None
-
-    @staticmethod
-    def _parse_texcoord(mesh, mesh_loops_length, d3d11_element_name, d3d11_element):
-        result = None
-        # TimerUtils.Start("GET TEXCOORD")
-        for uv_name in ('%s.xy' % d3d11_element_name, '%s.zw' % d3d11_element_name):
-            if uv_name in mesh.uv_layers:
-                uvs_array = numpy.empty(mesh_loops_length ,dtype=(numpy.float32,2))
-                mesh.uv_layers[uv_name].data.foreach_get("uv",uvs_array.ravel())
-                uvs_array[:,1] = 1.0 - uvs_array[:,1]
-
-                if d3d11_element.Format == 'R16G16_FLOAT':
-                    uvs_array = uvs_array.astype(numpy.float16)
-                
-                # 重塑 uvs_array 成 (mesh_loops_length, 2) 形状的二维数组
-                # uvs_array = uvs_array.reshape(-1, 2)
-
-                result = uvs_array 
-        # TimerUtils.End("GET TEXCOORD")
-        return result
-
-    @staticmethod
-    def _parse_blendindices(blendindices_dict, d3d11_element):
-        blendindices = blendindices_dict.get(d3d11_element.SemanticIndex,None)
-        # print("blendindices: " + str(len(blendindices_dict)))
-        # 如果当前索引对应的 blendindices 为 None，则使用索引0的数据并全部置0
-        if blendindices is None:
-            blendindices_0 = blendindices_dict.get(0, None)
-            if blendindices_0 is not None:
-                # 创建一个与 blendindices_0 形状相同的全0数组，保持相同的数据类型
-                blendindices = numpy.zeros_like(blendindices_0)
-            else:
-                raise Fatal("Cannot find any valid BLENDINDICES data in this model, Please check if your model's Vertex Group is correct.")
-        # print(len(blendindices))
-        if d3d11_element.Format == "R32G32B32A32_SINT":
-            return blendindices
-        elif d3d11_element.Format == "R16G16B16A16_UINT":
-            return blendindices
-        elif d3d11_element.Format == "R32G32B32A32_UINT":
-            return blendindices
-        elif d3d11_element.Format == "R32G32_UINT":
-            return blendindices[:, :2]
-        elif d3d11_element.Format == "R32G32_SINT":
-            return blendindices[:, :2]
-        elif d3d11_element.Format == "R32_UINT":
-            return blendindices[:, :1]
-        elif d3d11_element.Format == "R32_SINT":
-            return blendindices[:, :1]
-        elif d3d11_element.Format == 'R8G8B8A8_SNORM':
-            return FormatUtils.convert_4x_float32_to_r8g8b8a8_snorm(blendindices)
-        elif d3d11_element.Format == 'R8G8B8A8_UNORM':
-            return FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm(blendindices)
-        elif d3d11_element.Format == 'R8G8B8A8_UINT':
-            # TODO 这里类型截断错了吧，假如我们的全局顶点组索引是256或者300呢？
-            # 这里截断直接没了，后续我们还怎么去和remap里进行映射？
-            # 帮我在这里新加一个判断，如果blendindices里有大于255的值就不能转换为uint8
-            # print("uint8")
-            max_index = numpy.max(blendindices)
-            if max_index > 255:
-                print("BLENDINDICES大于255了,最大值是：" + str(max_index))
-            else:
-                blendindices.astype(numpy.uint8)
-            return blendindices
-            # print(original_elementname_data_dict[d3d11_element_name].dtype)
-        elif d3d11_element.Format == "R8_UINT" and d3d11_element.ByteWidth == 8:
-            max_index = numpy.max(blendindices)
-            if max_index > 255:
-                print("BLENDINDICES大于255了,最大值是：" + str(max_index))
-            else:
-                blendindices.astype(numpy.uint8)
-
-            return blendindices
-            # print(original_elementname_data_dict[d3d11_element_name].dtype)
-            # print("WWMI R8_UINT特殊处理")
-        elif d3d11_element.Format == "R16_UINT" and d3d11_element.ByteWidth == 16:
-            blendindices.astype(numpy.uint16)
-            return blendindices
-            # print("WWMI R16_UINT特殊处理")
-        else:
-            # print(blendindices.shape)
-            raise Fatal("未知的BLENDINDICES格式")
-
-    @staticmethod
-    def _parse_blendweight(blendweights_dict, d3d11_element):
-        blendweights = blendweights_dict.get(d3d11_element.SemanticIndex, None)
-        if blendweights is None:
-            # print("遇到了为None的情况！")
-            blendweights_0 = blendweights_dict.get(0, None)
-            if blendweights_0 is not None:
-                # 创建一个与 blendweights_0 形状相同的全0数组，保持相同的数据类型
-                blendweights = numpy.zeros_like(blendweights_0)
-            else:
-                raise Fatal("Cannot find any valid BLENDWEIGHT data in this model, Please check if your model's Vertex Group is correct.")
-        # print(len(blendweights))
-        if d3d11_element.Format == "R32G32B32A32_FLOAT":
-            return blendweights
-        elif d3d11_element.Format == "R32G32_FLOAT":
-            return blendweights[:, :2]
-        elif d3d11_element.Format == 'R8G8B8A8_SNORM':
-            # print("BLENDWEIGHT R8G8B8A8_SNORM")
-            return FormatUtils.convert_4x_float32_to_r8g8b8a8_snorm(blendweights)
-        elif d3d11_element.Format == 'R8G8B8A8_UNORM':
-            # print("BLENDWEIGHT R8G8B8A8_UNORM")
-            return FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm_blendweights(blendweights)
-        elif d3d11_element.Format == 'R16G16B16A16_FLOAT':
-            return blendweights.astype(numpy.float16)
-        elif d3d11_element.Format == 'R16G16B16A16_UNORM':
-            return FormatUtils.convert_4x_float32_to_r16g16b16a16_unorm(blendweights)
-        elif d3d11_element.Format == "R8_UNORM" and d3d11_element.ByteWidth == 8:
-            # TimerUtils.Start("WWMI BLENDWEIGHT R8_UNORM特殊处理")
-            blendweights = FormatUtils.convert_4x_float32_to_r8g8b8a8_unorm_blendweights(blendweights)
-            # original_elementname_data_dict[d3d11_element_name] = blendweights
-            print("WWMI R8_UNORM特殊处理")
-            # TimerUtils.End("WWMI BLENDWEIGHT R8_UNORM特殊处理")
-            return blendweights
-
-        else:
-            print(blendweights.shape)
-            raise Fatal("未知的BLENDWEIGHTS格式")
-
     @staticmethod
     def parse_elementname_data_dict(mesh:bpy.types.Mesh, d3d11_game_type:D3D11GameType):
         '''
@@ -453,14 +63,6 @@ class ObjBufferHelper:
 
         original_elementname_data_dict: dict = {}
 
-        mesh_loops = mesh.loops
-        mesh_loops_length = len(mesh.loops)
-        mesh_vertices = mesh.vertices
-        mesh_vertices_length = len(mesh.vertices)
-
-        loop_vertex_indices = numpy.empty(mesh_loops_length, dtype=int)
-        mesh_loops.foreach_get("vertex_index", loop_vertex_indices)
-
         # 预设的权重个数，也就是每个顶点组受多少个权重影响
         blend_size = 4
 
@@ -469,67 +71,27 @@ class ObjBufferHelper:
 
         normalize_weights = "Blend" in d3d11_game_type.OrderedCategoryNameList
 
-        # normalize_weights = False
-        if GlobalConfig.logic_name == LogicName.WWMI or GlobalConfig.logic_name == LogicName.WuWa:
-            # print("鸣潮专属测试版权重处理：")
-            blendweights_dict, blendindices_dict = VertexGroupUtils.get_blendweights_blendindices_v4_fast(mesh=mesh,normalize_weights = normalize_weights,blend_size=blend_size)
-
-        elif GlobalConfig.logic_name == LogicName.SnowBreak:
-            print("尘白禁区权重处理")
-            blendweights_dict, blendindices_dict = VertexGroupUtils.get_blendweights_blendindices_v4_fast(mesh=mesh,normalize_weights = normalize_weights,blend_size=blend_size)
-        else:
-            blendweights_dict, blendindices_dict = VertexGroupUtils.get_blendweights_blendindices_v3(mesh=mesh,normalize_weights = normalize_weights)
-
-
-        # 检查是否存在 ENCODEDDATA 元素 (用于 EFMI/AEMI 格式的 TBN 编码)
-        has_encoded_data = 'ENCODEDDATA' in d3d11_game_type.ElementNameD3D11ElementDict
-
-        # 对每一种Element都获取对应的数据
-        for d3d11_element_name in d3d11_game_type.OrderedFullElementList:
-            d3d11_element = d3d11_game_type.ElementNameD3D11ElementDict[d3d11_element_name]
-            
-            data = None
-
-            if d3d11_element_name == 'POSITION':
-                data = ObjBufferHelper._parse_position(mesh_vertices, mesh_vertices_length, loop_vertex_indices, d3d11_element)
-
-            elif d3d11_element_name == 'NORMAL':
-                if has_encoded_data and (GlobalConfig.logic_name == LogicName.EFMI or GlobalConfig.logic_name == LogicName.AEMI):
-                    pass
-                else:
-                    data = ObjBufferHelper._parse_normal(mesh_loops, mesh_loops_length, d3d11_element, has_encoded_data)
-
-            elif d3d11_element_name == 'TANGENT':
-                if has_encoded_data and (GlobalConfig.logic_name == LogicName.EFMI or GlobalConfig.logic_name == LogicName.AEMI):
-                    pass
-                else:
-                    data = ObjBufferHelper._parse_tangent(mesh_loops, mesh_loops_length, d3d11_element)
-
-            elif d3d11_element_name.startswith('BINORMAL'):
-                if has_encoded_data and (GlobalConfig.logic_name == LogicName.EFMI or GlobalConfig.logic_name == LogicName.AEMI):
-                    pass
-                else:
-                    data = ObjBufferHelper._parse_binormal(mesh_loops, mesh_loops_length, d3d11_element)
-            
-            elif d3d11_element_name.startswith('COLOR'):
-                data = ObjBufferHelper._parse_color(mesh, mesh_loops_length, d3d11_element_name, d3d11_element)
-
-            elif d3d11_element_name.startswith('TEXCOORD') and d3d11_element.Format.endswith('FLOAT'):
-                data = ObjBufferHelper._parse_texcoord(mesh, mesh_loops_length, d3d11_element_name, d3d11_element)
-            
-            elif d3d11_element_name.startswith('BLENDINDICES'):
-                data = ObjBufferHelper._parse_blendindices(blendindices_dict, d3d11_element)
-                
-            elif d3d11_element_name.startswith('BLENDWEIGHT'):
-                data = ObjBufferHelper._parse_blendweight(blendweights_dict, d3d11_element)
-
-            elif d3d11_element_name == 'ENCODEDDATA':
-                if GlobalConfig.logic_name == LogicName.EFMI or GlobalConfig.logic_name == LogicName.AEMI:
-                    data = ObjBufferHelper._parse_encoded_tbn(mesh_loops, mesh_loops_length, d3d11_element)
-                else:
-                    print(f"警告: ENCODEDDATA 元素仅在 EFMI/AEMI 格式中支持，当前游戏类型: {GlobalConfig.logic_name}")
-                    data = None
+        # 各游戏的权重策略：
+        # WWMI/WuWa/尘白禁区 忽略0权重，全部权重放在同一个 BLENDINDICES 中
+        # 其它游戏保留0权重的顶点组，每4个一组拆分到不同的 SemanticIndex
+        split_by_4 = True
+        ignore_zero_weights = False
+        if GlobalConfig.logic_name in (LogicName.WWMI, LogicName.WuWa, LogicName.SnowBreak):
+            split_by_4 = False
+            ignore_zero_weights = True
+
+        blendweights_dict, blendindices_dict = VertexGroupUtils.get_blendweights_blendindices_unified(
+            mesh=mesh,
+            blend_size=blend_size,
+            ignore_zero_weights=ignore_zero_weights,
+            normalize_weights=normalize_weights,
+            split_by_4=split_by_4
+        )
 
+        # 每个元素的编码函数在数据类型和游戏逻辑确定后只解析一次，这里只是按顺序执行
+        element_source = ElementSource(mesh=mesh, blendweights_dict=blendweights_dict, blendindices_dict=blendindices_dict)
+        for d3d11_element_name, d3d11_element, codec in ElementCodecRegistry.resolve_codec_plan(d3d11_game_type, GlobalConfig.logic_name):
+            data = codec(element_source, d3d11_element)
             if data is not None:
                 original_elementname_data_dict[d3d11_element_name] = data
 
@@ -568,6 +130,49 @@ class ObjBufferHelper:
         return element_vertex_ndarray
     
 
+    @staticmethod
+    def _get_polygon_loop_order(mesh:bpy.types.Mesh) -> numpy.ndarray:
+        '''
+        按 mesh.polygons 的遍历顺序返回所有 loop 的索引
+        等价于 [l for poly in mesh.polygons for l in range(poly.loop_start, poly.loop_start + poly.loop_total)]
+        '''
+        n_polys = len(mesh.polygons)
+        loop_starts = numpy.empty(n_polys, dtype=numpy.int32)
+        loop_totals = numpy.empty(n_polys, dtype=numpy.int32)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+
+        # 每个 loop 的索引 = 所在面的 loop_start + 在面内的偏移
+        poly_offsets = numpy.cumsum(loop_totals) - loop_totals
+        loop_order = numpy.arange(int(loop_totals.sum()), dtype=numpy.int64)
+        loop_order += numpy.repeat(loop_starts - poly_offsets, loop_totals)
+        return loop_order
+
+    @staticmethod
+    def _flip_triangle_winding(flattened_ib:numpy.ndarray) -> numpy.ndarray:
+        '''
+        翻转每个三角形的顶点顺序，末尾不足3个的索引也按组翻转，与逐三个切片翻转的旧逻辑一致
+        '''
+        full_count = len(flattened_ib) - len(flattened_ib) % 3
+        flipped = numpy.asarray(flattened_ib).copy()
+        flipped[:full_count] = flipped[:full_count].reshape(-1, 3)[:, ::-1].reshape(-1)
+        flipped[full_count:] = flipped[full_count:][::-1]
+        return flipped
+
+    @staticmethod
+    def _split_category_buffer_dict(indexed_vertices:numpy.ndarray, d3d11_game_type:D3D11GameType) -> dict:
+        '''
+        把去重后的结构化顶点数组按 Category 的 Stride 切分为每个分类的字节数组
+        '''
+        indexed_vertices = numpy.ascontiguousarray(indexed_vertices)
+        data_matrix = indexed_vertices.view(numpy.uint8).reshape(len(indexed_vertices), indexed_vertices.dtype.itemsize)
+
+        category_buffer_dict:dict[str,numpy.ndarray] = {}
+        for categoryname,category_stride in d3d11_game_type.CategoryStrideDict.items():
+            stride_offset = d3d11_game_type.CategoryOffsetDict[categoryname]
+            category_buffer_dict[categoryname] = data_matrix[:,stride_offset:stride_offset + category_stride].flatten()
+        return category_buffer_dict
+
     @staticmethod
     def calc_index_vertex_buffer_wwmi_v2(
         mesh:bpy.types.Mesh, 
@@ -739,6 +344,21 @@ class ObjBufferHelper:
         return ib, category_buffer_dict, index_vertex_id_dict, unique_element_vertex_ndarray,unique_first_loop_indices
 
 
+    @staticmethod
+    def _to_vertex_ndarray(indexed_vertices, dtype:numpy.dtype) -> numpy.ndarray:
+        '''
+        indexed_vertices 可以是结构化 ndarray，也可以是每个顶点一个 bytes 的可迭代对象
+        返回一个可写的结构化 ndarray 副本
+        '''
+        if isinstance(indexed_vertices, numpy.ndarray):
+            return indexed_vertices.astype(dtype, copy=True)
+
+        # 不用担心这个转换的效率，速度非常快
+        vb = bytearray()
+        for vertex in indexed_vertices:
+            vb += bytes(vertex)
+        return numpy.frombuffer(vb, dtype = dtype)
+
     @staticmethod
     def average_normal_color(obj,indexed_vertices,d3d11GameType:D3D11GameType,dtype):
         '''
@@ -757,52 +377,33 @@ class ObjBufferHelper:
         # 开始重计算COLOR
         TimerUtils.Start("Recalculate COLOR")
 
-        # 不用担心这个转换的效率，速度非常快
-        vb = bytearray()
-        for vertex in indexed_vertices:
-            vb += bytes(vertex)
-        vb = numpy.frombuffer(vb, dtype = dtype)
+        vb = ObjBufferHelper._to_vertex_ndarray(indexed_vertices, dtype)
 
-        # 首先提取所有唯一的位置，并创建一个索引映射
-        unique_positions, position_indices = numpy.unique(
-            [tuple(val['POSITION']) for val in vb], 
-            return_inverse=True, 
+        # 首先提取所有唯一的位置，并创建一个索引映射（位置完全相同才算同一个点）
+        _, position_indices = numpy.unique(
+            numpy.asarray(vb['POSITION'], dtype=float).reshape(len(vb), -1),
+            return_inverse=True,
             axis=0
         )
-
-        # 初始化累积法线和计数器为零
-        accumulated_normals = numpy.zeros((len(unique_positions), 3), dtype=float)
-        counts = numpy.zeros(len(unique_positions), dtype=int)
-
-        # 累加法线并增加计数（这里假设vb是一个list）
-        for i, val in enumerate(vb):
-            accumulated_normals[position_indices[i]] += numpy.array(val['NORMAL'], dtype=float)
-            counts[position_indices[i]] += 1
-
-        # 对所有位置的法线进行一次性规范化处理
-        mask = counts > 0
-        average_normals = numpy.zeros_like(accumulated_normals)
-        average_normals[mask] = (accumulated_normals[mask] / counts[mask][:, None])
+        position_indices = position_indices.reshape(-1)
+
+        # 按顶点顺序逐个累加法线并计数，bincount 的累加顺序和逐顶点循环一致，结果逐位相同
+        normals = numpy.asarray(vb['NORMAL'], dtype=float).reshape(len(vb), -1)
+        counts = numpy.bincount(position_indices)
+        accumulated_normals = numpy.stack(
+            [numpy.bincount(position_indices, weights=normals[:, i], minlength=len(counts)) for i in range(3)],
+            axis=1
+        )
+        average_normals = accumulated_normals / counts[:, None]
 
         # 归一化到[0,1]，然后映射到颜色值
         normalized_normals = ((average_normals + 1) / 2 * 255).astype(numpy.uint8)
 
-        # 更新颜色信息
-        new_color = []
-        for i, val in enumerate(vb):
-            color = [0, 0, 0, val['COLOR'][3]]  # 保留原来的Alpha通道
-            
-            if mask[position_indices[i]]:
-                color[:3] = normalized_normals[position_indices[i]]
-
-            new_color.append(color)
-
-        # 将新的颜色列表转换为NumPy数组
-        new_color_array = numpy.array(new_color, dtype=numpy.uint8)
-
-        # 更新vb中的颜色信息
-        for i, val in enumerate(vb):
-            val['COLOR'] = new_color_array[i]
+        # 更新颜色信息，保留原来的Alpha通道
+        new_color_array = numpy.empty((len(vb), 4), dtype=numpy.uint8)
+        new_color_array[:, :3] = normalized_normals[position_indices]
+        new_color_array[:, 3] = vb['COLOR'][:, 3]
+        vb['COLOR'] = new_color_array
 
         TimerUtils.End("Recalculate COLOR")
         return vb
@@ -829,15 +430,11 @@ class ObjBufferHelper:
         if not allow_calc:
             return indexed_vertices
         
-        # 不用担心这个转换的效率，速度非常快
-        vb = bytearray()
-        for vertex in indexed_vertices:
-            vb += bytes(vertex)
-        vb = numpy.frombuffer(vb, dtype = dtype)
+        vb = ObjBufferHelper._to_vertex_ndarray(indexed_vertices, dtype)
 
         # 开始重计算TANGENT
-        positions = numpy.array([val['POSITION'] for val in vb])
-        normals = numpy.array([val['NORMAL'] for val in vb], dtype=float)
+        positions = numpy.asarray(vb['POSITION'])
+        normals = numpy.asarray(vb['NORMAL'], dtype=float)
 
         # 对位置进行排序，以便相同的位置会相邻
         sort_indices = numpy.lexsort(positions.T)
@@ -848,25 +445,18 @@ class ObjBufferHelper:
         group_indices = numpy.flatnonzero(numpy.any(sorted_positions[:-1] != sorted_positions[1:], axis=1))
         group_indices = numpy.r_[0, group_indices + 1, len(sorted_positions)]
 
-        # 累加法线和计算计数
-        unique_positions = sorted_positions[group_indices[:-1]]
+        # 累加法线
         accumulated_normals = numpy.add.reduceat(sorted_normals, group_indices[:-1], axis=0)
-        counts = numpy.diff(group_indices)
 
         # 归一化累积法线向量
         normalized_normals = accumulated_normals / numpy.linalg.norm(accumulated_normals, axis=1)[:, numpy.newaxis]
         normalized_normals[numpy.isnan(normalized_normals)] = 0  # 处理任何可能出现的零向量导致的除零错误
 
-        # 构建结果字典
-        position_normal_dict = dict(zip(map(tuple, unique_positions), normalized_normals))
-
-        # TimerUtils.End("Recalculate TANGENT")
-
-        # 获取所有位置并转换为元组，用于查找字典
-        positions = [tuple(pos) for pos in vb['POSITION']]
-
-        # 从字典中获取对应的标准化法线
-        normalized_normals = numpy.array([position_normal_dict[pos] for pos in positions])
+        # 每个顶点所在的分组编号，按原顺序取回对应的标准化法线
+        sorted_group_ids = numpy.repeat(numpy.arange(len(group_indices) - 1), numpy.diff(group_indices))
+        vertex_group_ids = numpy.empty(len(vb), dtype=numpy.int64)
+        vertex_group_ids[sort_indices] = sorted_group_ids
+        normalized_normals = normalized_normals[vertex_group_ids]
 
         # 计算 w 并调整 tangent 的第四个分量
         w = numpy.where(vb['TANGENT'][:, 3] >= 0, -1.0, 1.0)
@@ -884,23 +474,23 @@ class ObjBufferHelper:
         '''
         计算IndexBuffer和CategoryBufferDict并返回
 
-        这里是速度瓶颈，23万顶点情况下测试，前面的获取mesh数据只用了1.5秒
-        但是这里两个步骤加起来用了6秒，占了4/5运行时间。
-        不过暂时也够用了，先不管了。
+        这里曾经是速度瓶颈，23万顶点情况下逐 Loop 构建 OrderedDict 要6秒左右，
+        现在把每个 Loop 的整行字节哈希成两个 uint64 后一次性去重，并校验哈希碰撞，
+        得到的首次出现顺序、IB 和 VB 与原来的逐 Loop 字典完全一致。
         '''
-        # TimerUtils.Start("Calc IB VB")
         # (1) 统计模型的索引和唯一顶点
         '''
         不保持相同顶点时，仍然使用经典而又快速的方法
         '''
-        # print("calc ivb universal")
-        indexed_vertices = collections.OrderedDict()
-        ib = [[indexed_vertices.setdefault(element_vertex_ndarray[blender_lvertex.index].tobytes(), len(indexed_vertices))
-                for blender_lvertex in mesh.loops[poly.loop_start:poly.loop_start + poly.loop_total]
-                    ]for poly in mesh.polygons] 
-            
-        flattened_ib = [item for sublist in ib for item in sublist]
-        # TimerUtils.End("Calc IB VB")
+        vb = numpy.ascontiguousarray(element_vertex_ndarray)
+        n_loops = len(vb)
+        row_bytes = vb.view(numpy.uint8).reshape(n_loops, vb.dtype.itemsize)
+
+        # 按 polygons 的遍历顺序排列 loop
+        loop_order = ObjBufferHelper._get_polygon_loop_order(mesh)
+
+        unique_first_positions, flattened_ib = RowHashUtils.unique_rows_hashed(row_bytes[loop_order])
+        indexed_vertices = vb[loop_order[unique_first_positions]]
 
         # 重计算TANGENT步骤
         indexed_vertices = ObjBufferHelper.average_normal_tangent(obj=obj, indexed_vertices=indexed_vertices, d3d11GameType=d3d11GameType,dtype=dtype)
@@ -908,44 +498,80 @@ class ObjBufferHelper:
         # 重计算COLOR步骤
         indexed_vertices = ObjBufferHelper.average_normal_color(obj=obj, indexed_vertices=indexed_vertices, d3d11GameType=d3d11GameType,dtype=dtype)
 
-        # print("indexed_vertices:")
-        # print(str(len(indexed_vertices)))
-
         # (2) 转换为CategoryBufferDict
-        # TimerUtils.Start("Calc CategoryBuffer")
-        category_stride_dict = d3d11GameType.get_real_category_stride_dict()
-        category_buffer_dict:dict[str,list] = {}
-        for categoryname,category_stride in d3d11GameType.CategoryStrideDict.items():
-            category_buffer_dict[categoryname] = []
-
-        data_matrix = numpy.array([numpy.frombuffer(byte_data,dtype=numpy.uint8) for byte_data in indexed_vertices])
-        stride_offset = 0
-        for categoryname,category_stride in category_stride_dict.items():
-            category_buffer_dict[categoryname] = data_matrix[:,stride_offset:stride_offset + category_stride].flatten()
-            stride_offset += category_stride
+        category_buffer_dict = ObjBufferHelper._split_category_buffer_dict(indexed_vertices, d3d11GameType)
 
-        ib = flattened_ib
         if GlobalConfig.logic_name == LogicName.YYSLS:
             print("导出时翻转面朝向")
+            flattened_ib = ObjBufferHelper._flip_triangle_winding(flattened_ib)
 
-            flipped_indices = []
-            # print(flattened_ib[0],flattened_ib[1],flattened_ib[2])
-            for i in range(0, len(flattened_ib), 3):
-                triangle = flattened_ib[i:i+3]
-                flipped_triangle = triangle[::-1]
-                flipped_indices.extend(flipped_triangle)
-            # print(flipped_indices[0],flipped_indices[1],flipped_indices[2])
-            ib = flipped_indices
-
-
-        
-        category_buffer_dict = category_buffer_dict
+        ib = flattened_ib.astype(numpy.uint32)
         index_vertex_id_dict = None
 
         return ib,category_buffer_dict,index_vertex_id_dict
 
 
 
+    @staticmethod
+    def build_girlsfrontline2_vertex_ndarray(
+        element_vertex_ndarray:numpy.ndarray,
+        loop_vertex_indices:numpy.ndarray,
+        vertex_coords:numpy.ndarray) -> numpy.ndarray:
+        '''
+        少前2强制索引对齐模式的顶点缓冲构建，纯 numpy 实现，不依赖 bpy，方便脱离 Blender 验证。
+
+        - element_vertex_ndarray: 每个 Loop 一行的结构化数组
+        - loop_vertex_indices: 每个 Loop 对应的 Blender 顶点索引
+        - vertex_coords: (顶点数, 3) 的顶点坐标，用于填充没有被任何 Loop 引用的顶点
+
+        规则与逐 Loop 遍历完全一致：
+        - 同一个 (POSITION, NORMAL) 共用第一次出现的 Loop 的 TANGENT
+        - 同一个顶点被多个 Loop 引用时，以索引最大的 Loop 为准
+        - 没有被引用的顶点只填 POSITION，其余字段为0
+        '''
+        n_loops = len(element_vertex_ndarray)
+        v_cnt = len(vertex_coords)
+        loop_vertex_indices = numpy.asarray(loop_vertex_indices, dtype=numpy.int64)
+        loop_data = numpy.ascontiguousarray(element_vertex_ndarray).copy()
+
+        # 共享 TANGENT（仅当 TANGENT 字段存在时使用）
+        if 'TANGENT' in loop_data.dtype.names:
+            key_fields = [name for name in ('POSITION', 'NORMAL') if name in loop_data.dtype.names]
+            key_columns = []
+            for name in key_fields:
+                field_data = numpy.ascontiguousarray(loop_data[name]).reshape(n_loops, -1)
+                if field_data.dtype.kind == 'f':
+                    # +0.0 把 -0.0 规整为 0.0，与 tuple 比较时 -0.0 == 0.0 的语义保持一致
+                    field_data = field_data + field_data.dtype.type(0)
+                key_columns.append(field_data.view(numpy.uint8).reshape(n_loops, -1))
+            key_bytes = numpy.ascontiguousarray(numpy.hstack(key_columns))
+            key_rows = key_bytes.view(numpy.dtype((numpy.void, key_bytes.shape[1]))).reshape(-1)
+
+            # return_index 给出每个 (POSITION, NORMAL) 第一次出现的 Loop
+            _, first_loops, inverse = numpy.unique(key_rows, return_index=True, return_inverse=True)
+            loop_data['TANGENT'] = loop_data['TANGENT'][first_loops[inverse.reshape(-1)]]
+
+        # 按 (vertex_index, loop_index) 排序后检测分组边界，每组最后一个就是该顶点最后被写入的 Loop
+        sorted_loops = numpy.lexsort((numpy.arange(n_loops), loop_vertex_indices))
+        sorted_vidx = loop_vertex_indices[sorted_loops]
+        group_last = numpy.flatnonzero(numpy.r_[sorted_vidx[1:] != sorted_vidx[:-1], True]) if n_loops > 0 else numpy.empty(0, dtype=numpy.int64)
+
+        used_vertices = sorted_vidx[group_last]
+        used_mask = numpy.zeros(v_cnt, dtype=bool)
+        used_mask[used_vertices] = True
+
+        vertex_buffer = numpy.zeros(v_cnt, dtype=loop_data.dtype)
+        vertex_buffer[used_vertices] = loop_data[sorted_loops[group_last]]
+
+        # 给"死顶点"也填上 dummy，但位置必须对
+        unused_vertices = numpy.flatnonzero(~used_mask)
+        if len(unused_vertices) > 0:
+            positions = vertex_buffer['POSITION']
+            positions[unused_vertices, :3] = vertex_coords[unused_vertices]
+            vertex_buffer['POSITION'] = positions
+
+        return vertex_buffer
+
     @staticmethod
     def calc_index_vertex_buffer_girlsfrontline2(
         mesh:bpy.types.Mesh, 
@@ -989,63 +615,28 @@ class ObjBufferHelper:
 
         loops = mesh.loops
         v_cnt = len(mesh.vertices)
-        loop_vidx = numpy.empty(len(loops), dtype=int)
+        loop_vidx = numpy.empty(len(loops), dtype=numpy.int32)
         loops.foreach_get("vertex_index", loop_vidx)
 
-        # 1. 预分配：每条 Blender 顶点一条记录，先填“空”
-        dummy = numpy.zeros(1, dtype=element_vertex_ndarray.dtype)
-        vertex_buffer = [dummy.copy() for _ in range(v_cnt)]   # list[ndarray]
-        # 2. 标记哪些顶点被 loop 真正用到
-        used_mask = numpy.zeros(v_cnt, dtype=bool)
-        used_mask[loop_vidx] = True
-
-        # 3. 共享 TANGENT 字典（仅当 TANGENT 字段存在时使用）
-        has_tangent = 'TANGENT' in element_vertex_ndarray.dtype.names
-        pos_normal_key = {}   # (position_tuple, normal_tuple) -> tangent
-
-        # 4. 先给"被用到"的顶点填真实数据
-        for lp in loops:
-            v_idx = lp.vertex_index
-            if used_mask[v_idx]:
-                data = element_vertex_ndarray[lp.index].copy()
-                if has_tangent:
-                    pn_key = (tuple(data['POSITION']), tuple(data['NORMAL']))
-                    if pn_key in pos_normal_key:
-                        data['TANGENT'] = pos_normal_key[pn_key]
-                    else:
-                        pos_normal_key[pn_key] = data['TANGENT']
-                vertex_buffer[v_idx] = data
-
-        # 5. 给"死顶点"也填上 dummy，但位置必须对
-        for v_idx in range(v_cnt):
-            if not used_mask[v_idx]:
-                vertex_buffer[v_idx]['POSITION'] = mesh.vertices[v_idx].co
-                # 其余字段保持 0
-
-        # 6. 现在 vertex_buffer 长度 == v_cnt，直接转 bytes 即可
-        indexed_vertices = [arr.tobytes() for arr in vertex_buffer]
+        vertex_coords = numpy.empty(v_cnt * 3, dtype=numpy.float32)
+        mesh.vertices.foreach_get("co", vertex_coords)
 
-        # 7. 重建索引缓冲（IB）
-        ib = []
-        for poly in mesh.polygons:
-            ib.append([v_idx for lp in loops[poly.loop_start:poly.loop_start + poly.loop_total]
-                    for v_idx in [lp.vertex_index]])
+        # 1~6. 按 Blender 顶点一一对应构建顶点缓冲
+        vertex_buffer = ObjBufferHelper.build_girlsfrontline2_vertex_ndarray(
+            element_vertex_ndarray=element_vertex_ndarray,
+            loop_vertex_indices=loop_vidx,
+            vertex_coords=vertex_coords.reshape(-1, 3)
+        )
 
-        flattened_ib = [i for sub in ib for i in sub]
+        # 7. 重建索引缓冲（IB），索引直接就是 Blender 顶点索引
+        flattened_ib = loop_vidx[ObjBufferHelper._get_polygon_loop_order(mesh)]
         
-        print(f"[去重精度-gf2] Blender顶点数: {v_cnt}, 导出顶点数: {len(indexed_vertices)} (强制对齐)")
+        print(f"[去重精度-gf2] Blender顶点数: {v_cnt}, 导出顶点数: {len(vertex_buffer)} (强制对齐)")
 
         # 8. 拆 CategoryBuffer
-        category_stride_dict = d3d11_game_type.get_real_category_stride_dict()
-        category_buffer_dict = {name: [] for name in d3d11_game_type.CategoryStrideDict}
-        data_matrix = numpy.array([numpy.frombuffer(b, dtype=numpy.uint8) for b in indexed_vertices])
-        stride_offset = 0
-        for name, stride in category_stride_dict.items():
-            category_buffer_dict[name] = data_matrix[:, stride_offset:stride_offset + stride].flatten()
-            stride_offset += stride
+        category_buffer_dict = ObjBufferHelper._split_category_buffer_dict(vertex_buffer, d3d11_game_type)
 
-        # print("长度：", v_cnt)          
-        ib = flattened_ib
+        ib = flattened_ib.astype(numpy.uint32)
         index_vertex_id_dict = None
 
         return ib, category_buffer_dict, index_vertex_id_dict
@@ -1150,103 +741,69 @@ class ObjBufferHelper:
         except Exception:
             raw = vb.tobytes()
             row_bytes = numpy.frombuffer(raw, dtype=numpy.uint8).reshape(n_loops, row_size)
+
+        # 按 polygons 的遍历顺序排列 loop，保证首次出现顺序与逐面遍历完全一致
+        loop_order = ObjBufferHelper._get_polygon_loop_order(mesh)
+
+        loop_vertex_indices = numpy.empty(n_loops, dtype=numpy.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vertex_indices)
         
         # 统一逻辑：始终将 (数据 + 顶点索引) 作为唯一标识
         # 1. 彻底解决 ShapeKey 问题：防止 Basis 中重合但在 Morph 中分离的顶点被错误合并。
         # 2. 保持拓扑结构：确保 Blender 中不同的点导出后依然是不同的点。
-        unique_map = collections.OrderedDict()
-        
+        # 选中字段的字节 + 4字节顶点索引 拼成定长的一行，整体视为 void 类型后一次 numpy.unique 完成去重
+        key_columns = [row_bytes[:, start:end] for start, end in field_byte_ranges]
+        if include_vertex_id:
+            key_columns.append(loop_vertex_indices.view(numpy.uint8).reshape(n_loops, 4))
+
+        if key_columns:
+            key_bytes = numpy.ascontiguousarray(numpy.hstack(key_columns)[loop_order])
+        else:
+            # 没有任何字段参与去重时，所有 Loop 共用同一个顶点
+            key_bytes = numpy.zeros((len(loop_order), 1), dtype=numpy.uint8)
+
+        key_rows = key_bytes.view(numpy.dtype((numpy.void, key_bytes.shape[1]))).reshape(-1)
+
+        # return_index 返回的是每个唯一值的首次出现位置
+        _, first_positions, inverse = numpy.unique(key_rows, return_index=True, return_inverse=True)
+
+        # numpy.unique 的结果是按字节排序的，这里重排为首次出现顺序
+        order = numpy.argsort(first_positions, kind='stable')
+        new_id = numpy.empty(len(order), dtype=numpy.int64)
+        new_id[order] = numpy.arange(len(order), dtype=numpy.int64)
+        flattened_ib = new_id[inverse.reshape(-1)]
+
         # KEY: unique_vertex_index (buffer index), VALUE: first_loop_index
         # 记录每一个生成的 Buffer 顶点对应的是哪一个原始 Loop
         # 这对于 Shape Key 的法线导出至关重要，因为法线是存储在 Loop 上的
-        unique_loop_map = {} 
-
-        ib = []
-        for poly in mesh.polygons:
-            poly_indices = []
-            for loop_index in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                loop = mesh.loops[loop_index]
-                
-                # 根据配置选择性提取字段数据
-                if field_byte_ranges:
-                    selected_bytes_list = []
-                    for start, end in field_byte_ranges:
-                        selected_bytes_list.append(row_bytes[loop.index, start:end])
-                    if selected_bytes_list:
-                        data = numpy.hstack(selected_bytes_list).tobytes()
-                    else:
-                        data = b''
-                else:
-                    data = b''
-                
-                # 核心：Key 始终包含 vertex_index (data, index)
-                # 这样只有当 "数据完全一致" 且 "是同一个顶点(仅因硬边/UV断开)" 时才会共用索引
-                if include_vertex_id:
-                    key = (data, loop.vertex_index)
-                else:
-                    key = data
-                
-                if key in unique_map:
-                    idx = unique_map[key]
-                else:
-                    idx = len(unique_map)
-                    unique_map[key] = idx
-                    unique_loop_map[idx] = loop.index
-                
-                poly_indices.append(idx)
-            ib.append(poly_indices)
-        
-        print(f"[去重精度-unified] Loops: {n_loops} -> Unique: {len(unique_map)} (合并了 {n_loops - len(unique_map)} 个)")
+        unique_loop_indices = loop_order[first_positions[order]]
         
-        # 提取 vertex buffer 需要的数据 (使用完整的原始数据)
-        # vertex_data_list = [k[0] for k in unique_map.keys()]
+        print(f"[去重精度-unified] Loops: {n_loops} -> Unique: {len(unique_loop_indices)} (合并了 {n_loops - len(unique_loop_indices)} 个)")
 
         # 同时构建 index -> blender_loop_index 的映射
         # 这对于后续生成 ShapeKey Buffer 至关重要，因为我们需要知道当前生成的第 i 个点对应 Blender 的哪个 Loop
         # Loop Index 可进一步转换为 Vertex Index，但 Vertex Index 无法反推唯一的 Loop Index (Split Normals)
-        vertex_data_list = []
-        for key in unique_map.keys():
-            # 获取对应的 loop_index，然后从原始数据中提取完整数据
-            loop_idx = unique_loop_map[unique_map[key]]
-            full_data = element_vertex_ndarray[loop_idx].tobytes()
-            vertex_data_list.append(full_data)
-        
-        index_loop_id_dict = unique_loop_map
+        index_loop_id_dict = dict(enumerate(unique_loop_indices.tolist()))
 
-        flattened_ib = [item for sublist in ib for item in sublist]
+        # 提取 vertex buffer 需要的数据 (使用完整的原始数据)
+        indexed_vertices = vb[unique_loop_indices]
         # TimerUtils.End("Calc IB VB")
 
         # 重计算TANGENT步骤
-        indexed_vertices = ObjBufferHelper.average_normal_tangent(obj=obj, indexed_vertices=vertex_data_list, d3d11GameType=d3d11_game_type,dtype=dtype)
+        indexed_vertices = ObjBufferHelper.average_normal_tangent(obj=obj, indexed_vertices=indexed_vertices, d3d11GameType=d3d11_game_type,dtype=dtype)
         
         # 重计算COLOR步骤
         indexed_vertices = ObjBufferHelper.average_normal_color(obj=obj, indexed_vertices=indexed_vertices, d3d11GameType=d3d11_game_type,dtype=dtype)
 
         # (2) 转换为CategoryBufferDict
-        # TimerUtils.Start("Calc CategoryBuffer")
-        category_stride_dict = d3d11_game_type.get_real_category_stride_dict()
-        category_buffer_dict:dict[str,list] = {}
-        for categoryname,category_stride in d3d11_game_type.CategoryStrideDict.items():
-            category_buffer_dict[categoryname] = []
-
-        data_matrix = numpy.array([numpy.frombuffer(byte_data,dtype=numpy.uint8) for byte_data in indexed_vertices])
-        stride_offset = 0
-        for categoryname,category_stride in category_stride_dict.items():
-            category_buffer_dict[categoryname] = data_matrix[:,stride_offset:stride_offset + category_stride].flatten()
-            stride_offset += category_stride
+        category_buffer_dict = ObjBufferHelper._split_category_buffer_dict(indexed_vertices, d3d11_game_type)
 
         # 设置ib，准备返回
-        ib = flattened_ib
         # YYSLS是目前除了鸣潮外，唯一需要翻转面朝向的游戏
         if GlobalConfig.logic_name == LogicName.YYSLS:
-            flipped_indices = []
-            # print(flattened_ib[0],flattened_ib[1],flattened_ib[2])
-            for i in range(0, len(flattened_ib), 3):
-                triangle = flattened_ib[i:i+3]
-                flipped_triangle = triangle[::-1]
-                flipped_indices.extend(flipped_triangle)
-            # print(flipped_indices[0],flipped_indices[1],flipped_indices[2])
-            ib = flipped_indices
+            flattened_ib = ObjBufferHelper._flip_triangle_winding(flattened_ib)
+
+        ib = flattened_ib.astype(numpy.uint32)
 
         return ib, category_buffer_dict,index_loop_id_dict
       
\ No newline at end of file
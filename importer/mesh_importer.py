@@ -3,7 +3,6 @@
 import bpy
 import os
 import numpy
-import itertools
 import math
 
 from ..utils.timer_utils import TimerUtils
@@ -24,7 +23,7 @@ from ..base.d3d11_element import D3D11Element
 from ..common.extracted_object import ExtractedObjectHelper
 
 # 用于解决 AttributeError: 'IMPORT_MESH_OT_migoto_raw_buffers_mmt' object has no attribute 'filepath'
-from bpy_extras.io_utils import unpack_list, axis_conversion
+from bpy_extras.io_utils import axis_conversion
 
 from .fmt_file import FMTFile
 from .migoto_binary_file import MigotoBinaryFile
@@ -42,6 +41,9 @@ class MeshImporter:
         if not mbf.file_size_check():
             return None
 
+        # 工作空间导入时已经在线程池里准备好了，这里直接跳过
+        MeshImporter.prepare_mbf_data(mbf)
+
         # 创建mesh和obj
         mesh = bpy.data.meshes.new(mbf.mesh_name)
         obj = bpy.data.objects.new(mesh.name, mesh)
@@ -59,37 +61,36 @@ class MeshImporter:
 
 
         for element in mbf.fmt_file.elements:
-            data = mbf.vb_data[element.ElementName]
+            data = mbf.element_data_dict[element.ElementName]
 
             print("当前Element: " + element.ElementName)
-            print("当前数据转换前 Shape: " + str(data.shape))
-            data = FormatUtils.apply_format_conversion(data, element.Format)
-            print("当前数据转换后 Shape: " + str(data.shape))
 
             if element.SemanticName == "POSITION":
                 if len(data[0]) == 4:
                     # Nico: 这里改为只要所有的第四位都是0或1就可以近似看为3D的 POSITION
                     # 这种处理是偷懒，第四位直接不管了，呵呵呵
-                    if not all(x[3] in (0, 1) for x in data):
-                    # if ([x[3] for x in data] != [1.0] * len(data)) and ([x[3] for x in data] != [0] * len(data)):
+                    if not numpy.isin(data[:, 3], (0, 1)).all():
                         raise Fatal('Positions are 4D')
                 
-                positions = [(x[0], x[1] , x[2] ) for x in data]
-                mesh.vertices.foreach_set('co', unpack_list(positions))
+                positions = numpy.ascontiguousarray(data[:, :3], dtype=numpy.float32)
+                mesh.vertices.foreach_set('co', positions.ravel())
             elif element.SemanticName.startswith("COLOR"):
                 mesh.vertex_colors.new(name=element.ElementName)
                 color_layer = mesh.vertex_colors[element.ElementName].data
-                for l in mesh.loops:
-                    if l.vertex_index < len(data):
-                        color_layer[l.index].color = list(data[l.vertex_index]) + [0] * (4 - len(data[l.vertex_index]))
-                    else:
-                        color_layer[l.index].color = [1.0, 1.0, 1.0, 1.0]
+
+                # 不足4个分量的用0补齐，超出顶点数据范围的Loop使用白色
+                color_data = numpy.asarray(data, dtype=numpy.float32).reshape(len(data), -1)
+                color_data = numpy.pad(color_data, ((0, 0), (0, 4 - color_data.shape[1])))
+                loop_vertex_indices = MeshImporter.get_loop_vertex_indices(mesh)
+                in_range = loop_vertex_indices < len(color_data)
+                loop_colors = numpy.ones((len(loop_vertex_indices), 4), dtype=numpy.float32)
+                loop_colors[in_range] = color_data[loop_vertex_indices[in_range]]
+                color_layer.foreach_set('color', loop_colors.ravel())
                 
             elif element.SemanticName == "BLENDINDICES":
                 if data.ndim == 1:
-                    # 如果data是一维数组，转换为包含元组的2D数组，用于处理只有一个R32_UINT的情况
-                    data_2d = numpy.array([(x,) for x in data])
-                    blend_indices[element.SemanticIndex] = data_2d
+                    # 如果data是一维数组，转换为(N,1)的2D数组，用于处理只有一个R32_UINT的情况
+                    blend_indices[element.SemanticIndex] = data.reshape(-1, 1)
                 else:
                     blend_indices[element.SemanticIndex] = data
                 # print("Import BLENDINDICES Shape: " + str(blend_indices[element.SemanticIndex].shape))
@@ -116,7 +117,7 @@ class MeshImporter:
                 '''
                 if GlobalConfig.logic_name == LogicName.YYSLS:
                     print("燕云十六声法线处理")
-                    normals = [(x[0] * 2 - 1, x[1] * 2 - 1, x[2] * 2 - 1) for x in data]
+                    normals = data[:, :3] * 2 - 1
                 elif (mbf.fmt_file.logic_name == LogicName.AEMI or mbf.fmt_file.logic_name == LogicName.EFMI) and element.Format == "R32_UINT":
                     print("终末地压缩法线处理(Endfield Packed Normals) - 使用 TBNCodec")
                     
@@ -126,10 +127,10 @@ class MeshImporter:
                     if raw.ndim > 1:
                         raw = raw[:, 0]
                     
-                    normals = TBNCodec.decode_octahedral_r32_uint(raw).tolist()
+                    normals = TBNCodec.decode_octahedral_r32_uint(raw)
                     print("终末地压缩法线处理完成")
                 else:
-                    normals = [(x[0], x[1], x[2]) for x in data]
+                    normals = data[:, :3]
             elif element.SemanticName == "ENCODEDDATA":
                 if mbf.fmt_file.logic_name == LogicName.AEMI or mbf.fmt_file.logic_name == LogicName.EFMI:
                     print("终末地 ENCODEDDATA 处理 - 使用 TBNCodec 解码 TBN 数据")
@@ -141,7 +142,7 @@ class MeshImporter:
                     if raw.ndim > 1:
                         raw = raw[:, 0]
                     
-                    normals = TBNCodec.decode_octahedral_r32_uint(raw).tolist()
+                    normals = TBNCodec.decode_octahedral_r32_uint(raw)
                     print("终末地 ENCODEDDATA 处理完成")
                 else:
                     print(f"警告: ENCODEDDATA 元素仅在 EFMI/AEMI 格式中支持，当前游戏类型: {mbf.fmt_file.logic_name}")
@@ -155,14 +156,10 @@ class MeshImporter:
         # 导入完之后，如果发现blend_weights是空的，则自动补充默认值为1,0,0,0的BLENDWEIGHTS
         if len(blend_weights) == 0 and len(blend_indices) != 0:
             print("检测到BLENDWEIGHTS为空，但是含有BLENDINDICES数据，特殊情况，默认补充1,0,0,0的BLENDWEIGHTS")
-            tmpi = 0
-            for blendindices_turple in blend_indices.values():
-                # print(blendindices_turple)
-                new_dict = []
-                for indices in blendindices_turple:
-                    new_dict.append((1.0,0,0,0))
-                blend_weights[tmpi] = new_dict
-                tmpi = tmpi + 1
+            for tmpi, blendindices_turple in enumerate(blend_indices.values()):
+                default_weights = numpy.zeros((len(blendindices_turple), 4), dtype=numpy.float32)
+                default_weights[:, 0] = 1.0
+                blend_weights[tmpi] = default_weights
 
         MeshImporter.import_uv_layers(mesh, obj, texcoords)
 
@@ -279,30 +276,60 @@ class MeshImporter:
    
 
     @classmethod
-    def initialize_mesh(cls,mesh, mbf:MigotoBinaryFile):
-        # 翻转索引顺序以改变面朝向，只能改变面朝向，模型依然是镜像的
-        # print(mbf.ib_data[0],mbf.ib_data[1],mbf.ib_data[2])
+    def get_loop_vertex_indices(cls, mesh) -> numpy.ndarray:
+        '''
+        一次性读取所有 Loop 的顶点索引
+        '''
+        loop_vertex_indices = numpy.empty(len(mesh.loops), dtype=numpy.int32)
+        mesh.loops.foreach_get('vertex_index', loop_vertex_indices)
+        return loop_vertex_indices
 
+    @classmethod
+    def prepare_mbf_data(cls, mbf:MigotoBinaryFile):
+        '''
+        导入前的数据准备：按 Element 解码顶点数据，并按需翻转索引顺序
+        这里只读取文件和做 numpy 计算，不访问 bpy，可以放到线程池里和其它 DrawIB 并行执行，
+        读取磁盘和 numpy 计算期间会释放 GIL，主线程只需要负责创建物体
+        已经准备过的 mbf 直接跳过
+        '''
+        if mbf.data_prepared:
+            return
+        mbf.data_prepared = True
+
+        # 空文件在 create_mesh_obj_from_mbf 里给出提示并跳过导入
+        if mbf.vb_file_size == 0 or mbf.ib_file_size == 0:
+            return
+
+        # 翻转索引顺序以改变面朝向，只能改变面朝向，模型依然是镜像的
         # 部分游戏模型导入时必须翻转面朝向，并在生成Mod时翻转面朝向
         if (mbf.fmt_file.logic_name == LogicName.WWMI 
             or mbf.fmt_file.logic_name == LogicName.WuWa
             or mbf.fmt_file.logic_name == LogicName.YYSLS):
-            flipped_indices = []
-            for i in range(0, len(mbf.ib_data), 3):
-                triangle = mbf.ib_data[i:i+3]
-                flipped_triangle = triangle[::-1]
-                flipped_indices.extend(flipped_triangle)
-            mbf.ib_data = flipped_indices
-        
-        # 输出查看翻转后的前三个索引
-        # print(mbf.ib_data[0],mbf.ib_data[1],mbf.ib_data[2])
+            # 每个三角形的三个索引倒序，末尾不足一个三角形的部分也整体倒序
+            ib_data = numpy.asarray(mbf.ib_data)
+            full_length = len(ib_data) // 3 * 3
+            mbf.ib_data = numpy.concatenate((ib_data[:full_length].reshape(-1, 3)[:, ::-1].ravel(), ib_data[full_length:][::-1]))
+        else:
+            mbf.ib_data = numpy.array(mbf.ib_data)
 
+        for element in mbf.fmt_file.elements:
+            raw_data = mbf.vb_data[element.ElementName]
+            print(mbf.mesh_name + " 当前Element: " + element.ElementName + " 转换前 Shape: " + str(raw_data.shape))
+            data = FormatUtils.apply_format_conversion(raw_data, element.Format)
+
+            # 不需要转换的格式拿到的还是指向内存映射文件的视图，在这里复制出来，保证磁盘读取发生在当前线程
+            if data is raw_data:
+                data = numpy.array(raw_data)
+            mbf.element_data_dict[element.ElementName] = data
+
+    @classmethod
+    def initialize_mesh(cls,mesh, mbf:MigotoBinaryFile):
         # 导入IB文件设置为mesh的三角形索引
         mesh.loops.add(mbf.ib_count)
         mesh.polygons.add(mbf.ib_polygon_count)
-        mesh.loops.foreach_set('vertex_index', mbf.ib_data)
-        mesh.polygons.foreach_set('loop_start', [x * 3 for x in range(mbf.ib_polygon_count)])
-        mesh.polygons.foreach_set('loop_total', [3] * mbf.ib_polygon_count)
+        mesh.loops.foreach_set('vertex_index', numpy.ascontiguousarray(mbf.ib_data, dtype=numpy.int32))
+        mesh.polygons.foreach_set('loop_start', numpy.arange(mbf.ib_polygon_count, dtype=numpy.int32) * 3)
+        mesh.polygons.foreach_set('loop_total', numpy.full(mbf.ib_polygon_count, 3, dtype=numpy.int32))
 
         # 根据vb文件的顶点数设置mesh的顶点数
         mesh.vertices.add(mbf.vb_vertex_count)
@@ -313,8 +340,7 @@ class MeshImporter:
     @classmethod
     def import_uv_layers(cls,mesh, obj, texcoords):
         # 预先获取所有循环的顶点索引并转换为numpy数组
-        loops = mesh.loops
-        vertex_indices = numpy.array([l.vertex_index for l in loops], dtype=numpy.int32)
+        vertex_indices = MeshImporter.get_loop_vertex_indices(mesh)
         
         for texcoord, data in sorted(texcoords.items()):
             # 将原始数据转换为numpy数组（只需转换一次）
@@ -403,7 +429,7 @@ class MeshImporter:
             # to use the vertex group index, vertex group name or attach some extra
             # data. Make sure the indices and names match:
             if component is None:
-                num_vertex_groups = max(itertools.chain(*itertools.chain(*blend_indices.values()))) + 1
+                num_vertex_groups = max(int(numpy.max(arr)) for arr in blend_indices.values() if numpy.size(arr) > 0) + 1
             else:
                 num_vertex_groups = max(component.vg_map.values()) + 1
             
@@ -412,18 +438,55 @@ class MeshImporter:
             if num_vertex_groups > 10000:
                 raise Fatal("检测到在当前导入的数据类型" + obj.get('3DMigoto:GameTypeName',"") + "描述下，BLENDINDICES顶点组数量为: " + str(num_vertex_groups) + " 基本不可能是正常情况，请更换其他数据类型重新导入")
             
+            TimerUtils.Start("Import Vertex Groups")
             for i in range(num_vertex_groups):
                 obj.vertex_groups.new(name=str(i))
-            for vertex in mesh.vertices:
-                for semantic_index in sorted(blend_indices.keys()):
-                    for i, w in zip(blend_indices[semantic_index][vertex.index], blend_weights[semantic_index][vertex.index]):
-                        if w == 0.0:
-                            continue
-                        if component is None:
-                            obj.vertex_groups[i].add((vertex.index,), w, 'REPLACE')
-                        else:
-                            # 这里由于C++生成的json文件是无序的，所以我们这里读取的时候要用原始的map而不是转换成列表的索引，避免无序问题
-                            obj.vertex_groups[component.vg_map[str(i)]].add((vertex.index,), w, 'REPLACE')
+            MeshImporter.add_vertex_group_weights_bulk(obj, len(mesh.vertices), blend_indices, blend_weights, num_vertex_groups, component)
+            TimerUtils.End("Import Vertex Groups")
+
+    @classmethod
+    def add_vertex_group_weights_bulk(cls, obj, vertex_count:int, blend_indices, blend_weights, num_vertex_groups:int, component):
+        '''
+        批量写入顶点组权重，结果与逐顶点逐权重调用 add((vertex,), w, 'REPLACE') 一致：
+        按 (顶点, SemanticIndex 升序, 权重槽位) 的顺序展开所有非0权重，
+        再交给 VertexGroupUtils.add_vertex_weights_bulk 按 (顶点组, 权重值) 分桶写入
+        '''
+        if vertex_count == 0:
+            return
+
+        semantic_index_list = sorted(blend_indices.keys())
+        indices_matrix = numpy.concatenate(
+            [numpy.asarray(blend_indices[semantic_index]).reshape(len(blend_indices[semantic_index]), -1)[:vertex_count] for semantic_index in semantic_index_list], axis=1)
+        weights_matrix = numpy.concatenate(
+            [numpy.asarray(blend_weights[semantic_index]).reshape(len(blend_weights[semantic_index]), -1)[:vertex_count] for semantic_index in semantic_index_list], axis=1)
+
+        slot_count = indices_matrix.shape[1]
+        vertex_ids = numpy.repeat(numpy.arange(vertex_count, dtype=numpy.int64), slot_count)
+        bone_ids = indices_matrix.reshape(-1).astype(numpy.int64)
+        weights = weights_matrix.reshape(-1)
+
+        non_zero = weights != 0.0
+        vertex_ids = vertex_ids[non_zero]
+        bone_ids = bone_ids[non_zero]
+        weights = weights[non_zero]
+        if len(weights) == 0:
+            return
+
+        # 骨骼索引转换为实际的顶点组索引
+        if component is None:
+            # 与 obj.vertex_groups[i] 的 Python 负索引行为保持一致，例如 65535 被替换成的 -1
+            group_ids = numpy.where(bone_ids < 0, bone_ids + num_vertex_groups, bone_ids)
+        else:
+            # 这里由于C++生成的json文件是无序的，所以我们这里读取的时候要用原始的map而不是转换成列表的索引，避免无序问题
+            unique_bone_ids, bone_inverse = numpy.unique(bone_ids, return_inverse=True)
+            mapped_ids = numpy.array([component.vg_map[str(i)] for i in unique_bone_ids.tolist()], dtype=numpy.int64)
+            group_ids = mapped_ids[bone_inverse.reshape(-1)]
+
+        if group_ids.min() < 0 or group_ids.max() >= num_vertex_groups:
+            raise Fatal("BLENDINDICES中存在超出顶点组数量的索引，请更换其他数据类型重新导入")
+
+        add_call_count = VertexGroupUtils.add_vertex_weights_bulk(obj, group_ids, vertex_ids, weights, vertex_count)
+        print("导入顶点组权重: " + str(len(weights)) + " 条, add() 调用次数: " + str(add_call_count))
 
     @classmethod
     def import_shapekeys(cls,mesh, obj, shapekeys):
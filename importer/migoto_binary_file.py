@@ -2,6 +2,7 @@ from .fmt_file import FMTFile
 
 from ..utils.format_utils import FormatUtils
 from ..utils.format_utils import Fatal
+from ..utils.file_utils import FileUtils
 from ..utils.log_utils import LOG
 
 import os
@@ -185,14 +186,19 @@ class MigotoBinaryFile:
 
         self.ib_count = int(self.ib_file_size / ib_stride)
         self.ib_polygon_count = int(self.ib_count / 3)
-        self.ib_data = numpy.fromfile(self.ib_bin_path, dtype=FormatUtils.get_nptype_from_format(self.fmt_file.format), count=self.ib_count)
+        # ib 和 vb 都用只读内存映射打开，导入时按 Element 取出的都是直接指向文件的视图，不会先把整个文件读入内存
+        self.ib_data = FileUtils.map_binary_file(self.ib_bin_path, dtype=FormatUtils.get_nptype_from_format(self.fmt_file.format), count=self.ib_count)
         
         # 读取fmt文件，解析出后面要用的dtype
         fmt_dtype = self.fmt_file.get_dtype()
         vb_stride = fmt_dtype.itemsize
 
         self.vb_vertex_count = int(self.vb_file_size / vb_stride)
-        self.vb_data = numpy.fromfile(self.vb_bin_path, dtype=fmt_dtype, count=self.vb_vertex_count)
+        self.vb_data = FileUtils.map_binary_file(self.vb_bin_path, dtype=fmt_dtype, count=self.vb_vertex_count)
+
+        # 按 ElementName 解码好的顶点数据，由 MeshImporter.prepare_mbf_data 填充
+        self.element_data_dict:dict[str,numpy.ndarray] = {}
+        self.data_prepared = False
 
     
     def file_sanity_check(self):
@@ -0,0 +1,152 @@
+"""
+FingerprintCalculator 新旧实现的耗时对比（不是测试用例，pytest 不会收集）
+
+在合成的网格数组上分别运行：
+- 旧实现：逐面 / 逐顶点组遍历，JSON 序列化后 md5
+- 新实现冷启动：foreach_get 读原始缓冲区后 blake2b
+- 新实现热缓存：同一 Mesh 未修改时直接命中组件哈希缓存
+
+用法：python tests/bench_fingerprint.py --vertices 100000 --groups 32 --repeat 3
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import types
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 复用测试环境：没有 Blender 时注册 bpy 占位模块和合成包 theherta3
+import conftest  # noqa: F401
+# blueprint 包和 common 之间有循环导入，按插件加载顺序先导入 blueprint
+import theherta3.blueprint  # noqa: F401
+from theherta3.utils.preprocess_cache import FingerprintCalculator
+
+from mesh_stubs import StubCollection, make_vertex_group_vertices
+
+
+def legacy_vertex_hash(obj):
+    mesh = obj.data
+    vertices = numpy.empty(len(mesh.vertices) * 3, dtype=numpy.float32)
+    mesh.vertices.foreach_get('co', vertices)
+    return len(mesh.vertices), hashlib.md5(vertices.tobytes()).hexdigest()
+
+
+def legacy_face_hash(obj):
+    '''原实现：逐面取顶点列表和平滑标记，JSON 序列化后 md5'''
+    face_data = []
+    for poly in obj.data.polygons:
+        face_data.append(list(poly.vertices))
+        face_data.append(poly.use_smooth)
+    return hashlib.md5(json.dumps(face_data, sort_keys=True).encode()).hexdigest()
+
+
+def legacy_vertex_group_hash(obj):
+    '''原实现：每个顶点组都遍历一遍所有顶点，权重列表 JSON 序列化后 md5'''
+    mesh = obj.data
+    vg_data = []
+    for vg in obj.vertex_groups:
+        weights = []
+        for i, vert in enumerate(mesh.vertices):
+            for group in vert.groups:
+                if group.group == vg.index:
+                    weights.append((i, group.weight))
+                    break
+        vg_data.append({
+            'name': vg.name,
+            'lock_weight': vg.lock_weight,
+            'weights_hash': hashlib.md5(json.dumps(weights, sort_keys=True).encode()).hexdigest(),
+        })
+    return hashlib.md5(json.dumps(vg_data, sort_keys=True).encode()).hexdigest()
+
+
+class _VertexList(list):
+    '''逐顶点访问 .groups，同时支持按属性 foreach_get 坐标'''
+
+    def __init__(self, vertices, **arrays):
+        super().__init__(vertices)
+        self._collection = StubCollection(**arrays)
+
+    def foreach_get(self, attribute, out):
+        self._collection.foreach_get(attribute, out)
+
+
+def make_synthetic_object(vertex_count, group_count, influences, seed=0):
+    '''合成一个三角面网格物体：随机坐标、随机三角形、每个顶点 influences 个互不相同的顶点组'''
+    rng = numpy.random.default_rng(seed)
+    triangle_count = vertex_count * 2
+    triangles = rng.integers(0, vertex_count, size=(triangle_count, 3))
+
+    influences = min(influences, group_count)
+    group_ids = numpy.argsort(rng.random((vertex_count, group_count)), axis=1)[:, :influences]
+    weights = rng.random((vertex_count, influences)).astype(numpy.float32)
+    vertices = make_vertex_group_vertices([
+        list(zip(groups.tolist(), row_weights.tolist())) for groups, row_weights in zip(group_ids, weights)
+    ])
+
+    mesh = types.SimpleNamespace(
+        session_uid=seed + 1,
+        vertices=_VertexList(vertices, co=rng.random((vertex_count, 3)).astype(numpy.float32)),
+        edges=StubCollection(),
+        loops=StubCollection(vertex_index=triangles.reshape(-1)),
+        polygons=StubCollection(
+            vertices=triangles,
+            loop_start=numpy.arange(triangle_count) * 3,
+            use_smooth=rng.random(triangle_count) < 0.5,
+        ),
+        uv_layers=[],
+        color_attributes=[],
+        shape_keys=None,
+    )
+    vertex_groups = [
+        types.SimpleNamespace(index=index, name=f"Group_{index}", lock_weight=False) for index in range(group_count)
+    ]
+    return types.SimpleNamespace(type='MESH', data=mesh, vertex_groups=vertex_groups)
+
+
+def best_time(func, repeat, before=None):
+    best = float('inf')
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vertices', type=int, default=20000)
+    parser.add_argument('--groups', type=int, default=32)
+    parser.add_argument('--influences', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    obj = make_synthetic_object(args.vertices, args.groups, args.influences, args.seed)
+    print(f"顶点数: {args.vertices}  面数: {len(obj.data.polygons)}  顶点组数: {args.groups}  每顶点权重数: {args.influences}  重复次数: {args.repeat}")
+
+    components = [
+        ('vertex', legacy_vertex_hash, FingerprintCalculator.calculate_vertex_hash),
+        ('face', legacy_face_hash, FingerprintCalculator.calculate_face_hash),
+        ('vertex_group', legacy_vertex_group_hash, FingerprintCalculator.calculate_vertex_group_hash),
+    ]
+
+    print(f"{'组件':<14}{'旧实现(ms)':>14}{'新实现冷(ms)':>16}{'新实现热(ms)':>16}{'加速比(冷)':>14}")
+    for name, legacy_func, new_func in components:
+        legacy_time = best_time(lambda: legacy_func(obj), args.repeat)
+        cold_time = best_time(lambda: new_func(obj), args.repeat, before=FingerprintCalculator.clear_component_cache)
+        new_func(obj)
+        warm_time = best_time(lambda: new_func(obj), args.repeat)
+        print(f"{name:<14}{legacy_time * 1000:>14.2f}{cold_time * 1000:>16.2f}{warm_time * 1000:>16.3f}{legacy_time / cold_time:>14.1f}x")
+
+    FingerprintCalculator.clear_component_cache()
+
+
+if __name__ == '__main__':
+    main()
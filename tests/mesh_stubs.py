@@ -0,0 +1,64 @@
+"""
+不依赖 Blender 的网格数据桩，只实现测试用到的 foreach_get / 逐元素属性访问
+"""
+import types
+
+import numpy
+
+
+class StubCollection:
+    """模拟 bpy_prop_collection：按属性名保存 numpy 数组，支持 foreach_get、len、下标和遍历"""
+
+    def __init__(self, **arrays):
+        self.arrays = {name: numpy.asarray(array) for name, array in arrays.items()}
+        self.count = len(next(iter(self.arrays.values()))) if self.arrays else 0
+
+    def __len__(self):
+        return self.count
+
+    def foreach_get(self, attribute, out):
+        out[...] = self.arrays[attribute].reshape(out.shape)
+
+    def __getitem__(self, index):
+        return StubElement(self, index)
+
+    def __iter__(self):
+        return (StubElement(self, index) for index in range(self.count))
+
+
+class StubElement:
+    def __init__(self, collection, index):
+        self._collection = collection
+        self.index = index
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        value = self._collection.arrays[name][self.index]
+        return value.tolist() if getattr(value, 'ndim', 0) > 0 else value.item()
+
+
+def make_vertex_group_vertices(vertex_groups_list):
+    """vertex_groups_list[i] 是第 i 个顶点的 [(group, weight), ...]，保持给定顺序"""
+    return [
+        types.SimpleNamespace(
+            index=vertex_index,
+            groups=[types.SimpleNamespace(group=group, weight=weight) for group, weight in groups])
+        for vertex_index, groups in enumerate(vertex_groups_list)
+    ]
+
+
+def make_triangle_mesh(triangle_vertex_indices, vertex_count=None, **loop_arrays):
+    """由三角形的顶点索引构建 loops/polygons，loop_arrays 为额外的逐 loop 属性"""
+    triangle_vertex_indices = numpy.asarray(triangle_vertex_indices, dtype=numpy.int64).reshape(-1, 3)
+    triangle_count = len(triangle_vertex_indices)
+    if vertex_count is None:
+        vertex_count = int(triangle_vertex_indices.max()) + 1 if triangle_count else 0
+    return types.SimpleNamespace(
+        loops=StubCollection(vertex_index=triangle_vertex_indices.reshape(-1), **loop_arrays),
+        polygons=StubCollection(
+            loop_start=numpy.arange(triangle_count) * 3,
+            loop_total=numpy.full(triangle_count, 3),
+        ),
+        vertices=StubCollection(index=numpy.arange(vertex_count)),
+    )
@@ -0,0 +1,179 @@
+"""
+average_normal_tangent / average_normal_color 在带重复接缝顶点的合成网格上与原来的逐顶点实现逐字节对比，
+固定同位置分组（包括 -0.0 与 0.0）、零向量分组和 TANGENT.w 符号的处理方式
+"""
+import types
+
+import numpy
+import pytest
+
+# blueprint 包和 common 之间有循环导入，按插件加载顺序先导入 blueprint
+import theherta3.blueprint  # noqa: F401
+from theherta3.helper import obj_buffer_helper
+from theherta3.helper.obj_buffer_helper import ObjBufferHelper
+
+
+GAME_TYPE = types.SimpleNamespace(OrderedFullElementList=["POSITION", "NORMAL", "TANGENT", "COLOR"])
+
+
+def legacy_average_normal_color(vb):
+    '''原实现：按位置元组 unique 后逐顶点累加法线，再逐顶点写回 COLOR'''
+    unique_positions, position_indices = numpy.unique(
+        [tuple(val['POSITION']) for val in vb],
+        return_inverse=True,
+        axis=0
+    )
+    accumulated_normals = numpy.zeros((len(unique_positions), 3), dtype=float)
+    counts = numpy.zeros(len(unique_positions), dtype=int)
+    for i, val in enumerate(vb):
+        accumulated_normals[position_indices[i]] += numpy.array(val['NORMAL'], dtype=float)
+        counts[position_indices[i]] += 1
+
+    mask = counts > 0
+    average_normals = numpy.zeros_like(accumulated_normals)
+    average_normals[mask] = (accumulated_normals[mask] / counts[mask][:, None])
+    normalized_normals = ((average_normals + 1) / 2 * 255).astype(numpy.uint8)
+
+    new_color = []
+    for i, val in enumerate(vb):
+        color = [0, 0, 0, val['COLOR'][3]]
+        if mask[position_indices[i]]:
+            color[:3] = normalized_normals[position_indices[i]]
+        new_color.append(color)
+    new_color_array = numpy.array(new_color, dtype=numpy.uint8)
+    for i, val in enumerate(vb):
+        val['COLOR'] = new_color_array[i]
+    return vb
+
+
+def legacy_average_normal_tangent(vb):
+    '''原实现：lexsort + reduceat 分组后，按位置元组查字典取回标准化法线'''
+    positions = numpy.array([val['POSITION'] for val in vb])
+    normals = numpy.array([val['NORMAL'] for val in vb], dtype=float)
+    sort_indices = numpy.lexsort(positions.T)
+    sorted_positions = positions[sort_indices]
+    sorted_normals = normals[sort_indices]
+    group_indices = numpy.flatnonzero(numpy.any(sorted_positions[:-1] != sorted_positions[1:], axis=1))
+    group_indices = numpy.r_[0, group_indices + 1, len(sorted_positions)]
+
+    unique_positions = sorted_positions[group_indices[:-1]]
+    accumulated_normals = numpy.add.reduceat(sorted_normals, group_indices[:-1], axis=0)
+    with numpy.errstate(invalid='ignore'):
+        normalized_normals = accumulated_normals / numpy.linalg.norm(accumulated_normals, axis=1)[:, numpy.newaxis]
+    normalized_normals[numpy.isnan(normalized_normals)] = 0
+
+    position_normal_dict = dict(zip(map(tuple, unique_positions), normalized_normals))
+    normalized_normals = numpy.array([position_normal_dict[tuple(pos)] for pos in vb['POSITION']])
+
+    w = numpy.where(vb['TANGENT'][:, 3] >= 0, -1.0, 1.0)
+    vb['TANGENT'][:, :3] = normalized_normals
+    vb['TANGENT'][:, 3] = w
+    return vb
+
+
+def make_seam_vertices(rng, position_type, normal_type, color_type):
+    '''
+    从少量位置中重复取点模拟 UV / 法线接缝：同一位置出现多次、法线各不相同，
+    一部分 0.0 坐标换成 -0.0，一部分分组放入方向相反的法线让累加结果为零向量
+    '''
+    dtype = numpy.dtype([
+        ('POSITION', position_type, 3),
+        ('NORMAL', normal_type, 3),
+        ('TANGENT', numpy.float32, 4),
+        ('COLOR', color_type, 4),
+    ])
+    position_pool = rng.integers(-2, 3, size=(int(rng.integers(1, 12)), 3)).astype(numpy.float32) / 2
+    vertex_count = int(rng.integers(1, 80))
+    positions = position_pool[rng.integers(0, len(position_pool), size=vertex_count)]
+    negative_zero = (positions == 0) & (rng.random(positions.shape) < 0.5)
+    positions[negative_zero] = -0.0
+
+    normals = rng.uniform(-1, 1, size=(vertex_count, 3)).astype(numpy.float32)
+    # 每个位置第一次和第二次出现时放入相反的法线，这个位置只有这两个顶点时累加为零向量
+    for position in position_pool[rng.random(len(position_pool)) < 0.3]:
+        same = numpy.flatnonzero(numpy.all(positions == position, axis=1))
+        if len(same) >= 2:
+            normals[same[1]] = -normals[same[0]]
+
+    vb = numpy.zeros(vertex_count, dtype=dtype)
+    vb['POSITION'] = positions
+    vb['NORMAL'] = normals
+    vb['TANGENT'] = rng.uniform(-1, 1, size=(vertex_count, 4))
+    vb['TANGENT'][rng.random(vertex_count) < 0.2, 3] = 0.0
+    vb['TANGENT'][rng.random(vertex_count) < 0.2, 3] = -0.0
+    if numpy.dtype(color_type).kind == 'u':
+        vb['COLOR'] = rng.integers(0, 256, size=(vertex_count, 4))
+    else:
+        vb['COLOR'] = rng.random((vertex_count, 4))
+    return vb
+
+
+@pytest.fixture
+def recalculate_enabled(monkeypatch):
+    monkeypatch.setattr(obj_buffer_helper.Properties_GenerateMod, "recalculate_color", classmethod(lambda cls: True))
+    monkeypatch.setattr(obj_buffer_helper.Properties_GenerateMod, "recalculate_tangent", classmethod(lambda cls: True))
+
+
+@pytest.mark.parametrize("seed", range(100))
+@pytest.mark.parametrize("position_type", [numpy.float32, numpy.float16])
+@pytest.mark.parametrize("color_type", [numpy.uint8, numpy.float16, numpy.float32])
+def test_average_normal_color_matches_legacy(recalculate_enabled, seed, position_type, color_type):
+    vb = make_seam_vertices(numpy.random.default_rng(seed), position_type, numpy.float32, color_type)
+    expected = legacy_average_normal_color(vb.copy())
+    actual = ObjBufferHelper.average_normal_color({}, vb.copy(), GAME_TYPE, vb.dtype)
+    assert actual.tobytes() == expected.tobytes()
+
+
+@pytest.mark.parametrize("seed", range(100))
+@pytest.mark.parametrize("position_type", [numpy.float32, numpy.float16])
+@pytest.mark.parametrize("normal_type", [numpy.float32, numpy.float16])
+def test_average_normal_tangent_matches_legacy(recalculate_enabled, seed, position_type, normal_type):
+    vb = make_seam_vertices(numpy.random.default_rng(seed), position_type, normal_type, numpy.uint8)
+    expected = legacy_average_normal_tangent(vb.copy())
+    with numpy.errstate(invalid='ignore'):
+        actual = ObjBufferHelper.average_normal_tangent({}, vb.copy(), GAME_TYPE, vb.dtype)
+    assert actual.tobytes() == expected.tobytes()
+
+
+def make_fixed_seam():
+    dtype = numpy.dtype([('POSITION', numpy.float32, 3), ('NORMAL', numpy.float32, 3),
+                         ('TANGENT', numpy.float32, 4), ('COLOR', numpy.uint8, 4)])
+    vb = numpy.zeros(5, dtype=dtype)
+    vb['POSITION'] = [[0.0, 1.0, 0.0], [-0.0, 1.0, 0.0], [0.0, 1.0, -0.0], [2.0, 0.0, 0.0], [2.0, 0.0, 0.0]]
+    vb['NORMAL'] = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [0.0, 1.0, 0.0], [0.0, -1.0, 0.0]]
+    vb['TANGENT'][:, 3] = [1.0, 0.0, -0.0, -1.0, 0.5]
+    vb['COLOR'][:, 3] = [10, 20, 30, 40, 50]
+    return vb
+
+
+def test_signed_zero_seam_is_one_group(recalculate_enabled):
+    vb = make_fixed_seam()
+
+    with numpy.errstate(invalid='ignore'):
+        tangent = ObjBufferHelper.average_normal_tangent({}, vb.copy(), GAME_TYPE, vb.dtype)
+    # -0.0 与 0.0 是同一个位置，三个法线相加后归一化
+    expected_normal = numpy.float32(1 / numpy.sqrt(3))
+    numpy.testing.assert_array_equal(tangent['TANGENT'][:3, :3], numpy.full((3, 3), expected_normal))
+    # 相反法线累加为零向量时写入 0，而不是 NaN
+    numpy.testing.assert_array_equal(tangent['TANGENT'][3:, :3], numpy.zeros((2, 3)))
+    # w >= 0（包括 -0.0）时取 -1
+    assert tangent['TANGENT'][:, 3].tolist() == [-1.0, -1.0, -1.0, 1.0, -1.0]
+
+    color = ObjBufferHelper.average_normal_color({}, vb.copy(), GAME_TYPE, vb.dtype)
+    # 算术平均 (1/3, 1/3, 1/3) 映射到 [0, 255] 后截断；零向量分组映射到 127
+    assert color['COLOR'][:3, :3].tolist() == [[170, 170, 170]] * 3
+    assert color['COLOR'][3:, :3].tolist() == [[127, 127, 127]] * 2
+    assert color['COLOR'][:, 3].tolist() == [10, 20, 30, 40, 50]
+
+
+def test_disabled_returns_input_unchanged(monkeypatch):
+    monkeypatch.setattr(obj_buffer_helper.Properties_GenerateMod, "recalculate_color", classmethod(lambda cls: False))
+    monkeypatch.setattr(obj_buffer_helper.Properties_GenerateMod, "recalculate_tangent", classmethod(lambda cls: False))
+    vb = make_fixed_seam()
+    assert ObjBufferHelper.average_normal_color({}, vb, GAME_TYPE, vb.dtype) is vb
+    assert ObjBufferHelper.average_normal_tangent({}, vb, GAME_TYPE, vb.dtype) is vb
+
+    # 物体上单独标记时仍然重计算
+    color = ObjBufferHelper.average_normal_color({"3DMigoto:RecalculateCOLOR": True}, vb, GAME_TYPE, vb.dtype)
+    assert color is not vb
+    assert color['COLOR'][0, :3].tolist() == [170, 170, 170]
@@ -0,0 +1,179 @@
+"""
+FileUtils.map_binary_file 与 MigotoBinaryFile 在合成的混合格式 / 步长 Buffer 上与 numpy.frombuffer 逐字节对比
+"""
+import numpy
+import pytest
+
+# blueprint 包和 common 之间有循环导入，按插件加载顺序先导入 blueprint
+import theherta3.blueprint  # noqa: F401
+from theherta3.importer.migoto_binary_file import MigotoBinaryFile
+from theherta3.utils.file_utils import FileUtils
+
+
+# (SemanticName, Format, 显式 ByteWidth, 期望的 numpy 类型, 分量数)，ByteWidth 为 None 时由 Format 推算
+ELEMENT_POOL = [
+    ("POSITION", "R32G32B32_FLOAT", None, numpy.float32, 3),
+    ("NORMAL", "R8G8B8A8_SNORM", None, numpy.int8, 4),
+    ("TANGENT", "R32G32B32A32_FLOAT", None, numpy.float32, 4),
+    ("COLOR", "R8G8B8A8_UNORM", None, numpy.uint8, 4),
+    ("TEXCOORD", "R16G16_FLOAT", None, numpy.float16, 2),
+    ("TEXCOORD", "R32G32_FLOAT", None, numpy.float32, 2),
+    ("BLENDWEIGHT", "R16G16B16A16_UNORM", None, numpy.uint16, 4),
+    ("BLENDINDICES", "R32_UINT", None, numpy.uint32, 1),
+    ("BLENDINDICES", "R16G16B16A16_SINT", None, numpy.int16, 4),
+    # WWMI 的 BLENDINDICES 是 R8_UINT 但 ByteWidth 为 8
+    ("BLENDINDICES", "R8_UINT", 8, numpy.uint8, 8),
+]
+
+
+def random_elements(rng):
+    '''随机挑选若干个 Element，同名语义按出现顺序分配 SemanticIndex'''
+    picks = rng.choice(len(ELEMENT_POOL), size=int(rng.integers(1, 6)), replace=False)
+    semantic_index_dict = {}
+    elements = []
+    for pick in picks:
+        semantic_name, fmt, byte_width, np_type, size = ELEMENT_POOL[pick]
+        semantic_index = semantic_index_dict.get(semantic_name, 0)
+        semantic_index_dict[semantic_name] = semantic_index + 1
+        elements.append((semantic_name, semantic_index, fmt, byte_width, np_type, size))
+    return elements
+
+
+def element_name(semantic_name, semantic_index):
+    return semantic_name if semantic_index == 0 else semantic_name + str(semantic_index)
+
+
+def write_fmt(fmt_path, elements, ib_format, prefix=""):
+    lines = ["stride: 0", "topology: trianglelist", f"format: {ib_format}", "gametypename: test"]
+    if prefix:
+        lines.append(f"prefix: {prefix}")
+    for element_number, (semantic_name, semantic_index, fmt, byte_width, *_) in enumerate(elements):
+        lines.append(f"element[{element_number}]:")
+        lines.append(f"  SemanticName: {semantic_name}")
+        lines.append(f"  SemanticIndex: {semantic_index}")
+        lines.append(f"  Format: {fmt}")
+        if byte_width is not None:
+            lines.append(f"  ByteWidth: {byte_width}")
+        lines.append("  InputSlot: 0")
+        lines.append("  AlignedByteOffset: 0")
+        lines.append("  InputSlotClass: per-vertex")
+        lines.append("  InstanceDataStepRate: 0")
+    fmt_path.write_text("\n".join(lines) + "\n")
+
+
+def random_bytes(rng, size):
+    return rng.integers(0, 256, size=size, dtype=numpy.uint8).tobytes()
+
+
+def assert_same_records(actual, expected):
+    assert actual.dtype == expected.dtype
+    assert actual.shape == expected.shape
+    assert actual.tobytes() == expected.tobytes()
+    for name in expected.dtype.names or ():
+        # 结构化数组的字段是跨步视图，按字节比较避免随机字节里出现 NaN
+        assert numpy.ascontiguousarray(actual[name]).tobytes() == numpy.ascontiguousarray(expected[name]).tobytes()
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_map_binary_file_matches_frombuffer(tmp_path, seed):
+    rng = numpy.random.default_rng(seed)
+    dtype = numpy.dtype([
+        (f"f{index}", fmt, count) if count > 1 else (f"f{index}", fmt)
+        for index, (fmt, count) in enumerate(
+            (rng.choice(["<f4", "<f2", "<u4", "<u2", "u1", "i1", "<i2"]), int(rng.integers(1, 5)))
+            for _ in range(int(rng.integers(1, 5))))
+    ])
+    record_count = int(rng.integers(0, 50))
+    # 末尾附带不足一条记录的字节
+    data = random_bytes(rng, record_count * dtype.itemsize + int(rng.integers(0, dtype.itemsize)))
+    file_path = tmp_path / "buffer.buf"
+    file_path.write_bytes(data)
+
+    offset = int(rng.integers(0, len(data) + 1))
+    count = int(rng.integers(-1, record_count + 3))
+
+    available_count = (len(data) - offset) // dtype.itemsize
+    expected_count = available_count if count < 0 else min(count, available_count)
+    expected = numpy.frombuffer(data, dtype=dtype, count=expected_count, offset=offset)
+
+    actual = FileUtils.map_binary_file(str(file_path), dtype=dtype, count=count, offset=offset)
+    assert_same_records(actual, expected)
+
+
+def test_map_binary_file_empty_and_out_of_range(tmp_path):
+    empty_path = tmp_path / "empty.ib"
+    empty_path.write_bytes(b"")
+    result = FileUtils.map_binary_file(str(empty_path), dtype=numpy.uint32)
+    assert result.shape == (0,) and result.dtype == numpy.uint32
+
+    file_path = tmp_path / "short.ib"
+    file_path.write_bytes(numpy.arange(3, dtype=numpy.uint16).tobytes() + b"\x01")
+    assert FileUtils.map_binary_file(str(file_path), dtype=numpy.uint16, offset=100).shape == (0,)
+    assert FileUtils.map_binary_file(str(file_path), dtype=numpy.uint16, count=0).shape == (0,)
+    assert FileUtils.map_binary_file(str(file_path), dtype=numpy.uint16, count=10).tolist() == [0, 1, 2]
+    assert FileUtils.map_binary_file(str(file_path), dtype=numpy.uint16, offset=2).tolist() == [1, 2]
+
+
+def test_map_binary_file_is_read_only(tmp_path):
+    file_path = tmp_path / "data.vb"
+    data = numpy.arange(8, dtype=numpy.float32).tobytes()
+    file_path.write_bytes(data)
+
+    result = FileUtils.map_binary_file(str(file_path), dtype=numpy.float32)
+    assert not result.flags.writeable
+    with pytest.raises(ValueError):
+        result[0] = 42.0
+
+    copied = result.copy()
+    copied[0] = 42.0
+    assert file_path.read_bytes() == data
+
+
+@pytest.fixture
+def no_config_alias(monkeypatch):
+    # 别名依赖工作空间里的 Config.json，这里不需要
+    monkeypatch.setattr(MigotoBinaryFile, "_apply_config_alias", lambda self: None)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_migoto_binary_file_matches_frombuffer(tmp_path, no_config_alias, seed):
+    rng = numpy.random.default_rng(seed)
+    elements = random_elements(rng)
+    ib_format, ib_dtype = [("DXGI_FORMAT_R16_UINT", numpy.uint16), ("DXGI_FORMAT_R32_UINT", numpy.uint32)][seed % 2]
+    prefix = f"Component{seed}"
+    write_fmt(tmp_path / f"{prefix}.fmt", elements, ib_format)
+
+    vb_dtype = numpy.dtype([
+        (element_name(semantic_name, semantic_index), np_type, size) if size > 1 else (element_name(semantic_name, semantic_index), np_type)
+        for semantic_name, semantic_index, fmt, byte_width, np_type, size in elements
+    ])
+
+    vertex_count = int(rng.integers(1, 60))
+    vb_data = random_bytes(rng, vertex_count * vb_dtype.itemsize + int(rng.integers(0, vb_dtype.itemsize)))
+    index_count = int(rng.integers(1, 40)) * 3
+    ib_data = rng.integers(0, vertex_count, size=index_count).astype(ib_dtype).tobytes()
+    (tmp_path / f"{prefix}.vb").write_bytes(vb_data)
+    (tmp_path / f"{prefix}.ib").write_bytes(ib_data)
+
+    mbf = MigotoBinaryFile(str(tmp_path / f"{prefix}.fmt"))
+    assert mbf.mesh_name == prefix
+    assert mbf.vb_vertex_count == vertex_count
+    assert mbf.ib_count == index_count
+    assert mbf.ib_polygon_count == index_count // 3
+    assert mbf.file_size_check()
+    assert_same_records(mbf.vb_data, numpy.frombuffer(vb_data, dtype=vb_dtype, count=vertex_count))
+    assert_same_records(mbf.ib_data, numpy.frombuffer(ib_data, dtype=ib_dtype))
+    assert not mbf.vb_data.flags.writeable
+
+
+def test_migoto_binary_file_empty_ib(tmp_path, no_config_alias):
+    elements = [("POSITION", 0, "R32G32B32_FLOAT", None, numpy.float32, 3), ("COLOR", 0, "R8G8B8A8_UNORM", None, numpy.uint8, 4)]
+    write_fmt(tmp_path / "Body.fmt", elements, "DXGI_FORMAT_R32_UINT", prefix="Body")
+    (tmp_path / "Body.vb").write_bytes(bytes(16 * 5))
+    (tmp_path / "Body.ib").write_bytes(b"")
+
+    mbf = MigotoBinaryFile(str(tmp_path / "Body.fmt"), mesh_name="Body.Renamed")
+    assert mbf.mesh_name == "Body.Renamed"
+    assert mbf.vb_vertex_count == 5
+    assert mbf.ib_count == 0 and mbf.ib_data.shape == (0,)
+    assert not mbf.file_size_check()
@@ -0,0 +1,190 @@
+"""
+BlendRemap 正反向表和 BLENDINDICES 重写，与原来逐顶点 / 逐 loop 的 Python 实现逐项对比
+"""
+import types
+
+import numpy
+import pytest
+
+# blueprint 包和 common 之间有循环导入，按插件加载顺序先导入 blueprint
+import theherta3.blueprint  # noqa: F401
+from theherta3.common import draw_ib_model_wwmi
+from theherta3.common.draw_ib_model_wwmi import DrawIBModelWWMI
+from theherta3.utils.vertexgroup_utils import VertexGroupUtils
+
+from mesh_stubs import StubCollection, make_vertex_group_vertices
+
+
+def legacy_used_vg_ids(vertex_groups_list, num_vgs):
+    '''原实现：每个顶点按权重降序稳定排序取前 num_vgs 个，权重大于0的加入集合'''
+    used_vg_set = set()
+    for groups in vertex_groups_list:
+        groups = sorted(groups, key=lambda x: x[1], reverse=True)
+        for group, weight in groups[:num_vgs]:
+            if weight > 0:
+                used_vg_set.add(int(group))
+    return used_vg_set
+
+
+def legacy_remap_tables(components, num_vgs):
+    blend_remap = False
+    forward_list, reverse_list, reverse_maps = [], [], {}
+    for name, vertex_groups_list in components:
+        used_vg_set = legacy_used_vg_ids(vertex_groups_list, num_vgs)
+        if len(used_vg_set) == 0 or max(used_vg_set) < 256:
+            reverse_maps[name] = {}
+            continue
+        blend_remap = True
+        obj_vg_ids = numpy.array(sorted(used_vg_set), dtype=numpy.uint16)
+        forward = numpy.zeros(512, dtype=numpy.uint16)
+        forward[:len(obj_vg_ids)] = obj_vg_ids
+        reverse = numpy.zeros(512, dtype=numpy.uint16)
+        reverse[obj_vg_ids] = numpy.arange(len(obj_vg_ids), dtype=numpy.uint16)
+        forward_list.append(forward)
+        reverse_list.append(reverse)
+        reverse_maps[name] = {int(v): i for i, v in enumerate(obj_vg_ids.tolist())}
+    return blend_remap, forward_list, reverse_list, reverse_maps
+
+
+def legacy_rewrite(arr, loop_to_poly, polygon_to_objname, reverse_maps):
+    '''原实现：逐 loop 查 polygon 所属 component，再按 reverse 字典逐项替换，找不到的保持原值'''
+    arr = arr.copy()
+    for li in range(len(loop_to_poly)):
+        comp_obj_name = polygon_to_objname[loop_to_poly[li]]
+        if not comp_obj_name:
+            continue
+        reverse_map = reverse_maps.get(comp_obj_name, {})
+        if arr.ndim == 1:
+            arr[li] = reverse_map.get(int(arr[li]), int(arr[li]))
+        else:
+            for j in range(arr.shape[1]):
+                arr[li, j] = reverse_map.get(int(arr[li, j]), int(arr[li, j]))
+    return arr
+
+
+def random_vertex_groups(rng, vertex_count, max_group_id):
+    vertex_groups_list = []
+    for _ in range(vertex_count):
+        group_count = int(rng.integers(0, 11))
+        group_ids = rng.choice(max_group_id, size=group_count, replace=False)
+        # 大量相同权重，覆盖并列时的顺序
+        weights = rng.choice(numpy.array([0.0, 0.25, 0.5, 0.5, 0.75], dtype=numpy.float32), size=group_count)
+        vertex_groups_list.append([(int(g), float(w)) for g, w in zip(group_ids, weights)])
+    return vertex_groups_list
+
+
+@pytest.fixture
+def written_buffers(monkeypatch):
+    written = {}
+    monkeypatch.setattr(draw_ib_model_wwmi.GlobalConfig, "path_generatemod_buffer_folder", classmethod(lambda cls: "buffers"))
+    monkeypatch.setattr(draw_ib_model_wwmi.BufferExportHelper, "write_buffer_file",
+                        staticmethod(lambda path, data: written.__setitem__(path.rsplit("-", 1)[-1], numpy.asarray(data).copy())))
+    return written
+
+
+def make_draw_ib_model(num_vgs):
+    model = object.__new__(DrawIBModelWWMI)
+    model.d3d11GameType = types.SimpleNamespace(get_blendindices_count_wwmi=lambda: num_vgs)
+    model.unique_str = "unique"
+    model.draw_ib = "drawib"
+    model.blend_remap = False
+    return model
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_remap_matches_legacy_implementation(seed, written_buffers):
+    rng = numpy.random.default_rng(seed)
+    num_vgs = int(rng.choice([4, 8]))
+    components = [
+        (f"comp_{i}", random_vertex_groups(rng, int(rng.integers(0, 30)), int(rng.choice([100, 300, 500]))))
+        for i in range(int(rng.integers(1, 4)))
+    ]
+    component_objs = [
+        types.SimpleNamespace(name=name, data=types.SimpleNamespace(vertices=make_vertex_group_vertices(groups)))
+        for name, groups in components
+    ]
+
+    model = make_draw_ib_model(num_vgs)
+    model.export_blendremap_forward_and_reverse(component_objs)
+
+    legacy_blend_remap, legacy_forward, legacy_reverse, legacy_reverse_maps = legacy_remap_tables(components, num_vgs)
+    assert model.blend_remap == legacy_blend_remap
+    if legacy_forward:
+        assert numpy.array_equal(written_buffers["BlendRemapForward.buf"], numpy.concatenate(legacy_forward))
+        assert numpy.array_equal(written_buffers["BlendRemapReverse.buf"], numpy.concatenate(legacy_reverse))
+    else:
+        assert written_buffers == {}
+
+    # 组件按顺序排布在合并物体的三角形上，最后留一段不属于任何组件的三角形
+    triangle_count = int(rng.integers(1, 40))
+    layout, polygon_to_objname, index_offset = [], [None] * triangle_count, 0
+    for name, _ in components:
+        index_count = int(rng.integers(0, triangle_count + 1)) * 3
+        layout.append(types.SimpleNamespace(objects=[types.SimpleNamespace(name=name, index_offset=index_offset, index_count=index_count)]))
+        for poly in range(index_offset // 3, min((index_offset + index_count) // 3, triangle_count)):
+            polygon_to_objname[poly] = name
+        index_offset += index_count
+    model.merged_object = types.SimpleNamespace(components=layout)
+
+    dtype = rng.choice([numpy.uint16, numpy.uint32, numpy.int32])
+    shape = (triangle_count * 3,) if rng.random() < 0.2 else (triangle_count * 3, num_vgs)
+    blendindices = rng.integers(0, 600, size=shape).astype(dtype)
+    mesh = types.SimpleNamespace(
+        loops=StubCollection(vertex_index=numpy.zeros(triangle_count * 3)),
+        polygons=StubCollection(loop_start=numpy.arange(triangle_count) * 3, loop_total=numpy.full(triangle_count, 3)),
+    )
+    obj_element_model = types.SimpleNamespace(
+        mesh=mesh,
+        original_elementname_data_dict={'BLENDINDICES': blendindices.copy()},
+        final_elementname_data_dict={},
+    )
+
+    model.replace_remapped_blendindices(obj_element_model)
+
+    expected = legacy_rewrite(blendindices, numpy.repeat(numpy.arange(triangle_count), 3), polygon_to_objname, legacy_reverse_maps)
+    result = obj_element_model.final_elementname_data_dict['BLENDINDICES']
+    assert result.dtype == blendindices.dtype
+    assert numpy.array_equal(result, expected)
+
+
+def test_remap_rewrites_high_group_ids():
+    model = make_draw_ib_model(4)
+    model.blend_remap_maps = {"comp": {'forward': numpy.array([3, 300, 511], dtype=numpy.uint16)}}
+    model.merged_object = types.SimpleNamespace(components=[
+        types.SimpleNamespace(objects=[types.SimpleNamespace(name="comp", index_offset=0, index_count=3)]),
+    ])
+    mesh = types.SimpleNamespace(
+        loops=StubCollection(vertex_index=numpy.zeros(6)),
+        polygons=StubCollection(loop_start=numpy.array([0, 3]), loop_total=numpy.array([3, 3])),
+    )
+    blendindices = numpy.array([[511, 300, 3, 7]] * 6, dtype=numpy.uint16)
+    obj_element_model = types.SimpleNamespace(mesh=mesh, original_elementname_data_dict={'BLENDINDICES': blendindices}, final_elementname_data_dict={})
+
+    model.replace_remapped_blendindices(obj_element_model)
+
+    # 第一个三角形属于 comp，7 不在 forward 表中保持原值；第二个三角形不属于任何组件
+    expected = numpy.array([[2, 1, 0, 7]] * 3 + [[511, 300, 3, 7]] * 3, dtype=numpy.uint16)
+    assert numpy.array_equal(obj_element_model.final_elementname_data_dict['BLENDINDICES'], expected)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_topk_from_csr_keeps_original_order_on_ties(seed):
+    rng = numpy.random.default_rng(seed)
+    vertex_groups_list = random_vertex_groups(rng, 50, 64)
+    max_influences = int(rng.choice([2, 4, 8]))
+    mesh = types.SimpleNamespace(vertices=make_vertex_group_vertices(vertex_groups_list))
+
+    row_offsets, group_ids, weights = VertexGroupUtils.collect_vertex_group_weights(mesh)
+    topk_weights_dict, topk_indices_dict = VertexGroupUtils.calc_topk_blend_from_csr(
+        row_offsets, group_ids, weights,
+        blend_size=max_influences,
+        split_by_4=False,
+        max_influences=max_influences,
+    )
+
+    for vertex_index, groups in enumerate(vertex_groups_list):
+        expected = sorted(groups, key=lambda x: x[1], reverse=True)[:max_influences]
+        picked_groups = topk_indices_dict[0][vertex_index, :len(expected)].tolist()
+        picked_weights = topk_weights_dict[0][vertex_index, :len(expected)].tolist()
+        assert picked_groups == [group for group, _ in expected]
+        assert picked_weights == [weight for _, weight in expected]
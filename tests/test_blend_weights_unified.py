@@ -0,0 +1,114 @@
+"""
+get_blendweights_blendindices_unified 与旧的 v3 / v4 / v4_fast 在随机权重表上逐项对比
+"""
+import types
+
+import numpy
+import pytest
+
+# blueprint 包和 common 之间有循环导入，按插件加载顺序先导入 blueprint
+import theherta3.blueprint  # noqa: F401
+from theherta3.utils.vertexgroup_utils import VertexGroupUtils
+
+from mesh_stubs import StubCollection, make_vertex_group_vertices
+
+
+# 权重只取少数几个值，让并列的情况足够多；都能被 float32 精确表示
+TIED_WEIGHTS = numpy.array([0.0, 0.25, 0.5, 0.75, 1.0], dtype=numpy.float32)
+
+
+def make_random_weight_mesh(rng, max_groups=10, tied=True):
+    '''随机顶点组权重表，每个顶点的顶点组互不相同，loops 随机引用顶点'''
+    vertex_count = int(rng.integers(1, 40))
+    group_count = int(rng.integers(1, 300))
+    vertex_groups_list = []
+    for _ in range(vertex_count):
+        count = int(rng.integers(0, min(max_groups, group_count) + 1))
+        groups = rng.choice(group_count, size=count, replace=False)
+        if tied:
+            weights = rng.choice(TIED_WEIGHTS, size=count)
+        else:
+            weights = rng.random(count).astype(numpy.float32)
+        vertex_groups_list.append([(int(group), float(weight)) for group, weight in zip(groups, weights)])
+
+    loop_vertex_indices = rng.integers(0, vertex_count, size=int(rng.integers(1, 120)))
+    return types.SimpleNamespace(
+        loops=StubCollection(vertex_index=loop_vertex_indices),
+        vertices=make_vertex_group_vertices(vertex_groups_list),
+    )
+
+
+def assert_same_blend(actual, expected):
+    actual_weights, actual_indices = actual
+    expected_weights, expected_indices = expected
+    assert list(actual_weights.keys()) == list(expected_weights.keys())
+    assert list(actual_indices.keys()) == list(expected_indices.keys())
+    for set_idx in expected_weights:
+        assert actual_weights[set_idx].dtype == numpy.float32
+        assert actual_indices[set_idx].dtype == numpy.uint32
+        numpy.testing.assert_array_equal(actual_weights[set_idx], expected_weights[set_idx])
+        numpy.testing.assert_array_equal(actual_indices[set_idx], expected_indices[set_idx])
+
+
+@pytest.mark.parametrize("seed", range(200))
+@pytest.mark.parametrize("normalize_weights", [False, True])
+def test_unified_matches_v3(seed, normalize_weights):
+    mesh = make_random_weight_mesh(numpy.random.default_rng(seed), tied=seed % 2 == 0)
+    expected = VertexGroupUtils.get_blendweights_blendindices_v3(mesh, normalize_weights=normalize_weights)
+    actual = VertexGroupUtils.get_blendweights_blendindices_unified(
+        mesh, blend_size=4, ignore_zero_weights=False, normalize_weights=normalize_weights, split_by_4=True)
+    assert_same_blend(actual, expected)
+
+
+@pytest.mark.parametrize("seed", range(200))
+@pytest.mark.parametrize("normalize_weights", [False, True])
+@pytest.mark.parametrize("blend_size", [4, 8])
+def test_unified_matches_v4_fast(seed, normalize_weights, blend_size):
+    mesh = make_random_weight_mesh(numpy.random.default_rng(seed), tied=seed % 2 == 0)
+    expected = VertexGroupUtils.get_blendweights_blendindices_v4_fast(mesh, normalize_weights=normalize_weights, blend_size=blend_size)
+    actual = VertexGroupUtils.get_blendweights_blendindices_unified(
+        mesh, blend_size=blend_size, ignore_zero_weights=True, normalize_weights=normalize_weights, split_by_4=False)
+    assert_same_blend(actual, expected)
+
+
+@pytest.mark.parametrize("seed", range(200))
+@pytest.mark.parametrize("blend_size", [4, 8])
+def test_unified_matches_v4(seed, blend_size):
+    # v4 不看 normalize_weights 参数，权重和大于0时总是归一化
+    mesh = make_random_weight_mesh(numpy.random.default_rng(seed), tied=seed % 2 == 0)
+    expected = VertexGroupUtils.get_blendweights_blendindices_v4(mesh, blend_size=blend_size)
+    actual = VertexGroupUtils.get_blendweights_blendindices_unified(
+        mesh, blend_size=blend_size, ignore_zero_weights=True, normalize_weights=True, split_by_4=False)
+    assert_same_blend(actual, expected)
+
+
+def test_tied_weights_keep_vertex_group_order():
+    # 同一顶点上权重相同的顶点组按 v.groups 中的顺序排列，三个实现一致
+    mesh = types.SimpleNamespace(
+        loops=StubCollection(vertex_index=numpy.array([0, 1, 0])),
+        vertices=make_vertex_group_vertices([
+            [(7, 0.5), (3, 0.5), (9, 0.0), (1, 0.5), (5, 0.75)],
+            [(2, 0.0), (4, 0.0)],
+        ]),
+    )
+    weights_dict, indices_dict = VertexGroupUtils.get_blendweights_blendindices_unified(mesh, split_by_4=True)
+    assert indices_dict[0][0].tolist() == [5, 7, 3, 1]
+    assert indices_dict[1][0].tolist() == [9, 0, 0, 0]
+    assert indices_dict[0][1].tolist() == [2, 4, 0, 0]
+    assert_same_blend((weights_dict, indices_dict), VertexGroupUtils.get_blendweights_blendindices_v3(mesh))
+
+    fast = VertexGroupUtils.get_blendweights_blendindices_unified(mesh, ignore_zero_weights=True, split_by_4=False)
+    assert fast[1][0][0].tolist() == [5, 7, 3, 1]
+    assert fast[1][0][1].tolist() == [0] * 4
+    assert_same_blend(fast, VertexGroupUtils.get_blendweights_blendindices_v4_fast(mesh))
+
+
+def test_no_vertex_groups():
+    mesh = types.SimpleNamespace(
+        loops=StubCollection(vertex_index=numpy.array([0, 1])),
+        vertices=make_vertex_group_vertices([[], []]),
+    )
+    assert VertexGroupUtils.get_blendweights_blendindices_unified(mesh, split_by_4=True) == ({}, {})
+    assert_same_blend(
+        VertexGroupUtils.get_blendweights_blendindices_unified(mesh, blend_size=8, ignore_zero_weights=True, split_by_4=False),
+        VertexGroupUtils.get_blendweights_blendindices_v4_fast(mesh, blend_size=8))
@@ -0,0 +1,127 @@
+"""
+D3D11GameTypeRegistry.get_game_type 和 JsonUtils.LoadFromFileCached：
+文件不变时返回同一个对象，修改时间或大小变化时重新解析
+"""
+import json
+import os
+
+import pytest
+
+from theherta3.base.d3d11_gametype import D3D11GameTypeRegistry
+from theherta3.utils.json_utils import JsonUtils
+
+
+ELEMENT_LIST = [
+    ("POSITION", 0, "R32G32B32_FLOAT", 12, "Position"),
+    ("NORMAL", 0, "R16G16B16A16_FLOAT", 8, "Position"),
+    ("TANGENT", 0, "R8G8B8A8_SNORM", 4, "Position"),
+    ("BLENDWEIGHT", 0, "R32_FLOAT", 4, "Blend"),
+    ("BLENDINDICES", 0, "R8G8B8A8_UINT", 4, "Blend"),
+    ("TEXCOORD", 0, "R16G16_FLOAT", 4, "Texcoord"),
+]
+
+
+def write_game_type_json(path, element_count):
+    json_dict = {
+        "WorkGameType": "StubGame",
+        "D3D11ElementList": [
+            {
+                "SemanticName": semantic_name,
+                "SemanticIndex": str(semantic_index),
+                "Format": format,
+                "ByteWidth": byte_width,
+                "Category": category,
+                "ExtractSlot": "vb0",
+                "ExtractTechnique": "trianglelist",
+            }
+            for semantic_name, semantic_index, format, byte_width, category in ELEMENT_LIST[:element_count]
+        ],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(json_dict, f)
+
+
+def set_mtime_ns(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(monkeypatch):
+    monkeypatch.setattr(D3D11GameTypeRegistry, "_path_gametype_dict", {})
+    monkeypatch.setattr(JsonUtils, "_path_json_cache_dict", {})
+
+
+def test_game_type_lookup_returns_identical_object(tmp_path):
+    path = str(tmp_path / "import.json")
+    write_game_type_json(path, len(ELEMENT_LIST))
+
+    game_type = D3D11GameTypeRegistry.get_game_type(path)
+
+    assert D3D11GameTypeRegistry.get_game_type(path) is game_type
+    assert D3D11GameTypeRegistry.get_game_type(os.path.join(str(tmp_path), ".", "import.json")) is game_type
+    assert game_type.TotalStride == 36
+    assert game_type.CategoryOffsetDict == {"Position": 0, "Blend": 24, "Texcoord": 32}
+    assert game_type.get_total_structured_dtype().itemsize == game_type.TotalStride
+
+
+def test_game_type_reparsed_when_size_changes(tmp_path):
+    path = str(tmp_path / "import.json")
+    write_game_type_json(path, len(ELEMENT_LIST))
+    set_mtime_ns(path, 1_000_000_000)
+    game_type = D3D11GameTypeRegistry.get_game_type(path)
+
+    # 修改时间不变，只有大小变化
+    write_game_type_json(path, 3)
+    set_mtime_ns(path, 1_000_000_000)
+    reparsed = D3D11GameTypeRegistry.get_game_type(path)
+
+    assert reparsed is not game_type
+    assert reparsed.TotalStride == 24
+    assert D3D11GameTypeRegistry.get_game_type(path) is reparsed
+
+
+def test_game_type_reparsed_when_mtime_changes(tmp_path):
+    path = str(tmp_path / "import.json")
+    write_game_type_json(path, len(ELEMENT_LIST))
+    set_mtime_ns(path, 1_000_000_000)
+    game_type = D3D11GameTypeRegistry.get_game_type(path)
+
+    set_mtime_ns(path, 2_000_000_000)
+
+    assert D3D11GameTypeRegistry.get_game_type(path) is not game_type
+
+
+def test_json_cache_returns_identical_object(tmp_path):
+    path = str(tmp_path / "Import.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"abcd1234-3-0": "GPU-A"}, f)
+
+    json_dict = JsonUtils.LoadFromFileCached(path)
+
+    assert json_dict == {"abcd1234-3-0": "GPU-A"}
+    assert JsonUtils.LoadFromFileCached(path) is json_dict
+
+
+def test_json_cache_invalidated_by_mtime_or_size(tmp_path):
+    path = str(tmp_path / "Import.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"a": "b"}, f)
+    set_mtime_ns(path, 1_000_000_000)
+    first = JsonUtils.LoadFromFileCached(path)
+
+    # 大小相同，只有修改时间变化
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"a": "c"}, f)
+    set_mtime_ns(path, 2_000_000_000)
+    second = JsonUtils.LoadFromFileCached(path)
+    assert second == {"a": "c"} and second is not first
+
+    # 修改时间相同，只有大小变化
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"a": "dd"}, f)
+    set_mtime_ns(path, 2_000_000_000)
+    assert JsonUtils.LoadFromFileCached(path) == {"a": "dd"}
+
+
+def test_json_cache_missing_file(tmp_path):
+    assert JsonUtils.LoadFromFileCached(str(tmp_path / "missing.json")) == {}
@@ -0,0 +1,171 @@
+"""
+PersistentWorkerPool 的 ready/task/result/exit/超时协议测试
+通过 command_builder 启动一个不依赖 Blender 的 Python 模拟工作进程
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+from theherta3.utils.parallel_preprocess import (
+    WORKER_PROTOCOL_PREFIX,
+    PersistentWorkerPool,
+    PreprocessTask,
+)
+
+
+STUB_WORKER_SOURCE = '''
+import json
+import os
+import sys
+import time
+
+PREFIX = {prefix!r}
+
+
+def send_message(message):
+    sys.stdout.write(PREFIX + json.dumps(message) + "\\n")
+    sys.stdout.flush()
+
+
+send_message({{"type": "ready", "blend_file": "stub.blend"}})
+for line in sys.stdin:
+    line = line.strip()
+    if not line:
+        continue
+    message = json.loads(line)
+    if message["type"] == "shutdown":
+        break
+    if message["type"] != "task":
+        continue
+    object_names = message["object_names"]
+    print("log line that is not part of the protocol")
+    if "CRASH" in object_names:
+        os._exit(3)
+    if "HANG" in object_names:
+        time.sleep(60)
+    with open(message["output_blend"], "w") as f:
+        f.write(json.dumps(object_names))
+    send_message({{
+        "type": "result",
+        "task_id": message["task_id"],
+        "success": True,
+        "error_message": "",
+        "processed_objects": object_names + ["pid=" + str(os.getpid())],
+        "output_blend": message["output_blend"],
+        "processing_time": 0.0,
+    }})
+send_message({{"type": "bye"}})
+'''
+
+
+@pytest.fixture
+def stub_pool_factory(tmp_path):
+    stub_file = tmp_path / "stub_worker.py"
+    stub_file.write_text(STUB_WORKER_SOURCE.format(prefix=WORKER_PROTOCOL_PREFIX), encoding="utf-8")
+    blend_file = tmp_path / "scene.blend"
+    blend_file.write_text("blend")
+    pools = []
+
+    def create(num_workers=2, task_timeout=30):
+        pool = PersistentWorkerPool(
+            "blender", str(blend_file), num_workers,
+            command_builder=lambda script_file: [sys.executable, str(stub_file)],
+            task_timeout=task_timeout,
+        )
+        pools.append(pool)
+        return pool
+
+    yield create
+    for pool in pools:
+        pool.close()
+
+
+def make_tasks(tmp_path, object_names_list, prefix="task"):
+    return [
+        PreprocessTask(
+            task_id=task_id,
+            blend_file="scene.blend",
+            object_names=object_names,
+            output_blend=os.path.join(str(tmp_path), f"{prefix}_{task_id}.blend"),
+            mirror_workflow=False,
+        )
+        for task_id, object_names in enumerate(object_names_list)
+    ]
+
+
+def get_worker_pid(result):
+    return result.processed_objects[-1]
+
+
+def test_results_are_ordered_and_progress_runs_on_calling_thread(tmp_path, stub_pool_factory):
+    pool = stub_pool_factory(num_workers=2)
+    tasks = make_tasks(tmp_path, [[f"obj_{i}"] for i in range(5)])
+    progress_calls = []
+
+    def progress_callback(percent):
+        progress_calls.append((percent, threading.current_thread()))
+
+    results = pool.run_tasks(tasks, progress_callback)
+
+    assert [result.task_id for result in results] == list(range(5))
+    assert all(result.success for result in results)
+    assert [result.processed_objects[0] for result in results] == [f"obj_{i}" for i in range(5)]
+    assert [percent for percent, _ in progress_calls] == [20.0, 40.0, 60.0, 80.0, 100.0]
+    assert all(thread is threading.main_thread() for _, thread in progress_calls)
+
+
+def test_workers_are_reused_between_rounds(tmp_path, stub_pool_factory):
+    pool = stub_pool_factory(num_workers=1)
+    first = pool.run_tasks(make_tasks(tmp_path, [["a"], ["b"]], prefix="first"))
+    second = pool.run_tasks(make_tasks(tmp_path, [["c"]], prefix="second"))
+
+    worker_pids = {get_worker_pid(result) for result in first + second}
+    assert len(worker_pids) == 1
+
+
+def test_worker_exit_fails_task_and_worker_restarts(tmp_path, stub_pool_factory):
+    pool = stub_pool_factory(num_workers=1)
+    results = pool.run_tasks(make_tasks(tmp_path, [["a"], ["CRASH"], ["b"]]))
+
+    assert [result.success for result in results] == [True, False, True]
+    assert "意外退出" in results[1].error_message
+    assert get_worker_pid(results[0]) != get_worker_pid(results[2])
+
+
+def test_task_timeout_fails_task_and_worker_restarts(tmp_path, stub_pool_factory):
+    pool = stub_pool_factory(num_workers=1, task_timeout=1)
+    results = pool.run_tasks(make_tasks(tmp_path, [["HANG"], ["a"]]))
+
+    assert [result.success for result in results] == [False, True]
+    assert results[0].error_message == "预处理超时"
+
+
+def test_exception_in_worker_thread_still_produces_result(tmp_path, stub_pool_factory):
+    pool = stub_pool_factory(num_workers=2)
+
+    def broken_ensure_worker(worker_index):
+        raise RuntimeError("启动异常")
+
+    pool._ensure_worker = broken_ensure_worker
+    progress_calls = []
+    results = pool.run_tasks(make_tasks(tmp_path, [["a"], ["b"], ["c"]]), progress_calls.append)
+
+    assert [result.task_id for result in results] == [0, 1, 2]
+    assert not any(result.success for result in results)
+    assert all(result.error_message == "启动异常" for result in results)
+    assert progress_calls[-1] == 100.0
+
+
+def test_close_shuts_down_workers(tmp_path, stub_pool_factory):
+    pool = stub_pool_factory(num_workers=1)
+    pool.run_tasks(make_tasks(tmp_path, [["a"]]))
+    worker = pool.workers[0]
+    process = worker.process
+
+    pool.close()
+
+    assert process.poll() is not None
+    assert not worker.is_alive()
+    assert not os.path.exists(pool.work_dir)
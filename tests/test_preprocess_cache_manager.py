@@ -0,0 +1,135 @@
+"""
+PreprocessCacheManager 的容量淘汰、孤立文件整理和按物体名清理
+"""
+import os
+
+import pytest
+
+from theherta3.utils.preprocess_cache import ObjectFingerprint, PreprocessCacheManager
+
+
+def make_fingerprint(vertex_count):
+    return ObjectFingerprint(
+        vertex_count=vertex_count,
+        vertex_hash="v",
+        edge_hash="e",
+        face_hash="f",
+        vertex_group_hash="vg",
+        modifier_hash="m",
+        shape_key_hash="sk",
+        transform_hash="t",
+        armature_pose_hash="a",
+        mirror_workflow=False,
+    )
+
+
+def put_entry(manager, obj_name, vertex_count, size_bytes, last_access=None):
+    """写一个指定大小的缓存文件并登记到索引，last_access 用于固定 LRU 顺序"""
+    fingerprint = make_fingerprint(vertex_count)
+    cache_key = manager._get_cache_key(obj_name, fingerprint)
+    cache_file = manager._get_cache_file_path(cache_key, PreprocessCacheManager.BACKEND_NPZ)
+    with open(cache_file, 'wb') as f:
+        f.write(b'x' * size_bytes)
+    manager._register_entry(cache_key, obj_name, fingerprint, cache_file, PreprocessCacheManager.BACKEND_NPZ)
+    if last_access is not None and cache_key in manager.cache_index:
+        manager.cache_index[cache_key]['last_access'] = last_access
+    return cache_key
+
+
+def cached_obj_names(manager):
+    return sorted(entry['obj_name'] for entry in manager.cache_index.values())
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def test_evicts_least_recently_used_first(cache_dir):
+    manager = PreprocessCacheManager(cache_dir=cache_dir, max_size_bytes=3500)
+    put_entry(manager, "Body", 1, 1000, last_access=100)
+    put_entry(manager, "Hair", 2, 1000, last_access=200)
+    put_entry(manager, "Face", 3, 1000, last_access=300)
+
+    # 超出上限 1500 字节，需要按最后访问时间淘汰 Body 和 Hair
+    put_entry(manager, "Cloth", 4, 2000)
+
+    assert cached_obj_names(manager) == ["Cloth", "Face"]
+    assert sorted(os.listdir(cache_dir)) == sorted(
+        [os.path.basename(entry['file']) for entry in manager.cache_index.values()] + ["cache_index.json"]
+    )
+
+
+def test_touch_moves_entry_to_most_recently_used(cache_dir):
+    manager = PreprocessCacheManager(cache_dir=cache_dir, max_size_bytes=2500)
+    body_key = put_entry(manager, "Body", 1, 1000, last_access=100)
+    put_entry(manager, "Hair", 2, 1000, last_access=200)
+
+    manager._touch_entry(body_key)
+    put_entry(manager, "Face", 3, 1000)
+
+    assert cached_obj_names(manager) == ["Body", "Face"]
+
+
+def test_entry_just_written_is_kept_even_over_budget(cache_dir):
+    manager = PreprocessCacheManager(cache_dir=cache_dir, max_size_bytes=1500)
+    put_entry(manager, "Body", 1, 1000, last_access=100)
+
+    big_key = put_entry(manager, "Huge", 2, 5000)
+
+    assert list(manager.cache_index) == [big_key]
+    assert os.path.exists(manager._get_entry_file_path(big_key))
+
+
+def test_compact_removes_missing_entries_and_old_orphans_only(cache_dir):
+    manager = PreprocessCacheManager(cache_dir=cache_dir, max_size_bytes=0)
+    put_entry(manager, "Body", 1, 10)
+    missing_key = put_entry(manager, "Hair", 2, 10)
+    os.remove(manager._get_entry_file_path(missing_key))
+
+    old_orphan = os.path.join(cache_dir, "old_orphan.blend")
+    fresh_orphan = os.path.join(cache_dir, "fresh_orphan.npz")
+    unrelated_file = os.path.join(cache_dir, "notes.txt")
+    for path in (old_orphan, fresh_orphan, unrelated_file):
+        with open(path, 'wb') as f:
+            f.write(b'y' * 7)
+    os.utime(old_orphan, (1, 1))
+    os.utime(unrelated_file, (1, 1))
+
+    stats = manager.compact_cache()
+
+    assert stats == {'removed_entries': 1, 'removed_files': 1, 'freed_bytes': 7}
+    assert cached_obj_names(manager) == ["Body"]
+    assert not os.path.exists(old_orphan)
+    assert os.path.exists(fresh_orphan)
+    assert os.path.exists(unrelated_file)
+
+    # 宽限期为 0 时刚写入的孤立文件也会被删除
+    assert manager.compact_cache(min_age_seconds=0)['removed_files'] == 1
+    assert not os.path.exists(fresh_orphan)
+
+
+def test_compact_runs_when_manager_is_created(cache_dir):
+    manager = PreprocessCacheManager(cache_dir=cache_dir, max_size_bytes=0)
+    missing_key = put_entry(manager, "Body", 1, 10)
+    os.remove(manager._get_entry_file_path(missing_key))
+
+    reopened = PreprocessCacheManager(cache_dir=cache_dir, max_size_bytes=0)
+
+    assert reopened.cache_index == {}
+
+
+def test_clear_cache_matches_object_name_exactly(cache_dir):
+    manager = PreprocessCacheManager(cache_dir=cache_dir, max_size_bytes=0)
+    body_keys = [put_entry(manager, "Body", 1, 10), put_entry(manager, "Body", 2, 10)]
+    put_entry(manager, "Body.001", 3, 10)
+    put_entry(manager, "Body_copy", 4, 10)
+
+    manager.clear_cache("Body")
+
+    assert cached_obj_names(manager) == ["Body.001", "Body_copy"]
+    assert not any(os.path.exists(manager._get_cache_file_path(key, PreprocessCacheManager.BACKEND_NPZ)) for key in body_keys)
+
+    manager.clear_cache()
+    assert manager.cache_index == {}
+    assert os.listdir(cache_dir) == ["cache_index.json"]
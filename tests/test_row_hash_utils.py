@@ -0,0 +1,112 @@
+"""
+RowHashUtils.unique_rows_hashed 与按整行字节精确去重的结果一致，包括哈希碰撞时的回退
+"""
+import numpy
+import pytest
+
+from theherta3.utils.row_hash_utils import RowHashUtils
+
+
+def reference_unique_rows(row_bytes):
+    '''按行字节内容逐行去重，编号按首次出现顺序'''
+    first_index_dict = {}
+    unique_first_indices = []
+    inverse = []
+    for row_index, row in enumerate(row_bytes):
+        key = row.tobytes()
+        if key not in first_index_dict:
+            first_index_dict[key] = len(unique_first_indices)
+            unique_first_indices.append(row_index)
+        inverse.append(first_index_dict[key])
+    return numpy.array(unique_first_indices, dtype=numpy.int64), numpy.array(inverse, dtype=numpy.int64)
+
+
+def make_structured_rows(rng, row_count, dtype, unique_count):
+    '''先生成 unique_count 个不同的结构化元素，再随机重复，得到带大量重复行的数组'''
+    pool = numpy.zeros(unique_count, dtype=dtype)
+    pool_bytes = pool.view(numpy.uint8).reshape(unique_count, dtype.itemsize)
+    pool_bytes[...] = rng.integers(0, 256, size=pool_bytes.shape, dtype=numpy.uint8)
+    # 只差一个字节的相邻行，确保哈希对每个字节都敏感
+    if unique_count > 1:
+        pool_bytes[1] = pool_bytes[0]
+        pool_bytes[1, -1] ^= 1
+    rows = pool[rng.integers(0, unique_count, size=row_count)]
+    return rows.view(numpy.uint8).reshape(row_count, dtype.itemsize)
+
+
+DTYPE_LIST = [
+    numpy.dtype([("POSITION", numpy.float32, 3)]),
+    numpy.dtype([("POSITION", numpy.float32, 3), ("NORMAL", numpy.float16, 4), ("TEXCOORD", numpy.float16, 2)]),
+    numpy.dtype([("BLENDINDICES", numpy.uint8, 4), ("COLOR", numpy.uint8, 3)]),
+    numpy.dtype([("POSITION", numpy.float32, 3), ("BLENDWEIGHT", numpy.float32, 4), ("BLENDINDICES", numpy.uint16, 4), ("PAD", numpy.uint8, 1)]),
+    numpy.dtype([("INDEX", numpy.uint8, 1)]),
+]
+
+
+@pytest.mark.parametrize("dtype", DTYPE_LIST, ids=lambda dtype: f"stride{dtype.itemsize}")
+@pytest.mark.parametrize("seed", range(5))
+def test_hashed_unique_matches_exact(dtype, seed):
+    rng = numpy.random.default_rng(seed)
+    row_count = int(rng.integers(1, 3000))
+    unique_count = int(rng.integers(1, min(row_count, 200) + 1))
+    row_bytes = make_structured_rows(rng, row_count, dtype, unique_count)
+
+    unique_first_indices, inverse = RowHashUtils.unique_rows_hashed(row_bytes)
+    expected_first_indices, expected_inverse = reference_unique_rows(row_bytes)
+
+    assert numpy.array_equal(unique_first_indices, expected_first_indices)
+    assert numpy.array_equal(inverse, expected_inverse)
+
+    exact_first_indices, exact_inverse = RowHashUtils.unique_rows_exact(row_bytes)
+    assert numpy.array_equal(exact_first_indices, expected_first_indices)
+    assert numpy.array_equal(exact_inverse, expected_inverse)
+
+
+def test_non_contiguous_rows():
+    rng = numpy.random.default_rng(7)
+    row_bytes = make_structured_rows(rng, 500, DTYPE_LIST[1], 40)
+    strided = row_bytes[:, ::2]
+
+    unique_first_indices, inverse = RowHashUtils.unique_rows_hashed(strided)
+    expected_first_indices, expected_inverse = reference_unique_rows(numpy.ascontiguousarray(strided))
+
+    assert numpy.array_equal(unique_first_indices, expected_first_indices)
+    assert numpy.array_equal(inverse, expected_inverse)
+
+
+def test_forced_collision_falls_back_to_exact(monkeypatch):
+    rng = numpy.random.default_rng(11)
+    row_bytes = make_structured_rows(rng, 1000, DTYPE_LIST[3], 64)
+    exact_calls = []
+    original_unique_rows_exact = RowHashUtils.unique_rows_exact.__func__
+
+    def colliding_hash_rows_x2(cls, rows):
+        # 所有行的哈希都相同，必然发生碰撞
+        return numpy.zeros((rows.shape[0], 2), dtype=numpy.uint64)
+
+    def spy_unique_rows_exact(cls, rows):
+        exact_calls.append(rows.shape)
+        return original_unique_rows_exact(cls, rows)
+
+    monkeypatch.setattr(RowHashUtils, "hash_rows_x2", classmethod(colliding_hash_rows_x2))
+    monkeypatch.setattr(RowHashUtils, "unique_rows_exact", classmethod(spy_unique_rows_exact))
+
+    unique_first_indices, inverse = RowHashUtils.unique_rows_hashed(row_bytes)
+    expected_first_indices, expected_inverse = reference_unique_rows(row_bytes)
+
+    assert exact_calls == [row_bytes.shape]
+    assert numpy.array_equal(unique_first_indices, expected_first_indices)
+    assert numpy.array_equal(inverse, expected_inverse)
+
+
+def test_no_fallback_without_collision(monkeypatch):
+    rng = numpy.random.default_rng(3)
+    row_bytes = make_structured_rows(rng, 1000, DTYPE_LIST[0], 100)
+    monkeypatch.setattr(RowHashUtils, "unique_rows_exact", classmethod(lambda cls, rows: pytest.fail("不应回退")))
+
+    RowHashUtils.unique_rows_hashed(row_bytes)
+
+
+def test_empty_rows():
+    unique_first_indices, inverse = RowHashUtils.unique_rows_hashed(numpy.zeros((0, 12), dtype=numpy.uint8))
+    assert len(unique_first_indices) == 0 and len(inverse) == 0
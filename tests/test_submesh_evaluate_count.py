@@ -0,0 +1,101 @@
+"""
+每个 SubMesh 只 evaluate 一次：SubMeshModel 创建的 ObjElementModel 直接交给 ObjBufferModelUnity，
+ObjBufferModelUnity 用完后不再持有它
+"""
+import json
+import types
+
+import numpy
+import pytest
+
+# blueprint 包和 common 之间有循环导入，按插件加载顺序先导入 blueprint
+import theherta3.blueprint  # noqa: F401
+from theherta3.base.d3d11_gametype import D3D11GameTypeRegistry
+from theherta3.blueprint.blueprint_export_helper import BlueprintExportHelper
+from theherta3.common.export.submesh_model import SubMeshModel
+from theherta3.common.obj_buffer_model_unity import ObjBufferModelUnity
+from theherta3.config.main_config import GlobalConfig
+from theherta3.helper.obj_buffer_helper import ObjBufferHelper
+from theherta3.utils.json_utils import JsonUtils
+from theherta3.utils.obj_utils import ObjUtils
+from theherta3.utils.performance_stats import get_counter
+from theherta3.utils.shapekey_utils import ShapeKeyUtils
+
+
+GAMETYPE_NAME = "StubGameType"
+
+
+class StubGameType:
+    FilePath = "stub_import.json"
+    OrderedFullElementList = ["POSITION"]
+
+    def get_total_structured_dtype(self):
+        return numpy.dtype([("POSITION", numpy.float32, 3)])
+
+
+class StubDrawCallModel:
+    def __init__(self, obj_name, first_index):
+        self.obj_name = obj_name
+        self.match_draw_ib = "abcd1234"
+        self.match_first_index = str(first_index)
+        self.match_index_count = "3"
+
+    def get_unique_str(self):
+        return f"{self.match_draw_ib}-{self.match_first_index}"
+
+
+def make_stub_object(name):
+    mesh_data = types.SimpleNamespace(vertices=[0, 1, 2], polygons=[0], shape_keys=None)
+    return types.SimpleNamespace(name=name, type='MESH', data=mesh_data)
+
+
+@pytest.fixture
+def stub_export(tmp_path, monkeypatch):
+    """搭建一个最小的工作空间，并把依赖 Blender 的部分替换成计数用的桩"""
+    unique_str_list = [StubDrawCallModel(f"obj_{i}_copy", i * 3).get_unique_str() for i in range(3)]
+    (tmp_path / "Import.json").write_text(json.dumps({unique_str: GAMETYPE_NAME for unique_str in unique_str_list}))
+    for unique_str in unique_str_list:
+        type_folder = tmp_path / unique_str / ("TYPE_" + GAMETYPE_NAME)
+        type_folder.mkdir(parents=True)
+        (type_folder / "import.json").write_text("{}")
+
+    objects = {f"obj_{i}_copy": make_stub_object(f"obj_{i}_copy") for i in range(3)}
+    evaluated_obj_names = []
+
+    def get_mesh_evaluate_from_obj(obj):
+        evaluated_obj_names.append(obj.name)
+        return types.SimpleNamespace(polygons=[])
+
+    monkeypatch.setattr(GlobalConfig, "path_workspace_folder", classmethod(lambda cls: str(tmp_path)))
+    monkeypatch.setattr(GlobalConfig, "logic_name", "")
+    monkeypatch.setattr(JsonUtils, "LoadFromFileCached", staticmethod(lambda path: json.loads(open(path).read())))
+    monkeypatch.setattr(D3D11GameTypeRegistry, "get_game_type", staticmethod(lambda path: StubGameType()))
+    monkeypatch.setattr(ObjUtils, "get_obj_by_name", staticmethod(lambda name: objects.get(name)))
+    monkeypatch.setattr(ObjUtils, "get_mesh_evaluate_from_obj", staticmethod(get_mesh_evaluate_from_obj))
+    monkeypatch.setattr(ShapeKeyUtils, "reset_shapekey_values", staticmethod(lambda *args, **kwargs: None))
+    monkeypatch.setattr(ObjBufferHelper, "check_and_verify_attributes", staticmethod(lambda **kwargs: None))
+    monkeypatch.setattr(ObjBufferHelper, "parse_elementname_data_dict", staticmethod(lambda **kwargs: {}))
+    monkeypatch.setattr(ObjBufferHelper, "convert_to_element_vertex_ndarray", staticmethod(lambda **kwargs: numpy.zeros(3, dtype=StubGameType().get_total_structured_dtype())))
+    monkeypatch.setattr(ObjBufferHelper, "calc_index_vertex_buffer_unified", staticmethod(lambda **kwargs: (numpy.arange(3, dtype=numpy.uint32), {}, None)))
+    monkeypatch.setattr(BlueprintExportHelper, "get_current_shapekeyname_mkey_dict", staticmethod(lambda: {}))
+    return types.SimpleNamespace(objects=objects, evaluated_obj_names=evaluated_obj_names)
+
+
+def test_one_evaluate_per_submesh(stub_export):
+    counter_before = get_counter("ObjElementModel_Evaluate")
+
+    submesh_list = [SubMeshModel(drawcall_model_list=[StubDrawCallModel(f"obj_{i}_copy", i * 3)]) for i in range(3)]
+
+    assert get_counter("ObjElementModel_Evaluate") - counter_before == len(submesh_list)
+    assert stub_export.evaluated_obj_names == ["obj_0_copy", "obj_1_copy", "obj_2_copy"]
+    assert all(list(submesh.ib) == [0, 1, 2] for submesh in submesh_list)
+
+
+def test_obj_buffer_model_releases_element_model(stub_export):
+    counter_before = get_counter("ObjElementModel_Evaluate")
+
+    obj_buffer_model = ObjBufferModelUnity(obj=stub_export.objects["obj_0_copy"], d3d11_game_type=StubGameType())
+
+    assert get_counter("ObjElementModel_Evaluate") - counter_before == 1
+    assert obj_buffer_model.obj_element_model is None
+
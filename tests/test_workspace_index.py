@@ -0,0 +1,132 @@
+"""
+WorkSpaceIndex：生成Mod时无论有多少个 DrawIB，工作空间只遍历一次；文件夹有变化时索引失效
+"""
+import json
+import os
+
+import pytest
+
+# blueprint 包和 common 之间有循环导入，按插件加载顺序先导入 blueprint
+import theherta3.blueprint  # noqa: F401
+from theherta3.common.workspace_helper import WorkSpaceHelper
+from theherta3.config.main_config import GlobalConfig
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def make_workspace(root, draw_ib_count):
+    '''每个 DrawIB 两个 SSMT4 子文件夹，贴图标记文件分散在 Config/MarkTexture 的多层子文件夹中'''
+    marktexture_folder = os.path.join(root, "Config", "MarkTexture")
+    draw_ib_list = []
+    for i in range(draw_ib_count):
+        draw_ib = f"{i:08x}"
+        draw_ib_list.append(draw_ib)
+        os.makedirs(os.path.join(root, f"{draw_ib}-{i * 3}-0", "TYPE_GPU-A"))
+        os.makedirs(os.path.join(root, f"{draw_ib}-{i * 3}-10", "TYPE_CPU-B"))
+        sub_folder = os.path.join(marktexture_folder, f"sub{i % 3}")
+        write_json(os.path.join(sub_folder, f"{draw_ib}-ComponentName_DrawCallIndexList.json"),
+                   {f"Component {k}": [f"{i:03d}{k:03d}"] for k in range(3)})
+        write_json(os.path.join(sub_folder, f"{draw_ib}-TrianglelistDedupedFileName.json"),
+                   {f"{i:03d}{k:03d}-x": {"FALogDedupedFileName": f"{i:04x}aaaa_{k:04x}bbbb-R8G8B8A8_UNORM_SRGB.dds"} for k in range(3)})
+    return draw_ib_list
+
+
+@pytest.fixture
+def walk_counter(tmp_path, monkeypatch):
+    '''
+    统计 os.walk 的次数和对工作空间根目录的 os.scandir 次数
+    os.walk 内部也会对每一层子文件夹调用 os.scandir，这些不计入
+    '''
+    calls = {"walk": 0, "scandir": 0}
+    original_walk, original_scandir = os.walk, os.scandir
+
+    def counting_walk(*args, **kwargs):
+        calls["walk"] += 1
+        return original_walk(*args, **kwargs)
+
+    def counting_scandir(path=".", *args, **kwargs):
+        if os.path.basename(os.path.normpath(path)) == "workspace":
+            calls["scandir"] += 1
+        return original_scandir(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "walk", counting_walk)
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    monkeypatch.setattr(WorkSpaceHelper, "_workspace_index", None)
+    return calls
+
+
+def use_workspace(monkeypatch, workspace_folder):
+    monkeypatch.setattr(GlobalConfig, "path_workspace_folder", classmethod(lambda cls: workspace_folder))
+
+
+@pytest.mark.parametrize("draw_ib_count", [5, 20, 80])
+def test_walk_count_is_constant(tmp_path, monkeypatch, walk_counter, draw_ib_count):
+    workspace_folder = str(tmp_path / "workspace")
+    draw_ib_list = make_workspace(workspace_folder, draw_ib_count)
+    use_workspace(monkeypatch, workspace_folder)
+
+    for i, draw_ib in enumerate(draw_ib_list):
+        texture_info_dict = WorkSpaceHelper.get_hash_deduped_texture_info_dict(draw_ib)
+        assert list(texture_info_dict) == [f"{i:04x}aaaa"]
+        assert texture_info_dict[f"{i:04x}aaaa"].componet_count_list_str == "2."
+        assert sorted(WorkSpaceHelper.get_drawib_folder_name_list(draw_ib)) == [f"{draw_ib}-{i * 3}-0", f"{draw_ib}-{i * 3}-10"]
+
+    assert walk_counter == {"walk": 1, "scandir": 1}
+
+
+def test_prefers_file_matching_draw_ib_in_nested_folder(tmp_path, monkeypatch, walk_counter):
+    workspace_folder = str(tmp_path / "workspace")
+    make_workspace(workspace_folder, 3)
+    use_workspace(monkeypatch, workspace_folder)
+
+    path = WorkSpaceHelper.find_json_file_in_marktexture_folder("TrianglelistDedupedFileName", "00000002")
+    assert path == os.path.join(workspace_folder, "Config", "MarkTexture", "sub2", "00000002-TrianglelistDedupedFileName.json")
+    assert WorkSpaceHelper.find_json_file_in_marktexture_folder("TrianglelistDedupedFileName", "ffffffff").endswith("-TrianglelistDedupedFileName.json")
+    assert WorkSpaceHelper.find_json_file_in_marktexture_folder("NoSuchFile", "00000002") == ""
+
+
+def test_index_rebuilds_after_folder_changes(tmp_path, monkeypatch, walk_counter):
+    workspace_folder = str(tmp_path / "workspace")
+    make_workspace(workspace_folder, 4)
+    use_workspace(monkeypatch, workspace_folder)
+
+    WorkSpaceHelper.get_hash_deduped_texture_info_dict("00000001")
+    assert walk_counter["walk"] == 1
+
+    # 深层子文件夹中新增的文件也要能找到
+    deep_folder = os.path.join(workspace_folder, "Config", "MarkTexture", "sub1", "deep")
+    write_json(os.path.join(deep_folder, "00000009-ComponentName_DrawCallIndexList.json"), {"Component 9": ["000009"]})
+    write_json(os.path.join(deep_folder, "00000009-TrianglelistDedupedFileName.json"),
+               {"000009-x": {"FALogDedupedFileName": "9999_8888-BC1_UNORM.dds"}})
+    texture_info_dict = WorkSpaceHelper.get_hash_deduped_texture_info_dict("00000009")
+    assert list(texture_info_dict) == ["9999"]
+    assert texture_info_dict["9999"].componet_count_list_str == "9."
+    assert walk_counter["walk"] == 2
+
+    # 新增的 DrawIB 子文件夹
+    os.makedirs(os.path.join(workspace_folder, "00000001-99-5"))
+    assert "00000001-99-5" in WorkSpaceHelper.get_drawib_folder_name_list("00000001")
+    assert walk_counter["scandir"] == 3
+
+
+def test_type_folders_are_listed_lazily(tmp_path, monkeypatch, walk_counter):
+    workspace_folder = str(tmp_path / "workspace")
+    make_workspace(workspace_folder, 3)
+    use_workspace(monkeypatch, workspace_folder)
+
+    assert WorkSpaceHelper.get_type_folder_name_list("00000001-3-10") == ["TYPE_CPU-B"]
+    assert WorkSpaceHelper.get_workspace_index().folder_type_name_list_dict == {"00000001-3-10": ["TYPE_CPU-B"]}
+
+    os.makedirs(os.path.join(workspace_folder, "00000001-3-10", "TYPE_GPU-C"))
+    assert sorted(WorkSpaceHelper.get_type_folder_name_list("00000001-3-10")) == ["TYPE_CPU-B", "TYPE_GPU-C"]
+
+
+def test_missing_workspace(tmp_path, monkeypatch, walk_counter):
+    use_workspace(monkeypatch, str(tmp_path / "missing"))
+
+    assert WorkSpaceHelper.get_hash_deduped_texture_info_dict("00000001") == {}
+    assert WorkSpaceHelper.get_drawib_folder_name_list("00000001") == []
@@ -95,6 +95,8 @@ class PanelBasicInformation(bpy.types.Panel):
         
         layout.prop(context.scene.properties_import_model,"use_preprocess_cache",text="启用预处理缓存")
         if context.scene.properties_import_model.use_preprocess_cache:
+            layout.prop(context.scene.properties_import_model,"use_array_preprocess_cache",text="使用数组缓存(.npz)")
+            layout.prop(context.scene.properties_import_model,"preprocess_cache_max_size_mb",text="缓存容量上限(MB)")
             from ..utils.preprocess_cache import get_cache_manager
             cache_manager = get_cache_manager()
             stats = cache_manager.get_cache_stats()
@@ -1,4 +1,5 @@
 import os
+import numpy
 
 class FileUtils:
 
@@ -12,3 +13,20 @@ class FileUtils:
                 file_list.append(entry)
         return file_list
 
+    @staticmethod
+    def map_binary_file(file_path:str, dtype, count:int = -1, offset:int = 0) -> numpy.ndarray:
+        """
+        以只读内存映射的方式打开二进制 Buffer 文件，按 dtype 解析为一维记录数组
+        不会一次性把文件读入内存，只有实际访问到的部分才会从磁盘读取，结构化 dtype 的每个字段也都是直接指向文件的视图
+
+        offset 为起始字节偏移，count 为读取的记录数量，-1 表示一直读到文件末尾，末尾不足一条记录的字节会被忽略
+        文件为空或者可读取的记录数为0时返回空数组（numpy.memmap 不能映射长度为0的区域）
+        返回的数组是只读的，需要修改时先 copy()
+        """
+        dtype = numpy.dtype(dtype)
+        available_count = max(os.path.getsize(file_path) - offset, 0) // dtype.itemsize
+        if count < 0 or count > available_count:
+            count = available_count
+        if count == 0:
+            return numpy.empty(0, dtype=dtype)
+        return numpy.memmap(file_path, dtype=dtype, mode='r', offset=offset, shape=(count,))
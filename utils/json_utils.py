@@ -1,6 +1,9 @@
+import os
 import json
 
 class JsonUtils:
+    # LoadFromFileCached 使用，key 是绝对路径，value 是 ((mtime_ns, size), json_dict)
+    _path_json_cache_dict:dict = {}
 
 
     @classmethod
@@ -22,4 +25,25 @@ class JsonUtils:
             return {}
         except json.JSONDecodeError:
             print(f"Error: The file at {filepath} is not a valid JSON file.")
-            return {}
\ No newline at end of file
+            return {}
+
+    @classmethod
+    def LoadFromFileCached(cls, filepath: str) -> dict:
+        '''
+        文件没有变化（修改时间和大小一致）时直接返回上一次解析的字典，
+        返回的字典是共享的，只能读取不能修改
+        '''
+        abs_path = os.path.abspath(filepath)
+        try:
+            file_stat = os.stat(abs_path)
+        except OSError:
+            return cls.LoadFromFile(filepath)
+        file_stamp = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        cached = cls._path_json_cache_dict.get(abs_path, None)
+        if cached is not None and cached[0] == file_stamp:
+            return cached[1]
+
+        json_dict = cls.LoadFromFile(filepath)
+        cls._path_json_cache_dict[abs_path] = (file_stamp, json_dict)
+        return json_dict
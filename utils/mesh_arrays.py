@@ -0,0 +1,436 @@
+'''
+预处理结果的纯数组表示
+把预处理后的 mesh 物体保存为压缩的 .npz 文件，加载时直接用 foreach_set 重建物体，
+比通过 bpy.data.libraries.write / load 读写 .blend 快得多，而且缓存内容可以脱离 Blender 直接用 numpy 查看。
+
+注意：本模块顶层不导入 bpy，只有 from_object / to_object 需要在 Blender 中调用。
+'''
+import json
+import numpy
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+# 除了 UV 和颜色属性之外允许出现的属性，其它自定义属性无法保存时回退到 .blend 缓存
+_BUILTIN_ATTRIBUTE_NAMES = {'position', 'sharp_face', 'sharp_edge', 'material_index', 'custom_normal'}
+
+
+def _id_properties_to_dict(id_block) -> dict:
+    '''
+    把 ID 上的自定义属性转换为可以 JSON 序列化的字典
+    '''
+    properties = {}
+    for key, value in id_block.items():
+        if key == '_RNA_UI':
+            continue
+        if hasattr(value, 'to_dict'):
+            value = value.to_dict()
+        elif hasattr(value, 'to_list'):
+            value = value.to_list()
+        properties[key] = value
+    return properties
+
+
+@dataclass
+class MeshArrays:
+    '''
+    预处理后 mesh 物体的数组快照
+
+    - 拓扑: 顶点坐标、边、Loop 的顶点/边索引、面的起始 Loop 与 Loop 数量、平滑与锐边标记
+    - UV 与颜色属性: 每层一个数组，按层顺序保存
+    - 顶点组权重: CSR 形式 (weight_offsets, weight_groups, weight_values)
+    - 形态键: 每个形态键的顶点坐标，直接保存 co，不保存偏移量，避免 float32 下 positions + (co - positions) 与 co 不相等
+    - 自定义法线: 仅在 mesh 含有自定义法线时保存逐 Loop 法线
+    - 物体和 mesh 上的自定义属性: JSON
+    '''
+    FORMAT_VERSION = 2
+
+    name: str
+    positions: numpy.ndarray = field(repr=False)
+    edges: numpy.ndarray = field(repr=False)
+    edge_sharp: numpy.ndarray = field(repr=False)
+    loop_vertex_indices: numpy.ndarray = field(repr=False)
+    loop_edge_indices: numpy.ndarray = field(repr=False)
+    poly_loop_starts: numpy.ndarray = field(repr=False)
+    poly_loop_totals: numpy.ndarray = field(repr=False)
+    poly_smooth: numpy.ndarray = field(repr=False)
+    matrix_world: numpy.ndarray = field(repr=False)
+
+    uv_layer_names: List[str] = field(default_factory=list)
+    uv_layers: List[numpy.ndarray] = field(default_factory=list, repr=False)
+    active_uv_index: int = 0
+    active_render_uv_index: int = 0
+
+    # 每项为 {'name', 'domain', 'data_type'}
+    color_attribute_infos: List[Dict] = field(default_factory=list)
+    color_attributes: List[numpy.ndarray] = field(default_factory=list, repr=False)
+    active_color_index: int = -1
+    render_color_index: int = -1
+
+    vertex_group_names: List[str] = field(default_factory=list)
+    weight_offsets: Optional[numpy.ndarray] = field(default=None, repr=False)
+    weight_groups: Optional[numpy.ndarray] = field(default=None, repr=False)
+    weight_values: Optional[numpy.ndarray] = field(default=None, repr=False)
+
+    # 每项为 {'name', 'value', 'slider_min', 'slider_max', 'mute', 'interpolation', 'vertex_group', 'relative_key'}
+    shape_key_infos: List[Dict] = field(default_factory=list)
+    shape_key_coords: Optional[numpy.ndarray] = field(default=None, repr=False)
+    shape_key_use_relative: bool = True
+
+    custom_normals: Optional[numpy.ndarray] = field(default=None, repr=False)
+    # Blender 4.1 之前的自动平滑设置，None 表示当前版本没有该属性
+    auto_smooth: Optional[List] = None
+
+    object_properties: Dict = field(default_factory=dict)
+    mesh_properties: Dict = field(default_factory=dict)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.positions)
+
+    # ------------------------------------------------------------------
+    # 序列化，不依赖 bpy
+    # ------------------------------------------------------------------
+    def save(self, file_path: str):
+        '''
+        保存为压缩的 .npz，元数据以 JSON 字符串保存在 meta 中
+        '''
+        meta = {
+            'format_version': self.FORMAT_VERSION,
+            'name': self.name,
+            'uv_layer_names': self.uv_layer_names,
+            'active_uv_index': self.active_uv_index,
+            'active_render_uv_index': self.active_render_uv_index,
+            'color_attribute_infos': self.color_attribute_infos,
+            'active_color_index': self.active_color_index,
+            'render_color_index': self.render_color_index,
+            'vertex_group_names': self.vertex_group_names,
+            'shape_key_infos': self.shape_key_infos,
+            'shape_key_use_relative': self.shape_key_use_relative,
+            'auto_smooth': self.auto_smooth,
+            'object_properties': self.object_properties,
+            'mesh_properties': self.mesh_properties,
+        }
+
+        arrays = {
+            'meta': numpy.array(json.dumps(meta, ensure_ascii=False)),
+            'positions': self.positions,
+            'edges': self.edges,
+            'edge_sharp': self.edge_sharp,
+            'loop_vertex_indices': self.loop_vertex_indices,
+            'loop_edge_indices': self.loop_edge_indices,
+            'poly_loop_starts': self.poly_loop_starts,
+            'poly_loop_totals': self.poly_loop_totals,
+            'poly_smooth': self.poly_smooth,
+            'matrix_world': self.matrix_world,
+        }
+        for i, uv in enumerate(self.uv_layers):
+            arrays[f'uv_{i}'] = uv
+        for i, color in enumerate(self.color_attributes):
+            arrays[f'color_{i}'] = color
+        if self.weight_offsets is not None:
+            arrays['weight_offsets'] = self.weight_offsets
+            arrays['weight_groups'] = self.weight_groups
+            arrays['weight_values'] = self.weight_values
+        if self.shape_key_coords is not None:
+            arrays['shape_key_coords'] = self.shape_key_coords
+        if self.custom_normals is not None:
+            arrays['custom_normals'] = self.custom_normals
+
+        # 传入文件对象，避免 numpy 自动给文件名追加 .npz 后缀
+        with open(file_path, 'wb') as f:
+            numpy.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, file_path: str) -> "MeshArrays":
+        with numpy.load(file_path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('format_version') != cls.FORMAT_VERSION:
+                raise ValueError(f"不支持的缓存格式版本: {meta.get('format_version')}")
+
+            def optional(key):
+                return data[key] if key in data.files else None
+
+            return cls(
+                name=meta['name'],
+                positions=data['positions'],
+                edges=data['edges'],
+                edge_sharp=data['edge_sharp'],
+                loop_vertex_indices=data['loop_vertex_indices'],
+                loop_edge_indices=data['loop_edge_indices'],
+                poly_loop_starts=data['poly_loop_starts'],
+                poly_loop_totals=data['poly_loop_totals'],
+                poly_smooth=data['poly_smooth'],
+                matrix_world=data['matrix_world'],
+                uv_layer_names=meta['uv_layer_names'],
+                uv_layers=[data[f'uv_{i}'] for i in range(len(meta['uv_layer_names']))],
+                active_uv_index=meta['active_uv_index'],
+                active_render_uv_index=meta['active_render_uv_index'],
+                color_attribute_infos=meta['color_attribute_infos'],
+                color_attributes=[data[f'color_{i}'] for i in range(len(meta['color_attribute_infos']))],
+                active_color_index=meta['active_color_index'],
+                render_color_index=meta['render_color_index'],
+                vertex_group_names=meta['vertex_group_names'],
+                weight_offsets=optional('weight_offsets'),
+                weight_groups=optional('weight_groups'),
+                weight_values=optional('weight_values'),
+                shape_key_infos=meta['shape_key_infos'],
+                shape_key_coords=optional('shape_key_coords'),
+                shape_key_use_relative=meta['shape_key_use_relative'],
+                custom_normals=optional('custom_normals'),
+                auto_smooth=meta['auto_smooth'],
+                object_properties=meta['object_properties'],
+                mesh_properties=meta['mesh_properties'],
+            )
+
+    # ------------------------------------------------------------------
+    # 与 Blender 物体之间的转换
+    # ------------------------------------------------------------------
+    @staticmethod
+    def get_unsupported_reason(obj) -> Optional[str]:
+        '''
+        判断物体能否无损地保存为数组，返回 None 表示可以，否则返回原因
+        '''
+        if obj is None or obj.type != 'MESH' or obj.data is None:
+            return "不是 mesh 物体"
+        if len(obj.modifiers) > 0:
+            return "物体仍有未应用的修改器"
+        if len(obj.constraints) > 0:
+            return "物体仍有约束"
+        if obj.parent is not None:
+            return "物体有父级"
+        if any(slot.material is not None for slot in obj.material_slots):
+            return "物体有材质"
+
+        mesh = obj.data
+        known_names = set(_BUILTIN_ATTRIBUTE_NAMES)
+        known_names.update(uv_layer.name for uv_layer in mesh.uv_layers)
+        known_names.update(attribute.name for attribute in mesh.color_attributes)
+        for attribute in mesh.attributes:
+            if attribute.name.startswith('.') or attribute.name in known_names:
+                continue
+            return f"mesh 含有无法保存的属性: {attribute.name}"
+
+        try:
+            json.dumps(_id_properties_to_dict(obj))
+            json.dumps(_id_properties_to_dict(mesh))
+        except (TypeError, ValueError):
+            return "自定义属性无法序列化"
+
+        return None
+
+    @classmethod
+    def from_object(cls, obj) -> "MeshArrays":
+        '''
+        从预处理后的物体读取全部数组，调用前需先用 get_unsupported_reason 检查
+        '''
+        from .vertexgroup_utils import VertexGroupUtils
+
+        mesh = obj.data
+        n_verts = len(mesh.vertices)
+        n_edges = len(mesh.edges)
+        n_loops = len(mesh.loops)
+        n_polys = len(mesh.polygons)
+
+        positions = numpy.empty(n_verts * 3, dtype=numpy.float32)
+        mesh.vertices.foreach_get('co', positions)
+        positions = positions.reshape(-1, 3)
+
+        edges = numpy.empty(n_edges * 2, dtype=numpy.int32)
+        mesh.edges.foreach_get('vertices', edges)
+        edge_sharp = numpy.empty(n_edges, dtype=numpy.bool_)
+        mesh.edges.foreach_get('use_edge_sharp', edge_sharp)
+
+        loop_vertex_indices = numpy.empty(n_loops, dtype=numpy.int32)
+        mesh.loops.foreach_get('vertex_index', loop_vertex_indices)
+        loop_edge_indices = numpy.empty(n_loops, dtype=numpy.int32)
+        mesh.loops.foreach_get('edge_index', loop_edge_indices)
+
+        poly_loop_starts = numpy.empty(n_polys, dtype=numpy.int32)
+        mesh.polygons.foreach_get('loop_start', poly_loop_starts)
+        poly_loop_totals = numpy.empty(n_polys, dtype=numpy.int32)
+        mesh.polygons.foreach_get('loop_total', poly_loop_totals)
+        poly_smooth = numpy.empty(n_polys, dtype=numpy.bool_)
+        mesh.polygons.foreach_get('use_smooth', poly_smooth)
+
+        uv_layer_names = []
+        uv_layers = []
+        active_uv_index = 0
+        active_render_uv_index = 0
+        for i, uv_layer in enumerate(mesh.uv_layers):
+            uv = numpy.empty(n_loops * 2, dtype=numpy.float32)
+            uv_layer.data.foreach_get('uv', uv)
+            uv_layer_names.append(uv_layer.name)
+            uv_layers.append(uv.reshape(-1, 2))
+            if uv_layer.active:
+                active_uv_index = i
+            if uv_layer.active_render:
+                active_render_uv_index = i
+
+        color_attribute_infos = []
+        color_attributes = []
+        for attribute in mesh.color_attributes:
+            color = numpy.empty(len(attribute.data) * 4, dtype=numpy.float32)
+            attribute.data.foreach_get('color', color)
+            color_attribute_infos.append({'name': attribute.name, 'domain': attribute.domain, 'data_type': attribute.data_type})
+            color_attributes.append(color.reshape(-1, 4))
+
+        weight_offsets, weight_groups, weight_values = VertexGroupUtils.collect_vertex_group_weights(mesh)
+
+        shape_key_infos = []
+        shape_key_coords = None
+        shape_key_use_relative = True
+        if mesh.shape_keys is not None:
+            shape_key_use_relative = mesh.shape_keys.use_relative
+            key_blocks = mesh.shape_keys.key_blocks
+            shape_key_coords = numpy.empty((len(key_blocks), n_verts, 3), dtype=numpy.float32)
+            for i, key_block in enumerate(key_blocks):
+                key_block.data.foreach_get('co', shape_key_coords[i].reshape(-1))
+                shape_key_infos.append({
+                    'name': key_block.name,
+                    'value': key_block.value,
+                    'slider_min': key_block.slider_min,
+                    'slider_max': key_block.slider_max,
+                    'mute': key_block.mute,
+                    'interpolation': key_block.interpolation,
+                    'vertex_group': key_block.vertex_group,
+                    'relative_key': key_block.relative_key.name if key_block.relative_key else "",
+                })
+
+        auto_smooth = None
+        if hasattr(mesh, 'use_auto_smooth'):
+            auto_smooth = [bool(mesh.use_auto_smooth), float(mesh.auto_smooth_angle)]
+
+        custom_normals = None
+        if mesh.has_custom_normals:
+            # Blender 4.1 之前需要先计算 split normals 才能读到 Loop 法线
+            if hasattr(mesh, 'calc_normals_split'):
+                mesh.calc_normals_split()
+            custom_normals = numpy.empty(n_loops * 3, dtype=numpy.float32)
+            mesh.loops.foreach_get('normal', custom_normals)
+            custom_normals = custom_normals.reshape(-1, 3)
+
+        return cls(
+            name=obj.name,
+            positions=positions,
+            edges=edges.reshape(-1, 2),
+            edge_sharp=edge_sharp,
+            loop_vertex_indices=loop_vertex_indices,
+            loop_edge_indices=loop_edge_indices,
+            poly_loop_starts=poly_loop_starts,
+            poly_loop_totals=poly_loop_totals,
+            poly_smooth=poly_smooth,
+            matrix_world=numpy.array(obj.matrix_world, dtype=numpy.float32),
+            uv_layer_names=uv_layer_names,
+            uv_layers=uv_layers,
+            active_uv_index=active_uv_index,
+            active_render_uv_index=active_render_uv_index,
+            color_attribute_infos=color_attribute_infos,
+            color_attributes=color_attributes,
+            active_color_index=getattr(mesh.color_attributes, 'active_color_index', -1),
+            render_color_index=getattr(mesh.color_attributes, 'render_color_index', -1),
+            vertex_group_names=[vertex_group.name for vertex_group in obj.vertex_groups],
+            weight_offsets=weight_offsets,
+            weight_groups=weight_groups.astype(numpy.int32),
+            weight_values=weight_values,
+            shape_key_infos=shape_key_infos,
+            shape_key_coords=shape_key_coords,
+            shape_key_use_relative=shape_key_use_relative,
+            custom_normals=custom_normals,
+            auto_smooth=auto_smooth,
+            object_properties=_id_properties_to_dict(obj),
+            mesh_properties=_id_properties_to_dict(mesh),
+        )
+
+    def to_object(self, target_scene, name: Optional[str] = None):
+        '''
+        用 foreach_set 重建物体并链接到 target_scene
+        '''
+        import bpy
+        from mathutils import Matrix
+        from .vertexgroup_utils import VertexGroupUtils
+
+        object_name = name or self.name
+        mesh = bpy.data.meshes.new(object_name)
+
+        mesh.vertices.add(len(self.positions))
+        mesh.vertices.foreach_set('co', self.positions.ravel())
+
+        mesh.edges.add(len(self.edges))
+        mesh.edges.foreach_set('vertices', self.edges.ravel())
+
+        mesh.loops.add(len(self.loop_vertex_indices))
+        mesh.loops.foreach_set('vertex_index', self.loop_vertex_indices)
+        mesh.loops.foreach_set('edge_index', self.loop_edge_indices)
+
+        mesh.polygons.add(len(self.poly_loop_starts))
+        mesh.polygons.foreach_set('loop_start', self.poly_loop_starts)
+        try:
+            # Blender 4.0 之前需要同时设置 loop_total，之后该属性为只读
+            mesh.polygons.foreach_set('loop_total', self.poly_loop_totals)
+        except (AttributeError, TypeError, RuntimeError):
+            pass
+
+        mesh.update()
+
+        mesh.edges.foreach_set('use_edge_sharp', self.edge_sharp)
+        mesh.polygons.foreach_set('use_smooth', self.poly_smooth)
+
+        for uv_name, uv in zip(self.uv_layer_names, self.uv_layers):
+            uv_layer = mesh.uv_layers.new(name=uv_name, do_init=False)
+            uv_layer.data.foreach_set('uv', uv.ravel())
+        if len(mesh.uv_layers) > 0:
+            mesh.uv_layers.active_index = self.active_uv_index
+            mesh.uv_layers[self.active_render_uv_index].active_render = True
+
+        for info, color in zip(self.color_attribute_infos, self.color_attributes):
+            attribute = mesh.color_attributes.new(name=info['name'], type=info['data_type'], domain=info['domain'])
+            attribute.data.foreach_set('color', color.ravel())
+        if self.active_color_index >= 0 and hasattr(mesh.color_attributes, 'active_color_index'):
+            mesh.color_attributes.active_color_index = self.active_color_index
+        if self.render_color_index >= 0 and hasattr(mesh.color_attributes, 'render_color_index'):
+            mesh.color_attributes.render_color_index = self.render_color_index
+
+        if self.auto_smooth is not None and hasattr(mesh, 'use_auto_smooth'):
+            mesh.use_auto_smooth, mesh.auto_smooth_angle = self.auto_smooth
+
+        if self.custom_normals is not None:
+            if hasattr(mesh, 'use_auto_smooth'):
+                mesh.use_auto_smooth = True
+            mesh.normals_split_custom_set(self.custom_normals.tolist())
+
+        for key, value in self.mesh_properties.items():
+            mesh[key] = value
+
+        obj = bpy.data.objects.new(object_name, mesh)
+        obj.matrix_world = Matrix(self.matrix_world.tolist())
+        target_scene.collection.objects.link(obj)
+
+        for key, value in self.object_properties.items():
+            obj[key] = value
+
+        for vertex_group_name in self.vertex_group_names:
+            obj.vertex_groups.new(name=vertex_group_name)
+        if self.weight_offsets is not None and len(self.weight_values) > 0:
+            vertex_ids = numpy.repeat(numpy.arange(self.vertex_count, dtype=numpy.int64), numpy.diff(self.weight_offsets))
+            VertexGroupUtils.add_vertex_weights_bulk(obj, self.weight_groups, vertex_ids, self.weight_values, self.vertex_count)
+
+        if self.shape_key_infos:
+            for info, coords in zip(self.shape_key_infos, self.shape_key_coords):
+                key_block = obj.shape_key_add(name=info['name'], from_mix=False)
+                key_block.data.foreach_set('co', coords.ravel())
+                key_block.slider_min = info['slider_min']
+                key_block.slider_max = info['slider_max']
+                key_block.value = info['value']
+                key_block.mute = info['mute']
+                key_block.interpolation = info['interpolation']
+                key_block.vertex_group = info['vertex_group']
+
+            key_blocks = mesh.shape_keys.key_blocks
+            for info in self.shape_key_infos:
+                if info['relative_key'] in key_blocks:
+                    key_blocks[info['name']].relative_key = key_blocks[info['relative_key']]
+            mesh.shape_keys.use_relative = self.shape_key_use_relative
+
+        return obj
@@ -1,8 +1,65 @@
 import bpy
 import numpy
 
+from dataclasses import dataclass, field
+
 from ..config.main_config import GlobalConfig, LogicName
 
+
+@dataclass
+class TriangleTopology:
+    '''
+    三角化 mesh 的共享拓扑数据
+    形态键之间只有顶点坐标不同，Loop 与三角形的对应关系、UV 都是相同的，
+    所以这里只计算一次，然后给每个形态键重新计算法线和切线时复用。
+    '''
+    loop_vertex_indices:numpy.ndarray = field(repr=False)
+    loop_uvs:numpy.ndarray = field(repr=False)
+    vertex_count:int
+    # True 表示所有面都是平直着色(normals_domain == 'FACE')，否则为全部平滑着色(normals_domain == 'POINT')
+    flat_shading:bool = False
+
+    triangle_loops:numpy.ndarray = field(init=False, repr=False)
+    triangle_vertices:numpy.ndarray = field(init=False, repr=False)
+    uv_edge1:numpy.ndarray = field(init=False, repr=False)
+    uv_edge2:numpy.ndarray = field(init=False, repr=False)
+    uv_inv_det:numpy.ndarray = field(init=False, repr=False)
+    # 平滑着色时，(顶点索引, UV) 相同的 Loop 共享同一个切线空间
+    smooth_tangent_group_ids:numpy.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.triangle_loops = numpy.arange(len(self.loop_vertex_indices), dtype=numpy.int64).reshape(-1, 3)
+        self.triangle_vertices = self.loop_vertex_indices[self.triangle_loops]
+
+        triangle_uvs = self.loop_uvs[self.triangle_loops]
+        self.uv_edge1 = triangle_uvs[:, 1] - triangle_uvs[:, 0]
+        self.uv_edge2 = triangle_uvs[:, 2] - triangle_uvs[:, 0]
+        det = self.uv_edge1[:, 0] * self.uv_edge2[:, 1] - self.uv_edge2[:, 0] * self.uv_edge1[:, 1]
+        self.uv_inv_det = numpy.zeros_like(det)
+        valid = numpy.abs(det) > 1e-12
+        self.uv_inv_det[valid] = 1.0 / det[valid]
+
+        self.smooth_tangent_group_ids = MeshUtils.group_loops_by_bytes([
+            self.loop_vertex_indices.astype(numpy.int32).reshape(-1, 1),
+            self.loop_uvs.astype(numpy.float32),
+        ])
+
+    @classmethod
+    def from_mesh(cls, mesh:bpy.types.Mesh) -> "TriangleTopology":
+        loop_vertex_indices = numpy.empty(len(mesh.loops), dtype=numpy.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vertex_indices)
+
+        # calc_tangents() 默认使用当前激活的UV
+        loop_uvs = numpy.empty(len(mesh.loops) * 2, dtype=numpy.float32)
+        mesh.uv_layers.active.data.foreach_get("uv", loop_uvs)
+
+        return cls(
+            loop_vertex_indices=loop_vertex_indices.astype(numpy.int64),
+            loop_uvs=loop_uvs.reshape(-1, 2),
+            vertex_count=len(mesh.vertices),
+            flat_shading=(getattr(mesh, "normals_domain", "POINT") == 'FACE'),
+        )
+
 class MeshUtils:
 
     @classmethod
@@ -85,4 +142,120 @@ class MeshUtils:
         mesh.normals_split_custom_set(recalculated.tolist())
 
         # 可选：强制所有面为平滑（避免硬边干扰）
-        mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=np.bool_))
\ No newline at end of file
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=np.bool_))
+
+    @staticmethod
+    def get_batched_tbn_blocker(mesh:bpy.types.Mesh) -> str | None:
+        '''
+        判断 mesh 的法线能否只由顶点坐标和拓扑推导出来
+        返回 None 表示可以，否则返回原因
+        '''
+        if len(mesh.polygons) == 0:
+            return "mesh 没有面"
+
+        loop_totals = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        if numpy.any(loop_totals != 3):
+            return "mesh 没有完全三角化"
+
+        if mesh.uv_layers.active is None:
+            return "mesh 没有UV，无法计算切线"
+
+        if mesh.has_custom_normals:
+            return "mesh 含有自定义法线"
+
+        # 存在锐边或平滑/平直混合着色时，Blender 会按扇区计算 Corner 法线
+        if getattr(mesh, "normals_domain", "CORNER") not in ('POINT', 'FACE'):
+            return "mesh 的法线定义在 Corner 上(锐边或混合着色)"
+
+        return None
+
+    @staticmethod
+    def group_loops_by_bytes(columns:list) -> numpy.ndarray:
+        '''
+        把若干 (n, k) 的数组按行拼成字节键，返回每一行所属的分组编号
+        '''
+        n_rows = len(columns[0])
+        key_bytes = numpy.hstack([numpy.ascontiguousarray(column).view(numpy.uint8).reshape(n_rows, -1) for column in columns])
+        key_bytes = numpy.ascontiguousarray(key_bytes)
+        key_rows = key_bytes.view(numpy.dtype((numpy.void, key_bytes.shape[1]))).reshape(-1)
+        _, group_ids = numpy.unique(key_rows, return_inverse=True)
+        return group_ids.reshape(-1)
+
+    @staticmethod
+    def _normalize_rows(vectors:numpy.ndarray) -> numpy.ndarray:
+        lengths = numpy.linalg.norm(vectors, axis=-1, keepdims=True)
+        return numpy.divide(vectors, lengths, out=numpy.zeros_like(vectors), where=lengths > 1e-20)
+
+    @staticmethod
+    def _scatter_add_rows(group_ids:numpy.ndarray, values:numpy.ndarray, group_count:int) -> numpy.ndarray:
+        result = numpy.empty((group_count, values.shape[1]), dtype=numpy.float64)
+        for component in range(values.shape[1]):
+            result[:, component] = numpy.bincount(group_ids, weights=values[:, component], minlength=group_count)
+        return result
+
+    @staticmethod
+    def calc_loop_normals_tangents(vertex_coords:numpy.ndarray, topology:TriangleTopology):
+        '''
+        根据顶点坐标与共享拓扑，批量计算每个 Loop 的法线、切线和副切线符号，不需要 Blender 重新 evaluate mesh
+
+        - 平滑着色: 法线为按角度加权的面法线之和，与 Blender 的顶点法线一致
+        - 平直着色: 法线为面法线
+        - 切线: 按三角形 UV 梯度计算，在共享切线空间的 Loop 之间按角度加权累加后对法线正交化，
+          副切线符号满足 bitangent = sign * cross(normal, tangent)，与 calc_tangents() 的约定一致
+
+        返回 (normals (L,3), tangents (L,3), bitangent_signs (L,)) ，均为 float32
+        '''
+        loop_count = len(topology.loop_vertex_indices)
+        triangle_loops = topology.triangle_loops.reshape(-1)
+        triangle_positions = vertex_coords.astype(numpy.float64)[topology.triangle_vertices]
+
+        edge1 = triangle_positions[:, 1] - triangle_positions[:, 0]
+        edge2 = triangle_positions[:, 2] - triangle_positions[:, 0]
+        face_normals = MeshUtils._normalize_rows(numpy.cross(edge1, edge2))
+
+        # 每个角的内角，作为累加权重
+        to_next = MeshUtils._normalize_rows(triangle_positions[:, [1, 2, 0]] - triangle_positions)
+        to_prev = MeshUtils._normalize_rows(triangle_positions[:, [2, 0, 1]] - triangle_positions)
+        corner_angles = numpy.arccos(numpy.clip(numpy.sum(to_next * to_prev, axis=-1), -1.0, 1.0)).reshape(-1)
+
+        corner_face_normals = numpy.repeat(face_normals, 3, axis=0)
+        loop_normals = numpy.empty((loop_count, 3), dtype=numpy.float64)
+        if topology.flat_shading:
+            loop_normals[triangle_loops] = corner_face_normals
+            tangent_group_ids = MeshUtils.group_loops_by_bytes([
+                topology.loop_vertex_indices.astype(numpy.int32).reshape(-1, 1),
+                topology.loop_uvs.astype(numpy.float32),
+                loop_normals.astype(numpy.float32),
+            ])
+        else:
+            vertex_normals = MeshUtils._scatter_add_rows(
+                topology.triangle_vertices.reshape(-1),
+                corner_face_normals * corner_angles[:, None],
+                topology.vertex_count)
+            loop_normals = MeshUtils._normalize_rows(vertex_normals)[topology.loop_vertex_indices]
+            tangent_group_ids = topology.smooth_tangent_group_ids
+
+        # 每个三角形的 UV 切线与副切线
+        uv_edge1 = topology.uv_edge1
+        uv_edge2 = topology.uv_edge2
+        inv_det = topology.uv_inv_det[:, None]
+        face_tangents = (edge1 * uv_edge2[:, 1:2] - edge2 * uv_edge1[:, 1:2]) * inv_det
+        face_bitangents = (edge2 * uv_edge1[:, 0:1] - edge1 * uv_edge2[:, 0:1]) * inv_det
+
+        group_count = int(tangent_group_ids.max()) + 1 if loop_count > 0 else 0
+        corner_groups = tangent_group_ids[triangle_loops]
+        group_tangents = MeshUtils._scatter_add_rows(corner_groups, numpy.repeat(face_tangents, 3, axis=0) * corner_angles[:, None], group_count)
+        group_bitangents = MeshUtils._scatter_add_rows(corner_groups, numpy.repeat(face_bitangents, 3, axis=0) * corner_angles[:, None], group_count)
+
+        loop_tangents = group_tangents[tangent_group_ids]
+        loop_bitangents = group_bitangents[tangent_group_ids]
+
+        # Gram-Schmidt 正交化
+        loop_tangents = loop_tangents - loop_normals * numpy.sum(loop_normals * loop_tangents, axis=-1, keepdims=True)
+        loop_tangents = MeshUtils._normalize_rows(loop_tangents)
+
+        handedness = numpy.sum(numpy.cross(loop_normals, loop_tangents) * loop_bitangents, axis=-1)
+        bitangent_signs = numpy.where(handedness < 0.0, -1.0, 1.0)
+
+        return loop_normals.astype(numpy.float32), loop_tangents.astype(numpy.float32), bitangent_signs.astype(numpy.float32)
@@ -12,6 +12,28 @@ from typing import List, Dict, Tuple, Optional, TYPE_CHECKING
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from .performance_stats import record_parallel_schedule
+
+# 常驻工作进程协议行的前缀，用于和 Blender 自身输出的日志区分
+WORKER_PROTOCOL_PREFIX = "@@SSMT_WORKER@@ "
+
+# 预处理成本估计中各类修改器的相对权重，未列出的启用修改器按 1.0 计算
+PREPROCESS_MODIFIER_COST_WEIGHTS = {
+    'ARMATURE': 1.0,
+    'MIRROR': 1.0,
+    'SOLIDIFY': 1.5,
+    'ARRAY': 2.0,
+    'BEVEL': 2.0,
+    'SHRINKWRAP': 2.0,
+    'DATA_TRANSFER': 2.0,
+    'NODES': 3.0,
+    'SUBSURF': 4.0,
+    'MULTIRES': 4.0,
+}
+
+# 每个物体与顶点数无关的固定开销（复制、三角化、应用变换等），以顶点数为单位
+PREPROCESS_OBJECT_BASE_COST = 2000.0
+
 if TYPE_CHECKING:
     import bpy
 
@@ -39,20 +61,45 @@ class PreprocessResult:
 
 class ParallelPreprocessManager:
     """多进程并行预处理管理器"""
+
+    # 每单位预估成本对应的实际秒数，用上一次并行预处理的实际耗时校准，同一个 Blender 会话内有效
+    seconds_per_cost_unit: Optional[float] = None
     
-    def __init__(self, num_workers: Optional[int] = None):
+    def __init__(self, num_workers: Optional[int] = None, use_persistent_pool: bool = True):
         self.num_workers = num_workers or max(1, multiprocessing.cpu_count() - 1)
+        self.use_persistent_pool = use_persistent_pool
         self.temp_dir = None
         self.tasks: List[PreprocessTask] = []
         self.results: List[PreprocessResult] = []
         self.validation_error: Optional[str] = None
+        self.task_costs: Dict[int, float] = {}
     
+    @staticmethod
+    def estimate_object_cost(obj) -> float:
+        """
+        估计单个物体的预处理成本：顶点数 × 修改器权重 × 形态键数量
+        带形态键应用修改器时每个形态键都要单独计算一次，所以有启用的修改器时成本随形态键数量线性增长
+        """
+        if obj is None or obj.type != 'MESH':
+            return PREPROCESS_OBJECT_BASE_COST
+
+        vertex_count = len(obj.data.vertices)
+        enabled_modifiers = [mod for mod in obj.modifiers if mod.show_viewport]
+        modifier_weight = 1.0 + sum(PREPROCESS_MODIFIER_COST_WEIGHTS.get(mod.type, 1.0) for mod in enabled_modifiers)
+
+        shapekey_count = 0
+        if enabled_modifiers and obj.data.shape_keys is not None:
+            shapekey_count = max(0, len(obj.data.shape_keys.key_blocks) - 1)
+
+        return PREPROCESS_OBJECT_BASE_COST + vertex_count * modifier_weight * (1 + shapekey_count)
+
     def preprocess_parallel(
         self,
         blend_file: str,
         object_names: List[str],
         mirror_workflow: bool = False,
-        progress_callback=None
+        progress_callback=None,
+        object_costs: Optional[Dict[str, float]] = None
     ) -> Dict[str, str]:
         """
         并行预处理入口函数
@@ -62,6 +109,7 @@ class ParallelPreprocessManager:
             object_names: 物体名称列表
             mirror_workflow: 是否启用非镜像工作流
             progress_callback: 进度回调函数
+            object_costs: {物体名: 预估成本}，提供时按成本做负载均衡，否则按数量平均分配
         
         Returns:
             字典: {原始物体名: 预处理后的blend文件路径}
@@ -74,12 +122,20 @@ class ParallelPreprocessManager:
                 print("[ParallelPreprocess] 物体数量不足，使用单进程模式")
                 return None
             
-            subsets = self._split_objects(object_names)
+            subsets = self._split_objects(object_names, object_costs)
             
             self._create_tasks(blend_file, subsets, mirror_workflow)
+            if object_costs:
+                self.task_costs = {
+                    task.task_id: sum(object_costs.get(name, PREPROCESS_OBJECT_BASE_COST) for name in task.object_names)
+                    for task in self.tasks
+                }
             
             self._run_workers(progress_callback)
             
+            if self.task_costs:
+                self._record_schedule()
+            
             if self.validation_error:
                 return None
             
@@ -95,6 +151,39 @@ class ParallelPreprocessManager:
         finally:
             pass
     
+    def _record_schedule(self) -> None:
+        """
+        对比预测与实际的 makespan 并写入性能报告，同时用本次的实际耗时校准成本到秒数的换算
+        预测时间使用之前的校准值，首次运行没有校准值时使用本次的平均值
+        """
+        result_dict = {result.task_id: result for result in self.results}
+        finished_task_ids = [task_id for task_id, result in result_dict.items() if result.success and task_id in self.task_costs]
+
+        total_cost = sum(self.task_costs[task_id] for task_id in finished_task_ids)
+        total_time = sum(result_dict[task_id].processing_time for task_id in finished_task_ids)
+        if total_cost <= 0:
+            return
+
+        current_rate = total_time / total_cost
+        rate = ParallelPreprocessManager.seconds_per_cost_unit or current_rate
+        ParallelPreprocessManager.seconds_per_cost_unit = current_rate
+
+        task_rows = []
+        for task in self.tasks:
+            result = result_dict.get(task.task_id)
+            task_rows.append({
+                'task_id': task.task_id,
+                'object_count': len(task.object_names),
+                'cost': self.task_costs.get(task.task_id, 0.0),
+                'predicted_time': self.task_costs.get(task.task_id, 0.0) * rate,
+                'actual_time': result.processing_time if result else 0.0
+            })
+
+        predicted_makespan = max(row['predicted_time'] for row in task_rows)
+        actual_makespan = max(row['actual_time'] for row in task_rows)
+        print(f"[ParallelPreprocess] 预测 makespan: {predicted_makespan:.2f} 秒, 实际 makespan: {actual_makespan:.2f} 秒")
+        record_parallel_schedule("ParallelPreprocess", predicted_makespan, actual_makespan, task_rows)
+    
     def cleanup(self):
         """清理临时文件"""
         if self.temp_dir and os.path.exists(self.temp_dir):
@@ -104,7 +193,7 @@ class ParallelPreprocessManager:
             except Exception as e:
                 print(f"[ParallelPreprocess] 清理失败: {e}")
     
-    def _split_objects(self, object_names: List[str]) -> List[List[str]]:
+    def _split_objects(self, object_names: List[str], object_costs: Optional[Dict[str, float]] = None) -> List[List[str]]:
         """将物体列表分割成多个子集"""
         num_objects = len(object_names)
         actual_workers = min(self.num_workers, num_objects)
@@ -112,6 +201,9 @@ class ParallelPreprocessManager:
         if actual_workers == 0:
             return []
         
+        if object_costs:
+            return self._split_objects_by_cost(object_names, object_costs, actual_workers)
+        
         subset_size = num_objects // actual_workers
         remainder = num_objects % actual_workers
         
@@ -129,6 +221,35 @@ class ParallelPreprocessManager:
             print(f"[ParallelPreprocess] 子集 {i}: {len(subset)} 个物体")
         return subsets
     
+    @staticmethod
+    def _split_objects_by_cost(object_names: List[str], object_costs: Dict[str, float], actual_workers: int) -> List[List[str]]:
+        """
+        最长处理时间优先（LPT）贪心分配：按预估成本从大到小，每次把物体放进当前总成本最小的子集
+        """
+        import heapq
+
+        ordered_names = sorted(
+            object_names,
+            key=lambda name: object_costs.get(name, PREPROCESS_OBJECT_BASE_COST),
+            reverse=True
+        )
+
+        subsets: List[List[str]] = [[] for _ in range(actual_workers)]
+        subset_costs = [0.0] * actual_workers
+        heap = [(0.0, i) for i in range(actual_workers)]
+        for name in ordered_names:
+            load, subset_index = heapq.heappop(heap)
+            subsets[subset_index].append(name)
+            load += object_costs.get(name, PREPROCESS_OBJECT_BASE_COST)
+            subset_costs[subset_index] = load
+            heapq.heappush(heap, (load, subset_index))
+
+        non_empty = [(subset, cost) for subset, cost in zip(subsets, subset_costs) if subset]
+        print(f"[ParallelPreprocess] 按预估成本分割 {len(object_names)} 个物体到 {len(non_empty)} 个子集")
+        for i, (subset, cost) in enumerate(non_empty):
+            print(f"[ParallelPreprocess] 子集 {i}: {len(subset)} 个物体, 预估成本 {cost:.0f}")
+        return [subset for subset, _ in non_empty]
+    
     def _create_tasks(
         self,
         blend_file: str,
@@ -167,6 +288,12 @@ class ParallelPreprocessManager:
         
         print(f"[ParallelPreprocess] Blender 可执行文件: {blender_exe}")
         
+        if self.use_persistent_pool and self.tasks:
+            pool = get_worker_pool(blender_exe, self.tasks[0].blend_file, self.num_workers)
+            print(f"[ParallelPreprocess] 使用常驻工作进程池执行 {len(self.tasks)} 个任务...")
+            self.results.extend(pool.run_tasks(self.tasks, progress_callback))
+            return
+        
         print(f"[ParallelPreprocess] 启动 {len(self.tasks)} 个工作进程...")
         
         result_queue = queue.Queue()
@@ -226,15 +353,12 @@ class ParallelPreprocessManager:
         print(f"[ParallelPreprocess] 所有线程已结束")
     
     @staticmethod
-    def _run_single_worker(blender_exe: str, task: PreprocessTask) -> PreprocessResult:
-        """运行单个工作进程 - 执行预处理（优化版）"""
-        start_time = datetime.now()
-        
-        try:
-            addon_name = "ssmt_theherta_plugin"
-            
-            # 优化：预生成脚本，避免每次都生成
-            script = f'''
+    def _build_worker_script(task: Optional[PreprocessTask] = None) -> str:
+        """
+        生成在 Blender 后台进程中执行的预处理脚本
+        task 不为 None 时处理该任务后退出；为 None 时生成常驻工作进程脚本，通过 stdin/stdout 的 JSON 行协议接收任务
+        """
+        script_imports = '''
 import bpy
 import sys
 import json
@@ -242,36 +366,9 @@ import os
 import traceback
 import time
 
-# 优化：控制日志级别，减少不必要的输出
-VERBOSE = False
-
-if VERBOSE:
-    print("=" * 50)
-    print(f"[Worker {task.task_id}] 脚本开始执行")
-    print(f"[Worker {task.task_id}] Python 路径: {{sys.path[:3]}}")
-    print("=" * 50)
-
-# 任务参数
-task_id = {task.task_id}
-object_names = {json.dumps(task.object_names)}
-mirror_workflow = {str(task.mirror_workflow)}
-output_blend = r"{task.output_blend}"
-
-if VERBOSE:
-    print(f"[Worker {{task_id}}] 物体数量: {{len(object_names)}}")
-    print(f"[Worker {{task_id}}] 非镜像工作流: {{mirror_workflow}}")
-    print(f"[Worker {{task_id}}] 输出文件: {{output_blend}}")
-
-# 检查物体是否存在
-if VERBOSE:
-    for obj_name in object_names:
-        obj = bpy.data.objects.get(obj_name)
-        if obj:
-            print(f"[Worker {{task_id}}] 找到物体: {{obj_name}} (类型: {{obj.type}})")
-        else:
-            print(f"[Worker {{task_id}}] 警告: 物体不存在 {{obj_name}}")
-
+'''
 
+        script_helpers = f'''
 def reset_shapekey_values(obj):
     """重置所有形态键值为0"""
     if obj.data.shape_keys is None:
@@ -753,122 +850,293 @@ def apply_all_transforms(obj):
     print(f"变换已应用，原点已回到世界中心: {{obj.name}}")
 
 
-processed_objects = []
+def detach_external_references(copy_objects):
+    """
+    断开副本对副本以外物体的引用（父级、修改器、约束中的物体指针），
+    与单次模式中删除所有非副本物体后的结果保持一致，同时避免被引用的物体被一起写入文件
+    """
+    copy_set = set(copy_objects)
+    for copy_obj in copy_objects:
+        if copy_obj.parent is not None and copy_obj.parent not in copy_set:
+            copy_obj.parent = None
+        for owner in list(copy_obj.modifiers) + list(copy_obj.constraints):
+            for prop in owner.bl_rna.properties:
+                if prop.type != 'POINTER' or prop.is_readonly:
+                    continue
+                value = getattr(owner, prop.identifier, None)
+                if isinstance(value, bpy.types.Object) and value not in copy_set:
+                    try:
+                        setattr(owner, prop.identifier, None)
+                    except Exception:
+                        pass
+
 
-for obj_name in object_names:
+def write_processed_copies(processed_objects, created_copies, output_blend, task_id):
+    """只把处理后的副本写入 output_blend，然后从当前会话中删除所有副本"""
+    copy_objects = [bpy.data.objects[name] for name in processed_objects if name in bpy.data.objects]
     try:
-        obj = bpy.data.objects.get(obj_name)
-        if not obj:
-            print(f"[Worker {{task_id}}] 跳过不存在的物体: {{obj_name}}")
+        detach_external_references(copy_objects)
+        bpy.data.libraries.write(output_blend, set(copy_objects), compress=True)
+    except Exception as e:
+        print(f"[Worker {{task_id}}] 保存失败: {{e}}")
+        traceback.print_exc()
+
+    for copy_name in created_copies:
+        copy_obj = bpy.data.objects.get(copy_name)
+        if copy_obj is None:
             continue
-        
-        if obj.type != 'MESH':
+        copy_mesh = copy_obj.data if copy_obj.type == 'MESH' else None
+        bpy.data.objects.remove(copy_obj, do_unlink=True)
+        if copy_mesh is not None and copy_mesh.users == 0:
+            bpy.data.meshes.remove(copy_mesh)
+
+
+def send_message(message):
+    """协议消息单独占一行并带有前缀，与 Blender 自身的日志输出区分开"""
+    sys.stdout.write("{WORKER_PROTOCOL_PREFIX}" + json.dumps(message, ensure_ascii=False) + "\\n")
+    sys.stdout.flush()
+
+
+def run_worker_loop():
+    """常驻工作进程主循环：每行一个 JSON 任务，处理完成后回复一行 JSON 结果"""
+    send_message({{"type": "ready", "blend_file": bpy.data.filepath}})
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            message = json.loads(line)
+        except Exception as e:
+            send_message({{"type": "error", "error_message": str(e)}})
             continue
+
+        message_type = message.get("type")
+        if message_type == "shutdown":
+            break
+        if message_type != "task":
+            continue
+
+        global task_id
+        task_id = message["task_id"]
+        start_time = time.time()
+        task_output_blend = message["output_blend"]
+        try:
+            task_processed_objects = process_batch(
+                message["task_id"],
+                message["object_names"],
+                message["mirror_workflow"],
+                task_output_blend,
+                persistent=True
+            )
+            send_message({{
+                "type": "result",
+                "task_id": message["task_id"],
+                "success": os.path.exists(task_output_blend),
+                "error_message": "",
+                "processed_objects": task_processed_objects,
+                "output_blend": task_output_blend,
+                "processing_time": time.time() - start_time
+            }})
+        except Exception as e:
+            traceback.print_exc()
+            send_message({{
+                "type": "result",
+                "task_id": message["task_id"],
+                "success": False,
+                "error_message": str(e),
+                "processed_objects": [],
+                "output_blend": "",
+                "processing_time": time.time() - start_time
+            }})
+    send_message({{"type": "bye"}})
+
+
+def process_batch(task_id, object_names, mirror_workflow, output_blend, persistent=False):
+    """
+    处理一批物体并保存到 output_blend
+    persistent=True 时只写出副本并在结束后删除，保持当前会话中的原始场景不变，供常驻工作进程复用
+    """
+    processed_objects = []
+    created_copies = []
+
+    for obj_name in object_names:
+        try:
+            obj = bpy.data.objects.get(obj_name)
+            if not obj:
+                print(f"[Worker {{task_id}}] 跳过不存在的物体: {{obj_name}}")
+                continue
         
-        # 1. 创建副本，使用标准命名规范
-        copy_obj = obj.copy()
-        copy_obj.data = obj.data.copy()
-        if obj_name.endswith("-Original"):
-            copy_obj.name = obj_name.replace("-Original", "-copy_Original")
-        else:
-            copy_obj.name = obj_name + "_copy"
-        bpy.context.scene.collection.objects.link(copy_obj)
+            if obj.type != 'MESH':
+                continue
         
-        # 优化：先删除禁用的修改器，减少后续处理开销
-        disabled_modifiers = [mod for mod in copy_obj.modifiers if not mod.show_viewport]
-        for mod in reversed(disabled_modifiers):
-            copy_obj.modifiers.remove(mod)
+            # 1. 创建副本，使用标准命名规范
+            copy_obj = obj.copy()
+            copy_obj.data = obj.data.copy()
+            if obj_name.endswith("-Original"):
+                copy_obj.name = obj_name.replace("-Original", "-copy_Original")
+            else:
+                copy_obj.name = obj_name + "_copy"
+            bpy.context.scene.collection.objects.link(copy_obj)
+            created_copies.append(copy_obj.name)
         
-        # 2. 应用修改器 - 与单进程模式完全一致
-        # 优化：只检查启用的骨骼修改器
-        has_enabled_armature = any(
-            mod.type == 'ARMATURE' and mod.show_viewport 
-            for mod in copy_obj.modifiers
-        )
-        if mirror_workflow:
+            # 优化：先删除禁用的修改器，减少后续处理开销
+            disabled_modifiers = [mod for mod in copy_obj.modifiers if not mod.show_viewport]
+            for mod in reversed(disabled_modifiers):
+                copy_obj.modifiers.remove(mod)
+        
+            # 2. 应用修改器 - 与单进程模式完全一致
+            # 优化：只检查启用的骨骼修改器
+            has_enabled_armature = any(
+                mod.type == 'ARMATURE' and mod.show_viewport 
+                for mod in copy_obj.modifiers
+            )
+            if mirror_workflow:
+                try:
+                    prepare_copy_for_mirror_workflow(copy_obj)
+                except Exception as e:
+                    print(f"[Worker {{task_id}}] 前处理失败 {{copy_obj.name}}: {{e}}")
+                    traceback.print_exc()
+            elif has_enabled_armature:
+                try:
+                    apply_all_modifiers(copy_obj)
+                except Exception as e:
+                    print(f"[Worker {{task_id}}] 应用修改器失败 {{copy_obj.name}}: {{e}}")
+                    traceback.print_exc()
+        
+            # 3. BEAUTY三角化
             try:
-                prepare_copy_for_mirror_workflow(copy_obj)
+                mesh_triangulate_beauty(copy_obj)
             except Exception as e:
-                print(f"[Worker {{task_id}}] 前处理失败 {{copy_obj.name}}: {{e}}")
+                print(f"[Worker {{task_id}}] 三角化失败 {{copy_obj.name}}: {{e}}")
                 traceback.print_exc()
-        elif has_enabled_armature:
+        
+            # 3.5 应用全部变换，让原点回到世界中心
             try:
-                apply_all_modifiers(copy_obj)
+                apply_all_transforms(copy_obj)
             except Exception as e:
-                print(f"[Worker {{task_id}}] 应用修改器失败 {{copy_obj.name}}: {{e}}")
+                print(f"[Worker {{task_id}}] 应用变换失败 {{copy_obj.name}}: {{e}}")
                 traceback.print_exc()
         
-        # 3. BEAUTY三角化
-        try:
-            mesh_triangulate_beauty(copy_obj)
-        except Exception as e:
-            print(f"[Worker {{task_id}}] 三角化失败 {{copy_obj.name}}: {{e}}")
-            traceback.print_exc()
+            # 4. 清除材质，减少文件体积
+            try:
+                clear_materials(copy_obj)
+            except Exception as e:
+                print(f"[Worker {{task_id}}] 清除材质失败 {{copy_obj.name}}: {{e}}")
+        
+            # 5. 非镜像工作流后处理 - 与单进程模式完全一致
+            if mirror_workflow:
+                try:
+                    apply_mirror_transform(copy_obj)
+                    flip_face_normals(copy_obj)
+                except Exception as e:
+                    print(f"[Worker {{task_id}}] 后处理失败 {{copy_obj.name}}: {{e}}")
+                    traceback.print_exc()
+        
+            # 记录副本名称（用于加载时匹配）
+            processed_objects.append(copy_obj.name)
         
-        # 3.5 应用全部变换，让原点回到世界中心
-        try:
-            apply_all_transforms(copy_obj)
         except Exception as e:
-            print(f"[Worker {{task_id}}] 应用变换失败 {{copy_obj.name}}: {{e}}")
+            print(f"[Worker {{task_id}}] 处理物体 {{obj_name}} 时出错: {{e}}")
             traceback.print_exc()
-        
-        # 4. 清除材质，减少文件体积
+
+    if persistent:
+        write_processed_copies(processed_objects, created_copies, output_blend, task_id)
+    else:
+        # 删除所有非副本物体，只保留预处理后的副本
+        copy_names_set = set(processed_objects)
+        objects_to_remove = [obj for obj in bpy.data.objects if obj.name not in copy_names_set]
+        for obj in objects_to_remove:
+            bpy.data.objects.remove(obj, do_unlink=True)
+
+        # 清理未使用的材质和数据块，进一步减小体积
+        try:
+            bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+        except:
+            pass
+
+        # 保存预处理结果
         try:
-            clear_materials(copy_obj)
+            bpy.ops.wm.save_as_mainfile(filepath=output_blend, compress=True)
         except Exception as e:
-            print(f"[Worker {{task_id}}] 清除材质失败 {{copy_obj.name}}: {{e}}")
-        
-        # 5. 非镜像工作流后处理 - 与单进程模式完全一致
-        if mirror_workflow:
-            try:
-                apply_mirror_transform(copy_obj)
-                flip_face_normals(copy_obj)
-            except Exception as e:
-                print(f"[Worker {{task_id}}] 后处理失败 {{copy_obj.name}}: {{e}}")
-                traceback.print_exc()
-        
-        # 记录副本名称（用于加载时匹配）
-        processed_objects.append(copy_obj.name)
-        
+            print(f"[Worker {{task_id}}] 保存失败: {{e}}")
+            traceback.print_exc()
+
+    # 写入结果文件
+    result_file = output_blend.replace('.blend', '_result.json')
+    result_data = {{
+        "task_id": task_id,
+        "success": True,
+        "processed_objects": processed_objects,
+        "output_blend": output_blend
+    }}
+    try:
+        with open(result_file, 'w', encoding='utf-8') as f:
+            json.dump(result_data, f, ensure_ascii=False)
     except Exception as e:
-        print(f"[Worker {{task_id}}] 处理物体 {{obj_name}} 时出错: {{e}}")
-        traceback.print_exc()
+        print(f"[Worker {{task_id}}] 写入结果失败: {{e}}")
+
+    print(f"[Worker {{task_id}}] 完成: {{len(processed_objects)}} 个物体")
+    return processed_objects
+'''
+
+        if task is None:
+            return script_imports + '''
+VERBOSE = False
+
+# 当前任务编号，辅助函数的日志中会用到，由 run_worker_loop 在每个任务开始时更新
+task_id = -1
+
+''' + script_helpers + '''
 
-# 删除所有非副本物体，只保留预处理后的副本
-copy_names_set = set(processed_objects)
-objects_to_remove = [obj for obj in bpy.data.objects if obj.name not in copy_names_set]
-for obj in objects_to_remove:
-    bpy.data.objects.remove(obj, do_unlink=True)
-
-# 清理未使用的材质和数据块，进一步减小体积
-try:
-    bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
-except:
-    pass
-
-# 保存预处理结果
-try:
-    bpy.ops.wm.save_as_mainfile(filepath=output_blend, compress=True)
-except Exception as e:
-    print(f"[Worker {{task_id}}] 保存失败: {{e}}")
-    traceback.print_exc()
-
-# 写入结果文件
-result_file = output_blend.replace('.blend', '_result.json')
-result_data = {{
-    "task_id": task_id,
-    "success": True,
-    "processed_objects": processed_objects,
-    "output_blend": output_blend
-}}
-try:
-    with open(result_file, 'w', encoding='utf-8') as f:
-        json.dump(result_data, f, ensure_ascii=False)
-except Exception as e:
-    print(f"[Worker {{task_id}}] 写入结果失败: {{e}}")
-
-print(f"[Worker {{task_id}}] 完成: {{len(processed_objects)}} 个物体")
+run_worker_loop()
 '''
+
+        return script_imports + f'''
+# 优化：控制日志级别，减少不必要的输出
+VERBOSE = False
+
+if VERBOSE:
+    print("=" * 50)
+    print(f"[Worker {task.task_id}] 脚本开始执行")
+    print(f"[Worker {task.task_id}] Python 路径: {{sys.path[:3]}}")
+    print("=" * 50)
+
+# 任务参数
+task_id = {task.task_id}
+object_names = {json.dumps(task.object_names)}
+mirror_workflow = {str(task.mirror_workflow)}
+output_blend = r"{task.output_blend}"
+
+if VERBOSE:
+    print(f"[Worker {{task_id}}] 物体数量: {{len(object_names)}}")
+    print(f"[Worker {{task_id}}] 非镜像工作流: {{mirror_workflow}}")
+    print(f"[Worker {{task_id}}] 输出文件: {{output_blend}}")
+
+# 检查物体是否存在
+if VERBOSE:
+    for obj_name in object_names:
+        obj = bpy.data.objects.get(obj_name)
+        if obj:
+            print(f"[Worker {{task_id}}] 找到物体: {{obj_name}} (类型: {{obj.type}})")
+        else:
+            print(f"[Worker {{task_id}}] 警告: 物体不存在 {{obj_name}}")
+
+
+''' + script_helpers + '''
+
+process_batch(task_id, object_names, mirror_workflow, output_blend)
+'''
+
+    @staticmethod
+    def _run_single_worker(blender_exe: str, task: PreprocessTask) -> PreprocessResult:
+        """运行单个工作进程 - 执行预处理（优化版）"""
+        start_time = datetime.now()
+        
+        try:
+            addon_name = "ssmt_theherta_plugin"
+            
+            # 优化：预生成脚本，避免每次都生成
+            script = ParallelPreprocessManager._build_worker_script(task)
             
             script_file = os.path.join(
                 os.path.dirname(task.output_blend),
@@ -1017,6 +1285,313 @@ print(f"[Worker {{task_id}}] 完成: {{len(processed_objects)}} 个物体")
         return (user_path, None)
 
 
+class PersistentPreprocessWorker:
+    """
+    常驻的 Blender 后台工作进程，整个生命周期内只加载一次 .blend 文件
+
+    协议：stdin/stdout 上每行一个 JSON 消息，工作进程输出的协议行带有 WORKER_PROTOCOL_PREFIX 前缀，
+    其余输出视为日志写入 log_file。
+    - 工作进程启动后发送 {"type": "ready"}
+    - 管理器发送 {"type": "task", ...PreprocessTask 字段}，工作进程回复 {"type": "result", ...PreprocessResult 字段}
+    - 管理器发送 {"type": "shutdown"}，工作进程回复 {"type": "bye"} 后退出
+    """
+
+    def __init__(self, worker_id: int, command: List[str], log_file: str):
+        self.worker_id = worker_id
+        self.command = command
+        self.log_file = log_file
+        self.process: Optional[subprocess.Popen] = None
+        self._message_queue = None
+        self._reader_thread = None
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, timeout: float = 600) -> bool:
+        """启动工作进程并等待 ready 消息"""
+        import threading
+        import queue
+
+        self._message_queue = queue.Queue()
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1
+        )
+        self._reader_thread = threading.Thread(target=self._read_output, args=(self.process, self._message_queue), daemon=True)
+        self._reader_thread.start()
+
+        message = self._wait_message(timeout)
+        if message is None or message.get("type") != "ready":
+            print(f"[WorkerPool] 工作进程 {self.worker_id} 启动失败: {message}")
+            self.close()
+            return False
+
+        print(f"[WorkerPool] 工作进程 {self.worker_id} 已就绪")
+        return True
+
+    def _read_output(self, process: subprocess.Popen, message_queue):
+        """
+        读取工作进程的输出，协议行放入消息队列，其余写入日志文件
+        进程和队列作为参数传入，工作进程重启后旧的读取线程不会把 exit 消息放进新进程的队列
+        """
+        prefix_length = len(WORKER_PROTOCOL_PREFIX)
+        with open(self.log_file, 'a', encoding='utf-8') as log:
+            for line in process.stdout:
+                if line.startswith(WORKER_PROTOCOL_PREFIX):
+                    try:
+                        message_queue.put(json.loads(line[prefix_length:]))
+                    except ValueError as e:
+                        log.write(f"[WorkerPool] 无法解析协议消息: {e}: {line}")
+                else:
+                    log.write(line)
+            log.flush()
+        message_queue.put({"type": "exit"})
+
+    def _wait_message(self, timeout: float) -> Optional[dict]:
+        import queue
+        try:
+            return self._message_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _send(self, message: dict):
+        self.process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+        self.process.stdin.flush()
+
+    def run_task(self, task: PreprocessTask, timeout: float = 1800) -> PreprocessResult:
+        """发送一个任务并等待结果"""
+        start_time = datetime.now()
+        try:
+            message = asdict(task)
+            message["type"] = "task"
+            self._send(message)
+
+            while True:
+                reply = self._wait_message(timeout)
+                if reply is None:
+                    # 工作进程可能卡死，不再等待它响应 shutdown，直接结束
+                    self.kill()
+                    error_message = "预处理超时"
+                    break
+                if reply.get("type") == "exit":
+                    # 输出已经关闭，进程可能还没有被回收，这里回收掉，下一个任务会重新启动
+                    self.kill()
+                    error_message = f"工作进程意外退出，日志文件: {self.log_file}"
+                    break
+                if reply.get("type") == "result" and reply.get("task_id") == task.task_id:
+                    return PreprocessResult(
+                        task_id=task.task_id,
+                        success=bool(reply.get("success")),
+                        error_message=reply.get("error_message", ""),
+                        processed_objects=reply.get("processed_objects", []),
+                        output_blend=reply.get("output_blend", ""),
+                        processing_time=float(reply.get("processing_time", 0))
+                    )
+        except (OSError, ValueError) as e:
+            error_message = str(e)
+
+        return PreprocessResult(
+            task_id=task.task_id,
+            success=False,
+            error_message=error_message,
+            processed_objects=[],
+            output_blend="",
+            processing_time=(datetime.now() - start_time).total_seconds()
+        )
+
+    def kill(self):
+        """强制结束工作进程"""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        try:
+            self.process.stdin.close()
+        except (OSError, ValueError):
+            pass
+        self.process = None
+
+    def close(self, timeout: float = 30):
+        """通知工作进程退出，超时则强制结束"""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            try:
+                self._send({"type": "shutdown"})
+                self.process.stdin.close()
+                self.process.wait(timeout=timeout)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+
+class PersistentWorkerPool:
+    """
+    常驻工作进程池，每个工作进程只加载一次 .blend 文件，
+    在同一次 SSMTGenerateModBlueprint 的多轮导出之间复用，blend 文件的修改时间变化时才重启
+    """
+
+    def __init__(self, blender_exe: str, blend_file: str, num_workers: int, command_builder=None, task_timeout: float = 1800):
+        self.blender_exe = blender_exe
+        self.blend_file = blend_file
+        self.blend_mtime = os.path.getmtime(blend_file) if os.path.exists(blend_file) else None
+        self.num_workers = max(1, num_workers)
+        self.work_dir = tempfile.mkdtemp(prefix="ssmt_worker_pool_")
+        # command_builder(script_file) -> 命令行参数列表，默认启动 Blender 后台进程，可替换为不依赖 Blender 的模拟工作进程
+        self.command_builder = command_builder or self._build_blender_command
+        self.workers: List[PersistentPreprocessWorker] = []
+        # 单个任务等待结果的超时时间（秒），超时后结束该工作进程，下一个任务会重新启动它
+        self.task_timeout = task_timeout
+
+        self.script_file = os.path.join(self.work_dir, "preprocess_worker.py")
+        with open(self.script_file, 'w', encoding='utf-8') as f:
+            f.write(ParallelPreprocessManager._build_worker_script(None))
+
+    def _build_blender_command(self, script_file: str) -> List[str]:
+        return [self.blender_exe, '-b', self.blend_file, '-P', script_file]
+
+    def is_compatible(self, blender_exe: str, blend_file: str, num_workers: int) -> bool:
+        """blend 文件路径、修改时间、Blender 路径和工作进程数都不变时才能复用"""
+        if blender_exe != self.blender_exe or blend_file != self.blend_file or max(1, num_workers) != self.num_workers:
+            return False
+        current_mtime = os.path.getmtime(blend_file) if os.path.exists(blend_file) else None
+        return current_mtime == self.blend_mtime
+
+    def _ensure_worker(self, worker_index: int) -> Optional[PersistentPreprocessWorker]:
+        """获取可用的工作进程，不存在或已退出时重新启动"""
+        while len(self.workers) <= worker_index:
+            worker_id = len(self.workers)
+            self.workers.append(PersistentPreprocessWorker(
+                worker_id=worker_id,
+                command=self.command_builder(self.script_file),
+                log_file=os.path.join(self.work_dir, f"worker_{worker_id}_log.txt")
+            ))
+
+        worker = self.workers[worker_index]
+        if not worker.is_alive():
+            if not worker.start():
+                return None
+        return worker
+
+    def run_tasks(self, tasks: List[PreprocessTask], progress_callback=None) -> List[PreprocessResult]:
+        """
+        把任务分发给各工作进程执行，每个工作进程同一时间只处理一个任务
+        后台线程只负责把结果放入队列，打印和进度回调都在调用线程中处理（进度回调会调用 wm.progress_update）
+        """
+        import threading
+        import queue
+
+        task_queue = queue.Queue()
+        for task in tasks:
+            task_queue.put(task)
+
+        result_queue = queue.Queue()
+        results: List[PreprocessResult] = []
+        total = len(tasks)
+
+        def run_one_task(worker, worker_index: int, task: PreprocessTask):
+            if worker is None or not worker.is_alive():
+                worker = self._ensure_worker(worker_index)
+            if worker is None:
+                return worker, PreprocessResult(
+                    task_id=task.task_id,
+                    success=False,
+                    error_message=f"工作进程 {worker_index} 启动失败",
+                    processed_objects=[],
+                    output_blend="",
+                    processing_time=0
+                )
+            print(f"[WorkerPool] 工作进程 {worker_index} 开始任务 {task.task_id}")
+            return worker, worker.run_task(task, timeout=self.task_timeout)
+
+        def worker_thread(worker_index: int):
+            worker = None
+            while True:
+                try:
+                    task = task_queue.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    worker, result = run_one_task(worker, worker_index, task)
+                except Exception as e:
+                    # 每个任务都必须产生一个结果，否则调用线程会一直等待
+                    import traceback
+                    traceback.print_exc()
+                    worker = None
+                    result = PreprocessResult(
+                        task_id=task.task_id,
+                        success=False,
+                        error_message=str(e),
+                        processed_objects=[],
+                        output_blend="",
+                        processing_time=0
+                    )
+                result_queue.put(result)
+
+        threads = [threading.Thread(target=worker_thread, args=(i,), daemon=True) for i in range(min(self.num_workers, total))]
+        for thread in threads:
+            thread.start()
+
+        while len(results) < total:
+            result = result_queue.get()
+            results.append(result)
+            completed = len(results)
+            status = "成功" if result.success else "失败"
+            print(f"[WorkerPool] 任务 {result.task_id} {status} ({completed}/{total})")
+            if not result.success:
+                print(f"[WorkerPool] 错误信息: {result.error_message}")
+            if progress_callback:
+                progress_callback(completed / total * 100)
+
+        for thread in threads:
+            thread.join()
+
+        return sorted(results, key=lambda result: result.task_id)
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+        self.workers = []
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        print("[WorkerPool] 已关闭工作进程池")
+
+
+_active_worker_pool: Optional[PersistentWorkerPool] = None
+
+
+def get_worker_pool(blender_exe: str, blend_file: str, num_workers: int) -> PersistentWorkerPool:
+    """获取当前的常驻工作进程池，blend 文件有变化时重建"""
+    global _active_worker_pool
+
+    if _active_worker_pool is not None and not _active_worker_pool.is_compatible(blender_exe, blend_file, num_workers):
+        print("[WorkerPool] blend 文件或配置已变化，重启工作进程池")
+        _active_worker_pool.close()
+        _active_worker_pool = None
+
+    if _active_worker_pool is None:
+        _active_worker_pool = PersistentWorkerPool(blender_exe, blend_file, num_workers)
+
+    return _active_worker_pool
+
+
+def shutdown_worker_pool():
+    """关闭常驻工作进程池，在一次导出流程结束时调用"""
+    global _active_worker_pool
+
+    if _active_worker_pool is not None:
+        _active_worker_pool.close()
+        _active_worker_pool = None
+
+
 def load_preprocessed_objects(object_blend_map: Dict[str, str]):
     """
     从预处理文件加载物体到当前场景
@@ -164,7 +164,31 @@ class PerformanceStats:
             'total_time': 0.0,
             'operations': []
         })
+        # 只计次数不计时间的计数器，例如 mesh evaluate 的次数
+        self.counters = defaultdict(int)
+        # 并行预处理的调度记录：预测与实际的 makespan
+        self.parallel_schedules: List[Dict] = []
     
+    def increment_counter(self, counter_name: str, amount: int = 1):
+        """计数器加一（计数器不受性能统计开关影响）"""
+        self.counters[counter_name] += amount
+    
+    def get_counter(self, counter_name: str) -> int:
+        """获取计数器的值"""
+        return self.counters.get(counter_name, 0)
+    
+    def record_parallel_schedule(self, label: str, predicted_makespan: float, actual_makespan: float, task_rows: List[Dict]):
+        """
+        记录一次并行预处理的调度结果
+        task_rows: 每个任务一行 {'task_id', 'object_count', 'cost', 'predicted_time', 'actual_time'}
+        """
+        self.parallel_schedules.append({
+            'label': label,
+            'predicted_makespan': predicted_makespan,
+            'actual_makespan': actual_makespan,
+            'task_rows': task_rows
+        })
+
     def start_operation(self, operation_name: str, obj_name: str = None):
         """开始一个操作"""
         if not PERFORMANCE_STATS_ENABLED:
@@ -312,6 +336,33 @@ class PerformanceStats:
         
         report.append("")
         
+        if self.counters:
+            report.append("-" * 80)
+            report.append("计数统计")
+            report.append("-" * 80)
+            report.append("")
+            for counter_name in sorted(self.counters.keys()):
+                report.append(f"{counter_name:<40} {self.counters[counter_name]:>8}")
+            report.append("")
+        
+        if self.parallel_schedules:
+            report.append("-" * 80)
+            report.append("并行预处理负载均衡")
+            report.append("-" * 80)
+            report.append("")
+            for schedule in self.parallel_schedules:
+                report.append(f"{schedule['label']}: 预测 makespan {schedule['predicted_makespan']:.2f} 秒, 实际 makespan {schedule['actual_makespan']:.2f} 秒")
+                report.append(f"  {'任务':>6} {'物体数':>8} {'预估成本':>14} {'预测时间(秒)':>14} {'实际时间(秒)':>14}")
+                for row in schedule['task_rows']:
+                    report.append(
+                        f"  {row['task_id']:>6} "
+                        f"{row['object_count']:>8} "
+                        f"{row['cost']:>14.0f} "
+                        f"{row['predicted_time']:>14.2f} "
+                        f"{row['actual_time']:>14.2f}"
+                    )
+                report.append("")
+        
         # 性能瓶颈分析
         report.append("-" * 80)
         report.append("性能瓶颈分析")
@@ -440,6 +491,8 @@ class PerformanceStats:
         self.stats.clear()
         self.operation_stack.clear()
         self.object_stats.clear()
+        self.counters.clear()
+        self.parallel_schedules.clear()
 
 
 # 全局性能统计实例
@@ -461,6 +514,21 @@ def end_operation(operation_name: str = None):
     _global_performance_stats.end_operation(operation_name)
 
 
+def increment_counter(counter_name: str, amount: int = 1):
+    """计数器加一"""
+    _global_performance_stats.increment_counter(counter_name, amount)
+
+
+def get_counter(counter_name: str) -> int:
+    """获取计数器的值"""
+    return _global_performance_stats.get_counter(counter_name)
+
+
+def record_parallel_schedule(label: str, predicted_makespan: float, actual_makespan: float, task_rows: List[Dict]):
+    """记录并行预处理的调度结果"""
+    _global_performance_stats.record_parallel_schedule(label, predicted_makespan, actual_makespan, task_rows)
+
+
 def print_performance_report():
     """打印性能报告"""
     return _global_performance_stats.print_report()
@@ -6,10 +6,13 @@ import bpy
 import hashlib
 import json
 import os
+import time
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field, asdict
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .mesh_arrays import MeshArrays
+from .vertexgroup_utils import VertexGroupUtils
 
 
 @dataclass
@@ -66,11 +69,166 @@ class ObjectFingerprint:
         )
 
 
+# key 是 Mesh 的 session_uid，value 是该 Mesh 被 depsgraph 标记为几何更新的次数
+_mesh_geometry_update_counter_dict: Dict[int, int] = {}
+
+# key 是 (Mesh 的 session_uid, 组件名)，value 是 (有效性键, 哈希值)
+_mesh_component_hash_cache: Dict[Tuple[int, str], Tuple[tuple, str]] = {}
+
+
+@bpy.app.handlers.persistent
+def _count_mesh_geometry_updates(scene, depsgraph):
+    """
+    每次 depsgraph 更新都给几何被更新的 Mesh 计数加一，用作指纹组件哈希缓存失效的依据
+    """
+    for update in depsgraph.updates:
+        updated_id = update.id
+        if isinstance(updated_id, bpy.types.Mesh):
+            mesh_uid = updated_id.original.session_uid
+        elif isinstance(updated_id, bpy.types.Key) and isinstance(updated_id.original.user, bpy.types.Mesh):
+            # 形态键数据挂在 Key 数据块上，计到所属 Mesh 头上
+            mesh_uid = updated_id.original.user.session_uid
+        elif isinstance(updated_id, bpy.types.Object) and update.is_updated_geometry and updated_id.type == 'MESH' and updated_id.data:
+            mesh_uid = updated_id.original.data.session_uid
+        else:
+            continue
+        _mesh_geometry_update_counter_dict[mesh_uid] = _mesh_geometry_update_counter_dict.get(mesh_uid, 0) + 1
+
+
+@bpy.app.handlers.persistent
+def _clear_fingerprint_cache_handler(*args):
+    """撤销/重做/加载文件后网格数据会被整体替换，组件哈希缓存全部作废"""
+    FingerprintCalculator.clear_component_cache()
+
+
 class FingerprintCalculator:
-    """指纹计算器"""
-    
+    """指纹计算器
+
+    所有大块数据都通过 foreach_get 读成 numpy 缓冲区后直接用 blake2b 哈希原始字节，
+    不再逐顶点遍历或 JSON 序列化。
+    顶点、边、面、顶点组权重、形态键坐标、UV 坐标这些只依赖 Mesh 数据的组件哈希
+    会按 Mesh 的 session_uid 和 depsgraph 几何更新计数缓存，同一会话内未修改的网格不会重复哈希。
+    修改器、变换、骨骼姿势等元数据很小且可能随其他物体变化，每次都重新计算。
+    """
+
+    HASH_DIGEST_SIZE = 16
+
+    @classmethod
+    def _hash_buffers(cls, *buffers) -> str:
+        """对若干原始字节缓冲区计算 blake2b 哈希，每段前面写入长度避免拼接歧义"""
+        hasher = hashlib.blake2b(digest_size=cls.HASH_DIGEST_SIZE)
+        for buffer in buffers:
+            view = memoryview(buffer)
+            hasher.update(view.nbytes.to_bytes(8, 'little'))
+            hasher.update(view)
+        return hasher.hexdigest()
+
+    @classmethod
+    def _hash_json(cls, data) -> str:
+        """对少量元数据做 JSON 序列化后计算 blake2b 哈希"""
+        return cls._hash_buffers(json.dumps(data, sort_keys=True).encode())
+
     @staticmethod
-    def calculate_vertex_hash(obj: bpy.types.Object) -> Tuple[int, str]:
+    def _read_buffer(collection, attribute: str, count: int, dtype) -> np.ndarray:
+        buffer = np.empty(count, dtype=dtype)
+        if count > 0:
+            collection.foreach_get(attribute, buffer)
+        return buffer
+
+    @staticmethod
+    def _get_mesh_validity_key(mesh: bpy.types.Mesh) -> tuple:
+        """网格缓存的有效性键：几何更新计数 + 各类元素数量，数量变化时即使没有 depsgraph 通知也会失效"""
+        shape_keys = mesh.shape_keys
+        return (
+            _mesh_geometry_update_counter_dict.get(mesh.session_uid, 0),
+            len(mesh.vertices),
+            len(mesh.edges),
+            len(mesh.loops),
+            len(mesh.polygons),
+            len(mesh.uv_layers),
+            len(mesh.color_attributes),
+            len(shape_keys.key_blocks) if shape_keys else 0,
+        )
+
+    @classmethod
+    def _get_cached_mesh_hash(cls, mesh: bpy.types.Mesh, component: str, compute_func) -> str:
+        cache_key = (mesh.session_uid, component)
+        validity_key = cls._get_mesh_validity_key(mesh)
+        cached = _mesh_component_hash_cache.get(cache_key)
+        if cached is not None and cached[0] == validity_key:
+            return cached[1]
+
+        component_hash = compute_func(mesh)
+        _mesh_component_hash_cache[cache_key] = (validity_key, component_hash)
+        return component_hash
+
+    @staticmethod
+    def clear_component_cache():
+        """清空组件哈希缓存"""
+        _mesh_component_hash_cache.clear()
+        _mesh_geometry_update_counter_dict.clear()
+
+    @classmethod
+    def _hash_mesh_vertices(cls, mesh: bpy.types.Mesh) -> str:
+        vertices = cls._read_buffer(mesh.vertices, 'co', len(mesh.vertices) * 3, np.float32)
+        return cls._hash_buffers(vertices)
+
+    @classmethod
+    def _hash_mesh_edges(cls, mesh: bpy.types.Mesh) -> str:
+        edge_count = len(mesh.edges)
+        edges = cls._read_buffer(mesh.edges, 'vertices', edge_count * 2, np.int32)
+        use_edge_sharp = cls._read_buffer(mesh.edges, 'use_edge_sharp', edge_count, np.bool_)
+        use_edge_freestyle = cls._read_buffer(mesh.edges, 'use_freestyle_mark', edge_count, np.bool_)
+        return cls._hash_buffers(edges, use_edge_sharp, use_edge_freestyle)
+
+    @classmethod
+    def _hash_mesh_faces(cls, mesh: bpy.types.Mesh) -> str:
+        loop_vertex_indices = cls._read_buffer(mesh.loops, 'vertex_index', len(mesh.loops), np.int32)
+        polygon_count = len(mesh.polygons)
+        loop_starts = cls._read_buffer(mesh.polygons, 'loop_start', polygon_count, np.int32)
+        use_smooth = cls._read_buffer(mesh.polygons, 'use_smooth', polygon_count, np.bool_)
+        return cls._hash_buffers(loop_vertex_indices, loop_starts, use_smooth)
+
+    @classmethod
+    def _hash_mesh_vertex_group_weights(cls, mesh: bpy.types.Mesh) -> str:
+        row_offsets, group_ids, weights = VertexGroupUtils.collect_vertex_group_weights(mesh)
+        return cls._hash_buffers(row_offsets, group_ids, weights)
+
+    @classmethod
+    def _hash_mesh_shape_key_data(cls, mesh: bpy.types.Mesh) -> str:
+        buffers = []
+        for kb in mesh.shape_keys.key_blocks:
+            buffers.append(cls._read_buffer(kb.data, 'co', len(kb.data) * 3, np.float32))
+        return cls._hash_buffers(*buffers)
+
+    @classmethod
+    def _hash_mesh_uv_data(cls, mesh: bpy.types.Mesh) -> str:
+        buffers = []
+        for uv_layer in mesh.uv_layers:
+            buffers.append(cls._read_buffer(uv_layer.data, 'uv', len(uv_layer.data) * 2, np.float32))
+        return cls._hash_buffers(*buffers)
+
+    @classmethod
+    def _hash_mesh_attributes(cls, mesh: bpy.types.Mesh) -> str:
+        buffers = []
+        for color_attribute in mesh.color_attributes:
+            buffers.append(f"{color_attribute.name}|{color_attribute.domain}|{color_attribute.data_type}".encode())
+            buffers.append(cls._read_buffer(color_attribute.data, 'color', len(color_attribute.data) * 4, np.float32))
+        buffers.append(b'1' if mesh.has_custom_normals else b'0')
+        if mesh.has_custom_normals and hasattr(mesh, 'corner_normals'):
+            buffers.append(cls._read_buffer(mesh.corner_normals, 'vector', len(mesh.corner_normals) * 3, np.float32))
+        return cls._hash_buffers(*buffers)
+
+    @classmethod
+    def calculate_attribute_hash(cls, obj: bpy.types.Object) -> str:
+        """计算颜色属性和自定义法线的哈希值，不参与 ObjectFingerprint，供导出清单判断 Buffer 是否需要重新生成"""
+        if obj.type != 'MESH' or not obj.data:
+            return ""
+
+        return cls._get_cached_mesh_hash(obj.data, 'attribute', cls._hash_mesh_attributes)
+
+    @classmethod
+    def calculate_vertex_hash(cls, obj: bpy.types.Object) -> Tuple[int, str]:
         """计算顶点数据的哈希值"""
         if obj.type != 'MESH' or not obj.data:
             return 0, ""
@@ -80,16 +238,11 @@ class FingerprintCalculator:
         if len(mesh.vertices) == 0:
             return 0, ""
         
-        vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
-        mesh.vertices.foreach_get('co', vertices)
-        
-        vertex_hash = hashlib.md5(vertices.tobytes()).hexdigest()
-        
-        return len(mesh.vertices), vertex_hash
+        return len(mesh.vertices), cls._get_cached_mesh_hash(mesh, 'vertex', cls._hash_mesh_vertices)
     
-    @staticmethod
-    def calculate_edge_hash(obj: bpy.types.Object) -> str:
-        """计算边缘数据的哈希值（包括锐边标记）"""
+    @classmethod
+    def calculate_edge_hash(cls, obj: bpy.types.Object) -> str:
+        """计算边缘数据的哈希值（包括锐边、Freestyle标记）"""
         if obj.type != 'MESH' or not obj.data:
             return ""
         
@@ -98,25 +251,11 @@ class FingerprintCalculator:
         if len(mesh.edges) == 0:
             return ""
         
-        edge_data = []
-        edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
-        mesh.edges.foreach_get('vertices', edges)
-        edge_data.append(edges.tobytes())
-        
-        use_edge_sharp = np.empty(len(mesh.edges), dtype=np.bool_)
-        mesh.edges.foreach_get('use_edge_sharp', use_edge_sharp)
-        edge_data.append(use_edge_sharp.tobytes())
-        
-        use_edge_freestyle = np.empty(len(mesh.edges), dtype=np.bool_)
-        mesh.edges.foreach_get('use_freestyle_mark', use_edge_freestyle)
-        edge_data.append(use_edge_freestyle.tobytes())
-        
-        combined = b''.join(edge_data)
-        return hashlib.md5(combined).hexdigest()
+        return cls._get_cached_mesh_hash(mesh, 'edge', cls._hash_mesh_edges)
     
-    @staticmethod
-    def calculate_face_hash(obj: bpy.types.Object) -> str:
-        """计算面数据的哈希值"""
+    @classmethod
+    def calculate_face_hash(cls, obj: bpy.types.Object) -> str:
+        """计算面数据的哈希值（包括顶点索引、平滑标记）"""
         if obj.type != 'MESH' or not obj.data:
             return ""
         
@@ -125,51 +264,23 @@ class FingerprintCalculator:
         if len(mesh.polygons) == 0:
             return ""
         
-        face_data = []
-        
-        for poly in mesh.polygons:
-            face_data.append(list(poly.vertices))
-            face_data.append(poly.use_smooth)
-        
-        face_json = json.dumps(face_data, sort_keys=True)
-        return hashlib.md5(face_json.encode()).hexdigest()
+        return cls._get_cached_mesh_hash(mesh, 'face', cls._hash_mesh_faces)
     
-    @staticmethod
-    def calculate_vertex_group_hash(obj: bpy.types.Object) -> str:
-        """计算顶点组数据的哈希值"""
+    @classmethod
+    def calculate_vertex_group_hash(cls, obj: bpy.types.Object) -> str:
+        """计算顶点组数据的哈希值（名称、锁定状态、权重）"""
         if obj.type != 'MESH' or not obj.data or not obj.vertex_groups:
             return ""
         
-        mesh = obj.data
-        vg_data = []
-        
-        for vg in obj.vertex_groups:
-            vg_info = {
-                'name': vg.name,
-                'lock_weight': vg.lock_weight,
-            }
-            
-            weights = []
-            for i, vert in enumerate(mesh.vertices):
-                for group in vert.groups:
-                    if group.group == vg.index:
-                        weights.append((i, group.weight))
-                        break
-            
-            vg_info['weights_hash'] = hashlib.md5(
-                json.dumps(weights, sort_keys=True).encode()
-            ).hexdigest()
-            vg_data.append(vg_info)
-        
-        vg_json = json.dumps(vg_data, sort_keys=True)
-        return hashlib.md5(vg_json.encode()).hexdigest()
+        vg_data = {
+            'groups': [(vg.index, vg.name, vg.lock_weight) for vg in obj.vertex_groups],
+            'weights_hash': cls._get_cached_mesh_hash(obj.data, 'vertex_group_weights', cls._hash_mesh_vertex_group_weights),
+        }
+        return cls._hash_json(vg_data)
     
     @staticmethod
-    def calculate_modifier_hash(obj: bpy.types.Object) -> str:
-        """计算修改器状态的哈希值"""
-        if not obj.modifiers:
-            return ""
-        
+    def _collect_modifier_data(obj: bpy.types.Object) -> list:
+        """收集修改器的类型和参数"""
         modifier_data = []
         for idx, mod in enumerate(obj.modifiers):
             mod_info = {
@@ -251,13 +362,19 @@ class FingerprintCalculator:
                 pass
             
             modifier_data.append(mod_info)
+        return modifier_data
+    
+    @classmethod
+    def calculate_modifier_hash(cls, obj: bpy.types.Object) -> str:
+        """计算修改器状态的哈希值"""
+        if not obj.modifiers:
+            return ""
         
-        modifier_json = json.dumps(modifier_data, sort_keys=True)
-        return hashlib.md5(modifier_json.encode()).hexdigest()
+        return cls._hash_json(cls._collect_modifier_data(obj))
     
-    @staticmethod
-    def calculate_shape_key_hash(obj: bpy.types.Object) -> str:
-        """计算形态键状态的哈希值"""
+    @classmethod
+    def calculate_shape_key_hash(cls, obj: bpy.types.Object) -> str:
+        """计算形态键状态的哈希值（名称、值、数据）"""
         if not obj.data or not obj.data.shape_keys or not obj.data.shape_keys.key_blocks:
             return ""
         
@@ -274,18 +391,15 @@ class FingerprintCalculator:
             if kb.relative_key:
                 kb_info['relative_key'] = kb.relative_key.name
             
-            if len(kb.data) > 0:
-                coords = np.empty(len(kb.data) * 3, dtype=np.float32)
-                kb.data.foreach_get('co', coords)
-                kb_info['data_hash'] = hashlib.md5(coords.tobytes()).hexdigest()
-            
             shape_key_data.append(kb_info)
         
-        shape_key_json = json.dumps(shape_key_data, sort_keys=True)
-        return hashlib.md5(shape_key_json.encode()).hexdigest()
+        return cls._hash_json({
+            'key_blocks': shape_key_data,
+            'data_hash': cls._get_cached_mesh_hash(obj.data, 'shape_key_data', cls._hash_mesh_shape_key_data),
+        })
     
-    @staticmethod
-    def calculate_transform_hash(obj: bpy.types.Object) -> str:
+    @classmethod
+    def calculate_transform_hash(cls, obj: bpy.types.Object) -> str:
         """计算物体变换的哈希值"""
         transform_data = {
             'location': list(obj.location),
@@ -298,47 +412,37 @@ class FingerprintCalculator:
             'delta_scale': list(obj.delta_scale) if hasattr(obj, 'delta_scale') else [],
         }
         
-        transform_json = json.dumps(transform_data, sort_keys=True)
-        return hashlib.md5(transform_json.encode()).hexdigest()
+        return cls._hash_json(transform_data)
     
-    @staticmethod
-    def calculate_armature_pose_hash(obj: bpy.types.Object) -> str:
+    @classmethod
+    def calculate_armature_pose_hash(cls, obj: bpy.types.Object) -> str:
         """计算骨骼姿势的哈希值"""
         armature_modifiers = [mod for mod in obj.modifiers if mod.type == 'ARMATURE' and mod.object and mod.show_viewport]
         
         if not armature_modifiers:
             return ""
         
-        pose_data = []
+        pose_buffers = []
         for mod in armature_modifiers:
             armature = mod.object
             if armature and armature.pose:
-                armature_info = {
-                    'armature_name': armature.name,
-                    'bones': []
-                }
-                
-                for bone in armature.pose.bones:
-                    bone_info = {
-                        'name': bone.name,
-                        'location': list(bone.location),
-                        'rotation_mode': bone.rotation_mode,
-                        'rotation_euler': list(bone.rotation_euler) if bone.rotation_mode == 'EULER' else [],
-                        'rotation_quaternion': list(bone.rotation_quaternion) if bone.rotation_mode == 'QUATERNION' else [],
-                        'scale': list(bone.scale),
-                    }
-                    armature_info['bones'].append(bone_info)
-                
-                pose_data.append(armature_info)
-        
-        if not pose_data:
+                pose_bones = armature.pose.bones
+                bone_count = len(pose_bones)
+                pose_buffers.append(json.dumps(
+                    [armature.name, [(bone.name, bone.rotation_mode) for bone in pose_bones]]
+                ).encode())
+                pose_buffers.append(cls._read_buffer(pose_bones, 'location', bone_count * 3, np.float32))
+                pose_buffers.append(cls._read_buffer(pose_bones, 'rotation_euler', bone_count * 3, np.float32))
+                pose_buffers.append(cls._read_buffer(pose_bones, 'rotation_quaternion', bone_count * 4, np.float32))
+                pose_buffers.append(cls._read_buffer(pose_bones, 'scale', bone_count * 3, np.float32))
+        
+        if not pose_buffers:
             return ""
         
-        pose_json = json.dumps(pose_data, sort_keys=True)
-        return hashlib.md5(pose_json.encode()).hexdigest()
+        return cls._hash_buffers(*pose_buffers)
     
-    @staticmethod
-    def calculate_uv_hash(obj: bpy.types.Object) -> str:
+    @classmethod
+    def calculate_uv_hash(cls, obj: bpy.types.Object) -> str:
         """计算 UV 数据的哈希值
         
         检测内容包括：
@@ -355,30 +459,59 @@ class FingerprintCalculator:
         if not mesh.uv_layers or len(mesh.uv_layers) == 0:
             return ""
         
-        uv_data = []
+        uv_layer_info = [(uv_layer.name, uv_layer.active, uv_layer.active_render) for uv_layer in mesh.uv_layers]
         
-        for uv_layer in mesh.uv_layers:
-            layer_info = {
-                'name': uv_layer.name,
-                'active': uv_layer.active,
-                'active_render': uv_layer.active_render,
-            }
-            
-            if len(mesh.loops) > 0:
-                uv_coords = np.empty(len(mesh.loops) * 2, dtype=np.float32)
-                uv_layer.data.foreach_get('uv', uv_coords)
-                layer_info['data_hash'] = hashlib.md5(uv_coords.tobytes()).hexdigest()
-            
-            uv_data.append(layer_info)
-        
-        uv_json = json.dumps(uv_data, sort_keys=True)
-        return hashlib.md5(uv_json.encode()).hexdigest()
+        return cls._hash_json({
+            'layers': uv_layer_info,
+            'data_hash': cls._get_cached_mesh_hash(mesh, 'uv_data', cls._hash_mesh_uv_data),
+        })
     
+    @classmethod
+    def _hash_evaluated_mesh(cls, mesh: bpy.types.Mesh) -> str:
+        """哈希求值后网格里导出会读取的全部数据：坐标、拓扑、角法线、UV、颜色属性、顶点组权重"""
+        loop_count = len(mesh.loops)
+        buffers = [
+            cls._read_buffer(mesh.vertices, 'co', len(mesh.vertices) * 3, np.float32),
+            cls._read_buffer(mesh.loops, 'vertex_index', loop_count, np.int32),
+            cls._read_buffer(mesh.polygons, 'loop_start', len(mesh.polygons), np.int32),
+        ]
+        if hasattr(mesh, 'corner_normals'):
+            buffers.append(cls._read_buffer(mesh.corner_normals, 'vector', len(mesh.corner_normals) * 3, np.float32))
+        else:
+            mesh.calc_normals_split()
+            buffers.append(cls._read_buffer(mesh.loops, 'normal', loop_count * 3, np.float32))
+        for uv_layer in mesh.uv_layers:
+            buffers.append(uv_layer.name.encode())
+            buffers.append(cls._read_buffer(uv_layer.data, 'uv', len(uv_layer.data) * 2, np.float32))
+        for color_attribute in mesh.color_attributes:
+            buffers.append(f"{color_attribute.name}|{color_attribute.domain}|{color_attribute.data_type}".encode())
+            buffers.append(cls._read_buffer(color_attribute.data, 'color', len(color_attribute.data) * 4, np.float32))
+        buffers.extend(VertexGroupUtils.collect_vertex_group_weights(mesh))
+        return cls._hash_buffers(*buffers)
+
+    @classmethod
+    def calculate_evaluated_mesh_hash(cls, obj: bpy.types.Object, depsgraph=None) -> str:
+        """计算物体求值后网格数据的哈希值
+
+        修改器参数、修改器引用的其他物体、骨架变换、驱动器等对导出结果的影响
+        最终都体现在求值后的网格上，直接哈希 foreach_get 读出的缓冲区，
+        不需要逐个修改器类型列举参数。供导出清单判断 Buffer 是否需要重新生成。
+        """
+        if obj.type != 'MESH' or not obj.data:
+            return ""
+
+        if depsgraph is None:
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+        obj_eval = obj.evaluated_get(depsgraph)
+        mesh = obj_eval.to_mesh(preserve_all_data_layers=True, depsgraph=depsgraph)
+        try:
+            return cls._hash_evaluated_mesh(mesh)
+        finally:
+            obj_eval.to_mesh_clear()
+
     @classmethod
     def calculate_fingerprint(cls, obj: bpy.types.Object, mirror_workflow: bool = False) -> ObjectFingerprint:
-        """计算物体的完整指纹（先收集数据，再并行计算哈希）"""
-        import time
-        
+        """计算物体的完整指纹"""
         start_total = time.time()
         
         if obj.type != 'MESH' or not obj.data:
@@ -396,290 +529,26 @@ class FingerprintCalculator:
                 uv_hash=""
             )
         
-        mesh = obj.data
+        vertex_count, vertex_hash = cls.calculate_vertex_hash(obj)
         
-        # 一次性收集所有数据（在主线程中）
-        start_collect = time.time()
-        vertex_count = len(mesh.vertices)
-        
-        # 收集顶点数据
-        if vertex_count > 0:
-            vertices = np.empty(vertex_count * 3, dtype=np.float32)
-            mesh.vertices.foreach_get('co', vertices)
-            vertex_data = vertices.tobytes()
-        else:
-            vertex_data = b''
-        
-        # 收集顶点组数据（优化：只遍历一次顶点）
-        vertex_group_data = []
-        if obj.vertex_groups:
-            # 预先初始化每个顶点组的权重列表
-            vg_weights = {vg.index: [] for vg in obj.vertex_groups}
-            
-            # 只遍历一次顶点，收集所有顶点组信息
-            for i, vert in enumerate(mesh.vertices):
-                for group in vert.groups:
-                    if group.group in vg_weights:
-                        vg_weights[group.group].append((i, group.weight))
-            
-            # 构建顶点组数据
-            for vg in obj.vertex_groups:
-                vg_info = {
-                    'name': vg.name,
-                    'lock_weight': vg.lock_weight,
-                    'weights': vg_weights[vg.index]
-                }
-                vertex_group_data.append(vg_info)
-        
-        # 收集修改器数据
-        modifier_data = []
-        for idx, mod in enumerate(obj.modifiers):
-            mod_info = {
-                'index': idx,
-                'name': mod.name,
-                'type': mod.type,
-                'show_viewport': mod.show_viewport,
-                'show_render': mod.show_render,
-            }
-            
-            if mod.type == 'ARMATURE':
-                mod_info['object'] = mod.object.name if mod.object else ""
-                mod_info['use_vertex_groups'] = mod.use_vertex_groups
-                mod_info['use_deform_preserve_volume'] = mod.use_deform_preserve_volume
-                mod_info['invert_vertex_group'] = mod.invert_vertex_group
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-                if hasattr(mod, 'use_multi_modifier'):
-                    mod_info['use_multi_modifier'] = mod.use_multi_modifier
-            elif mod.type == 'MIRROR':
-                mod_info['use_axis'] = list(mod.use_axis)
-                mod_info['use_bisect_axis'] = list(mod.use_bisect_axis)
-                mod_info['mirror_object'] = mod.mirror_object.name if mod.mirror_object else ""
-                mod_info['use_clip'] = mod.use_clip if hasattr(mod, 'use_clip') else False
-                mod_info['mirror_offset_u'] = mod.offset_u if hasattr(mod, 'offset_u') else 0.0
-                mod_info['mirror_offset_v'] = mod.offset_v if hasattr(mod, 'offset_v') else 0.0
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-            elif mod.type == 'SUBSURF':
-                mod_info['levels'] = mod.levels
-                mod_info['render_levels'] = mod.render_levels
-                mod_info['subdivision_type'] = mod.subdivision_type if hasattr(mod, 'subdivision_type') else 'CATMULL_CLARK'
-            elif mod.type == 'SOLIDIFY':
-                mod_info['thickness'] = mod.thickness
-                mod_info['offset'] = mod.offset
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-                mod_info['use_even_offset'] = mod.use_even_offset if hasattr(mod, 'use_even_offset') else False
-            elif mod.type == 'BEVEL':
-                mod_info['width'] = mod.width
-                mod_info['segments'] = mod.segments
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-                mod_info['limit_method'] = mod.limit_method if hasattr(mod, 'limit_method') else 'NONE'
-            elif mod.type == 'DECIMATE':
-                mod_info['ratio'] = mod.ratio
-                mod_info['decimate_type'] = mod.decimate_type
-            elif mod.type == 'TRIANGULATE':
-                mod_info['quad_method'] = mod.quad_method
-                mod_info['ngon_method'] = mod.ngon_method
-                mod_info['min_vertices'] = mod.min_vertices if hasattr(mod, 'min_vertices') else 4
-            elif mod.type == 'WELD':
-                mod_info['merge_threshold'] = mod.merge_threshold
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-            elif mod.type == 'BOOLEAN':
-                mod_info['operation'] = mod.operation if hasattr(mod, 'operation') else 'DIFFERENCE'
-                mod_info['object'] = mod.object.name if mod.object else ""
-                mod_info['solver'] = mod.solver if hasattr(mod, 'solver') else 'EXACT'
-            elif mod.type == 'LATTICE':
-                mod_info['object'] = mod.object.name if mod.object else ""
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-                mod_info['strength'] = mod.strength if hasattr(mod, 'strength') else 1.0
-            elif mod.type == 'HOOK':
-                mod_info['object'] = mod.object.name if mod.object else ""
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-                mod_info['strength'] = mod.strength if hasattr(mod, 'strength') else 1.0
-                mod_info['falloff_type'] = mod.falloff_type if hasattr(mod, 'falloff_type') else 'NONE'
-            elif mod.type == 'SHRINKWRAP':
-                mod_info['target'] = mod.target.name if mod.target else ""
-                mod_info['auxiliary_target'] = mod.auxiliary_target.name if hasattr(mod, 'auxiliary_target') and mod.auxiliary_target else ""
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-                mod_info['shrinkwrap_mode'] = mod.wrap_mode if hasattr(mod, 'wrap_mode') else 'ON_SURFACE'
-            elif mod.type == 'SIMPLE_DEFORM':
-                mod_info['deform_mode'] = mod.deform_method if hasattr(mod, 'deform_method') else 'TWIST'
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-                mod_info['factor'] = mod.factor if hasattr(mod, 'factor') else 0.0
-                mod_info['limits'] = [mod.limits[0], mod.limits[1]] if hasattr(mod, 'limits') else [0.0, 1.0]
-            elif mod.type == 'WAVE':
-                mod_info['vertex_group'] = mod.vertex_group if hasattr(mod, 'vertex_group') else ""
-                mod_info['time_offset'] = mod.time_offset if hasattr(mod, 'time_offset') else 0.0
-                mod_info['speed'] = mod.speed if hasattr(mod, 'speed') else 1.0
-            elif mod.type == 'ARMATURE':
-                pass
-            
-            modifier_data.append(mod_info)
-        
-        # 收集形态键数据
-        shape_key_data = []
-        if obj.data.shape_keys and obj.data.shape_keys.key_blocks:
-            for kb in obj.data.shape_keys.key_blocks:
-                kb_info = {
-                    'name': kb.name,
-                    'value': kb.value,
-                    'mute': kb.mute,
-                    'vertex_group': kb.vertex_group,
-                    'interpolation': kb.interpolation if hasattr(kb, 'interpolation') else 'KEY_LINEAR',
-                }
-                
-                if kb.relative_key:
-                    kb_info['relative_key'] = kb.relative_key.name
-                
-                if len(kb.data) > 0:
-                    coords = np.empty(len(kb.data) * 3, dtype=np.float32)
-                    kb.data.foreach_get('co', coords)
-                    kb_info['data_hash'] = hashlib.md5(coords.tobytes()).hexdigest()
-                
-                shape_key_data.append(kb_info)
-        
-        # 收集变换数据
-        transform_data = {
-            'location': list(obj.location),
-            'rotation_mode': obj.rotation_mode,
-            'rotation_euler': list(obj.rotation_euler) if obj.rotation_mode == 'EULER' else [],
-            'rotation_quaternion': list(obj.rotation_quaternion) if obj.rotation_mode == 'QUATERNION' else [],
-            'scale': list(obj.scale),
-            'delta_location': list(obj.delta_location) if hasattr(obj, 'delta_location') else [],
-            'delta_rotation_euler': list(obj.delta_rotation_euler) if hasattr(obj, 'delta_rotation_euler') else [],
-            'delta_scale': list(obj.delta_scale) if hasattr(obj, 'delta_scale') else [],
-        }
-        
-        # 收集骨骼姿势数据
-        pose_data = []
-        armature_modifiers = [mod for mod in obj.modifiers if mod.type == 'ARMATURE' and mod.object and mod.show_viewport]
-        for mod in armature_modifiers:
-            armature = mod.object
-            if armature and armature.pose:
-                armature_info = {
-                    'armature_name': armature.name,
-                    'bones': []
-                }
-                
-                for bone in armature.pose.bones:
-                    bone_info = {
-                        'name': bone.name,
-                        'location': list(bone.location),
-                        'rotation_mode': bone.rotation_mode,
-                        'rotation_euler': list(bone.rotation_euler) if bone.rotation_mode == 'EULER' else [],
-                        'rotation_quaternion': list(bone.rotation_quaternion) if bone.rotation_mode == 'QUATERNION' else [],
-                        'scale': list(bone.scale),
-                    }
-                    armature_info['bones'].append(bone_info)
-                
-                pose_data.append(armature_info)
-        
-        # 收集 UV 数据
-        uv_data = []
-        if mesh.uv_layers and len(mesh.uv_layers) > 0:
-            for uv_layer in mesh.uv_layers:
-                layer_info = {
-                    'name': uv_layer.name,
-                    'active': uv_layer.active,
-                    'active_render': uv_layer.active_render,
-                }
-                
-                if len(mesh.loops) > 0 and len(uv_layer.data) == len(mesh.loops):
-                    uv_coords = np.empty(len(mesh.loops) * 2, dtype=np.float32)
-                    uv_layer.data.foreach_get('uv', uv_coords)
-                    layer_info['data_hash'] = hashlib.md5(uv_coords.tobytes()).hexdigest()
-                
-                uv_data.append(layer_info)
-        
-        collect_time = time.time() - start_collect
-        print(f"[Fingerprint] 数据收集耗时: {collect_time:.3f}s")
-        
-        # 并行计算哈希值（不访问 Blender API）
-        start_hash = time.time()
-        
-        def calculate_vertex_hash():
-            return hashlib.md5(vertex_data).hexdigest()
-        
-        def calculate_vertex_group_hash():
-            if not vertex_group_data:
-                return ""
-            vg_json = json.dumps(vertex_group_data, sort_keys=True)
-            return hashlib.md5(vg_json.encode()).hexdigest()
-        
-        def calculate_modifier_hash():
-            if not modifier_data:
-                return ""
-            mod_json = json.dumps(modifier_data, sort_keys=True)
-            return hashlib.md5(mod_json.encode()).hexdigest()
-        
-        def calculate_shape_key_hash():
-            if not shape_key_data:
-                return ""
-            shape_key_json = json.dumps(shape_key_data, sort_keys=True)
-            return hashlib.md5(shape_key_json.encode()).hexdigest()
-        
-        def calculate_transform_hash():
-            transform_json = json.dumps(transform_data, sort_keys=True)
-            return hashlib.md5(transform_json.encode()).hexdigest()
-        
-        def calculate_armature_pose_hash():
-            if not pose_data:
-                return ""
-            pose_json = json.dumps(pose_data, sort_keys=True)
-            return hashlib.md5(pose_json.encode()).hexdigest()
-        
-        def calculate_uv_hash():
-            if not uv_data:
-                return ""
-            uv_json = json.dumps(uv_data, sort_keys=True)
-            return hashlib.md5(uv_json.encode()).hexdigest()
-        
-        # 使用多线程并行计算哈希值
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = {
-                executor.submit(calculate_vertex_hash): 'vertex',
-                executor.submit(calculate_vertex_group_hash): 'vertex_group',
-                executor.submit(calculate_modifier_hash): 'modifier',
-                executor.submit(calculate_shape_key_hash): 'shape_key',
-                executor.submit(calculate_transform_hash): 'transform',
-                executor.submit(calculate_armature_pose_hash): 'armature_pose',
-                executor.submit(calculate_uv_hash): 'uv'
-            }
-            
-            results = {}
-            for future in as_completed(futures):
-                key = futures[future]
-                try:
-                    results[key] = future.result()
-                except Exception as e:
-                    print(f"[Fingerprint] 计算 {key} 哈希时出错: {e}")
-                    results[key] = ""
-        
-        hash_time = time.time() - start_hash
-        print(f"[Fingerprint] 哈希计算耗时: {hash_time:.3f}s")
-        
-        vertex_hash = results['vertex']
-        vertex_group_hash = results['vertex_group']
-        modifier_hash = results['modifier']
-        shape_key_hash = results['shape_key']
-        transform_hash = results['transform']
-        armature_pose_hash = results['armature_pose']
-        uv_hash = results['uv']
-        
-        total_time = time.time() - start_total
-        print(f"[Fingerprint] 总耗时: {total_time:.3f}s")
-        
-        return ObjectFingerprint(
+        fingerprint = ObjectFingerprint(
             vertex_count=vertex_count,
             vertex_hash=vertex_hash,
-            edge_hash="",
-            face_hash="",
-            vertex_group_hash=vertex_group_hash,
-            modifier_hash=modifier_hash,
-            shape_key_hash=shape_key_hash,
-            transform_hash=transform_hash,
-            armature_pose_hash=armature_pose_hash,
+            edge_hash=cls.calculate_edge_hash(obj),
+            face_hash=cls.calculate_face_hash(obj),
+            vertex_group_hash=cls.calculate_vertex_group_hash(obj),
+            modifier_hash=cls.calculate_modifier_hash(obj),
+            shape_key_hash=cls.calculate_shape_key_hash(obj),
+            transform_hash=cls.calculate_transform_hash(obj),
+            armature_pose_hash=cls.calculate_armature_pose_hash(obj),
             mirror_workflow=mirror_workflow,
-            uv_hash=uv_hash
+            uv_hash=cls.calculate_uv_hash(obj)
         )
+        
+        total_time = time.time() - start_total
+        print(f"[Fingerprint] {obj.name} 总耗时: {total_time:.3f}s")
+        
+        return fingerprint
 
 
 class PreprocessCacheManager:
@@ -687,11 +556,23 @@ class PreprocessCacheManager:
     
     CACHE_VERSION = 1
     
-    def __init__(self, cache_dir: Optional[str] = None):
+    # 缓存后端：npz 为数组缓存，blend 为通过 bpy.data.libraries 读写的 .blend 缓存
+    BACKEND_NPZ = "npz"
+    BACKEND_BLEND = "blend"
+    
+    # 缓存容量的默认上限，可在面板中修改
+    DEFAULT_MAX_SIZE_MB = 2048
+    
+    # 压缩整理时只删除修改时间早于该秒数的孤立文件，避免删掉其它进程正在写入的文件
+    ORPHAN_MIN_AGE_SECONDS = 60
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_size_bytes: Optional[int] = None):
         self._cache_dir_override = cache_dir
+        self._max_size_bytes_override = max_size_bytes
         self.cache_index: Dict[str, dict] = {}
         self._ensure_cache_dir()
         self._load_cache_index()
+        self.compact_cache()
     
     @property
     def cache_dir(self) -> str:
@@ -743,14 +624,16 @@ class PreprocessCacheManager:
                 self.cache_index = {}
     
     def _save_cache_index(self):
-        """保存缓存索引"""
+        """保存缓存索引，先写入临时文件再替换，避免中途失败导致索引损坏"""
         try:
             data = {
                 'version': self.CACHE_VERSION,
                 'entries': self.cache_index
             }
-            with open(self.index_file, 'w', encoding='utf-8') as f:
+            temp_index_file = self.index_file + ".tmp"
+            with open(temp_index_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_index_file, self.index_file)
         except Exception as e:
             print(f"[PreprocessCache] 保存缓存索引失败: {e}")
     
@@ -763,9 +646,26 @@ class PreprocessCacheManager:
         print(f"[PreprocessCache] 生成缓存键: {cache_key[:50]}...")
         return cache_key
     
-    def _get_cache_file_path(self, cache_key: str) -> str:
+    def _get_cache_file_path(self, cache_key: str, backend: str = BACKEND_BLEND) -> str:
         """获取缓存文件路径"""
-        return os.path.join(self.cache_dir, f"{cache_key}.blend")
+        return os.path.join(self.cache_dir, f"{cache_key}.{backend}")
+    
+    def _get_entry_backend(self, cache_key: str) -> str:
+        """旧版本索引中没有 backend 字段，默认为 .blend 缓存"""
+        return self.cache_index.get(cache_key, {}).get('backend', self.BACKEND_BLEND)
+    
+    def _get_entry_file_path(self, cache_key: str) -> str:
+        return self._get_cache_file_path(cache_key, self._get_entry_backend(cache_key))
+    
+    @staticmethod
+    def _get_preferred_backend() -> str:
+        from ..config.properties_import_model import Properties_ImportModel
+        try:
+            if Properties_ImportModel.use_array_preprocess_cache():
+                return PreprocessCacheManager.BACKEND_NPZ
+        except AttributeError:
+            return PreprocessCacheManager.BACKEND_NPZ
+        return PreprocessCacheManager.BACKEND_BLEND
     
     def has_valid_cache(self, obj_name: str, fingerprint: ObjectFingerprint) -> bool:
         """检查是否有有效的缓存"""
@@ -774,7 +674,7 @@ class PreprocessCacheManager:
         if cache_key not in self.cache_index:
             return False
         
-        cache_file = self._get_cache_file_path(cache_key)
+        cache_file = self._get_entry_file_path(cache_key)
         if not os.path.exists(cache_file):
             return False
         
@@ -789,7 +689,7 @@ class PreprocessCacheManager:
             print(f"[PreprocessCache] 缓存未命中: {obj_name} (键不在索引中)")
             return None
         
-        cache_file = self._get_cache_file_path(cache_key)
+        cache_file = self._get_entry_file_path(cache_key)
         if not os.path.exists(cache_file):
             print(f"[PreprocessCache] 缓存未命中: {obj_name} (文件不存在)")
             return None
@@ -800,7 +700,15 @@ class PreprocessCacheManager:
                     preprocessed_obj: bpy.types.Object) -> str:
         """存储预处理结果到缓存"""
         cache_key = self._get_cache_key(obj_name, fingerprint)
-        cache_file = self._get_cache_file_path(cache_key)
+        
+        backend = self._get_preferred_backend()
+        if backend == self.BACKEND_NPZ:
+            unsupported_reason = MeshArrays.get_unsupported_reason(preprocessed_obj)
+            if unsupported_reason is None:
+                return self._store_cache_npz(obj_name, fingerprint, cache_key, preprocessed_obj)
+            print(f"[PreprocessCache] {obj_name} 无法使用数组缓存({unsupported_reason})，改用 .blend 缓存")
+        
+        cache_file = self._get_cache_file_path(cache_key, self.BACKEND_BLEND)
         
         try:
             self._ensure_cache_dir()
@@ -822,12 +730,7 @@ class PreprocessCacheManager:
             if mesh_data and mesh_data.name in bpy.data.meshes:
                 bpy.data.meshes.remove(mesh_data, do_unlink=True)
             
-            self.cache_index[cache_key] = {
-                'obj_name': obj_name,
-                'fingerprint': fingerprint.to_dict(),
-                'file': cache_file
-            }
-            self._save_cache_index()
+            self._register_entry(cache_key, obj_name, fingerprint, cache_file, self.BACKEND_BLEND)
             
             print(f"[PreprocessCache] 已缓存: {obj_name}")
             return cache_file
@@ -838,6 +741,39 @@ class PreprocessCacheManager:
             traceback.print_exc()
             return ""
     
+    def _register_entry(self, cache_key: str, obj_name: str, fingerprint: ObjectFingerprint, cache_file: str, backend: str):
+        """写入索引条目，记录文件大小和最后访问时间，然后按容量上限淘汰最久未使用的条目"""
+        self.cache_index[cache_key] = {
+            'obj_name': obj_name,
+            'fingerprint': fingerprint.to_dict(),
+            'file': cache_file,
+            'backend': backend,
+            'size_bytes': os.path.getsize(cache_file),
+            'last_access': time.time()
+        }
+        self._enforce_size_budget(keep_key=cache_key)
+        self._save_cache_index()
+    
+    def _store_cache_npz(self, obj_name: str, fingerprint: ObjectFingerprint, cache_key: str,
+                         preprocessed_obj: bpy.types.Object) -> str:
+        """把预处理后的物体保存为 .npz 数组缓存"""
+        cache_file = self._get_cache_file_path(cache_key, self.BACKEND_NPZ)
+        
+        try:
+            self._ensure_cache_dir()
+            MeshArrays.from_object(preprocessed_obj).save(cache_file)
+            
+            self._register_entry(cache_key, obj_name, fingerprint, cache_file, self.BACKEND_NPZ)
+            
+            print(f"[PreprocessCache] 已缓存(npz): {obj_name}")
+            return cache_file
+            
+        except Exception as e:
+            print(f"[PreprocessCache] 存储数组缓存失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return ""
+    
     def load_cache(self, obj_name: str, fingerprint: ObjectFingerprint, 
                    target_scene: bpy.types.Scene) -> Optional[bpy.types.Object]:
         """从缓存加载预处理结果"""
@@ -845,6 +781,19 @@ class PreprocessCacheManager:
         if not cache_file:
             return None
         
+        cache_key = self._get_cache_key(obj_name, fingerprint)
+        if self._get_entry_backend(cache_key) == self.BACKEND_NPZ:
+            try:
+                loaded_obj = MeshArrays.load(cache_file).to_object(target_scene, name=f"__cache_{obj_name}__")
+                print(f"[PreprocessCache] 从数组缓存加载: {obj_name}")
+                self._touch_entry(cache_key)
+                return loaded_obj
+            except Exception as e:
+                print(f"[PreprocessCache] 加载数组缓存失败: {e}")
+                import traceback
+                traceback.print_exc()
+                return None
+        
         try:
             with bpy.data.libraries.load(cache_file, link=False) as (data_from, data_to):
                 data_to.objects = [name for name in data_from.objects]
@@ -860,6 +809,7 @@ class PreprocessCacheManager:
             
             if loaded_obj:
                 print(f"[PreprocessCache] 从缓存加载: {obj_name}")
+                self._touch_entry(cache_key)
                 return loaded_obj
             
             return None
@@ -873,35 +823,136 @@ class PreprocessCacheManager:
     def clear_cache(self, obj_name: Optional[str] = None):
         """清理缓存"""
         if obj_name:
-            keys_to_remove = [k for k in self.cache_index if k.startswith(obj_name)]
+            # 按索引中记录的物体名精确匹配，避免前缀相同的其它物体被误删
+            keys_to_remove = [k for k, entry in self.cache_index.items() if entry.get('obj_name') == obj_name]
             for key in keys_to_remove:
-                cache_file = self._get_cache_file_path(key)
-                if os.path.exists(cache_file):
-                    try:
-                        os.remove(cache_file)
-                    except:
-                        pass
-                del self.cache_index[key]
+                self._remove_entry(key)
         else:
             for key in self.cache_index:
-                cache_file = self._get_cache_file_path(key)
+                cache_file = self._get_entry_file_path(key)
                 if os.path.exists(cache_file):
                     try:
                         os.remove(cache_file)
                     except:
                         pass
             self.cache_index.clear()
+            # 顺便删除不在索引中的残留文件
+            self.compact_cache(min_age_seconds=0)
         
         self._save_cache_index()
         print(f"[PreprocessCache] 已清理缓存")
     
+    def _touch_entry(self, cache_key: str):
+        """命中缓存时更新最后访问时间"""
+        entry = self.cache_index.get(cache_key)
+        if entry is not None:
+            entry['last_access'] = time.time()
+            self._save_cache_index()
+    
+    def _remove_entry(self, cache_key: str) -> int:
+        """删除条目及其文件，返回释放的字节数"""
+        freed_bytes = self._get_entry_size(cache_key)
+        cache_file = self._get_entry_file_path(cache_key)
+        if os.path.exists(cache_file):
+            try:
+                os.remove(cache_file)
+            except OSError as e:
+                print(f"[PreprocessCache] 删除缓存文件失败: {cache_file}: {e}")
+        self.cache_index.pop(cache_key, None)
+        return freed_bytes
+    
+    def _get_entry_size(self, cache_key: str) -> int:
+        """旧版本索引中没有 size_bytes，读取一次文件大小后补上"""
+        entry = self.cache_index.get(cache_key, {})
+        if 'size_bytes' not in entry:
+            cache_file = self._get_entry_file_path(cache_key)
+            entry['size_bytes'] = os.path.getsize(cache_file) if os.path.exists(cache_file) else 0
+        return entry['size_bytes']
+    
+    def _get_size_budget_bytes(self) -> Optional[int]:
+        """缓存容量上限，None 表示不限制"""
+        if self._max_size_bytes_override is not None:
+            return self._max_size_bytes_override or None
+        
+        max_size_mb = self.DEFAULT_MAX_SIZE_MB
+        try:
+            from ..config.properties_import_model import Properties_ImportModel
+            max_size_mb = Properties_ImportModel.get_preprocess_cache_max_size_mb()
+        except AttributeError:
+            pass
+        return max_size_mb * 1024 * 1024 if max_size_mb > 0 else None
+    
+    def _enforce_size_budget(self, keep_key: Optional[str] = None):
+        """总大小超过上限时，按最后访问时间从旧到新淘汰条目，keep_key 为刚写入的条目不参与淘汰"""
+        budget = self._get_size_budget_bytes()
+        if budget is None:
+            return
+        
+        total_size = sum(self._get_entry_size(key) for key in self.cache_index)
+        if total_size <= budget:
+            return
+        
+        candidates = sorted(
+            (key for key in self.cache_index if key != keep_key),
+            key=lambda key: self.cache_index[key].get('last_access', 0)
+        )
+        evicted_count = 0
+        for key in candidates:
+            if total_size <= budget:
+                break
+            total_size -= self._remove_entry(key)
+            evicted_count += 1
+        
+        print(f"[PreprocessCache] 超出容量上限，淘汰 {evicted_count} 个最久未使用的缓存，当前 {total_size / (1024 * 1024):.1f}MB")
+    
+    def compact_cache(self, min_age_seconds: Optional[float] = None) -> dict:
+        """
+        压缩整理缓存目录：
+        1. 删除文件已经不存在的索引条目
+        2. 删除目录中没有被索引引用的缓存文件（只删除修改时间足够早的文件，不影响正在写入的文件）
+        """
+        if min_age_seconds is None:
+            min_age_seconds = self.ORPHAN_MIN_AGE_SECONDS
+        
+        missing_keys = [key for key in self.cache_index if not os.path.exists(self._get_entry_file_path(key))]
+        for key in missing_keys:
+            del self.cache_index[key]
+        
+        referenced_files = {os.path.normcase(os.path.abspath(self._get_entry_file_path(key))) for key in self.cache_index}
+        now = time.time()
+        removed_files = 0
+        freed_bytes = 0
+        
+        if os.path.isdir(self.cache_dir):
+            for dir_entry in os.scandir(self.cache_dir):
+                if not dir_entry.is_file() or not dir_entry.name.endswith(('.blend', '.npz', '.blend1')):
+                    continue
+                if os.path.normcase(os.path.abspath(dir_entry.path)) in referenced_files:
+                    continue
+                try:
+                    stat = dir_entry.stat()
+                    if now - stat.st_mtime < min_age_seconds:
+                        continue
+                    os.remove(dir_entry.path)
+                    removed_files += 1
+                    freed_bytes += stat.st_size
+                except OSError:
+                    continue
+        
+        if missing_keys:
+            self._save_cache_index()
+        if missing_keys or removed_files:
+            print(f"[PreprocessCache] 压缩整理: 移除 {len(missing_keys)} 个失效条目, 删除 {removed_files} 个孤立文件, 释放 {freed_bytes / (1024 * 1024):.1f}MB")
+        
+        return {
+            'removed_entries': len(missing_keys),
+            'removed_files': removed_files,
+            'freed_bytes': freed_bytes
+        }
+    
     def get_cache_stats(self) -> dict:
         """获取缓存统计信息"""
-        total_size = 0
-        for key in self.cache_index:
-            cache_file = self._get_cache_file_path(key)
-            if os.path.exists(cache_file):
-                total_size += os.path.getsize(cache_file)
+        total_size = sum(self._get_entry_size(key) for key in self.cache_index)
         
         return {
             'total_entries': len(self.cache_index),
@@ -961,3 +1012,20 @@ def reset_cache_manager():
     global _global_cache_manager, _global_cache_blend_file
     _global_cache_manager = None
     _global_cache_blend_file = None
+
+
+def register():
+    if _count_mesh_geometry_updates not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_count_mesh_geometry_updates)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+        if _clear_fingerprint_cache_handler not in handlers:
+            handlers.append(_clear_fingerprint_cache_handler)
+
+
+def unregister():
+    if _count_mesh_geometry_updates in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_count_mesh_geometry_updates)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+        if _clear_fingerprint_cache_handler in handlers:
+            handlers.remove(_clear_fingerprint_cache_handler)
+    FingerprintCalculator.clear_component_cache()
@@ -0,0 +1,120 @@
+import numpy
+
+
+class RowHashUtils:
+    '''
+    纯 numpy 实现的定长字节行哈希与去重工具，不依赖 bpy。
+
+    每一行字节补齐到 8 字节的整数倍后按 uint64 分块，
+    使用 xxHash64 风格的乘法-循环移位混合，得到两条不同种子的 uint64 哈希通道，
+    合起来作为 128 位键参与 numpy.unique，比直接对整行字节排序快得多。
+    哈希去重后会逐字节校验一遍，若出现碰撞则退回到整行字节的精确去重。
+    '''
+
+    PRIME64_1 = numpy.uint64(0x9E3779B185EBCA87)
+    PRIME64_2 = numpy.uint64(0xC2B2AE3D27D4EB4F)
+    PRIME64_3 = numpy.uint64(0x165667B19E3779F9)
+    PRIME64_4 = numpy.uint64(0x85EBCA77C2B2AE63)
+    PRIME64_5 = numpy.uint64(0x27D4EB2F165667C5)
+
+    LANE_SEEDS = (0x0, 0x5851F42D4C957F2D)
+
+    @staticmethod
+    def _rotl(x:numpy.ndarray, r:int) -> numpy.ndarray:
+        return (x << numpy.uint64(r)) | (x >> numpy.uint64(64 - r))
+
+    @staticmethod
+    def _to_u64_blocks(row_bytes:numpy.ndarray) -> numpy.ndarray:
+        '''
+        (n, width) 的 uint8 矩阵补零到 8 字节对齐后视为 (n, blocks) 的 uint64 矩阵
+        '''
+        n_rows, width = row_bytes.shape
+        padded_width = max(8, width + (-width) % 8)
+        if padded_width == width and row_bytes.flags['C_CONTIGUOUS']:
+            padded = row_bytes
+        else:
+            padded = numpy.zeros((n_rows, padded_width), dtype=numpy.uint8)
+            padded[:, :width] = row_bytes
+        return padded.view('<u8').reshape(n_rows, padded_width // 8).astype(numpy.uint64, copy=False)
+
+    @classmethod
+    def hash_rows(cls, row_bytes:numpy.ndarray, seed:int = 0) -> numpy.ndarray:
+        '''
+        对每一行字节计算一个 uint64 哈希值（单通道）
+        '''
+        blocks = cls._to_u64_blocks(row_bytes)
+        n_rows, n_blocks = blocks.shape
+
+        with numpy.errstate(over='ignore'):
+            acc = numpy.full(n_rows, numpy.uint64(seed) + cls.PRIME64_5 + numpy.uint64(row_bytes.shape[1]), dtype=numpy.uint64)
+            for i in range(n_blocks):
+                k = blocks[:, i] * cls.PRIME64_2
+                k = cls._rotl(k, 31)
+                k *= cls.PRIME64_1
+                acc ^= k
+                acc = cls._rotl(acc, 27) * cls.PRIME64_1 + cls.PRIME64_4
+
+            # avalanche
+            acc ^= acc >> numpy.uint64(33)
+            acc *= cls.PRIME64_2
+            acc ^= acc >> numpy.uint64(29)
+            acc *= cls.PRIME64_3
+            acc ^= acc >> numpy.uint64(32)
+        return acc
+
+    @classmethod
+    def hash_rows_x2(cls, row_bytes:numpy.ndarray) -> numpy.ndarray:
+        '''
+        两条不同种子的哈希通道，返回 (n, 2) 的 uint64 矩阵
+        '''
+        lanes = numpy.empty((row_bytes.shape[0], 2), dtype=numpy.uint64)
+        for lane_index, seed in enumerate(cls.LANE_SEEDS):
+            lanes[:, lane_index] = cls.hash_rows(row_bytes, seed=seed)
+        return lanes
+
+    @staticmethod
+    def _unique_keys_first_occurrence(keys:numpy.ndarray):
+        '''
+        keys 为一维数组，返回 (首次出现位置按出现顺序排列, 每个元素对应的新编号)
+        '''
+        _, first_positions, inverse = numpy.unique(keys, return_index=True, return_inverse=True)
+        order = numpy.argsort(first_positions, kind='stable')
+        new_id = numpy.empty(len(order), dtype=numpy.int64)
+        new_id[order] = numpy.arange(len(order), dtype=numpy.int64)
+        return first_positions[order], new_id[inverse.reshape(-1)]
+
+    @classmethod
+    def unique_rows_exact(cls, row_bytes:numpy.ndarray):
+        '''
+        整行字节视为 void 类型做精确去重，结果按首次出现顺序编号
+        '''
+        row_bytes = numpy.ascontiguousarray(row_bytes)
+        if row_bytes.shape[1] == 0:
+            row_bytes = numpy.zeros((row_bytes.shape[0], 1), dtype=numpy.uint8)
+        keys = row_bytes.view(numpy.dtype((numpy.void, row_bytes.shape[1]))).reshape(-1)
+        return cls._unique_keys_first_occurrence(keys)
+
+    @classmethod
+    def unique_rows_hashed(cls, row_bytes:numpy.ndarray):
+        '''
+        基于 128 位哈希的去重，等价于按 row_bytes 整行内容去重，结果按首次出现顺序编号。
+
+        返回:
+        - unique_first_indices: 每个唯一行首次出现的行号，按出现顺序排列
+        - inverse: 每一行对应的唯一行编号
+        '''
+        row_bytes = numpy.ascontiguousarray(row_bytes)
+        if row_bytes.shape[0] == 0:
+            return numpy.empty(0, dtype=numpy.int64), numpy.empty(0, dtype=numpy.int64)
+
+        lanes = numpy.ascontiguousarray(cls.hash_rows_x2(row_bytes))
+        keys = lanes.view(numpy.dtype((numpy.void, 16))).reshape(-1)
+        unique_first_indices, inverse = cls._unique_keys_first_occurrence(keys)
+
+        # 碰撞校验：每一行都必须与其代表行的字节完全一致
+        representative_rows = row_bytes[unique_first_indices[inverse]]
+        if not numpy.array_equal(representative_rows, row_bytes):
+            print("[RowHashUtils] 检测到哈希碰撞，回退到精确字节去重")
+            return cls.unique_rows_exact(row_bytes)
+
+        return unique_first_indices, inverse
@@ -378,28 +378,34 @@ class ShapeKeyUtils:
     def extract_shapekey_data(cls,merged_obj,index_vertex_id_dict):
         '''
         传入一个Obj，提取出其形态键数据为特定格式
+        返回 (shapekey_offsets (128,) int32, shapekey_vertex_ids (N,) int32, shapekey_vertex_offsets (N,6) float32)
+        shapekey_vertex_offsets 每行前3个是坐标偏移，后3个固定为0
         '''
         shapekey_cache = cls.get_shapekey_cache(merged_obj,index_vertex_id_dict)
 
-        shapekey_offsets = []
-        shapekey_vertex_ids = []
-        shapekey_vertex_offsets = []
+        shapekey_offsets = numpy.zeros(128, dtype=numpy.int32)
+        shapekey_vertex_ids_list = []
+        shapekey_vertex_offsets_list = []
 
-        # 从0到128去获取ShapeKey的Index，有就直接加到
+        # 从0到128去获取ShapeKey的Index，没有的话就沿用当前已写入的顶点数量
         shapekey_verts_count = 0
         for group_id in range(128):
-            shapekey = shapekey_cache.get(group_id, None)
+            shapekey_offsets[group_id] = shapekey_verts_count
 
-            if shapekey is None or len(shapekey_cache[group_id]) == 0:
-                shapekey_offsets.extend([shapekey_verts_count if shapekey_verts_count != 0 else 0])
+            shapekey = shapekey_cache.get(group_id, None)
+            if shapekey is None or len(shapekey[0]) == 0:
                 continue
 
-            shapekey_offsets.extend([shapekey_verts_count])
+            draw_indices, vertex_offsets = shapekey
+            shapekey_vertex_ids_list.append(draw_indices)
+            shapekey_vertex_offsets_list.append(vertex_offsets)
+            shapekey_verts_count += len(draw_indices)
 
-            for draw_index, vertex_offsets in shapekey.items():
-                shapekey_vertex_ids.extend([draw_index])
-                shapekey_vertex_offsets.extend(vertex_offsets + [0, 0, 0])
-                shapekey_verts_count += 1
+        shapekey_vertex_ids = numpy.zeros(shapekey_verts_count, dtype=numpy.int32)
+        shapekey_vertex_offsets = numpy.zeros((shapekey_verts_count, 6), dtype=numpy.float32)
+        if shapekey_verts_count > 0:
+            shapekey_vertex_ids[:] = numpy.concatenate(shapekey_vertex_ids_list)
+            shapekey_vertex_offsets[:, :3] = numpy.concatenate(shapekey_vertex_offsets_list)
 
         return shapekey_offsets,shapekey_vertex_ids,shapekey_vertex_offsets
     
@@ -407,6 +413,10 @@ class ShapeKeyUtils:
 
     @classmethod
     def get_shapekey_cache(cls, merged_obj, index_vertex_id_dict):
+        '''
+        返回 {形态键ID: (index_id 数组, 对应的坐标偏移 (N,3) float32)}
+        只保留偏移量不为0的顶点，顺序为顶点索引从小到大，同一个顶点的多个 index_id 保持字典中的顺序
+        '''
         obj = merged_obj
         mesh = obj.data
         mesh_shapekeys = mesh.shape_keys
@@ -417,11 +427,11 @@ class ShapeKeyUtils:
             return None, None, None
 
         # 构建顶点索引到全局index_id的反向映射
-        vertex_to_indices = {}
-        for index_id, vertex_id in index_vertex_id_dict.items():
-            if vertex_id not in vertex_to_indices:
-                vertex_to_indices[vertex_id] = []
-            vertex_to_indices[vertex_id].append(index_id)
+        # 按顶点索引稳定排序后，同一个顶点的 index_id 相邻并保持原来的顺序
+        index_ids = numpy.fromiter(index_vertex_id_dict.keys(), dtype=numpy.int64, count=len(index_vertex_id_dict))
+        vertex_ids = numpy.fromiter(index_vertex_id_dict.values(), dtype=numpy.int64, count=len(index_vertex_id_dict))
+        vertex_order = numpy.argsort(vertex_ids, kind='stable')
+        sorted_vertex_ids = vertex_ids[vertex_order]
 
         # 获取基础坐标
         base_data = mesh_shapekeys.key_blocks['Basis'].data
@@ -460,26 +470,37 @@ class ShapeKeyUtils:
             # 计算向量长度并过滤小偏移
             lengths = numpy.linalg.norm(offsets, axis=1)
             valid_mask = lengths >= 1e-9
-            valid_vertex_ids = numpy.where(valid_mask)[0]
             
-            if not valid_vertex_ids.size:
+            if not valid_mask.any():
                 # 这里一般不会触发
                 # print("valid_vertex_ids.size not, continue!")
                 continue
-                
-            # 按形态键初始化缓存
+
+            # 处理有效顶点，获取关联的全局index_id（这里先记录它在字典中的序号）
+            selected = valid_mask[sorted_vertex_ids]
+            new_entries = vertex_order[selected]
+            new_offsets = offsets[sorted_vertex_ids[selected]]
+
             if shapekey_idx not in shapekey_cache:
-                shapekey_cache[shapekey_idx] = {}
-                
-            # 处理有效顶点
-            for v_idx in valid_vertex_ids:
-                offset_list = offsets[v_idx].tolist()
-                # 获取关联的全局index_id
-                if v_idx in vertex_to_indices:
-                    for index_id in vertex_to_indices[v_idx]:
-                        shapekey_cache[shapekey_idx][index_id] = offset_list
-
-        return shapekey_cache
+                shapekey_cache[shapekey_idx] = (new_entries, new_offsets)
+                continue
+
+            # 多个形态键对应同一个ID时，已有的 index_id 保持原来的位置并更新偏移，新的 index_id 追加到末尾
+            old_entries, old_offsets = shapekey_cache[shapekey_idx]
+            new_positions = numpy.full(len(index_ids), -1, dtype=numpy.int64)
+            new_positions[new_entries] = numpy.arange(len(new_entries))
+            old_positions = new_positions[old_entries]
+            is_existing = old_positions >= 0
+            merged_offsets = old_offsets.copy()
+            merged_offsets[is_existing] = new_offsets[old_positions[is_existing]]
+            new_positions[old_entries] = -1
+            is_appended = new_positions[new_entries] >= 0
+            shapekey_cache[shapekey_idx] = (
+                numpy.concatenate((old_entries, new_entries[is_appended])),
+                numpy.concatenate((merged_offsets, new_offsets[is_appended])),
+            )
+
+        return {shapekey_idx: (index_ids[entries], vertex_offsets) for shapekey_idx, (entries, vertex_offsets) in shapekey_cache.items()}
     
     @staticmethod
     def reset_shapekey_values(obj, configured_shapekey_names=None, current_shapekey_name=None):
@@ -501,3 +522,84 @@ class ShapeKeyUtils:
                     # 如果不是当前正在处理的形态键，则归零
                     if key_block.name != current_shapekey_name:
                         key_block.value = 0.0
+
+    @staticmethod
+    def get_direct_evaluation_blocker(obj:bpy.types.Object, mesh:bpy.types.Mesh) -> Optional[str]:
+        '''
+        判断能否跳过 depsgraph，直接从 key_blocks 的 co 计算每个形态键应用后的顶点坐标
+        返回 None 表示可以，否则返回不能直接计算的原因
+
+        只有形态键之后没有任何修改器参与计算，且 mesh 拓扑与原始数据一致时，
+        key_blocks 中的坐标才与 evaluated mesh 的顶点坐标完全对应
+        '''
+        shape_keys = obj.data.shape_keys
+        if shape_keys is None or len(shape_keys.key_blocks) == 0:
+            return "没有形态键"
+
+        enabled_modifiers = [modifier.name for modifier in obj.modifiers if modifier.show_viewport]
+        if enabled_modifiers:
+            return "存在启用的修改器: " + ", ".join(enabled_modifiers)
+
+        if obj.show_only_shape_key:
+            return "开启了形态键固定(Shape Key Lock)"
+
+        if not shape_keys.use_relative:
+            return "使用了绝对形态键"
+
+        for key_block in shape_keys.key_blocks:
+            if key_block.vertex_group:
+                return "形态键 " + key_block.name + " 使用了顶点组遮罩"
+
+        if len(mesh.vertices) != len(obj.data.vertices) or len(mesh.loops) != len(obj.data.loops):
+            return "evaluated mesh 与原始 mesh 拓扑不一致"
+
+        return None
+
+    @staticmethod
+    def get_direct_shapekey_vertex_coords_dict(obj:bpy.types.Object, shapekey_names:List[str]) -> Dict[str, numpy.ndarray]:
+        '''
+        一次性读取所有 key_blocks 的 co，计算每个配置的形态键单独应用到1时的顶点坐标
+        与逐个设置形态键值再 evaluated_get 的结果一致：
+        - 配置列表中的其它形态键视为0
+        - 未配置的形态键保留当前值
+        - 静音的形态键不参与计算
+        '''
+        shape_keys = obj.data.shape_keys
+        key_blocks = shape_keys.key_blocks
+        reference_key = shape_keys.reference_key
+        configured_shapekey_names = set(shapekey_names)
+        vertex_count = len(obj.data.vertices)
+
+        key_coords_dict:Dict[str, numpy.ndarray] = {}
+        def get_key_coords(key_block) -> numpy.ndarray:
+            coords = key_coords_dict.get(key_block.name, None)
+            if coords is None:
+                coords = numpy.empty(vertex_count * 3, dtype=numpy.float32)
+                key_block.data.foreach_get('co', coords)
+                coords = coords.reshape(-1, 3)
+                key_coords_dict[key_block.name] = coords
+            return coords
+
+        def get_key_delta(key_block) -> numpy.ndarray:
+            relative_key = key_block.relative_key if key_block.relative_key is not None else reference_key
+            return get_key_coords(key_block) - get_key_coords(relative_key)
+
+        # 所有形态键共用的部分：参考形态 + 未配置形态键按当前值的偏移
+        static_coords = get_key_coords(reference_key).copy()
+        for key_block in key_blocks:
+            if key_block == reference_key or key_block.mute or key_block.name in configured_shapekey_names:
+                continue
+            if key_block.value != 0.0:
+                static_coords += key_block.value * get_key_delta(key_block)
+
+        shapekey_vertex_coords_dict:Dict[str, numpy.ndarray] = {}
+        for shapekey_name in shapekey_names:
+            key_block = key_blocks.get(shapekey_name, None)
+            if key_block is None:
+                continue
+            if key_block == reference_key or key_block.mute:
+                shapekey_vertex_coords_dict[shapekey_name] = static_coords.copy()
+            else:
+                shapekey_vertex_coords_dict[shapekey_name] = static_coords + get_key_delta(key_block)
+
+        return shapekey_vertex_coords_dict
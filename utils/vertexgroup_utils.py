@@ -668,6 +668,221 @@ class VertexGroupUtils:
         # return in old interface: semantic index 0 only (v4 implementation style)
         return {0: blendweights}, {0: blendindices}
 
+    @staticmethod
+    def add_vertex_weights_bulk(obj, group_ids:numpy.ndarray, vertex_ids:numpy.ndarray, weights:numpy.ndarray, vertex_count:int) -> int:
+        '''
+        批量写入顶点组权重，结果与按顺序逐条调用 vertex_groups[g].add((v,), w, 'REPLACE') 一致：
+        同一 (顶点组, 顶点) 出现多次时保留最后一次，然后按 (顶点组, 权重值) 分桶，每个桶只调用一次 add()
+        返回 add() 的调用次数
+        '''
+        group_ids = numpy.asarray(group_ids, dtype=numpy.int64)
+        vertex_ids = numpy.asarray(vertex_ids, dtype=numpy.int64)
+        weights = numpy.asarray(weights)
+        if len(weights) == 0:
+            return 0
+
+        # REPLACE 语义：同一 (顶点组, 顶点) 只保留最后一次出现的权重
+        pair_keys = group_ids * vertex_count + vertex_ids
+        _, last_from_end = numpy.unique(pair_keys[::-1], return_index=True)
+        keep = len(pair_keys) - 1 - last_from_end
+        group_ids = group_ids[keep]
+        vertex_ids = vertex_ids[keep]
+        weights = weights[keep]
+
+        # 按 (顶点组, 权重) 分桶
+        order = numpy.lexsort((vertex_ids, weights, group_ids))
+        group_ids = group_ids[order]
+        vertex_ids = vertex_ids[order]
+        weights = weights[order]
+
+        bucket_starts = numpy.flatnonzero(
+            numpy.concatenate(([True], (group_ids[1:] != group_ids[:-1]) | (weights[1:] != weights[:-1]))))
+        bucket_ends = numpy.append(bucket_starts[1:], len(group_ids))
+
+        vertex_groups = obj.vertex_groups
+        for bucket_start, bucket_end in zip(bucket_starts.tolist(), bucket_ends.tolist()):
+            vertex_groups[int(group_ids[bucket_start])].add(vertex_ids[bucket_start:bucket_end].tolist(), float(weights[bucket_start]), 'REPLACE')
+
+        return len(bucket_starts)
+
+    @staticmethod
+    def collect_vertex_group_weights(mesh):
+        '''
+        一次遍历收集所有顶点的 (顶点组索引, 权重)，保持 v.groups 中的原始顺序
+        返回 CSR 形式: (row_offsets (V+1,), group_ids (N,), weights (N,))
+        '''
+        mesh_verts = mesh.vertices
+        n_verts = len(mesh_verts)
+
+        # 每个顶点的 v.groups 只取一次，len() 不会遍历其中的元素
+        vertex_groups_list = [v.groups for v in mesh_verts]
+        counts = numpy.fromiter(map(len, vertex_groups_list), dtype=numpy.int64, count=n_verts)
+        n_entries = int(counts.sum())
+
+        # 每个元素只访问一次，(group, weight) 交错写入同一个数组
+        # float64 可以精确表示顶点组索引和 float32 权重，拆分后不会丢失精度
+        flat_entries = numpy.fromiter(
+            itertools.chain.from_iterable((g.group, g.weight) for groups in vertex_groups_list for g in groups),
+            dtype=numpy.float64, count=n_entries * 2).reshape(n_entries, 2)
+        group_ids = flat_entries[:, 0].astype(numpy.int64)
+        weights = flat_entries[:, 1].astype(numpy.float32)
+
+        row_offsets = numpy.zeros(n_verts + 1, dtype=numpy.int64)
+        numpy.cumsum(counts, out=row_offsets[1:])
+        return row_offsets, group_ids, weights
+
+    @staticmethod
+    def calc_topk_blend_from_csr(
+        row_offsets:numpy.ndarray,
+        group_ids:numpy.ndarray,
+        weights:numpy.ndarray,
+        blend_size:int = 4,
+        ignore_zero_weights:bool = False,
+        normalize_weights:bool = False,
+        split_by_4:bool = True,
+        max_influences:int = 0):
+        '''
+        纯 numpy 的逐顶点权重 Top-K 计算，返回逐顶点的 (blendweights_dict, blendindices_dict)
+
+        - K 为所有顶点中最大的顶点组数量向上对齐到4的倍数，且不小于 blend_size
+        - 每个顶点按权重从大到小排列，权重相同时保持 v.groups 中的原始顺序
+        - ignore_zero_weights: 是否丢弃权重为0的顶点组
+        - normalize_weights: 是否把每个顶点的 K 个权重归一化，split_by_4 时每4个一组再归一化一次
+        - split_by_4: 是否按每4个一组拆分到不同的 SemanticIndex，否则全部放到 SemanticIndex 0
+        - max_influences: 大于0时每个顶点最多保留这么多个权重最大的顶点组，K 也按它来对齐
+        '''
+        n_verts = len(row_offsets) - 1
+        counts = numpy.diff(row_offsets)
+        vertex_ids = numpy.repeat(numpy.arange(n_verts, dtype=numpy.int64), counts)
+
+        if ignore_zero_weights:
+            keep = weights > 0
+            vertex_ids = vertex_ids[keep]
+            group_ids = group_ids[keep]
+            weights = weights[keep]
+            counts = numpy.bincount(vertex_ids, minlength=n_verts)
+            row_offsets = numpy.zeros(n_verts + 1, dtype=numpy.int64)
+            numpy.cumsum(counts, out=row_offsets[1:])
+
+        real_max_groups = int(counts.max()) if n_verts > 0 and len(weights) > 0 else 0
+        if split_by_4 and real_max_groups == 0:
+            # 没有任何顶点组时返回空字典，由调用方报错提示
+            return {}, {}
+
+        kept_groups = real_max_groups
+        if max_influences > 0:
+            kept_groups = min(kept_groups, max_influences)
+
+        top_k = 4 * math.ceil(kept_groups / 4) if kept_groups else 4
+        top_k = max(top_k, blend_size)
+
+        # 按行展开成 (V, C) 的稠密矩阵，空位权重为 -inf
+        column_count = max(real_max_groups, 1)
+        columns = numpy.arange(len(weights), dtype=numpy.int64) - row_offsets[vertex_ids]
+        dense_weights = numpy.full((n_verts, column_count), -numpy.inf, dtype=numpy.float32)
+        dense_groups = numpy.zeros((n_verts, column_count), dtype=numpy.int64)
+        dense_weights[vertex_ids, columns] = weights
+        dense_groups[vertex_ids, columns] = group_ids
+
+        if 0 < kept_groups < column_count:
+            # 用第 K 大的权重作为阈值选出 K 个，阈值上的并列项按原始顺序优先
+            kth = column_count - kept_groups
+            threshold = numpy.partition(dense_weights, kth, axis=1)[:, kth][:, None]
+            above = dense_weights > threshold
+            tied = dense_weights == threshold
+            remaining = kept_groups - above.sum(axis=1, keepdims=True)
+            selected = above | (tied & (numpy.cumsum(tied, axis=1) <= remaining))
+            dense_weights = numpy.where(selected, dense_weights, -numpy.inf)
+
+        # 稳定排序保证权重相同时保持原始顺序
+        order = numpy.argsort(-dense_weights, axis=1, kind='stable')[:, :top_k]
+        picked_weights = numpy.take_along_axis(dense_weights, order, axis=1)
+        picked_groups = numpy.take_along_axis(dense_groups, order, axis=1)
+
+        if picked_weights.shape[1] < top_k:
+            pad = top_k - picked_weights.shape[1]
+            picked_weights = numpy.pad(picked_weights, ((0, 0), (0, pad)), constant_values=-numpy.inf)
+            picked_groups = numpy.pad(picked_groups, ((0, 0), (0, pad)))
+
+        empty_slots = numpy.isneginf(picked_weights)
+        picked_weights[empty_slots] = 0.0
+        picked_groups[empty_slots] = 0
+
+        if normalize_weights:
+            weight_sums = picked_weights.sum(axis=1, keepdims=True)
+            weight_sums[weight_sums == 0] = 1
+            picked_weights = picked_weights / weight_sums
+
+        blendweights_dict = {}
+        blendindices_dict = {}
+        set_size = 4 if split_by_4 else top_k
+        for set_idx in range(top_k // set_size):
+            set_weights = picked_weights[:, set_idx * set_size:(set_idx + 1) * set_size].astype(numpy.float32)
+            set_indices = picked_groups[:, set_idx * set_size:(set_idx + 1) * set_size].astype(numpy.uint32)
+            if normalize_weights and split_by_4:
+                row_sum = numpy.sum(set_weights, axis=1, keepdims=True)
+                numpy.putmask(row_sum, row_sum == 0, 1.0)
+                set_weights = set_weights / row_sum
+            blendweights_dict[set_idx] = set_weights
+            blendindices_dict[set_idx] = set_indices
+
+        return blendweights_dict, blendindices_dict
+
+    @classmethod
+    def get_blendweights_blendindices_unified(
+        cls,
+        mesh,
+        blend_size:int = 4,
+        ignore_zero_weights:bool = False,
+        normalize_weights:bool = False,
+        split_by_4:bool = True,
+        max_influences:int = 0):
+        '''
+        所有游戏通用的权重提取：
+        1. 一次遍历把所有顶点组权重收集为 CSR
+        2. numpy 计算逐顶点 Top-K 与归一化
+        3. 按 loop 的顶点索引一次性映射到逐 loop 数组
+
+        split_by_4=True, ignore_zero_weights=False 时与 v3 结果一致，
+        split_by_4=False, ignore_zero_weights=True 时与 v4_fast 结果一致。
+        '''
+        mesh_loops = mesh.loops
+        n_loops = len(mesh_loops)
+        n_verts = len(mesh.vertices)
+
+        loop_vertex_indices = numpy.empty(n_loops, dtype=numpy.int32)
+        mesh_loops.foreach_get("vertex_index", loop_vertex_indices)
+
+        row_offsets, group_ids, weights = cls.collect_vertex_group_weights(mesh)
+        vertex_weights_dict, vertex_indices_dict = cls.calc_topk_blend_from_csr(
+            row_offsets=row_offsets,
+            group_ids=group_ids,
+            weights=weights,
+            blend_size=blend_size,
+            ignore_zero_weights=ignore_zero_weights,
+            normalize_weights=normalize_weights,
+            split_by_4=split_by_4,
+            max_influences=max_influences
+        )
+
+        valid_loop_mask = (0 <= loop_vertex_indices) & (loop_vertex_indices < n_verts)
+        valid_vidx = loop_vertex_indices[valid_loop_mask]
+
+        blendweights_dict = {}
+        blendindices_dict = {}
+        for set_idx, vertex_weights in vertex_weights_dict.items():
+            vertex_indices = vertex_indices_dict[set_idx]
+
+            blendweights = numpy.zeros((n_loops, vertex_weights.shape[1]), dtype=numpy.float32)
+            blendindices = numpy.zeros((n_loops, vertex_indices.shape[1]), dtype=numpy.uint32)
+            blendweights[valid_loop_mask] = vertex_weights[valid_vidx]
+            blendindices[valid_loop_mask] = vertex_indices[valid_vidx]
+
+            blendweights_dict[set_idx] = blendweights
+            blendindices_dict[set_idx] = blendindices
+
+        return blendweights_dict, blendindices_dict
+
     @classmethod
     def get_blendweights_blendindices_v4(cls, mesh, normalize_weights: bool = False,blend_size = 4):
         """